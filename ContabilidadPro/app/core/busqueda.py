@@ -0,0 +1,124 @@
+"""
+Índices de búsqueda de texto completo (SQLite FTS5)
+
+Mantiene tablas FTS5 de contenido externo sobre transacciones.concepto y
+auditoria.descripcion. Los triggers las mantienen sincronizadas con cada
+INSERT/UPDATE/DELETE, y al crearlas por primera vez se cargan con las filas
+existentes.
+"""
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from app.utils.logger import app_logger
+
+# Tabla FTS -> (tabla de contenido, columna indexada)
+INDICES_FTS = {
+    'transacciones_fts': ('transacciones', 'concepto'),
+    'auditoria_fts': ('auditoria', 'descripcion'),
+}
+
+# Sin distinguir mayúsculas ni acentos ("credito" encuentra "Crédito")
+TOKENIZADOR_FTS = "unicode61 remove_diacritics 2"
+
+
+def _ddl_indice(tabla_fts: str, tabla: str, columna: str) -> List[str]:
+    """Sentencias que crean la tabla FTS y sus triggers de sincronización"""
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla_fts} USING fts5("
+        f"{columna}, content='{tabla}', content_rowid='id', "
+        f"tokenize='{TOKENIZADOR_FTS}')",
+
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}(rowid, {columna}) VALUES (new.id, new.{columna}); END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {columna}) "
+        f"VALUES ('delete', old.id, old.{columna}); END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {tabla_fts}_au AFTER UPDATE OF {columna} ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {columna}) "
+        f"VALUES ('delete', old.id, old.{columna}); "
+        f"INSERT INTO {tabla_fts}(rowid, {columna}) VALUES (new.id, new.{columna}); END",
+    ]
+
+
+def crear_indices_busqueda(engine: Engine) -> bool:
+    """
+    Crea los índices FTS5 y sus triggers, cargando las filas existentes
+
+    Es idempotente: si los índices ya existen no hace nada.
+
+    Args:
+        engine: Engine de la base de datos
+
+    Returns:
+        True si FTS5 está disponible, False si SQLite no lo soporta
+    """
+    try:
+        with engine.begin() as conexion:
+            for tabla_fts, (tabla, columna) in INDICES_FTS.items():
+                existe = conexion.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"),
+                    {"nombre": tabla_fts}
+                ).first()
+
+                for sentencia in _ddl_indice(tabla_fts, tabla, columna):
+                    conexion.execute(text(sentencia))
+
+                if not existe:
+                    # Migración: indexar las filas que ya estaban en la tabla
+                    conexion.execute(text(f"INSERT INTO {tabla_fts}({tabla_fts}) VALUES ('rebuild')"))
+                    app_logger.info(f"Índice de búsqueda {tabla_fts} creado y cargado")
+        return True
+    except OperationalError as e:
+        app_logger.warning(f"Búsqueda de texto completo no disponible (FTS5): {e}")
+        return False
+
+
+def reconstruir_indices_busqueda(engine: Engine):
+    """
+    Reconstruye por completo los índices FTS5 desde sus tablas de contenido
+
+    Args:
+        engine: Engine de la base de datos
+    """
+    with engine.begin() as conexion:
+        for tabla_fts in INDICES_FTS:
+            conexion.execute(text(f"INSERT INTO {tabla_fts}({tabla_fts}) VALUES ('rebuild')"))
+
+
+def construir_consulta_fts(termino: str) -> str:
+    """
+    Convierte el texto ingresado por el usuario en una consulta FTS5 segura
+
+    Cada palabra se busca como prefijo ("vent" encuentra "Venta", "ventas")
+    y todas deben aparecer. Las comillas se escapan, por lo que el usuario no
+    puede inyectar operadores de FTS5.
+
+    Args:
+        termino: Texto a buscar
+
+    Returns:
+        Consulta MATCH de FTS5, o cadena vacía si no hay palabras
+    """
+    palabras = termino.split()
+    return " ".join('"' + palabra.replace('"', '""') + '"*' for palabra in palabras)
+
+
+def indice_no_disponible(error: OperationalError, tabla_fts: str) -> bool:
+    """
+    Indica si un error de una búsqueda FTS5 se debe a que el índice no existe
+
+    Solo en ese caso conviene buscar con LIKE; cualquier otro error (base
+    bloqueada, consulta interrumpida por una cancelación) debe propagarse.
+
+    Args:
+        error: Error lanzado por la consulta MATCH
+        tabla_fts: Nombre de la tabla FTS5 consultada
+
+    Returns:
+        True si falta la tabla FTS5 o el módulo fts5 de SQLite
+    """
+    mensaje = str(error.orig)
+    return mensaje in (f"no such table: {tabla_fts}", "no such module: fts5")
@@ -0,0 +1,140 @@
+"""
+Caché en memoria de estados financieros, invalidada por versión del libro contable
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.estado_sesion import marcar_en_transaccion
+import config
+
+# Clave en session.info que indica que la sesión modificó el libro contable
+CLAVE_LIBRO_MODIFICADO = 'libro_modificado'
+
+
+class VersionLibro:
+    """Contador de versión del libro contable (se incrementa con cada escritura confirmada)"""
+
+    def __init__(self):
+        self._valor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def actual(self) -> int:
+        """Versión actual del libro"""
+        return self._valor
+
+    def incrementar(self) -> int:
+        """
+        Incrementa la versión del libro
+
+        Returns:
+            Nueva versión
+        """
+        with self._lock:
+            self._valor += 1
+            return self._valor
+
+
+class CacheLRU:
+    """Caché LRU acotada y segura entre hilos, con contadores de uso"""
+
+    def __init__(self, capacidad: int):
+        """
+        Inicializa la caché
+
+        Args:
+            capacidad: Número máximo de entradas
+        """
+        self.capacidad = capacidad
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca una entrada en la caché
+
+        Args:
+            clave: Clave de la entrada
+
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.hits += 1
+                return True, self._datos[clave]
+            self.misses += 1
+            return False, None
+
+    def guardar(self, clave: Hashable, valor: Any):
+        """
+        Guarda una entrada, descartando la menos usada si se supera la capacidad
+
+        Args:
+            clave: Clave de la entrada
+            valor: Valor a guardar
+        """
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.evictions += 1
+
+    def limpiar(self):
+        """Elimina todas las entradas (los contadores se conservan)"""
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        Retorna los contadores de uso de la caché
+
+        Returns:
+            Diccionario con hits, misses, evictions, tamaño y capacidad
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'tamano': len(self._datos),
+                'capacidad': self.capacidad,
+                'version_libro': version_libro.actual
+            }
+
+
+def marcar_libro_modificado(session: Session):
+    """
+    Marca que la sesión escribió en el libro contable
+
+    La versión se incrementa recién cuando la sesión confirma (commit), de modo
+    que ningún lector pueda cachear datos no confirmados bajo la versión nueva.
+
+    Args:
+        session: Sesión que realizó la escritura
+    """
+    marcar_en_transaccion(session, CLAVE_LIBRO_MODIFICADO)
+
+
+def libro_modificado_en(session: Session) -> bool:
+    """Indica si la sesión tiene escrituras del libro pendientes de confirmar"""
+    return session.info.get(CLAVE_LIBRO_MODIFICADO, False)
+
+
+@event.listens_for(Session, "after_commit")
+def _incrementar_version_al_confirmar(session):
+    if session.info.pop(CLAVE_LIBRO_MODIFICADO, False):
+        version_libro.incrementar()
+
+
+
+# Instancias globales del proceso
+version_libro = VersionLibro()
+cache_estados = CacheLRU(config.CACHE_ESTADOS_CAPACIDAD)
@@ -0,0 +1,162 @@
+"""
+Cancelación de consultas largas de SQLite
+
+SQLite llama al "progress handler" de una conexión cada cierta cantidad de
+instrucciones de su máquina virtual; si el handler retorna un valor
+distinto de cero, la consulta en curso se interrumpe con
+OperationalError("interrupted"). Aquí se instala ese handler sobre la
+conexión cruda de la sesión mientras dura una operación, atado a un
+TokenCancelacion que puede cancelarse desde otro hilo o vencer por tiempo.
+
+    token = TokenCancelacion(tiempo_limite=120)
+    with consultas_cancelables(session, token):
+        for linea in reportes_service.iterar_reporte_transacciones(limite=None):
+            ...
+
+Si la operación se interrumpe, la sesión se revierte y se lanza
+ConsultaCancelada (con el motivo: cancelada o tiempo agotado).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from sqlalchemy.orm import Session
+from app.utils.logger import app_logger
+import config
+
+MOTIVO_CANCELADA = "cancelada"
+MOTIVO_TIEMPO_AGOTADO = "tiempo agotado"
+
+
+class ConsultaCancelada(Exception):
+    """La operación se interrumpió por cancelación o por superar su tiempo límite"""
+
+    def __init__(self, motivo: str, tiempo_limite: Optional[float] = None):
+        self.motivo = motivo
+        self.tiempo_limite = tiempo_limite
+        if motivo == MOTIVO_TIEMPO_AGOTADO:
+            mensaje = f"La operación superó el tiempo límite de {tiempo_limite:g} s"
+        else:
+            mensaje = "La operación fue cancelada"
+        super().__init__(mensaje)
+
+
+class TokenCancelacion:
+    """Señal de cancelación compartida entre hilos, con un plazo opcional"""
+
+    def __init__(self, tiempo_limite: Optional[float] = None):
+        """
+        Args:
+            tiempo_limite: Segundos desde ahora hasta que vence (None, sin plazo)
+        """
+        self._cancelado = threading.Event()
+        self.tiempo_limite: Optional[float] = None
+        self._vence: Optional[float] = None
+        self.fijar_tiempo_limite(tiempo_limite)
+
+    def fijar_tiempo_limite(self, tiempo_limite: Optional[float]):
+        """Fija el plazo, contado desde ahora (None para quitarlo)"""
+        self.tiempo_limite = tiempo_limite
+        self._vence = time.monotonic() + tiempo_limite if tiempo_limite else None
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+
+    @property
+    def vencido(self) -> bool:
+        return self._vence is not None and time.monotonic() >= self._vence
+
+    def motivo(self) -> Optional[str]:
+        """Motivo para interrumpir la operación, o None si puede seguir"""
+        if self.cancelado:
+            return MOTIVO_CANCELADA
+        if self.vencido:
+            return MOTIVO_TIEMPO_AGOTADO
+        return None
+
+    def verificar(self):
+        """Lanza ConsultaCancelada si hay que interrumpir (para bucles en Python)"""
+        motivo = self.motivo()
+        if motivo:
+            raise ConsultaCancelada(motivo, self.tiempo_limite)
+
+
+class MetricasCancelacion:
+    """Contadores de operaciones cancelables, seguros entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completadas = 0
+        self.canceladas = 0
+        self.tiempo_agotado = 0
+
+    def registrar(self, motivo: Optional[str]):
+        """Cuenta una operación terminada (motivo None si no se interrumpió)"""
+        with self._lock:
+            if motivo == MOTIVO_CANCELADA:
+                self.canceladas += 1
+            elif motivo == MOTIVO_TIEMPO_AGOTADO:
+                self.tiempo_agotado += 1
+            else:
+                self.completadas += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        Retorna los contadores
+
+        Returns:
+            Diccionario con completadas, canceladas y tiempo_agotado
+        """
+        with self._lock:
+            return {
+                'completadas': self.completadas,
+                'canceladas': self.canceladas,
+                'tiempo_agotado': self.tiempo_agotado
+            }
+
+
+@contextmanager
+def consultas_cancelables(session: Session, token: TokenCancelacion) -> Iterator[TokenCancelacion]:
+    """
+    Permite interrumpir las consultas de la sesión mientras dura el bloque
+
+    El handler se instala sobre la conexión cruda que la sesión usa en su
+    transacción actual, y se quita al salir del bloque (la conexión vuelve
+    al pool sin él). Si el token se cancela o vence, la consulta en curso
+    se interrumpe, la sesión se revierte y se lanza ConsultaCancelada.
+
+    Args:
+        session: Sesión cuyas consultas se pueden interrumpir
+        token: Token que indica cuándo interrumpir
+
+    Yields:
+        El mismo token
+    """
+    conexion = session.connection().connection.dbapi_connection
+    conexion.set_progress_handler(lambda: token.motivo() is not None,
+                                  config.CONSULTAS_INSTRUCCIONES_POR_VERIFICACION)
+    try:
+        yield token
+    except Exception as e:
+        # Cualquier error con el token activado es consecuencia de la
+        # interrupción (OperationalError "interrupted" o una verificación en Python)
+        motivo = token.motivo()
+        if motivo is None:
+            raise
+        conexion.set_progress_handler(None, 0)
+        session.rollback()
+        metricas_cancelacion.registrar(motivo)
+        app_logger.warning(f"Operación interrumpida ({motivo})")
+        raise ConsultaCancelada(motivo, token.tiempo_limite) from e
+    else:
+        metricas_cancelacion.registrar(None)
+    finally:
+        conexion.set_progress_handler(None, 0)
+
+
+# Contadores globales de operaciones interrumpidas
+metricas_cancelacion = MetricasCancelacion()
@@ -40,6 +40,7 @@ NATURALEZA_ACREEDORA = "Acreedora"
 TIPO_TRANSACCION_VENTA = "Venta"
 TIPO_TRANSACCION_COMPRA = "Compra"
 TIPO_TRANSACCION_GENERAL = "General"
+TIPO_TRANSACCION_CIERRE = "Cierre"  # Asiento de cierre de un período
 
 # Tipos de actividad para auditoría
 ACTIVIDAD_LOGIN = "Login"
@@ -48,4 +49,6 @@ ACTIVIDAD_CREAR_USUARIO = "Crear Usuario"
 ACTIVIDAD_CREAR_TRANSACCION = "Crear Transacción"
 ACTIVIDAD_VENTA = "Registrar Venta"
 ACTIVIDAD_COMPRA = "Registrar Compra"
+ACTIVIDAD_CREAR_PERIODO = "Crear Período"
 ACTIVIDAD_CERRAR_PERIODO = "Cerrar Período"
+ACTIVIDAD_IMPORTACION = "Importación"
@@ -1,18 +1,93 @@
 """
 Configuración de la base de datos
 """
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from contextlib import contextmanager
+from app.core.instrumentacion import CLAVE_METRICAS, ConexionInstrumentada, instrumentar_engine
 import config
 
+# Orden en que se aplican los PRAGMAs (journal_mode primero: los demás dependen de él)
+PRAGMAS_SOPORTADOS = ('journal_mode', 'synchronous', 'busy_timeout',
+                      'cache_size', 'mmap_size', 'temp_store')
+
+
+def obtener_perfil(nombre: Optional[str] = None) -> Dict:
+    """
+    Obtiene la configuración de PRAGMAs de un perfil de rendimiento
+
+    Args:
+        nombre: Nombre del perfil (None para usar config.DB_PERFIL)
+
+    Returns:
+        Diccionario con los PRAGMAs del perfil
+    """
+    nombre = nombre or config.DB_PERFIL
+    if nombre not in config.DB_PERFILES:
+        raise ValueError(
+            f"Perfil de base de datos desconocido: {nombre} "
+            f"(disponibles: {', '.join(config.DB_PERFILES)})"
+        )
+    return config.DB_PERFILES[nombre]
+
+
+def aplicar_pragmas(dbapi_connection, pragmas: Dict):
+    """
+    Aplica los PRAGMAs de un perfil sobre una conexión DBAPI de SQLite
+
+    Args:
+        dbapi_connection: Conexión sqlite3 cruda
+        pragmas: Diccionario nombre -> valor
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for nombre in PRAGMAS_SOPORTADOS:
+            if nombre in pragmas:
+                cursor.execute(f"PRAGMA {nombre}={pragmas[nombre]}")
+    finally:
+        cursor.close()
+
+
+def crear_engine(url: Optional[str] = None, perfil: Optional[str] = None) -> Engine:
+    """
+    Crea un engine de SQLAlchemy configurado con un perfil de rendimiento
+
+    Los PRAGMAs se aplican en el evento 'connect', es decir, sobre cada
+    conexión nueva del pool y no solo sobre la primera. Si
+    config.INSTRUMENTACION_CONSULTAS está activo, cada sentencia se mide
+    (ver app.core.instrumentacion).
+
+    Args:
+        url: URL de la base de datos (None para usar config.DATABASE_URL)
+        perfil: Nombre del perfil (None para usar config.DB_PERFIL)
+
+    Returns:
+        Engine configurado
+    """
+    pragmas = obtener_perfil(perfil)
+    connect_args = {"check_same_thread": False}  # Necesario para SQLite
+    if config.INSTRUMENTACION_CONSULTAS:
+        connect_args["factory"] = ConexionInstrumentada  # Cuenta las filas leídas
+    nuevo_engine = create_engine(
+        url or config.DATABASE_URL,
+        echo=False,  # True para debug SQL
+        connect_args=connect_args
+    )
+    if config.INSTRUMENTACION_CONSULTAS:
+        instrumentar_engine(nuevo_engine)
+
+    @event.listens_for(nuevo_engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        aplicar_pragmas(dbapi_connection, pragmas)
+
+    return nuevo_engine
+
+
 # Crear engine
-engine = create_engine(
-    config.DATABASE_URL,
-    echo=False,  # True para debug SQL
-    connect_args={"check_same_thread": False}  # Necesario para SQLite
-)
+engine = crear_engine()
 
 # Session factory
 session_factory = sessionmaker(bind=engine)
@@ -21,10 +96,35 @@ Session = scoped_session(session_factory)
 # Base para modelos
 Base = declarative_base()
 
+
+def configurar_perfil(perfil: str, url: Optional[str] = None) -> Engine:
+    """
+    Reemplaza el engine global por uno con otro perfil de rendimiento
+
+    Útil para procesos puntuales (p. ej. una carga masiva con 'bulk-load').
+    Las sesiones abiertas siguen usando el engine anterior hasta cerrarse.
+
+    Args:
+        perfil: Nombre del perfil
+        url: URL de la base de datos (None para usar config.DATABASE_URL)
+
+    Returns:
+        El nuevo engine
+    """
+    global engine
+    anterior = engine
+    engine = crear_engine(url, perfil)
+    Session.remove()
+    session_factory.configure(bind=engine)
+    anterior.dispose()
+    return engine
+
 @contextmanager
 def get_session():
     """Context manager para sesiones de base de datos"""
     session = Session()
+    # Las métricas de consultas (ver instrumentacion) son de esta unidad de trabajo
+    session.info.pop(CLAVE_METRICAS, None)
     try:
         yield session
         session.commit()
@@ -34,10 +134,33 @@ def get_session():
     finally:
         session.close()
 
-def init_db():
-    """Inicializa la base de datos creando todas las tablas"""
+def init_db(destino: Optional[Engine] = None):
+    """
+    Inicializa la base de datos creando todas las tablas
+    
+    Args:
+        destino: Engine a inicializar (None para el engine global)
+    """
     from app.models import base  # Importar todos los modelos
-    Base.metadata.create_all(engine)
+    destino = destino or engine
+    Base.metadata.create_all(destino)
+    
+    # create_all no agrega índices nuevos a tablas que ya existían
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(destino, checkfirst=True)
+    
+    # Resúmenes diarios y mensuales de transacciones (triggers)
+    from app.core.resumenes import crear_resumenes
+    crear_resumenes(destino)
+    
+    # Triggers que congelan las transacciones de los períodos cerrados
+    from app.core.periodos_cerrados import crear_bloqueo_periodos
+    crear_bloqueo_periodos(destino)
+    
+    # Índices de búsqueda de texto completo (FTS5)
+    from app.core.busqueda import crear_indices_busqueda
+    crear_indices_busqueda(destino)
 
 def drop_db():
     """Elimina todas las tablas (usar con precaución)"""
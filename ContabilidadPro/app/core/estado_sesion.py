@@ -0,0 +1,61 @@
+"""
+Estado pendiente de una sesión, ligado a su transacción
+
+Varios módulos acumulan en session.info trabajo que se completa al
+confirmar: actividades de auditoría, deltas de saldo, cuentas nuevas del
+plan y marcas de libro o períodos modificados. Sus eventos before_commit y
+after_commit lo aplican o lo publican; si la transacción termina de
+cualquier otra forma (rollback, close sin commit, una excepción antes de la
+primera sentencia SQL), el estado se descarta aquí, al terminar la
+transacción más externa, y nunca llega al próximo commit de la sesión.
+
+SQLAlchemy no emite eventos de transacción en una sesión que todavía no
+empezó ninguna, así que registrar un estado la empieza (sin tomar una
+conexión ni ejecutar SQL).
+"""
+from typing import Any, Callable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Clave en session.info con las claves a descartar al terminar la transacción
+CLAVE_ESTADO_TRANSACCION = 'estado_de_transaccion'
+
+
+def estado_de_transaccion(session: Session, clave: str, inicial: Callable[[], Any]) -> Any:
+    """
+    Obtiene un valor de session.info que dura hasta el fin de la transacción en curso
+
+    Args:
+        session: Sesión de la unidad de trabajo
+        clave: Clave en session.info
+        inicial: Función que crea el valor si todavía no existe
+
+    Returns:
+        El valor guardado en session.info[clave]
+    """
+    if not session.in_transaction():
+        session.begin()
+    session.info.setdefault(CLAVE_ESTADO_TRANSACCION, set()).add(clave)
+    if clave not in session.info:
+        session.info[clave] = inicial()
+    return session.info[clave]
+
+
+def marcar_en_transaccion(session: Session, clave: str):
+    """
+    Marca session.info[clave] como True hasta el fin de la transacción en curso
+
+    Args:
+        session: Sesión de la unidad de trabajo
+        clave: Clave en session.info
+    """
+    estado_de_transaccion(session, clave, bool)
+    session.info[clave] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_estado_al_terminar(session, transaccion):
+    # after_commit ya consumió lo confirmado; lo que queda es de una transacción no confirmada
+    if transaccion.parent is None:
+        for clave in session.info.pop(CLAVE_ESTADO_TRANSACCION, ()):
+            session.info.pop(clave, None)
@@ -0,0 +1,404 @@
+"""
+Instrumentación de consultas SQL
+
+Los eventos del engine registran cada sentencia: su duración (lo que tarda
+cursor.execute, es decir, hasta tener la primera fila), las filas
+devueltas o modificadas y el método de repositorio (o de servicio) que la
+originó. Con eso se mantienen:
+    - las métricas de cada sesión (session.info), para saber cuánto costó
+      una unidad de trabajo de get_session();
+    - estadísticas acumuladas por método en todo el proceso, para encontrar
+      los métodos más costosos sin un profiler.
+Las sentencias que superan config.CONSULTAS_UMBRAL_LENTA_MS se escriben en
+logs/consultas_lentas.log junto con su EXPLAIN QUERY PLAN.
+
+Las filas de un SELECT se cuentan a medida que se leen, con un cursor
+sqlite3 propio (CursorInstrumentado) que crea la conexión del engine.
+
+    from app.core.instrumentacion import estadisticas_consultas, metricas_sesion
+    estadisticas_consultas.resumen(limite=10)   # métodos con más tiempo acumulado
+    metricas_sesion(session)                    # costo de la sesión actual
+
+contar_consultas() cuenta las sentencias de un bloque y verifica un máximo
+(presupuesto), informando las sentencias repetidas que delatan un N+1.
+"""
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.utils.logger import setup_logger_consultas_lentas
+import config
+
+# Clave en session.info (y en el info de la conexión en uso) con las métricas de la sesión
+CLAVE_METRICAS = 'metricas_consultas'
+
+# Módulos cuyas funciones se consideran el origen de una consulta, en orden de preferencia
+ORIGENES = ('app.repositories.', 'app.services.')
+SIN_ORIGEN = '(otros)'
+PROFUNDIDAD_MAXIMA = 60
+
+# Sentencias para las que tiene sentido pedir EXPLAIN QUERY PLAN
+SENTENCIAS_CON_PLAN = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+consultas_lentas_logger = setup_logger_consultas_lentas()
+
+# Contadores de contar_consultas() activos en cada hilo
+_contadores_activos = threading.local()
+
+
+class RegistroConsulta:
+    """Una sentencia ejecutada: texto, origen, duración y filas"""
+
+    __slots__ = ('sentencia', 'metodo', 'duracion_ms', 'filas', '_sesion')
+
+    def __init__(self, sentencia: str, metodo: str, duracion_ms: float, filas: int,
+                 sesion: Optional["MetricasSesion"]):
+        self.sentencia = sentencia
+        self.metodo = metodo
+        self.duracion_ms = duracion_ms
+        self.filas = filas
+        self._sesion = sesion
+
+    def agregar_filas(self, cantidad: int):
+        """Suma filas leídas después de ejecutar la sentencia"""
+        self.filas += cantidad
+        if self._sesion is not None:
+            self._sesion.filas += cantidad
+        estadisticas_consultas.agregar_filas(self.metodo, cantidad)
+
+
+class MetricasSesion:
+    """Métricas de las sentencias de una sesión (una unidad de trabajo)"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_total_ms = 0.0
+        self.filas = 0
+        # Se guardan las primeras sentencias; los totales cuentan todas
+        self.registros: List[RegistroConsulta] = []
+
+    def registrar(self, registro: RegistroConsulta):
+        self.consultas += 1
+        self.tiempo_total_ms += registro.duracion_ms
+        self.filas += registro.filas
+        if len(self.registros) < config.INSTRUMENTACION_MAX_REGISTROS_SESION:
+            self.registros.append(registro)
+
+    def resumen(self) -> Dict:
+        """
+        Retorna las métricas de la sesión
+
+        Returns:
+            Diccionario con consultas, tiempo_total_ms, filas y por_metodo
+            ({metodo: cantidad de sentencias} de las sentencias guardadas)
+        """
+        por_metodo: Dict[str, int] = {}
+        for registro in self.registros:
+            por_metodo[registro.metodo] = por_metodo.get(registro.metodo, 0) + 1
+        return {
+            'consultas': self.consultas,
+            'tiempo_total_ms': self.tiempo_total_ms,
+            'filas': self.filas,
+            'por_metodo': por_metodo
+        }
+
+
+class EstadisticasConsultas:
+    """Estadísticas acumuladas por método de origen, seguras entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_metodo: Dict[str, Dict] = {}
+
+    def registrar(self, metodo: str, duracion_ms: float, filas: int, lenta: bool):
+        with self._lock:
+            datos = self._por_metodo.get(metodo)
+            if datos is None:
+                datos = self._por_metodo[metodo] = {
+                    'consultas': 0, 'tiempo_total_ms': 0.0, 'tiempo_max_ms': 0.0,
+                    'filas': 0, 'lentas': 0
+                }
+            datos['consultas'] += 1
+            datos['tiempo_total_ms'] += duracion_ms
+            datos['tiempo_max_ms'] = max(datos['tiempo_max_ms'], duracion_ms)
+            datos['filas'] += filas
+            if lenta:
+                datos['lentas'] += 1
+
+    def agregar_filas(self, metodo: str, cantidad: int):
+        with self._lock:
+            datos = self._por_metodo.get(metodo)
+            if datos is not None:
+                datos['filas'] += cantidad
+
+    def resumen(self, orden: str = 'tiempo_total_ms', limite: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna las estadísticas por método, de mayor a menor
+
+        Args:
+            orden: Campo por el que ordenar (tiempo_total_ms, consultas,
+                   tiempo_max_ms, filas o lentas)
+            limite: Cantidad de métodos a retornar (None para todos)
+
+        Returns:
+            Lista de diccionarios con metodo, consultas, tiempo_total_ms,
+            tiempo_medio_ms, tiempo_max_ms, filas y lentas
+        """
+        with self._lock:
+            filas = [
+                dict(datos, metodo=metodo, tiempo_medio_ms=datos['tiempo_total_ms'] / datos['consultas'])
+                for metodo, datos in self._por_metodo.items()
+            ]
+        filas.sort(key=lambda d: d[orden], reverse=True)
+        return filas[:limite] if limite is not None else filas
+
+    def reiniciar(self):
+        """Pone las estadísticas en cero"""
+        with self._lock:
+            self._por_metodo.clear()
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que cuenta las filas leídas y las suma a la sentencia que las produjo"""
+
+    registro: Optional[RegistroConsulta] = None
+
+    def _contar(self, cantidad: int):
+        if self.registro is not None and cantidad:
+            self.registro.agregar_filas(cantidad)
+
+    def fetchone(self):
+        fila = super().fetchone()
+        if fila is not None:
+            self._contar(1)
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        filas = super().fetchmany(*args, **kwargs)
+        self._contar(len(filas))
+        return filas
+
+    def fetchall(self):
+        filas = super().fetchall()
+        self._contar(len(filas))
+        return filas
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    """Conexión sqlite3 cuyos cursores cuentan las filas leídas"""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    """Una operación ejecutó más sentencias SQL que las permitidas"""
+
+
+class ContadorConsultas:
+    """Sentencias ejecutadas en el hilo actual mientras el contador está activo"""
+
+    def __init__(self):
+        self.registros: List[RegistroConsulta] = []
+
+    @property
+    def consultas(self) -> int:
+        return len(self.registros)
+
+    def repetidas(self, minimo: int) -> List[Dict]:
+        """
+        Detecta sentencias N+1: la misma sentencia ejecutada muchas veces desde el mismo método
+
+        Args:
+            minimo: Repeticiones a partir de las cuales se informa
+
+        Returns:
+            Lista de diccionarios con metodo, sentencia y veces (de más a menos)
+        """
+        veces: Dict[tuple, int] = {}
+        for registro in self.registros:
+            clave = (registro.metodo, registro.sentencia)
+            veces[clave] = veces.get(clave, 0) + 1
+        return sorted(
+            ({'metodo': metodo, 'sentencia': sentencia, 'veces': n}
+             for (metodo, sentencia), n in veces.items() if n >= minimo),
+            key=lambda d: d['veces'], reverse=True
+        )
+
+    def verificar(self, maximo: int, operacion: str = "La operación"):
+        """
+        Lanza PresupuestoConsultasExcedido si se superó el máximo de sentencias
+
+        El mensaje incluye las sentencias repetidas (probables N+1).
+
+        Args:
+            maximo: Sentencias permitidas
+            operacion: Nombre de la operación, para el mensaje
+        """
+        if self.consultas <= maximo:
+            return
+        detalle = "".join(
+            f"\n  {r['veces']}x en {r['metodo']}: {' '.join(r['sentencia'].split())[:200]}"
+            for r in self.repetidas(config.CONSULTAS_REPETICIONES_N_MAS_1)
+        )
+        raise PresupuestoConsultasExcedido(
+            f"{operacion} ejecutó {self.consultas} sentencias SQL (máximo {maximo})"
+            + (f"; sentencias repetidas:{detalle}" if detalle else "")
+        )
+
+
+@contextmanager
+def contar_consultas() -> Iterator[ContadorConsultas]:
+    """
+    Cuenta las sentencias que ejecuta el hilo actual dentro del bloque
+
+    Requiere que el engine esté instrumentado (config.INSTRUMENTACION_CONSULTAS);
+    si no lo está, lanza RuntimeError en lugar de contar cero sentencias.
+
+        with contar_consultas() as contador:
+            reportes_service.generar_reporte_transacciones(limite=None)
+        contador.verificar(5, "generar_reporte_transacciones")
+
+    Yields:
+        El contador (sus registros siguen disponibles después del bloque)
+    """
+    if not config.INSTRUMENTACION_CONSULTAS:
+        raise RuntimeError("contar_consultas() requiere INSTRUMENTACION_CONSULTAS=1: "
+                           "sin instrumentación el engine no registra las sentencias")
+    contador = ContadorConsultas()
+    if not hasattr(_contadores_activos, 'lista'):
+        _contadores_activos.lista = []
+    _contadores_activos.lista.append(contador)
+    try:
+        yield contador
+    finally:
+        _contadores_activos.lista.remove(contador)
+
+
+def metodo_origen() -> str:
+    """
+    Busca en la pila el método de repositorio (o, si no hay, de servicio) que ejecuta la consulta
+
+    Returns:
+        Nombre calificado del método (p. ej. 'TransaccionRepository.get_pagina')
+    """
+    frame = sys._getframe(2)
+    candidato = None
+    for _ in range(PROFUNDIDAD_MAXIMA):
+        if frame is None:
+            break
+        modulo = frame.f_globals.get('__name__', '')
+        if modulo.startswith(ORIGENES[0]):
+            # Con la clase real: los métodos heredados de BaseRepository se
+            # atribuyen al repositorio que los usa
+            instancia = frame.f_locals.get('self')
+            if instancia is not None:
+                return f"{type(instancia).__name__}.{frame.f_code.co_name}"
+            return frame.f_code.co_qualname
+        if candidato is None and modulo.startswith(ORIGENES[1]):
+            candidato = frame.f_code.co_qualname
+        frame = frame.f_back
+    return candidato or SIN_ORIGEN
+
+
+def metricas_sesion(session: Session) -> Dict:
+    """
+    Retorna las métricas de las sentencias ejecutadas por una sesión
+
+    Args:
+        session: Sesión a consultar
+
+    Returns:
+        Diccionario de MetricasSesion.resumen (en cero si no ejecutó nada)
+    """
+    metricas = session.info.get(CLAVE_METRICAS)
+    return (metricas or MetricasSesion()).resumen()
+
+
+def _explicar(conexion_dbapi, sentencia: str, parametros) -> str:
+    """EXPLAIN QUERY PLAN de una sentencia, en una línea por paso"""
+    if not sentencia.lstrip()[:6].upper().startswith(SENTENCIAS_CON_PLAN):
+        return "    (sin plan: no es una consulta ni una modificación de datos)"
+    try:
+        plan = conexion_dbapi.execute(f"EXPLAIN QUERY PLAN {sentencia}", parametros or ()).fetchall()
+    except sqlite3.Error as e:
+        return f"    (no se pudo obtener el plan: {e})"
+    if not plan:
+        return "    (sin pasos)"
+    return "\n".join(f"    {paso[-1]}" for paso in plan)
+
+
+def _registrar_lenta(conn, sentencia: str, parametros, executemany: bool, registro: RegistroConsulta):
+    if executemany:
+        parametros = parametros[0] if parametros else ()
+    plan = _explicar(conn.connection.dbapi_connection, sentencia, parametros)
+    consultas_lentas_logger.warning(
+        f"{registro.duracion_ms:.0f} ms en {registro.metodo}\n"
+        f"  {' '.join(sentencia.split())}\n"
+        f"  Parámetros: {str(parametros)[:500]}\n"
+        f"  Plan:\n{plan}"
+    )
+
+
+def instrumentar_engine(engine: Engine):
+    """
+    Registra los eventos que miden cada sentencia del engine
+
+    Args:
+        engine: Engine creado por crear_engine
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, sentencia, parametros, contexto, executemany):
+        conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, sentencia, parametros, contexto, executemany):
+        inicios = conn.info.get('inicio_consultas')
+        if not inicios:
+            return
+        duracion_ms = (time.perf_counter() - inicios.pop()) * 1000
+
+        metodo = metodo_origen()
+        # Sentencias que no devuelven filas: las que modificaron
+        filas = max(cursor.rowcount, 0) if cursor.description is None else 0
+        sesion = conn.info.get(CLAVE_METRICAS)
+        registro = RegistroConsulta(sentencia, metodo, duracion_ms, filas, sesion)
+        if sesion is not None:
+            sesion.registrar(registro)
+        for contador in getattr(_contadores_activos, 'lista', ()):
+            contador.registros.append(registro)
+        lenta = duracion_ms >= config.CONSULTAS_UMBRAL_LENTA_MS
+        estadisticas_consultas.registrar(metodo, duracion_ms, filas, lenta)
+        if isinstance(cursor, CursorInstrumentado):
+            cursor.registro = registro
+        if lenta:
+            _registrar_lenta(conn, sentencia, parametros, executemany, registro)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto_error):
+        conexion = contexto_error.connection
+        if conexion is not None and conexion.info.get('inicio_consultas'):
+            conexion.info['inicio_consultas'].pop()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _al_devolver(dbapi_connection, connection_record):
+        # La conexión deja de pertenecer a la sesión que la usaba
+        connection_record.info.pop(CLAVE_METRICAS, None)
+        connection_record.info.pop('inicio_consultas', None)
+
+
+@event.listens_for(Session, "after_begin")
+def _asociar_conexion(session, transaction, connection):
+    metricas = session.info.get(CLAVE_METRICAS)
+    if metricas is None:
+        metricas = session.info[CLAVE_METRICAS] = MetricasSesion()
+    connection.info[CLAVE_METRICAS] = metricas
+
+
+# Estadísticas acumuladas de todo el proceso
+estadisticas_consultas = EstadisticasConsultas()
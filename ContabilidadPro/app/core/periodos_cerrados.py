@@ -0,0 +1,87 @@
+"""
+Bloqueo de los períodos cerrados
+
+Una vez cerrado un período, sus transacciones quedan congeladas: los
+triggers rechazan cualquier INSERT, DELETE o cambio de fecha, tipo, cuenta
+o monto de una transacción cuya fecha cae dentro de un período cerrado, y
+también reabrir, mover o borrar el período. Igual que los resúmenes, cubren
+todos los caminos de escritura (ORM, inserciones por lotes, importaciones).
+
+Un período abarca desde fecha_inicio hasta el final del día de fecha_fin.
+Las fechas se guardan como 'AAAA-MM-DD HH:MM:SS.ffffff', así que alcanza
+con comparar el texto contra el día siguiente a fecha_fin ('AAAA-MM-DD').
+"""
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Mensaje del error (sqlalchemy.exc.IntegrityError) al escribir en un período cerrado
+MENSAJE_PERIODO_CERRADO = "La fecha corresponde a un período cerrado"
+
+TRIGGERS_PERIODOS_CERRADOS = (
+    'transacciones_cerrado_bi', 'transacciones_cerrado_bu', 'transacciones_cerrado_bd',
+    'periodos_cerrado_bu', 'periodos_cerrado_bd',
+)
+
+
+def _en_periodo_cerrado(fecha: str) -> str:
+    """Condición SQL: la fecha cae dentro de algún período cerrado"""
+    return (
+        f"EXISTS (SELECT 1 FROM periodos WHERE cerrado = 1 AND {fecha} >= fecha_inicio "
+        f"AND {fecha} < date(fecha_fin, '+1 day'))"
+    )
+
+
+def _rechazar(mensaje: str) -> str:
+    """Cuerpo de trigger que aborta la sentencia con un mensaje"""
+    return f"BEGIN SELECT RAISE(ABORT, '{mensaje}'); END"
+
+
+def _ddl_triggers() -> List[str]:
+    """Sentencias que crean los triggers de bloqueo"""
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS transacciones_cerrado_bi BEFORE INSERT ON transacciones "
+        f"WHEN {_en_periodo_cerrado('new.fecha')} {_rechazar(MENSAJE_PERIODO_CERRADO)}",
+
+        # Solo las columnas que cambian saldos: asignar periodo_id a filas viejas sigue permitido
+        f"CREATE TRIGGER IF NOT EXISTS transacciones_cerrado_bu "
+        f"BEFORE UPDATE OF fecha, tipo, cuenta_id, monto ON transacciones "
+        f"WHEN {_en_periodo_cerrado('old.fecha')} OR {_en_periodo_cerrado('new.fecha')} "
+        f"{_rechazar(MENSAJE_PERIODO_CERRADO)}",
+
+        f"CREATE TRIGGER IF NOT EXISTS transacciones_cerrado_bd BEFORE DELETE ON transacciones "
+        f"WHEN {_en_periodo_cerrado('old.fecha')} {_rechazar(MENSAJE_PERIODO_CERRADO)}",
+
+        f"CREATE TRIGGER IF NOT EXISTS periodos_cerrado_bu "
+        f"BEFORE UPDATE OF cerrado, fecha_inicio, fecha_fin, resultado ON periodos "
+        f"WHEN old.cerrado = 1 {_rechazar('El período está cerrado')}",
+
+        f"CREATE TRIGGER IF NOT EXISTS periodos_cerrado_bd BEFORE DELETE ON periodos "
+        f"WHEN old.cerrado = 1 {_rechazar('El período está cerrado')}",
+    ]
+
+
+def crear_bloqueo_periodos(engine: Engine):
+    """
+    Crea los triggers que congelan los períodos cerrados
+
+    Es idempotente: si los triggers ya existen no hace nada.
+
+    Args:
+        engine: Engine de la base de datos
+    """
+    with engine.begin() as conexion:
+        for sentencia in _ddl_triggers():
+            conexion.execute(text(sentencia))
+
+
+def quitar_bloqueo_periodos(engine: Engine):
+    """
+    Elimina los triggers de bloqueo (para cargas masivas o para medir su costo)
+
+    Args:
+        engine: Engine de la base de datos
+    """
+    with engine.begin() as conexion:
+        for nombre in TRIGGERS_PERIODOS_CERRADOS:
+            conexion.execute(text(f"DROP TRIGGER IF EXISTS {nombre}"))
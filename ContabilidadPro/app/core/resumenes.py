@@ -0,0 +1,159 @@
+"""
+Resúmenes de transacciones por día y por mes (tablas resumen_diario y resumen_mensual)
+
+Los triggers los actualizan en la misma transacción que cada INSERT, UPDATE o
+DELETE sobre transacciones. Así cubren todos los caminos de escritura (ORM,
+inserciones por lotes, importaciones y el generador de datos) sin que cada
+servicio tenga que acordarse de hacerlo. Al crear los triggers por primera
+vez los resúmenes se cargan con las transacciones existentes.
+
+SQLAlchemy guarda las fechas como 'AAAA-MM-DD HH:MM:SS.ffffff', así que el
+día es el prefijo de 10 caracteres y el mes el de 7 (más '-01', para que la
+columna se lea como fecha del primer día del mes).
+"""
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.utils.logger import app_logger
+
+# Tabla de resumen -> (columna de fecha, expresión SQL que la obtiene de una fecha de transacción)
+RESUMENES = {
+    'resumen_diario': ('dia', "substr({fecha}, 1, 10)"),
+    'resumen_mensual': ('mes', "substr({fecha}, 1, 7) || '-01'"),
+}
+
+# Diferencia máxima admitida entre un total guardado y el recalculado
+TOLERANCIA_RESUMEN = 0.005
+
+
+def _acumular(tabla: str, columna: str, expresion: str, fila: str, signo: str) -> str:
+    """Sentencia que suma (o resta) una transacción a su fila de resumen"""
+    return (
+        f"INSERT INTO {tabla}({columna}, tipo, cuenta_id, cantidad, total) "
+        f"VALUES ({expresion.format(fecha=f'{fila}.fecha')}, {fila}.tipo, {fila}.cuenta_id, "
+        f"{signo}1, {signo}{fila}.monto) "
+        f"ON CONFLICT({columna}, tipo, cuenta_id) DO UPDATE SET "
+        f"cantidad = cantidad + excluded.cantidad, total = total + excluded.total; "
+    )
+
+
+def _descartar_vacia(tabla: str, columna: str, expresion: str) -> str:
+    """Sentencia que borra la fila de resumen de old si ya no le quedan transacciones"""
+    return (
+        f"DELETE FROM {tabla} WHERE {columna} = {expresion.format(fecha='old.fecha')} "
+        f"AND tipo = old.tipo AND cuenta_id = old.cuenta_id AND cantidad = 0; "
+    )
+
+
+def _ddl_triggers(tabla: str, columna: str, expresion: str) -> List[str]:
+    """Sentencias que crean los triggers de un resumen"""
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_ai AFTER INSERT ON transacciones BEGIN "
+        f"{_acumular(tabla, columna, expresion, 'new', '')}END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_ad AFTER DELETE ON transacciones BEGIN "
+        f"{_acumular(tabla, columna, expresion, 'old', '-')}"
+        f"{_descartar_vacia(tabla, columna, expresion)}END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_au "
+        f"AFTER UPDATE OF fecha, tipo, cuenta_id, monto ON transacciones BEGIN "
+        f"{_acumular(tabla, columna, expresion, 'old', '-')}"
+        f"{_acumular(tabla, columna, expresion, 'new', '')}"
+        f"{_descartar_vacia(tabla, columna, expresion)}END",
+    ]
+
+
+def _sql_calcular(columna: str, expresion: str) -> str:
+    """Consulta que calcula un resumen completo desde las transacciones"""
+    return (
+        f"SELECT {expresion.format(fecha='fecha')} AS {columna}, tipo, cuenta_id, "
+        f"count(*), sum(monto) FROM transacciones GROUP BY 1, 2, 3"
+    )
+
+
+def _cargar(conexion, tabla: str, columna: str, expresion: str):
+    """Reemplaza el contenido de un resumen por el calculado desde las transacciones"""
+    conexion.execute(text(f"DELETE FROM {tabla}"))
+    conexion.execute(text(
+        f"INSERT INTO {tabla}({columna}, tipo, cuenta_id, cantidad, total) "
+        f"{_sql_calcular(columna, expresion)}"
+    ))
+
+
+def crear_resumenes(engine: Engine):
+    """
+    Crea los triggers de los resúmenes, cargando las transacciones existentes
+
+    Las tablas las crea init_db con el resto de los modelos. Es idempotente:
+    si los triggers ya existen no hace nada.
+
+    Args:
+        engine: Engine de la base de datos
+    """
+    with engine.begin() as conexion:
+        for tabla, (columna, expresion) in RESUMENES.items():
+            existe = conexion.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :nombre"),
+                {"nombre": f"{tabla}_ai"}
+            ).first()
+
+            for sentencia in _ddl_triggers(tabla, columna, expresion):
+                conexion.execute(text(sentencia))
+
+            if not existe:
+                # Migración: resumir las transacciones que ya estaban en la tabla
+                _cargar(conexion, tabla, columna, expresion)
+                app_logger.info(f"Resumen {tabla} creado y cargado")
+
+
+def reconstruir_resumenes(engine: Engine):
+    """
+    Recalcula por completo los resúmenes desde las transacciones
+
+    Args:
+        engine: Engine de la base de datos
+    """
+    with engine.begin() as conexion:
+        for tabla, (columna, expresion) in RESUMENES.items():
+            _cargar(conexion, tabla, columna, expresion)
+    app_logger.info("Resúmenes de transacciones reconstruidos")
+
+
+def verificar_resumenes(engine: Engine) -> List[Dict]:
+    """
+    Compara cada resumen con el calculado desde las transacciones
+
+    Args:
+        engine: Engine de la base de datos
+
+    Returns:
+        Lista de diferencias, cada una con tabla, fecha, tipo, cuenta_id,
+        cantidad_guardada, cantidad_calculada, total_guardado y total_calculado
+        (vacía si todo coincide)
+    """
+    diferencias = []
+    with engine.connect() as conexion:
+        for tabla, (columna, expresion) in RESUMENES.items():
+            guardados = {tuple(fila[:3]): tuple(fila[3:]) for fila in conexion.execute(text(
+                f"SELECT {columna}, tipo, cuenta_id, cantidad, total FROM {tabla}"
+            ))}
+            calculados = {tuple(fila[:3]): tuple(fila[3:]) for fila in conexion.execute(text(
+                _sql_calcular(columna, expresion)
+            ))}
+
+            for clave in sorted(guardados.keys() | calculados.keys()):
+                cantidad_guardada, total_guardado = guardados.get(clave, (0, 0.0))
+                cantidad_calculada, total_calculado = calculados.get(clave, (0, 0.0))
+                if (cantidad_guardada != cantidad_calculada
+                        or abs(total_guardado - total_calculado) > TOLERANCIA_RESUMEN):
+                    diferencias.append({
+                        'tabla': tabla,
+                        'fecha': clave[0],
+                        'tipo': clave[1],
+                        'cuenta_id': clave[2],
+                        'cantidad_guardada': cantidad_guardada,
+                        'cantidad_calculada': cantidad_calculada,
+                        'total_guardado': total_guardado,
+                        'total_calculado': total_calculado
+                    })
+    return diferencias
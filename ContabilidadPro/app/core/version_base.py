@@ -0,0 +1,79 @@
+"""
+Versión de la base de datos vista desde fuera del proceso
+
+PRAGMA data_version cambia, en una conexión, cada vez que otra conexión
+confirma cambios en el mismo archivo, sea de este proceso o de otra
+instancia de la aplicación (p. ej. sobre una unidad compartida). Como el
+valor es propio de cada conexión, se lee siempre de una conexión observadora
+por engine, abierta aparte del pool: así dos lecturas son comparables y
+cualquier commit de cualquier conexión lo hace cambiar.
+
+Las cachés en memoria (estados financieros, períodos inexistentes) lo usan
+para no servir datos que otro proceso ya modificó.
+"""
+import sqlite3
+import threading
+import weakref
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class _Observador:
+    """Conexión propia de un engine, usada solo para leer PRAGMA data_version"""
+
+    def __init__(self, ruta: str):
+        self._conexion: Optional[sqlite3.Connection] = sqlite3.connect(ruta, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def leer(self) -> int:
+        with self._lock:
+            if self._conexion is None:
+                return 0
+            return self._conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+
+_observadores: "weakref.WeakKeyDictionary[Engine, _Observador]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def version_base(engine: Optional[Engine]) -> int:
+    """
+    Obtiene la versión de datos de la base de un engine
+
+    El valor en sí no significa nada: solo importa si cambió desde la
+    lectura anterior. Para bases en memoria (que otra conexión no puede
+    modificar) retorna siempre 0.
+
+    Args:
+        engine: Engine de la base (None retorna 0)
+
+    Returns:
+        PRAGMA data_version de la conexión observadora del engine
+    """
+    if engine is None:
+        return 0
+    observador = _observadores.get(engine)
+    if observador is None:
+        ruta = engine.url.database
+        if engine.url.get_backend_name() != 'sqlite' or not ruta or ruta == ':memory:':
+            return 0
+        with _lock:
+            observador = _observadores.get(engine)
+            if observador is None:
+                observador = _observadores[engine] = _Observador(ruta)
+                event.listen(engine, "engine_disposed", lambda _: _cerrar(engine))
+    return observador.leer()
+
+
+def _cerrar(engine: Engine):
+    with _lock:
+        observador = _observadores.pop(engine, None)
+    if observador is not None:
+        observador.cerrar()
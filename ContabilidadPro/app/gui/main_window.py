@@ -1,15 +1,18 @@
 """
 Ventana Principal de la Aplicación
 """
+import time
+from typing import Callable, Dict, Optional, Tuple
 from PyQt6.QtWidgets import (QMainWindow, QTabWidget, QWidget, QVBoxLayout,
-                             QPushButton, QMessageBox, QStatusBar)
-from PyQt6.QtCore import Qt
+                             QPushButton, QMessageBox, QStatusBar, QProgressBar, QApplication)
+from PyQt6.QtCore import Qt, QTimer
 from app.models.usuario import Usuario
-from app.core.database import get_session
 from app.services.auth_service import AuthService
+from app.gui.tareas import ejecutor_tareas
 from app.gui.views.dashboard_view import DashboardView
 from app.gui.views.transacciones_view import TransaccionesView
 from app.gui.views.balance_view import BalanceView
+from app.gui.views.libro_view import LibroView
 from app.gui.views.reportes_view import ReportesView
 from app.gui.views.usuarios_view import UsuariosView
 from app.utils.logger import app_logger
@@ -18,9 +21,18 @@ from app.utils.logger import app_logger
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación"""
     
-    def __init__(self, usuario: Usuario):
+    def __init__(self, usuario: Usuario, inicio_login: Optional[float] = None):
+        """
+        Args:
+            usuario: Usuario autenticado
+            inicio_login: time.perf_counter() del momento en que terminó el
+                          login, para medir cuánto tarda en verse la ventana
+        """
         super().__init__()
         self.usuario = usuario
+        self.inicio_login = inicio_login
+        # Pestañas cuya vista todavía no se creó: índice -> (título, atributo, fábrica, contenedor)
+        self._tabs_pendientes: Dict[int, Tuple[str, str, Callable[[], QWidget], QWidget]] = {}
         self.init_ui()
     
     def init_ui(self):
@@ -41,11 +53,13 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
         
-        # Crear pestañas según el nivel del usuario
+        # Crear pestañas según el nivel del usuario (las vistas se crean al mostrarse)
         if self.usuario.es_administrador:
             self.crear_tabs_administrador()
         else:
             self.crear_tabs_trabajador()
+        self.tabs.currentChanged.connect(self._crear_vista_pendiente)
+        self._crear_vista_pendiente(self.tabs.currentIndex())
         
         # Botón cerrar sesión
         btn_cerrar_sesion = QPushButton("Cerrar Sesión")
@@ -58,35 +72,85 @@ class MainWindow(QMainWindow):
         self.setStatusBar(status_bar)
         status_bar.showMessage(f"Usuario: {self.usuario.nombre_completo} ({self.usuario.username})")
         
+        # Indicador de trabajo en segundo plano (barra indeterminada y botón para cancelar)
+        self.barra_ocupado = QProgressBar()
+        self.barra_ocupado.setRange(0, 0)
+        self.barra_ocupado.setMaximumWidth(120)
+        self.btn_cancelar_tareas = QPushButton("Cancelar")
+        self.btn_cancelar_tareas.clicked.connect(ejecutor_tareas().cancelar_todas)
+        status_bar.addPermanentWidget(self.barra_ocupado)
+        status_bar.addPermanentWidget(self.btn_cancelar_tareas)
+        ejecutor_tareas().ocupado.connect(self._mostrar_ocupado)
+        self._mostrar_ocupado(ejecutor_tareas().esta_ocupado)
+        
         app_logger.info(f"Ventana principal cargada para usuario {self.usuario.username}")
     
     def crear_tabs_administrador(self):
         """Crea las pestañas para usuarios administradores"""
-        # Dashboard
-        self.dashboard_view = DashboardView(self.usuario)
-        self.tabs.addTab(self.dashboard_view, "Dashboard")
+        self.agregar_tab("Dashboard", "dashboard_view", lambda: DashboardView(self.usuario))
+        self.agregar_tab("Transacciones", "transacciones_view", lambda: TransaccionesView(self.usuario))
+        self.agregar_tab("Libro", "libro_view", lambda: LibroView(self.usuario))
+        self.agregar_tab("Balance", "balance_view", lambda: BalanceView(self.usuario))
+        self.agregar_tab("Reportes", "reportes_view", lambda: ReportesView(self.usuario))
+        self.agregar_tab("Usuarios", "usuarios_view", lambda: UsuariosView(self.usuario))
+    
+    def crear_tabs_trabajador(self):
+        """Crea las pestañas para usuarios trabajadores"""
+        # Solo transacciones (ventas y compras)
+        self.agregar_tab("Ventas y Compras", "transacciones_view",
+                         lambda: TransaccionesView(self.usuario, modo_simple=True))
+    
+    def agregar_tab(self, titulo: str, atributo: str, crear_vista: Callable[[], QWidget]):
+        """
+        Agrega una pestaña cuya vista se crea recién la primera vez que se muestra
         
-        # Transacciones
-        self.transacciones_view = TransaccionesView(self.usuario)
-        self.tabs.addTab(self.transacciones_view, "Transacciones")
+        Hasta entonces la pestaña contiene un contenedor vacío y self.<atributo>
+        vale None.
         
-        # Balance
-        self.balance_view = BalanceView(self.usuario)
-        self.tabs.addTab(self.balance_view, "Balance")
+        Args:
+            titulo: Título de la pestaña
+            atributo: Nombre del atributo donde guardar la vista
+            crear_vista: Función que crea la vista
+        """
+        contenedor = QWidget()
+        contenedor_layout = QVBoxLayout(contenedor)
+        contenedor_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Reportes
-        self.reportes_view = ReportesView(self.usuario)
-        self.tabs.addTab(self.reportes_view, "Reportes")
+        setattr(self, atributo, None)
+        indice = self.tabs.addTab(contenedor, titulo)
+        self._tabs_pendientes[indice] = (titulo, atributo, crear_vista, contenedor)
+    
+    def _crear_vista_pendiente(self, indice: int):
+        """Crea la vista de la pestaña si todavía no se había creado"""
+        pendiente = self._tabs_pendientes.pop(indice, None)
+        if pendiente is None:
+            return
         
-        # Usuarios
-        self.usuarios_view = UsuariosView(self.usuario)
-        self.tabs.addTab(self.usuarios_view, "Usuarios")
+        titulo, atributo, crear_vista, contenedor = pendiente
+        inicio = time.perf_counter()
+        vista = crear_vista()
+        contenedor.layout().addWidget(vista)
+        setattr(self, atributo, vista)
+        app_logger.info(f"Pestaña {titulo} creada en {(time.perf_counter() - inicio) * 1000:.0f} ms")
     
-    def crear_tabs_trabajador(self):
-        """Crea las pestañas para usuarios trabajadores"""
-        # Solo transacciones (ventas y compras)
-        self.transacciones_view = TransaccionesView(self.usuario, modo_simple=True)
-        self.tabs.addTab(self.transacciones_view, "Ventas y Compras")
+    def showEvent(self, event):
+        """Al mostrarse por primera vez, informa el tiempo desde el login"""
+        super().showEvent(event)
+        if self.inicio_login is not None:
+            # singleShot(0) corre cuando el bucle de eventos ya procesó el primer pintado
+            QTimer.singleShot(0, self._informar_tiempo_inicio)
+    
+    def _mostrar_ocupado(self, ocupado: bool):
+        """Muestra el indicador mientras haya tareas en segundo plano"""
+        self.barra_ocupado.setVisible(ocupado)
+        self.btn_cancelar_tareas.setVisible(ocupado)
+    
+    def _informar_tiempo_inicio(self):
+        if self.inicio_login is None:
+            return
+        demora = (time.perf_counter() - self.inicio_login) * 1000
+        self.inicio_login = None
+        app_logger.info(f"Ventana principal visible {demora:.0f} ms después del login")
     
     def cerrar_sesion(self):
         """Cierra la sesión del usuario"""
@@ -98,19 +162,29 @@ class MainWindow(QMainWindow):
         )
         
         if respuesta == QMessageBox.StandardButton.Yes:
-            try:
-                with get_session() as session:
-                    auth_service = AuthService(session)
-                    auth_service.usuario_actual = self.usuario
-                    auth_service.cerrar_sesion()
-                
-                app_logger.info(f"Usuario {self.usuario.username} cerró sesión")
-                self.close()
-                
-            except Exception as e:
-                app_logger.error(f"Error al cerrar sesión: {e}")
-                QMessageBox.critical(self, "Error", "Error al cerrar sesión")
+            def cerrar(contexto):
+                auth_service = AuthService(contexto.session)
+                auth_service.usuario_actual = self.usuario
+                auth_service.cerrar_sesion()
+            
+            ejecutor_tareas().ejecutar(cerrar, al_terminar=self._sesion_cerrada,
+                                       al_fallar=self._error_cerrar_sesion, escritura=True)
+    
+    def _sesion_cerrada(self, _resultado):
+        app_logger.info(f"Usuario {self.usuario.username} cerró sesión")
+        self.close()
+    
+    def _error_cerrar_sesion(self, error: Exception):
+        app_logger.error(f"Error al cerrar sesión: {error}")
+        QMessageBox.critical(self, "Error", "Error al cerrar sesión")
     
     def closeEvent(self, event):
         """Maneja el evento de cierre de la ventana"""
-        event.accept()
+        # Las lecturas pendientes se cancelan; se espera a las que ya están en
+        # curso y a las escrituras, que no se cancelan
+        ejecutor_tareas().cancelar_todas()
+        ejecutor_tareas().esperar()
+        # Entrega sus resultados mientras la ventana existe: si una escritura
+        # falló, su al_fallar se lo informa al usuario antes de cerrar
+        QApplication.processEvents()
+        event.accept()
\ No newline at end of file
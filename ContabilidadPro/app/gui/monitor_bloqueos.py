@@ -0,0 +1,71 @@
+"""
+Monitor de bloqueos del hilo de la interfaz
+
+Un QTimer se programa cada pocos milisegundos; si el bucle de eventos
+está ocupado (una consulta o un cálculo en el hilo de la interfaz), el
+temporizador llega tarde. El retraso de cada llamada es lo que la ventana
+estuvo congelada. Se registra cada bloqueo mayor al umbral y se acumulan
+estadísticas para comparar antes y después de mover trabajo a segundo plano.
+
+Se activa con la variable de entorno GUI_MONITOR_BLOQUEOS=1.
+"""
+import time
+from typing import Dict, Optional
+from PyQt6.QtCore import QObject, QTimer
+from app.utils.logger import app_logger
+import config
+
+INTERVALO_MS = 20
+
+
+class MonitorBloqueos(QObject):
+    """Mide cuánto tarda el bucle de eventos en atender un temporizador periódico"""
+
+    def __init__(self, umbral_ms: Optional[float] = None, registrar: bool = True):
+        """
+        Args:
+            umbral_ms: Bloqueos a partir de este tiempo se cuentan (y registran)
+            registrar: Si se escribe cada bloqueo en el log
+        """
+        super().__init__()
+        self.umbral_ms = umbral_ms if umbral_ms is not None else config.GUI_UMBRAL_BLOQUEO_MS
+        self.registrar = registrar
+        self._timer = QTimer(self)
+        self._timer.setInterval(INTERVALO_MS)
+        self._timer.timeout.connect(self._tick)
+        self._ultimo: Optional[float] = None
+        self.reiniciar()
+
+    def iniciar(self):
+        self._ultimo = time.perf_counter()
+        self._timer.start()
+
+    def detener(self):
+        self._timer.stop()
+        self._ultimo = None
+
+    def reiniciar(self):
+        """Pone las estadísticas en cero"""
+        self.bloqueos = 0
+        self.maximo_ms = 0.0
+        self.total_bloqueado_ms = 0.0
+
+    def estadisticas(self) -> Dict:
+        """Bloqueos contados, el mayor y el tiempo total bloqueado (ms)"""
+        return {
+            'bloqueos': self.bloqueos,
+            'maximo_ms': self.maximo_ms,
+            'total_bloqueado_ms': self.total_bloqueado_ms
+        }
+
+    def _tick(self):
+        ahora = time.perf_counter()
+        if self._ultimo is not None:
+            retraso = (ahora - self._ultimo) * 1000 - INTERVALO_MS
+            self.maximo_ms = max(self.maximo_ms, retraso)
+            if retraso >= self.umbral_ms:
+                self.bloqueos += 1
+                self.total_bloqueado_ms += retraso
+                if self.registrar:
+                    app_logger.warning(f"Interfaz bloqueada durante {retraso:.0f} ms")
+        self._ultimo = ahora
@@ -0,0 +1,63 @@
+"""
+Precarga en segundo plano de los datos de la primera pestaña
+
+Mientras el usuario escribe su contraseña, un hilo calcula los estados
+financieros del dashboard y carga los índices del plan de cuentas y de
+períodos (usados al registrar la primera transacción). Los
+resultados quedan en la caché de estados (compartida por todo el proceso),
+así que al abrirse la ventana principal el dashboard los lee sin consultar
+la base.
+"""
+import threading
+import time
+from typing import Optional
+from app.core.database import get_session
+from app.services.contabilidad_service import ContabilidadService
+from app.utils.logger import app_logger
+
+
+class Precarga:
+    """Ejecuta la precarga en un hilo y permite esperar a que termine"""
+
+    def __init__(self):
+        self._hilo: Optional[threading.Thread] = None
+        self.duracion_ms: Optional[float] = None
+
+    def iniciar(self):
+        """Inicia la precarga (una sola vez)"""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._precargar, name="Precarga", daemon=True)
+            self._hilo.start()
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que termine la precarga
+
+        No debe llamarse desde el hilo de la interfaz: la ventana principal se
+        abre sin esperarla y el dashboard lee la caché si ya está cargada.
+
+        Args:
+            timeout: Segundos máximos de espera (None para esperar sin límite)
+
+        Returns:
+            True si la precarga terminó (o nunca se inició)
+        """
+        if self._hilo is None:
+            return True
+        self._hilo.join(timeout)
+        return not self._hilo.is_alive()
+
+    def _precargar(self):
+        inicio = time.perf_counter()
+        try:
+            # La sesión es propia del hilo (Session es scoped_session)
+            with get_session() as session:
+                contabilidad_service = ContabilidadService(session)
+                contabilidad_service.obtener_estados_financieros()
+                contabilidad_service.cuenta_repo.resolver_codigo("ING-VENTAS")
+                contabilidad_service.periodo_repo.get_rangos()
+        except Exception as e:
+            app_logger.warning(f"No se pudo precargar el dashboard: {e}")
+            return
+        self.duracion_ms = (time.perf_counter() - inicio) * 1000
+        app_logger.info(f"Precarga del dashboard completada en {self.duracion_ms:.0f} ms")
@@ -0,0 +1,230 @@
+"""
+Ejecución de trabajo de base de datos fuera del hilo de la interfaz
+
+Las vistas no consultan la base directamente: envían una función al
+ejecutor, que la corre en un hilo de un QThreadPool con una sesión propia
+de ese hilo (Session es scoped_session) y entrega el resultado de vuelta
+en el hilo de la interfaz mediante señales.
+
+    tarea = ejecutor_tareas().ejecutar(
+        lambda contexto: ContabilidadService(contexto.session).registrar_venta(...),
+        al_terminar=self._venta_registrada,
+        al_fallar=self._mostrar_error
+    )
+
+La función recibe un ContextoTarea con la sesión; puede informar avances
+con contexto.informar(valor) (llegan a al_informar en el hilo de la
+interfaz) y debe llamar a contexto.verificar_cancelacion() entre pasos
+largos. Para que la cancelación interrumpa también una consulta en curso,
+el trabajo se envuelve en contexto.consultas_cancelables(tiempo_limite).
+Una tarea cancelada termina con rollback y no llama a al_terminar; si se
+agota el tiempo límite, llama a al_fallar con ConsultaCancelada.
+
+Las tareas que escriben en la base (registrar una transacción, crear un
+usuario, iniciar o cerrar sesión) se ejecutan con escritura=True y no se
+pueden cancelar: una vez pedidas se confirman o fallan, y si fallan
+al_fallar informa al usuario que no se guardaron.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Set
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from app.core.database import get_session
+from app.core.cancelacion import (ConsultaCancelada, TokenCancelacion, MOTIVO_CANCELADA,
+                                  consultas_cancelables)
+from app.utils.logger import app_logger
+import config
+
+
+class TareaCancelada(Exception):
+    """Se lanza dentro de una tarea cuando fue cancelada"""
+
+
+class ContextoTarea:
+    """Lo que recibe la función de una tarea: la sesión del hilo y el control de la tarea"""
+
+    def __init__(self, tarea: "Tarea", session):
+        self._tarea = tarea
+        self.session = session
+
+    def cancelada(self) -> bool:
+        """Indica si se pidió cancelar la tarea"""
+        return self._tarea.cancelada
+
+    def verificar_cancelacion(self):
+        """Lanza TareaCancelada si se pidió cancelar la tarea"""
+        if self._tarea.cancelada:
+            raise TareaCancelada()
+
+    def informar(self, valor: Any):
+        """
+        Envía un avance al hilo de la interfaz (y verifica la cancelación)
+
+        Args:
+            valor: Dato a entregar a al_informar
+        """
+        self.verificar_cancelacion()
+        self._tarea.senales.avance.emit(valor)
+
+    @contextmanager
+    def consultas_cancelables(self, tiempo_limite: Optional[float] = None) -> Iterator[TokenCancelacion]:
+        """
+        Permite interrumpir las consultas del bloque al cancelar la tarea
+
+        Args:
+            tiempo_limite: Segundos máximos para el bloque (None, sin límite)
+        """
+        self._tarea.token.fijar_tiempo_limite(tiempo_limite)
+        with consultas_cancelables(self.session, self._tarea.token) as token:
+            yield token
+
+
+class SenalesTarea(QObject):
+    """Señales de una tarea (QRunnable no puede emitir señales por sí mismo)"""
+    terminada = pyqtSignal(object)
+    fallida = pyqtSignal(object)
+    avance = pyqtSignal(object)
+    finalizada = pyqtSignal()  # Siempre, al terminar, fallar o cancelarse
+
+
+class Tarea(QRunnable):
+    """Función a ejecutar en el pool, con su sesión de base de datos"""
+
+    def __init__(self, funcion: Callable[..., Any], args: tuple, kwargs: dict, escritura: bool = False):
+        super().__init__()
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.escritura = escritura
+        self.senales = SenalesTarea()
+        self.token = TokenCancelacion()
+        self.setAutoDelete(False)  # La referencia la mantiene el ejecutor hasta que finaliza
+
+    @property
+    def cancelada(self) -> bool:
+        return self.token.cancelado
+
+    def cancelar(self):
+        """
+        Pide cancelar la tarea; si todavía no empezó, no llega a ejecutarse, y
+        si está dentro de consultas_cancelables se interrumpe la consulta en curso
+
+        Las tareas de escritura no se cancelan: revertirlas descartaría en
+        silencio algo que el usuario ya pidió guardar.
+        """
+        if not self.escritura:
+            self.token.cancelar()
+
+    def run(self):
+        try:
+            if self.cancelada:
+                raise TareaCancelada()
+            with get_session() as session:
+                resultado = self.funcion(ContextoTarea(self, session), *self.args, **self.kwargs)
+                if self.cancelada:
+                    raise TareaCancelada()  # Revierte lo hecho por la tarea
+            self.senales.terminada.emit(resultado)
+        except TareaCancelada:
+            pass
+        except ConsultaCancelada as e:
+            if e.motivo != MOTIVO_CANCELADA:
+                self.senales.fallida.emit(e)
+        except Exception as e:
+            if self.escritura:
+                app_logger.error(f"Escritura revertida por un error: {e}", exc_info=True)
+            else:
+                app_logger.error(f"Error en tarea en segundo plano: {e}", exc_info=True)
+            self.senales.fallida.emit(e)
+        finally:
+            self.senales.finalizada.emit()
+
+
+class EjecutorTareas(QObject):
+    """Pool de hilos para las tareas de base de datos de la interfaz"""
+
+    # True cuando empieza la primera tarea pendiente, False cuando termina la última
+    ocupado = pyqtSignal(bool)
+
+    def __init__(self, hilos: Optional[int] = None):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(hilos or config.TAREAS_HILOS)
+        self._activas: Set[Tarea] = set()
+
+    def ejecutar(self, funcion: Callable[..., Any], *args,
+                 al_terminar: Optional[Callable[[Any], None]] = None,
+                 al_fallar: Optional[Callable[[Exception], None]] = None,
+                 al_informar: Optional[Callable[[Any], None]] = None,
+                 al_finalizar: Optional[Callable[[], None]] = None,
+                 escritura: bool = False,
+                 **kwargs) -> Tarea:
+        """
+        Ejecuta una función en el pool
+
+        Debe llamarse desde el hilo de la interfaz: los callbacks se ejecutan
+        en ese hilo.
+
+        Args:
+            funcion: Función a ejecutar; recibe un ContextoTarea y luego *args/**kwargs
+            al_terminar: Recibe el valor retornado por la función
+            al_fallar: Recibe la excepción si la función falla
+            al_informar: Recibe cada valor enviado con contexto.informar
+            al_finalizar: Se llama siempre al final (también si se cancela)
+            escritura: True si la función escribe en la base: la tarea no se
+                       puede cancelar, y al_fallar debe avisar al usuario
+
+        Returns:
+            La tarea, para poder cancelarla
+        """
+        tarea = Tarea(funcion, args, kwargs, escritura)
+        if al_terminar:
+            tarea.senales.terminada.connect(al_terminar)
+        if al_fallar:
+            tarea.senales.fallida.connect(al_fallar)
+        if al_informar:
+            tarea.senales.avance.connect(al_informar)
+        if al_finalizar:
+            tarea.senales.finalizada.connect(al_finalizar)
+        tarea.senales.finalizada.connect(lambda: self._finalizada(tarea))
+
+        self._activas.add(tarea)
+        if len(self._activas) == 1:
+            self.ocupado.emit(True)
+        self.pool.start(tarea)
+        return tarea
+
+    def cancelar_todas(self):
+        """Pide cancelar las tareas de lectura pendientes o en curso (las escrituras terminan)"""
+        for tarea in list(self._activas):
+            tarea.cancelar()
+
+    @property
+    def esta_ocupado(self) -> bool:
+        return bool(self._activas)
+
+    def esperar(self, milisegundos: int = -1) -> bool:
+        """
+        Espera a que terminen las tareas en curso (p. ej. al cerrar la aplicación)
+
+        Args:
+            milisegundos: Tiempo máximo de espera (-1 para esperar sin límite)
+
+        Returns:
+            True si terminaron todas
+        """
+        return self.pool.waitForDone(milisegundos)
+
+    def _finalizada(self, tarea: Tarea):
+        self._activas.discard(tarea)
+        if not self._activas:
+            self.ocupado.emit(False)
+
+
+_ejecutor: Optional[EjecutorTareas] = None
+
+
+def ejecutor_tareas() -> EjecutorTareas:
+    """Ejecutor compartido por todas las vistas (se crea en el primer uso)"""
+    global _ejecutor
+    if _ejecutor is None:
+        _ejecutor = EjecutorTareas()
+    return _ejecutor
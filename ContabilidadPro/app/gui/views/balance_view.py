@@ -5,8 +5,8 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QPushButton,
                              QLabel)
 from PyQt6.QtGui import QFont
 from app.models.usuario import Usuario
-from app.core.database import get_session
 from app.services.reportes_service import ReportesService
+from app.gui.tareas import ejecutor_tareas
 
 
 class BalanceView(QWidget):
@@ -15,8 +15,8 @@ class BalanceView(QWidget):
     def __init__(self, usuario: Usuario):
         super().__init__()
         self.usuario = usuario
+        self._cargado = False
         self.init_ui()
-        self.actualizar_balance()
     
     def init_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -45,12 +45,17 @@ class BalanceView(QWidget):
         
         self.setLayout(layout)
     
+    def showEvent(self, event):
+        """Genera el balance la primera vez que la vista se muestra"""
+        super().showEvent(event)
+        if not self._cargado:
+            self._cargado = True
+            self.actualizar_balance()
+    
     def actualizar_balance(self):
         """Actualiza el balance general"""
-        try:
-            with get_session() as session:
-                reportes_service = ReportesService(session)
-                balance_texto = reportes_service.generar_balance_general_texto()
-                self.balance_text.setText(balance_texto)
-        except Exception as e:
-            self.balance_text.setText(f"Error al generar balance: {str(e)}")
+        ejecutor_tareas().ejecutar(
+            lambda contexto: ReportesService(contexto.session).generar_balance_general_texto(),
+            al_terminar=self.balance_text.setText,
+            al_fallar=lambda e: self.balance_text.setText(f"Error al generar balance: {str(e)}")
+        )
\ No newline at end of file
@@ -3,13 +3,17 @@ Vista de Dashboard (Resumen general)
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QGroupBox, 
                              QHBoxLayout, QPushButton)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from app.models.usuario import Usuario
-from app.core.database import get_session
 from app.services.contabilidad_service import ContabilidadService
 from app.services.reportes_service import ReportesService
 from app.utils.formatters import formatear_moneda
+from app.gui.tareas import ejecutor_tareas
+from app.gui.widgets.graficos import GraficoWidget, FuenteVentasCompras, FuenteComposicionCuentas
+from app.core.cache import version_libro
+from app.core.constants import TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE
+import config
 
 
 class DashboardView(QWidget):
@@ -19,7 +23,6 @@ class DashboardView(QWidget):
         super().__init__()
         self.usuario = usuario
         self.init_ui()
-        self.actualizar_datos()
     
     def init_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -56,15 +59,43 @@ class DashboardView(QWidget):
         
         layout.addLayout(cards_layout)
         
+        # Tarjetas del mes en curso (se leen del resumen de transacciones)
+        mes_layout = QHBoxLayout()
+        mes_layout.setSpacing(20)
+        
+        self.ventas_mes_label = QLabel("$0.00")
+        mes_layout.addWidget(self.crear_tarjeta("Ventas del Mes", self.ventas_mes_label))
+        
+        self.compras_mes_label = QLabel("$0.00")
+        mes_layout.addWidget(self.crear_tarjeta("Compras del Mes", self.compras_mes_label))
+        
+        layout.addLayout(mes_layout)
+        
+        # Gráficos (se dibujan en segundo plano a partir de los resúmenes)
+        graficos_layout = QHBoxLayout()
+        graficos_layout.setSpacing(20)
+        self.grafico_ventas = GraficoWidget(FuenteVentasCompras())
+        graficos_layout.addWidget(self.grafico_ventas, 3)
+        self.grafico_activos = GraficoWidget(FuenteComposicionCuentas(
+            [TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE], "Composición del activo"
+        ))
+        graficos_layout.addWidget(self.grafico_activos, 2)
+        layout.addLayout(graficos_layout, 1)
+        
         # Botón de actualizar
         btn_actualizar = QPushButton("Actualizar")
         btn_actualizar.clicked.connect(self.actualizar_datos)
         btn_actualizar.setMaximumWidth(150)
         layout.addWidget(btn_actualizar)
         
-        layout.addStretch()
-        
         self.setLayout(layout)
+        
+        # Actualización en vivo: si otra vista confirmó cambios en el libro
+        self._version_mostrada = None
+        self._temporizador = QTimer(self)
+        self._temporizador.setInterval(config.DASHBOARD_INTERVALO_ACTUALIZACION_MS)
+        self._temporizador.timeout.connect(self._revisar_cambios)
+        self._temporizador.start()
     
     def crear_tarjeta(self, titulo: str, label_valor: QLabel) -> QGroupBox:
         """Crea una tarjeta de resumen"""
@@ -101,23 +132,47 @@ class DashboardView(QWidget):
         
         return group
     
+    def showEvent(self, event):
+        """Carga los datos la primera vez que la vista se muestra"""
+        super().showEvent(event)
+        if self._version_mostrada is None:
+            self.actualizar_datos()
+    
+    def _revisar_cambios(self):
+        """Actualiza el dashboard visible si el libro cambió desde la última vez"""
+        if self.isVisible() and version_libro.actual != self._version_mostrada:
+            self.actualizar_datos()
+    
     def actualizar_datos(self):
         """Actualiza los datos del dashboard"""
-        try:
-            with get_session() as session:
-                contabilidad_service = ContabilidadService(session)
-                balance = contabilidad_service.obtener_balance_general()
-                estado_resultados = contabilidad_service.obtener_estado_resultados()
-                
-                # Actualizar labels
-                self.activos_label.setText(formatear_moneda(balance['total_activo']))
-                self.pasivos_label.setText(formatear_moneda(balance['total_pasivo']))
-                patrimonio_total = balance['total_patrimonio'] + estado_resultados['resultado_periodo']
-                self.patrimonio_label.setText(formatear_moneda(patrimonio_total))
-                
-        except Exception as e:
-            self.activos_label.setText("Error")
-            self.pasivos_label.setText("Error")
-            self.patrimonio_label.setText("Error")
-            # Imprimimos en consola (el log ya lo captura en main.py si es fatal)
-            print(f"Error al actualizar dashboard: {e}")
\ No newline at end of file
+        self._version_mostrada = version_libro.actual
+        self.grafico_ventas.actualizar()
+        self.grafico_activos.actualizar()
+        ejecutor_tareas().ejecutar(
+            self._cargar_datos,
+            al_terminar=self._mostrar_datos,
+            al_fallar=self._mostrar_error
+        )
+    
+    @staticmethod
+    def _cargar_datos(contexto):
+        """Lee en segundo plano los estados financieros y los totales del mes"""
+        estados = ContabilidadService(contexto.session).obtener_estados_financieros()
+        del_mes = ReportesService(contexto.session).obtener_ventas_compras_del_mes()
+        return estados, del_mes
+    
+    def _mostrar_datos(self, datos):
+        """Muestra los totales de los estados financieros y del mes"""
+        (balance, estado_resultados), del_mes = datos
+        self.activos_label.setText(formatear_moneda(balance['total_activo']))
+        self.pasivos_label.setText(formatear_moneda(balance['total_pasivo']))
+        patrimonio_total = balance['total_patrimonio'] + estado_resultados['resultado_periodo']
+        self.patrimonio_label.setText(formatear_moneda(patrimonio_total))
+        self.ventas_mes_label.setText(formatear_moneda(del_mes['ventas']))
+        self.compras_mes_label.setText(formatear_moneda(del_mes['compras']))
+    
+    def _mostrar_error(self, error: Exception):
+        """Marca los totales con error (la tarea ya lo registró en el log)"""
+        for label in (self.activos_label, self.pasivos_label, self.patrimonio_label,
+                      self.ventas_mes_label, self.compras_mes_label):
+            label.setText("Error")
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Vista del Libro: transacciones y actividades en tablas paginadas
+"""
+from datetime import datetime, time, timedelta
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                             QPushButton, QCheckBox, QDateEdit, QStackedWidget)
+from PyQt6.QtCore import QDate
+from PyQt6.QtGui import QFont
+from app.models.usuario import Usuario
+from app.core.constants import *
+from app.gui.widgets.tabla_datos import TablaDatos, FuenteTransacciones, FuenteActividades
+
+TODOS = "Todos"
+TIPOS_TRANSACCION = [TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA, TIPO_TRANSACCION_GENERAL,
+                     TIPO_TRANSACCION_CIERRE]
+TIPOS_ACTIVIDAD = [ACTIVIDAD_LOGIN, ACTIVIDAD_LOGOUT, ACTIVIDAD_CREAR_USUARIO,
+                   ACTIVIDAD_CREAR_TRANSACCION, ACTIVIDAD_VENTA, ACTIVIDAD_COMPRA,
+                   ACTIVIDAD_CERRAR_PERIODO, ACTIVIDAD_IMPORTACION]
+
+
+class LibroView(QWidget):
+    """Vista para recorrer las transacciones y las actividades registradas"""
+
+    def __init__(self, usuario: Usuario):
+        super().__init__()
+        self.usuario = usuario
+        self.init_ui()
+
+    def init_ui(self):
+        """Inicializa la interfaz de usuario"""
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        # Título
+        title = QLabel("Libro")
+        title_font = QFont()
+        title_font.setPointSize(14)
+        title_font.setBold(True)
+        title.setFont(title_font)
+        layout.addWidget(title)
+
+        # Filtros
+        filtros_layout = QHBoxLayout()
+        filtros_layout.addWidget(QLabel("Mostrar:"))
+        self.origen_combo = QComboBox()
+        self.origen_combo.addItems(["Transacciones", "Actividades"])
+        self.origen_combo.currentIndexChanged.connect(self._cambiar_origen)
+        filtros_layout.addWidget(self.origen_combo)
+
+        filtros_layout.addSpacing(20)
+        filtros_layout.addWidget(QLabel("Tipo:"))
+        self.tipo_combo = QComboBox()
+        filtros_layout.addWidget(self.tipo_combo)
+
+        filtros_layout.addSpacing(20)
+        self.fechas_check = QCheckBox("Desde:")
+        filtros_layout.addWidget(self.fechas_check)
+        self.desde_edit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.desde_edit.setCalendarPopup(True)
+        filtros_layout.addWidget(self.desde_edit)
+        filtros_layout.addWidget(QLabel("Hasta:"))
+        self.hasta_edit = QDateEdit(QDate.currentDate())
+        self.hasta_edit.setCalendarPopup(True)
+        filtros_layout.addWidget(self.hasta_edit)
+
+        btn_filtrar = QPushButton("Filtrar")
+        btn_filtrar.clicked.connect(self.aplicar_filtros)
+        filtros_layout.addWidget(btn_filtrar)
+        filtros_layout.addStretch()
+        layout.addLayout(filtros_layout)
+
+        # Tablas (la de actividades se crea, y carga, recién al elegirla)
+        self.tabla_transacciones = TablaDatos(FuenteTransacciones())
+        self.tabla_actividades = None
+        self.tablas = QStackedWidget()
+        self.tablas.addWidget(self.tabla_transacciones)
+        layout.addWidget(self.tablas)
+
+        self.setLayout(layout)
+        self._cargar_tipos()
+
+    def _cambiar_origen(self, indice: int):
+        """Muestra la tabla de transacciones o la de actividades"""
+        if indice == 1 and self.tabla_actividades is None:
+            self.tabla_actividades = TablaDatos(FuenteActividades())
+            self.tablas.addWidget(self.tabla_actividades)
+        self.tablas.setCurrentIndex(indice)
+        self._cargar_tipos()
+
+    def _cargar_tipos(self):
+        """Carga los tipos que se pueden filtrar en la tabla visible"""
+        self.tipo_combo.clear()
+        self.tipo_combo.addItem(TODOS)
+        if self.origen_combo.currentIndex() == 0:
+            self.tipo_combo.addItems(TIPOS_TRANSACCION)
+        else:
+            self.tipo_combo.addItems(TIPOS_ACTIVIDAD)
+
+    def aplicar_filtros(self):
+        """Recarga la tabla visible con los filtros elegidos (se aplican en la consulta)"""
+        tipo = self.tipo_combo.currentText()
+        tipo = None if tipo == TODOS else tipo
+        fecha_inicio = fecha_fin = None
+        if self.fechas_check.isChecked():
+            fecha_inicio = datetime.combine(self.desde_edit.date().toPyDate(), time.min)
+            # Inclusive: hasta el último instante del día elegido
+            fecha_fin = datetime.combine(self.hasta_edit.date().toPyDate() + timedelta(days=1),
+                                         time.min) - timedelta(microseconds=1)
+
+        if self.origen_combo.currentIndex() == 0:
+            self.tabla_transacciones.modelo.filtrar(tipo=tipo, fecha_inicio=fecha_inicio,
+                                                    fecha_fin=fecha_fin)
+        else:
+            self.tabla_actividades.modelo.filtrar(tipo_actividad=tipo, fecha_inicio=fecha_inicio,
+                                                  fecha_fin=fecha_fin)
@@ -7,9 +7,9 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QFormLayout)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from app.core.database import get_session
 from app.services.auth_service import AuthService
 from app.models.usuario import Usuario
+from app.gui.tareas import ejecutor_tareas
 
 
 class LoginView(QDialog):
@@ -72,19 +72,19 @@ class LoginView(QDialog):
         # --- FIN DEL CAMBIO ---
         
         # Botón de login
-        login_btn = QPushButton("Iniciar Sesión")
-        login_btn.setMinimumHeight(40)
-        login_btn.clicked.connect(self.login)
+        self.login_btn = QPushButton("Iniciar Sesión")
+        self.login_btn.setMinimumHeight(40)
+        self.login_btn.clicked.connect(self.login)
         
         # Fix para el foco feo en el botón (opcional pero recomendado)
-        login_btn.setStyleSheet("""
+        self.login_btn.setStyleSheet("""
             QPushButton:focus { 
                 outline: none; 
                 border: 2px solid #5a90d6; 
             }
         """)
         
-        layout.addWidget(login_btn)
+        layout.addWidget(self.login_btn)
         
         # Información por defecto
         info_group = QGroupBox("Acceso por defecto")
@@ -110,18 +110,30 @@ class LoginView(QDialog):
             QMessageBox.warning(self, "Error", "Por favor complete todos los campos")
             return
         
-        try:
-            with get_session() as session:
-                auth_service = AuthService(session)
-                exito, mensaje, usuario = auth_service.autenticar(username, password)
-                
-                if exito:
-                    self.usuario_autenticado = usuario
-                    self.accept()
-                else:
-                    QMessageBox.critical(self, "Error de Autenticación", mensaje)
-                    self.password_input.clear()
-                    self.password_input.setFocus()
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al autenticar: {str(e)}")
\ No newline at end of file
+        # bcrypt tarda a propósito: se verifica en segundo plano
+        self.login_btn.setEnabled(False)
+        self.password_input.setEnabled(False)
+        ejecutor_tareas().ejecutar(
+            lambda contexto: AuthService(contexto.session).autenticar(username, password),
+            al_terminar=self._autenticado,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al autenticar: {str(e)}"),
+            al_finalizar=self._reactivar,
+            escritura=True
+        )
+    
+    def _autenticado(self, resultado):
+        """Recibe el resultado de la autenticación"""
+        exito, mensaje, usuario = resultado
+        if exito:
+            self.usuario_autenticado = usuario
+            self.accept()
+        else:
+            self._reactivar()
+            QMessageBox.critical(self, "Error de Autenticación", mensaje)
+            self.password_input.clear()
+            self.password_input.setFocus()
+    
+    def _reactivar(self):
+        """Vuelve a habilitar el formulario al terminar la autenticación"""
+        self.login_btn.setEnabled(True)
+        self.password_input.setEnabled(True)
@@ -2,11 +2,22 @@
 Vista de Reportes
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QPushButton,
-                             QLabel, QHBoxLayout, QComboBox)
-from PyQt6.QtGui import QFont
+                             QLabel, QHBoxLayout, QComboBox, QMessageBox)
+from PyQt6.QtGui import QFont, QTextCursor
 from app.models.usuario import Usuario
-from app.core.database import get_session
-from app.services.reportes_service import ReportesService
+from app.services.reportes_service import ReportesService, escribir_reporte
+from app.services.export_service import (ExportService, FORMATO_EXCEL, FORMATO_CSV,
+                                         FORMATO_PDF)
+from app.core.cancelacion import ConsultaCancelada
+from app.gui.tareas import ejecutor_tareas
+import config
+
+# Formatos ofrecidos en el selector de exportación
+FORMATOS = {
+    "Excel": FORMATO_EXCEL,
+    "CSV": FORMATO_CSV,
+    "PDF": FORMATO_PDF
+}
 
 
 class ReportesView(QWidget):
@@ -15,6 +26,8 @@ class ReportesView(QWidget):
     def __init__(self, usuario: Usuario):
         super().__init__()
         self.usuario = usuario
+        self.tarea_reporte = None
+        self.tarea_exportacion = None
         self.init_ui()
     
     def init_ui(self):
@@ -39,13 +52,33 @@ class ReportesView(QWidget):
             "Balance General",
             "Estado de Resultados",
             "Transacciones",
-            "Actividades"
+            "Transacciones del Período",
+            "Actividades",
+            "Ventas y Compras por Mes"
         ])
         selector_layout.addWidget(self.tipo_reporte_combo)
         
-        btn_generar = QPushButton("Generar Reporte")
-        btn_generar.clicked.connect(self.generar_reporte)
-        selector_layout.addWidget(btn_generar)
+        self.btn_generar = QPushButton("Generar Reporte")
+        self.btn_generar.clicked.connect(self.generar_reporte)
+        selector_layout.addWidget(self.btn_generar)
+        
+        selector_layout.addSpacing(20)
+        selector_layout.addWidget(QLabel("Formato:"))
+        self.formato_combo = QComboBox()
+        self.formato_combo.addItems(list(FORMATOS))
+        selector_layout.addWidget(self.formato_combo)
+        
+        self.btn_exportar = QPushButton("Exportar")
+        self.btn_exportar.clicked.connect(self.exportar_reporte)
+        selector_layout.addWidget(self.btn_exportar)
+        
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.clicked.connect(self.cancelar)
+        self.btn_cancelar.setVisible(False)
+        selector_layout.addWidget(self.btn_cancelar)
+        
+        self.estado_label = QLabel("")
+        selector_layout.addWidget(self.estado_label)
         
         selector_layout.addStretch()
         layout.addLayout(selector_layout)
@@ -62,22 +95,112 @@ class ReportesView(QWidget):
         """Genera el reporte seleccionado"""
         tipo = self.tipo_reporte_combo.currentText()
         
-        try:
-            with get_session() as session:
-                reportes_service = ReportesService(session)
-                
-                if tipo == "Balance General":
-                    texto = reportes_service.generar_balance_general_texto()
-                elif tipo == "Estado de Resultados":
-                    texto = reportes_service.generar_estado_resultados_texto()
-                elif tipo == "Transacciones":
-                    texto = reportes_service.generar_reporte_transacciones()
-                elif tipo == "Actividades":
-                    texto = reportes_service.generar_reporte_actividades()
-                else:
-                    texto = "Tipo de reporte no reconocido"
-                
-                self.reporte_text.setText(texto)
-                
-        except Exception as e:
-            self.reporte_text.setText(f"Error al generar reporte: {str(e)}")
+        self.reporte_text.clear()
+        self.btn_generar.setEnabled(False)
+        self.tarea_reporte = ejecutor_tareas().ejecutar(
+            self._generar, tipo,
+            al_informar=self._agregar_bloque,
+            al_fallar=self._reporte_fallido,
+            al_finalizar=self._reporte_finalizado
+        )
+        self._actualizar_cancelar()
+    
+    @staticmethod
+    def _generar(contexto, tipo: str) -> int:
+        """Genera el reporte en segundo plano y envía el texto bloque por bloque"""
+        reportes_service = ReportesService(contexto.session)
+        
+        if tipo == "Balance General":
+            lineas = reportes_service.iterar_balance_general()
+        elif tipo == "Estado de Resultados":
+            lineas = reportes_service.iterar_estado_resultados()
+        elif tipo == "Transacciones":
+            lineas = reportes_service.iterar_reporte_transacciones()
+        elif tipo == "Transacciones del Período":
+            lineas = reportes_service.iterar_reporte_periodo_actual()
+        elif tipo == "Actividades":
+            lineas = reportes_service.iterar_reporte_actividades()
+        elif tipo == "Ventas y Compras por Mes":
+            lineas = reportes_service.iterar_ventas_compras_por_mes()
+        else:
+            lineas = iter(["Tipo de reporte no reconocido"])
+        
+        # Cada bloque se muestra apenas se genera; cancelar o superar el
+        # tiempo límite del tipo de reporte interrumpe la consulta en curso
+        with contexto.consultas_cancelables(config.REPORTES_TIEMPO_LIMITE.get(tipo)):
+            return escribir_reporte(lineas, contexto.informar)
+    
+    def _agregar_bloque(self, bloque: str):
+        """Agrega un bloque de texto al final del reporte"""
+        cursor = self.reporte_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(bloque)
+    
+    def _reporte_fallido(self, error: Exception):
+        if isinstance(error, ConsultaCancelada):
+            # Se conserva lo que se alcanzó a generar
+            self._agregar_bloque(f"\n*** Reporte interrumpido: {error} ***\n")
+        else:
+            self.reporte_text.setText(f"Error al generar reporte: {str(error)}")
+    
+    def _reporte_finalizado(self):
+        if self.tarea_reporte is not None and self.tarea_reporte.cancelada:
+            self._agregar_bloque("\n*** Reporte cancelado ***\n")
+        self.tarea_reporte = None
+        self.btn_generar.setEnabled(True)
+        self._actualizar_cancelar()
+    
+    def cancelar(self):
+        """Cancela el reporte o la exportación en curso"""
+        for tarea in (self.tarea_reporte, self.tarea_exportacion):
+            if tarea is not None:
+                tarea.cancelar()
+    
+    def _actualizar_cancelar(self):
+        """Muestra el botón Cancelar mientras haya un reporte o exportación en curso"""
+        self.btn_cancelar.setVisible(self.tarea_reporte is not None or self.tarea_exportacion is not None)
+    
+    def exportar_reporte(self):
+        """Exporta el reporte seleccionado al formato elegido"""
+        tipo = self.tipo_reporte_combo.currentText()
+        formato = FORMATOS[self.formato_combo.currentText()]
+        
+        self.btn_exportar.setEnabled(False)
+        self.tarea_exportacion = ejecutor_tareas().ejecutar(
+            self._exportar, tipo, formato,
+            al_terminar=self._exportado,
+            al_informar=self._mostrar_progreso,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al exportar: {str(e)}"),
+            al_finalizar=self._exportacion_finalizada
+        )
+        self._actualizar_cancelar()
+    
+    @staticmethod
+    def _exportar(contexto, tipo: str, formato: str):
+        """Exporta en segundo plano; el avance llega a _mostrar_progreso"""
+        export_service = ExportService(contexto.session)
+        
+        with contexto.consultas_cancelables(config.EXPORTACION_TIEMPO_LIMITE):
+            if tipo == "Transacciones":
+                return export_service.exportar_transacciones(formato, progreso=contexto.informar)
+            if tipo == "Transacciones del Período":
+                return export_service.exportar_transacciones_periodo_actual(formato, progreso=contexto.informar)
+            if tipo == "Actividades":
+                return export_service.exportar_actividades(formato, progreso=contexto.informar)
+            if tipo == "Ventas y Compras por Mes":
+                return export_service.exportar_ventas_compras_por_mes(formato)
+            return export_service.exportar_estados_financieros(formato)
+    
+    def _exportado(self, resultado):
+        ruta, filas = resultado
+        QMessageBox.information(self, "Éxito", f"Se exportaron {filas} filas a:\n{ruta}")
+    
+    def _exportacion_finalizada(self):
+        self.tarea_exportacion = None
+        self.estado_label.setText("")
+        self.btn_exportar.setEnabled(True)
+        self._actualizar_cancelar()
+    
+    def _mostrar_progreso(self, filas: int):
+        """Muestra cuántas filas se exportaron"""
+        self.estado_label.setText(f"Exportando... {filas:,} filas")
\ No newline at end of file
@@ -6,11 +6,11 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox)
 from PyQt6.QtGui import QFont
 from app.models.usuario import Usuario
-from app.core.database import get_session
 from app.services.contabilidad_service import ContabilidadService
 from app.services.validacion_service import ValidacionService
 from app.utils.formatters import limpiar_monto
 from app.core.constants import TIPOS_CUENTA
+from app.gui.tareas import ejecutor_tareas
 
 
 class TransaccionesView(QWidget):
@@ -47,14 +47,14 @@ class TransaccionesView(QWidget):
         self.venta_monto = QLineEdit()
         self.venta_monto.setPlaceholderText("Monto ($)")
         
-        btn_venta = QPushButton("Registrar Venta")
-        btn_venta.clicked.connect(self.registrar_venta)
+        self.btn_venta = QPushButton("Registrar Venta")
+        self.btn_venta.clicked.connect(self.registrar_venta)
         
         venta_layout.addWidget(QLabel("Concepto:"))
         venta_layout.addWidget(self.venta_concepto)
         venta_layout.addWidget(QLabel("Monto:"))
         venta_layout.addWidget(self.venta_monto)
-        venta_layout.addWidget(btn_venta)
+        venta_layout.addWidget(self.btn_venta)
         
         venta_group.setLayout(venta_layout)
         layout.addWidget(venta_group)
@@ -69,14 +69,14 @@ class TransaccionesView(QWidget):
         self.compra_monto = QLineEdit()
         self.compra_monto.setPlaceholderText("Monto ($)")
         
-        btn_compra = QPushButton("Registrar Compra")
-        btn_compra.clicked.connect(self.registrar_compra)
+        self.btn_compra = QPushButton("Registrar Compra")
+        self.btn_compra.clicked.connect(self.registrar_compra)
         
         compra_layout.addWidget(QLabel("Concepto:"))
         compra_layout.addWidget(self.compra_concepto)
         compra_layout.addWidget(QLabel("Monto:"))
         compra_layout.addWidget(self.compra_monto)
-        compra_layout.addWidget(btn_compra)
+        compra_layout.addWidget(self.btn_compra)
         
         compra_group.setLayout(compra_layout)
         layout.addWidget(compra_group)
@@ -95,8 +95,8 @@ class TransaccionesView(QWidget):
             self.general_monto = QLineEdit()
             self.general_monto.setPlaceholderText("Monto ($)")
             
-            btn_general = QPushButton("Registrar Transacción")
-            btn_general.clicked.connect(self.registrar_general)
+            self.btn_general = QPushButton("Registrar Transacción")
+            self.btn_general.clicked.connect(self.registrar_general)
             
             general_layout.addWidget(QLabel("Tipo de Cuenta:"))
             general_layout.addWidget(self.tipo_combo)
@@ -104,7 +104,7 @@ class TransaccionesView(QWidget):
             general_layout.addWidget(self.general_concepto)
             general_layout.addWidget(QLabel("Monto:"))
             general_layout.addWidget(self.general_monto)
-            general_layout.addWidget(btn_general)
+            general_layout.addWidget(self.btn_general)
             
             general_group.setLayout(general_layout)
             layout.addWidget(general_group)
@@ -133,21 +133,10 @@ class TransaccionesView(QWidget):
             return
         
         # Registrar
-        try:
-            with get_session() as session:
-                contabilidad_service = ContabilidadService(session)
-                exito, mensaje = contabilidad_service.registrar_venta(concepto, monto, self.usuario)
-                
-                if exito:
-                    QMessageBox.information(self, "Éxito", mensaje)
-                    self.venta_concepto.clear()
-                    self.venta_monto.clear()
-                    self.venta_concepto.setFocus()
-                else:
-                    QMessageBox.critical(self, "Error", mensaje)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al registrar venta: {str(e)}")
+        self._registrar_en_segundo_plano(
+            lambda servicio: servicio.registrar_venta(concepto, monto, self.usuario),
+            self.btn_venta, self.venta_concepto, self.venta_monto, "venta"
+        )
     
     def registrar_compra(self):
         """Registra una compra"""
@@ -170,21 +159,10 @@ class TransaccionesView(QWidget):
             return
         
         # Registrar
-        try:
-            with get_session() as session:
-                contabilidad_service = ContabilidadService(session)
-                exito, mensaje = contabilidad_service.registrar_compra(concepto, monto, self.usuario)
-                
-                if exito:
-                    QMessageBox.information(self, "Éxito", mensaje)
-                    self.compra_concepto.clear()
-                    self.compra_monto.clear()
-                    self.compra_concepto.setFocus()
-                else:
-                    QMessageBox.critical(self, "Error", mensaje)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al registrar compra: {str(e)}")
+        self._registrar_en_segundo_plano(
+            lambda servicio: servicio.registrar_compra(concepto, monto, self.usuario),
+            self.btn_compra, self.compra_concepto, self.compra_monto, "compra"
+        )
     
     def registrar_general(self):
         """Registra una transacción general"""
@@ -208,20 +186,39 @@ class TransaccionesView(QWidget):
             return
         
         # Registrar
-        try:
-            with get_session() as session:
-                contabilidad_service = ContabilidadService(session)
-                exito, mensaje = contabilidad_service.registrar_transaccion_cuenta(
-                    tipo, concepto, monto, self.usuario
-                )
-                
-                if exito:
-                    QMessageBox.information(self, "Éxito", mensaje)
-                    self.general_concepto.clear()
-                    self.general_monto.clear()
-                    self.general_concepto.setFocus()
-                else:
-                    QMessageBox.critical(self, "Error", mensaje)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al registrar transacción: {str(e)}")
+        self._registrar_en_segundo_plano(
+            lambda servicio: servicio.registrar_transaccion_cuenta(tipo, concepto, monto, self.usuario),
+            self.btn_general, self.general_concepto, self.general_monto, "transacción"
+        )
+    
+    def _registrar_en_segundo_plano(self, registrar, boton: QPushButton, concepto_input: QLineEdit,
+                                    monto_input: QLineEdit, descripcion: str):
+        """
+        Ejecuta el registro fuera del hilo de la interfaz
+        
+        Args:
+            registrar: Función que recibe el ContabilidadService y retorna (exito, mensaje)
+            boton: Botón del formulario (se deshabilita mientras se registra)
+            concepto_input: Campo de concepto del formulario
+            monto_input: Campo de monto del formulario
+            descripcion: Qué se registra, para el mensaje de error
+        """
+        boton.setEnabled(False)
+        ejecutor_tareas().ejecutar(
+            lambda contexto: registrar(ContabilidadService(contexto.session)),
+            al_terminar=lambda resultado: self._registrado(resultado, concepto_input, monto_input),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al registrar {descripcion}: {str(e)}"),
+            al_finalizar=lambda: boton.setEnabled(True),
+            escritura=True
+        )
+    
+    def _registrado(self, resultado, concepto_input: QLineEdit, monto_input: QLineEdit):
+        """Informa el resultado del registro y limpia el formulario si tuvo éxito"""
+        exito, mensaje = resultado
+        if exito:
+            QMessageBox.information(self, "Éxito", mensaje)
+            concepto_input.clear()
+            monto_input.clear()
+            concepto_input.setFocus()
+        else:
+            QMessageBox.critical(self, "Error", mensaje)
\ No newline at end of file
@@ -6,9 +6,9 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QTextEdit, QComboBox)
 from PyQt6.QtGui import QFont
 from app.models.usuario import Usuario
-from app.core.database import get_session
 from app.services.auth_service import AuthService
 from app.core.constants import NIVEL_TRABAJADOR, NIVEL_ADMINISTRADOR
+from app.gui.tareas import ejecutor_tareas
 
 
 class UsuariosView(QWidget):
@@ -17,8 +17,8 @@ class UsuariosView(QWidget):
     def __init__(self, usuario: Usuario):
         super().__init__()
         self.usuario = usuario
+        self._cargado = False
         self.init_ui()
-        self.actualizar_lista()
     
     def init_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -60,8 +60,8 @@ class UsuariosView(QWidget):
             f"{NIVEL_ADMINISTRADOR} - Administrador"
         ])
         
-        btn_crear = QPushButton("Crear Usuario")
-        btn_crear.clicked.connect(self.crear_usuario)
+        self.btn_crear = QPushButton("Crear Usuario")
+        self.btn_crear.clicked.connect(self.crear_usuario)
         
         crear_layout.addWidget(QLabel("Usuario:"))
         crear_layout.addWidget(self.new_username)
@@ -75,7 +75,7 @@ class UsuariosView(QWidget):
         crear_layout.addWidget(self.new_documento)
         crear_layout.addWidget(QLabel("Nivel:"))
         crear_layout.addWidget(self.new_nivel)
-        crear_layout.addWidget(btn_crear)
+        crear_layout.addWidget(self.btn_crear)
         
         crear_group.setLayout(crear_layout)
         layout.addWidget(crear_group)
@@ -112,52 +112,69 @@ class UsuariosView(QWidget):
             QMessageBox.warning(self, "Error", "Complete todos los campos")
             return
         
-        try:
-            with get_session() as session:
-                auth_service = AuthService(session)
-                auth_service.usuario_actual = self.usuario
-                exito, mensaje = auth_service.crear_usuario(
-                    username, password, nombre, apellido, documento, nivel
-                )
-                
-                if exito:
-                    QMessageBox.information(self, "Éxito", mensaje)
-                    # Limpiar campos
-                    self.new_username.clear()
-                    self.new_password.clear()
-                    self.new_nombre.clear()
-                    self.new_apellido.clear()
-                    self.new_documento.clear()
-                    self.actualizar_lista()
-                else:
-                    QMessageBox.critical(self, "Error", mensaje)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al crear usuario: {str(e)}")
+        def crear(contexto):
+            auth_service = AuthService(contexto.session)
+            auth_service.usuario_actual = self.usuario
+            return auth_service.crear_usuario(username, password, nombre, apellido, documento, nivel)
+        
+        self.btn_crear.setEnabled(False)
+        ejecutor_tareas().ejecutar(
+            crear,
+            al_terminar=self._usuario_creado,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al crear usuario: {str(e)}"),
+            al_finalizar=lambda: self.btn_crear.setEnabled(True),
+            escritura=True
+        )
+    
+    def _usuario_creado(self, resultado):
+        """Informa el resultado de crear el usuario"""
+        exito, mensaje = resultado
+        if exito:
+            QMessageBox.information(self, "Éxito", mensaje)
+            # Limpiar campos
+            self.new_username.clear()
+            self.new_password.clear()
+            self.new_nombre.clear()
+            self.new_apellido.clear()
+            self.new_documento.clear()
+            self.actualizar_lista()
+        else:
+            QMessageBox.critical(self, "Error", mensaje)
+    
+    def showEvent(self, event):
+        """Carga la lista la primera vez que la vista se muestra"""
+        super().showEvent(event)
+        if not self._cargado:
+            self._cargado = True
+            self.actualizar_lista()
     
     def actualizar_lista(self):
         """Actualiza la lista de usuarios"""
-        try:
-            with get_session() as session:
-                auth_service = AuthService(session)
-                usuarios = auth_service.get_todos_usuarios()
-                
-                texto = "USUARIOS REGISTRADOS\n"
-                texto += "=" * 50 + "\n\n"
-                
-                for usuario in usuarios:
-                    nivel_texto = "Administrador" if usuario.nivel == NIVEL_ADMINISTRADOR else "Trabajador"
-                    estado = "Activo" if usuario.activo else "Inactivo"
-                    
-                    texto += f"Usuario: {usuario.username}\n"
-                    texto += f"Nombre: {usuario.nombre_completo}\n"
-                    texto += f"Documento: {usuario.documento}\n"
-                    texto += f"Nivel: {nivel_texto}\n"
-                    texto += f"Estado: {estado}\n"
-                    texto += f"Creado: {usuario.created_at.strftime('%d/%m/%Y %H:%M')}\n"
-                    texto += "-" * 30 + "\n"
-                
-                self.usuarios_text.setText(texto)
-                
-        except Exception as e:
-            self.usuarios_text.setText(f"Error al cargar usuarios: {str(e)}")
+        ejecutor_tareas().ejecutar(
+            self._generar_lista,
+            al_terminar=self.usuarios_text.setText,
+            al_fallar=lambda e: self.usuarios_text.setText(f"Error al cargar usuarios: {str(e)}")
+        )
+    
+    @staticmethod
+    def _generar_lista(contexto) -> str:
+        """Arma el texto de la lista de usuarios (se ejecuta en segundo plano)"""
+        auth_service = AuthService(contexto.session)
+        usuarios = auth_service.get_todos_usuarios()
+        
+        texto = "USUARIOS REGISTRADOS\n"
+        texto += "=" * 50 + "\n\n"
+        
+        for usuario in usuarios:
+            nivel_texto = "Administrador" if usuario.nivel == NIVEL_ADMINISTRADOR else "Trabajador"
+            estado = "Activo" if usuario.activo else "Inactivo"
+            
+            texto += f"Usuario: {usuario.username}\n"
+            texto += f"Nombre: {usuario.nombre_completo}\n"
+            texto += f"Documento: {usuario.documento}\n"
+            texto += f"Nivel: {nivel_texto}\n"
+            texto += f"Estado: {estado}\n"
+            texto += f"Creado: {usuario.created_at.strftime('%d/%m/%Y %H:%M')}\n"
+            texto += "-" * 30 + "\n"
+        
+        return texto
\ No newline at end of file
@@ -0,0 +1,505 @@
+"""
+Gráficos del dashboard dibujados fuera del hilo de la interfaz
+
+GraficoWidget muestra un gráfico de matplotlib sin usar su backend de Qt:
+los datos se leen (de tablas ya agregadas, como los resúmenes diarios) y la
+figura se dibuja con Agg en un hilo del ejecutor de tareas, sobre una
+imagen en memoria que el widget solo pinta. Las series con más puntos de
+los que caben en el ancho se reducen con LTTB antes de dibujarlas.
+
+Las actualizaciones en vivo usan blitting: al dibujar la figura se guarda
+el fondo (ejes, grilla, leyenda) sin las series, y cuando llegan datos
+nuevos que entran en los límites de los ejes solo se restaura ese fondo y
+se vuelven a dibujar las series, en milisegundos. Si los datos se salen de
+los límites, se redibuja la figura completa en segundo plano.
+
+    grafico = GraficoWidget(FuenteVentasCompras())
+    grafico.actualizar()   # relee los datos y hace blitting si puede
+"""
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+from sqlalchemy.orm import Session
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
+from app.gui.tareas import Tarea, ejecutor_tareas
+from app.repositories.cuenta_repository import CuentaRepository
+from app.repositories.resumen_repository import ResumenRepository
+import config
+
+# Colores del tema oscuro (ver styles/custom_styles.qss)
+COLOR_FONDO = "#2e2e2e"
+COLOR_TEXTO = "#e0e0e0"
+COLOR_GRILLA = "#3f3f3f"
+COLORES_SERIES = ["#5a90d6", "#d6905a", "#6ac08a", "#c86a9a", "#a0a0a0"]
+
+# LTTB deja un punto cada PIXELES_POR_PUNTO píxeles de ancho: con más, los
+# segmentos se superponen en pantalla y solo encarecen el dibujo
+PIXELES_POR_PUNTO = 2
+# Puntos por tramo a partir de los cuales LTTB opera cada tramo con numpy
+TRAMO_MINIMO_NUMPY = 16
+
+# Margen sobre el máximo de los ejes, para que los datos nuevos entren sin redibujar todo
+MARGEN_EJES = 0.15
+
+# Sufijos para abreviar montos en los ejes con poco espacio
+SUFIJOS_MONTO = [(1e9, "B"), (1e6, "M"), (1e3, "k")]
+
+# Agg no garantiza dibujar varias figuras a la vez en distintos hilos
+_bloqueo_dibujo = threading.Lock()
+
+
+def formato_monto_abreviado(valor: float, _posicion=None) -> str:
+    """Formatea un monto abreviado para las marcas de un eje (p. ej. $350k, $1.2M)"""
+    for divisor, sufijo in SUFIJOS_MONTO:
+        if abs(valor) >= divisor:
+            return f"${valor / divisor:,.3g}{sufijo}"
+    return f"${valor:,.0f}"
+
+
+def reducir_lttb(x: Sequence[float], y: Sequence[float], umbral: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce una serie a `umbral` puntos con Largest-Triangle-Three-Buckets
+
+    Conserva el primer y el último punto y, de cada tramo intermedio, el que
+    forma el triángulo de mayor área con el punto elegido del tramo anterior
+    y el promedio del siguiente. Mantiene los picos que un promedio perdería.
+
+    Args:
+        x: Valores del eje x, en orden creciente
+        y: Valores del eje y
+        umbral: Cantidad de puntos del resultado
+
+    Returns:
+        Tupla (x, y) reducida (la serie original si ya tiene umbral puntos o menos)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return x, y
+
+    # Límites de los tramos: el primero y el último son el primer y el último punto
+    limites = (np.arange(umbral - 1) * ((n - 2) / (umbral - 2))).astype(np.int64) + 1
+    limites[-1] = n - 1
+    limites = np.append(limites, n)
+    # Promedio de cada tramo, calculado de una vez (solo la elección es secuencial)
+    cantidades = np.diff(limites)
+    promedios_x = np.add.reduceat(x, limites[:-1]) / cantidades
+    promedios_y = np.add.reduceat(y, limites[:-1]) / cantidades
+
+    if n / umbral < TRAMO_MINIMO_NUMPY:
+        indices = _elegir_lttb_listas(x.tolist(), y.tolist(), limites.tolist(),
+                                      promedios_x.tolist(), promedios_y.tolist())
+    else:
+        indices = _elegir_lttb_numpy(x, y, limites, promedios_x, promedios_y)
+    return x[indices], y[indices]
+
+
+def _elegir_lttb_numpy(x, y, limites, promedios_x, promedios_y) -> np.ndarray:
+    """Elige el punto de cada tramo operando cada tramo con numpy (tramos largos)"""
+    umbral = len(limites) - 1
+    indices = np.empty(umbral, dtype=np.int64)
+    indices[0], indices[-1] = 0, len(x) - 1
+    elegido = 0
+    for i in range(umbral - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        x_elegido, y_elegido = x[elegido], y[elegido]
+        areas = np.abs((x_elegido - promedios_x[i + 1]) * (y[inicio:fin] - y_elegido)
+                       - (x_elegido - x[inicio:fin]) * (promedios_y[i + 1] - y_elegido))
+        elegido = inicio + int(areas.argmax())
+        indices[i + 1] = elegido
+    return indices
+
+
+def _elegir_lttb_listas(x, y, limites, promedios_x, promedios_y) -> List[int]:
+    """Igual que _elegir_lttb_numpy, con listas (en tramos de pocos puntos numpy cuesta más)"""
+    umbral = len(limites) - 1
+    indices = [0]
+    elegido = 0
+    for i in range(umbral - 2):
+        x_elegido, y_elegido = x[elegido], y[elegido]
+        dx, dy = x_elegido - promedios_x[i + 1], promedios_y[i + 1] - y_elegido
+        mayor = -1.0
+        for j in range(limites[i], limites[i + 1]):
+            area = abs(dx * (y[j] - y_elegido) - (x_elegido - x[j]) * dy)
+            if area > mayor:
+                mayor, elegido_tramo = area, j
+        elegido = elegido_tramo
+        indices.append(elegido)
+    indices.append(len(x) - 1)
+    return indices
+
+
+class FuenteGrafico:
+    """
+    Origen de los datos de un GraficoWidget y forma de dibujarlos
+
+    cargar corre en un hilo del ejecutor de tareas; dibujar y actualizar
+    trabajan sobre ejes de una figura Agg que no comparte ningún otro hilo.
+    """
+
+    titulo: str = ""
+
+    def cargar(self, session: Session) -> Any:
+        """Lee los datos del gráfico (debe leer tablas agregadas, no filas sueltas)"""
+        raise NotImplementedError
+
+    def dibujar(self, ejes: Axes, datos: Any, puntos: int) -> List[Artist]:
+        """
+        Dibuja los datos en los ejes
+
+        Args:
+            ejes: Ejes de la figura
+            datos: Resultado de cargar
+            puntos: Puntos a los que reducir las series (según el ancho en píxeles)
+
+        Returns:
+            Artistas que cambian con los datos; se marcan como animados y
+            quedan fuera del fondo guardado para el blitting
+        """
+        raise NotImplementedError
+
+    def actualizar(self, ejes: Axes, artistas: List[Artist], datos: Any, puntos: int) -> bool:
+        """
+        Actualiza los artistas con datos nuevos sin tocar el resto de la figura
+
+        Returns:
+            False si los datos no entran en la figura actual (hay que redibujarla)
+        """
+        return False
+
+
+class FuenteVentasCompras(FuenteGrafico):
+    """Ventas y compras por día (o por mes), leídas de los resúmenes de transacciones"""
+
+    TIPOS = (TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA)
+
+    def __init__(self, por_mes: bool = False, desde: Optional[date] = None,
+                 hasta: Optional[date] = None):
+        self.por_mes = por_mes
+        self.desde = desde
+        self.hasta = hasta
+        self.titulo = f"Ventas y compras por {'mes' if por_mes else 'día'}"
+
+    def cargar(self, session: Session) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        repo = ResumenRepository(session)
+        totales = repo.totales_por_mes if self.por_mes else repo.totales_por_dia
+        series = {tipo: ([], []) for tipo in self.TIPOS}
+        for fecha, tipo, _, total in totales(self.desde, self.hasta):
+            if tipo in series:
+                series[tipo][0].append(fecha)
+                series[tipo][1].append(total)
+        return {tipo: (date2num(fechas) if fechas else np.empty(0), np.asarray(valores, dtype=float))
+                for tipo, (fechas, valores) in series.items()}
+
+    def dibujar(self, ejes, datos, puntos):
+        lineas = []
+        for color, (tipo, (x, y)) in zip(COLORES_SERIES, datos.items()):
+            linea, = ejes.plot(*reducir_lttb(x, y, puntos), color=color, linewidth=1.0,
+                               label=tipo, animated=True)
+            lineas.append(linea)
+
+        todos_x = np.concatenate([x for x, _ in datos.values()])
+        todos_y = np.concatenate([y for _, y in datos.values()])
+        if len(todos_x):
+            # Sin fecha final el eje llega hasta hoy: lo que se registre hoy entra sin redibujar
+            fin = todos_x.max() if self.hasta else max(todos_x.max(), date2num(date.today()))
+            ejes.set_xlim(todos_x.min(), max(fin, todos_x.min() + 1))
+            ejes.set_ylim(min(0.0, todos_y.min()), max(todos_y.max(), 1.0) * (1 + MARGEN_EJES))
+        localizador = AutoDateLocator()
+        ejes.xaxis.set_major_locator(localizador)
+        ejes.xaxis.set_major_formatter(ConciseDateFormatter(localizador))
+        ejes.yaxis.set_major_formatter(FuncFormatter(lambda valor, _: f"${valor:,.0f}"))
+        ejes.legend(loc="upper left", frameon=False, labelcolor=COLOR_TEXTO)
+        return lineas
+
+    def actualizar(self, ejes, artistas, datos, puntos):
+        x_min, x_max = ejes.get_xlim()
+        y_min, y_max = ejes.get_ylim()
+        for x, y in datos.values():
+            if len(x) and (x.min() < x_min or x.max() > x_max or y.min() < y_min or y.max() > y_max):
+                return False
+        for linea, (x, y) in zip(artistas, datos.values()):
+            linea.set_data(*reducir_lttb(x, y, puntos))
+        return True
+
+
+class FuenteComposicionCuentas(FuenteGrafico):
+    """Saldo de las cuentas de algunos tipos (p. ej. la composición del activo)"""
+
+    def __init__(self, tipos: Sequence[str], titulo: str, limite: int = 10):
+        self.tipos = list(tipos)
+        self.titulo = titulo
+        self.limite = limite
+
+    def cargar(self, session: Session) -> List[Tuple[str, float]]:
+        filas = CuentaRepository(session).get_saldos_por_tipos(self.tipos)
+        cuentas = sorted(((nombre, saldo) for _, nombre, saldo in filas if saldo),
+                         key=lambda cuenta: abs(cuenta[1]), reverse=True)
+        return cuentas[:self.limite]
+
+    def dibujar(self, ejes, datos, puntos):
+        nombres = [nombre for nombre, _ in datos]
+        saldos = [saldo for _, saldo in datos]
+        barras = ejes.barh(range(len(datos)), saldos, color=COLORES_SERIES[0], animated=True)
+        ejes.set_yticks(range(len(datos)), nombres)
+        ejes.invert_yaxis()
+        if saldos:
+            ejes.set_xlim(min(0.0, min(saldos)) * (1 + MARGEN_EJES),
+                          max(max(saldos), 1.0) * (1 + MARGEN_EJES))
+        ejes.xaxis.set_major_locator(MaxNLocator(5))
+        ejes.xaxis.set_major_formatter(FuncFormatter(formato_monto_abreviado))
+        return list(barras)
+
+    def actualizar(self, ejes, artistas, datos, puntos):
+        x_min, x_max = ejes.get_xlim()
+        nombres = [etiqueta.get_text() for etiqueta in ejes.get_yticklabels()]
+        if [nombre for nombre, _ in datos] != nombres:
+            return False
+        if any(saldo < x_min or saldo > x_max for _, saldo in datos):
+            return False
+        for barra, (_, saldo) in zip(artistas, datos):
+            barra.set_width(saldo)
+        return True
+
+
+class Lienzo:
+    """
+    Figura Agg ya dibujada, con el fondo guardado para hacer blitting
+
+    Se crea en un hilo del ejecutor y después lo usa solo el hilo de la
+    interfaz: nunca la tocan dos hilos a la vez.
+    """
+
+    def __init__(self, fuente: FuenteGrafico, datos: Any, ancho: int, alto: int, escala: float):
+        self.fuente = fuente
+        self.escala = escala
+        self.figura = Figure(figsize=(ancho / config.GRAFICOS_DPI, alto / config.GRAFICOS_DPI),
+                             dpi=config.GRAFICOS_DPI, facecolor=COLOR_FONDO, layout='constrained')
+        self.canvas = FigureCanvasAgg(self.figura)
+        self.ejes = self.figura.add_subplot()
+        self._preparar_ejes()
+
+        self.artistas = fuente.dibujar(self.ejes, datos, self.puntos_por_serie)
+        for artista in self.artistas:
+            artista.set_animated(True)
+        # Dibuja todo menos los artistas animados y guarda ese fondo
+        self.canvas.draw()
+        self.fondo = self.canvas.copy_from_bbox(self.figura.bbox)
+
+    @property
+    def puntos_por_serie(self) -> int:
+        """Puntos a los que se reduce cada serie según el ancho del área de datos"""
+        return max(3, int(self.ejes.bbox.width) // PIXELES_POR_PUNTO)
+
+    def _preparar_ejes(self):
+        """Aplica los colores del tema a los ejes (los márgenes los calcula el layout al dibujar)"""
+        self.ejes.set_facecolor(COLOR_FONDO)
+        self.ejes.set_title(self.fuente.titulo, color=COLOR_TEXTO, fontsize=11)
+        self.ejes.tick_params(colors=COLOR_TEXTO, labelsize=8)
+        self.ejes.grid(True, color=COLOR_GRILLA, linewidth=0.6)
+        self.ejes.set_axisbelow(True)
+        for borde in self.ejes.spines.values():
+            borde.set_color(COLOR_GRILLA)
+
+    def actualizar(self, datos: Any) -> bool:
+        """
+        Pasa datos nuevos a los artistas si entran en los ejes actuales
+
+        Returns:
+            False si hay que redibujar la figura completa
+        """
+        return self.fuente.actualizar(self.ejes, self.artistas, datos, self.puntos_por_serie)
+
+    def componer(self) -> QImage:
+        """
+        Restaura el fondo, dibuja encima los artistas animados y retorna la imagen
+
+        Returns:
+            Imagen de la figura (independiente del buffer de Agg)
+        """
+        self.canvas.restore_region(self.fondo)
+        for artista in self.artistas:
+            self.ejes.draw_artist(artista)
+        ancho, alto = self.canvas.get_width_height()
+        imagen = QImage(self.canvas.buffer_rgba(), ancho, alto, ancho * 4,
+                        QImage.Format.Format_RGBA8888).copy()
+        imagen.setDevicePixelRatio(self.escala)
+        return imagen
+
+
+def renderizar(fuente: FuenteGrafico, datos: Any, ancho: int, alto: int,
+               escala: float = 1.0) -> Tuple[Lienzo, QImage]:
+    """
+    Dibuja la figura completa (pensado para correr en un hilo del ejecutor)
+
+    Args:
+        fuente: Fuente del gráfico
+        datos: Resultado de fuente.cargar
+        ancho: Ancho de la imagen en píxeles físicos
+        alto: Alto de la imagen en píxeles físicos
+        escala: Píxeles físicos por píxel lógico de la pantalla
+
+    Returns:
+        Tupla (lienzo para blitting, imagen)
+    """
+    with _bloqueo_dibujo:
+        lienzo = Lienzo(fuente, datos, ancho, alto, escala)
+        return lienzo, lienzo.componer()
+
+
+class GraficoWidget(QWidget):
+    """
+    Widget que pinta un gráfico dibujado en segundo plano
+
+    dibujado se emite con el modo ('completo' o 'blitting') y los
+    milisegundos que tardó el dibujo.
+    """
+
+    dibujado = pyqtSignal(str, float)
+    fallo = pyqtSignal(object)
+
+    def __init__(self, fuente: FuenteGrafico, parent=None):
+        super().__init__(parent)
+        self.fuente = fuente
+        self.setMinimumHeight(220)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+        self._imagen: Optional[QImage] = None
+        self._lienzo: Optional[Lienzo] = None
+        self._datos: Any = None
+        self._mensaje = "Cargando..."
+        self._tarea: Optional[Tarea] = None
+        self._generacion = 0
+
+        # Al redimensionar se redibuja una sola vez, cuando el tamaño se estabiliza
+        self._temporizador = QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.setInterval(config.GRAFICOS_RETARDO_REDIMENSION_MS)
+        self._temporizador.timeout.connect(self._redibujar)
+
+    def actualizar(self):
+        """Relee los datos; si entran en la figura actual se actualiza por blitting"""
+        if self._lienzo is None:
+            # Sin figura todavía: se dibuja completa (al mostrarse, si aún no está visible)
+            if self.isVisible():
+                self.recargar()
+            return
+        self._iniciar(self._cargar, self.fuente, al_terminar=self._datos_cargados)
+
+    def recargar(self):
+        """Relee los datos y redibuja la figura completa"""
+        self._iniciar(self._cargar_y_renderizar, self.fuente, *self._tamano_fisico(),
+                      al_terminar=self._renderizado)
+
+    def _iniciar(self, funcion, *args, al_terminar):
+        """Lanza una tarea, descartando la anterior si no terminó"""
+        if self._tarea is not None:
+            self._tarea.cancelar()
+        self._generacion += 1
+        generacion = self._generacion
+        self._tarea = ejecutor_tareas().ejecutar(
+            funcion, *args,
+            al_terminar=self._si_vigente(generacion, al_terminar),
+            al_fallar=self._si_vigente(generacion, self._fallido),
+            al_finalizar=self._si_vigente(generacion, self._finalizada)
+        )
+
+    def _si_vigente(self, generacion: int, funcion):
+        """Envuelve un callback para ignorarlo si llega de una tarea ya reemplazada"""
+        def envoltura(*args):
+            if generacion == self._generacion:
+                funcion(*args)
+        return envoltura
+
+    def _tamano_fisico(self) -> Tuple[int, int, float]:
+        """Tamaño del widget en píxeles físicos y la escala de la pantalla"""
+        escala = self.devicePixelRatioF()
+        return max(1, round(self.width() * escala)), max(1, round(self.height() * escala)), escala
+
+    @staticmethod
+    def _cargar(contexto, fuente: FuenteGrafico):
+        return fuente.cargar(contexto.session)
+
+    @staticmethod
+    def _cargar_y_renderizar(contexto, fuente: FuenteGrafico, ancho: int, alto: int, escala: float):
+        datos = fuente.cargar(contexto.session)
+        contexto.verificar_cancelacion()
+        inicio = time.perf_counter()
+        lienzo, imagen = renderizar(fuente, datos, ancho, alto, escala)
+        return datos, lienzo, imagen, (time.perf_counter() - inicio) * 1000
+
+    @staticmethod
+    def _solo_renderizar(contexto, fuente: FuenteGrafico, datos: Any, ancho: int, alto: int, escala: float):
+        inicio = time.perf_counter()
+        lienzo, imagen = renderizar(fuente, datos, ancho, alto, escala)
+        return datos, lienzo, imagen, (time.perf_counter() - inicio) * 1000
+
+    def _datos_cargados(self, datos: Any):
+        """Con datos nuevos: blitting si entran en la figura, si no, dibujo completo"""
+        inicio = time.perf_counter()
+        if self._lienzo is not None and self._lienzo.actualizar(datos):
+            self._datos = datos
+            self._imagen = self._lienzo.componer()
+            self.update()
+            self.dibujado.emit('blitting', (time.perf_counter() - inicio) * 1000)
+            return
+        self._datos = datos
+        self._redibujar()
+
+    def _redibujar(self):
+        """Dibuja la figura completa en segundo plano con los últimos datos"""
+        if self._datos is None:
+            self.recargar()
+            return
+        self._iniciar(self._solo_renderizar, self.fuente, self._datos, *self._tamano_fisico(),
+                      al_terminar=self._renderizado)
+
+    def _renderizado(self, resultado):
+        datos, lienzo, imagen, milisegundos = resultado
+        self._datos, self._lienzo, self._imagen = datos, lienzo, imagen
+        self.update()
+        self.dibujado.emit('completo', milisegundos)
+
+    def _fallido(self, error: Exception):
+        """Muestra el error en lugar del gráfico (la tarea ya lo registró en el log)"""
+        self._imagen = None
+        self._lienzo = None
+        self._mensaje = "Error al cargar el gráfico"
+        self.update()
+        self.fallo.emit(error)
+
+    def _finalizada(self):
+        self._tarea = None
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._imagen is not None or self._datos is not None:
+            self._temporizador.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._imagen is None and self._tarea is None:
+            self.recargar()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self._imagen is None:
+            painter.fillRect(self.rect(), Qt.GlobalColor.transparent)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._mensaje)
+        else:
+            # Mientras se redibuja tras un cambio de tamaño se estira la imagen anterior
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(self.rect(), self._imagen)
+        painter.end()
@@ -0,0 +1,348 @@
+"""
+Tabla de datos paginada para recorrer tablas grandes (transacciones, auditoría)
+
+ModeloTablaPaginada es un QAbstractTableModel que carga las filas a medida
+que la vista las necesita (canFetchMore/fetchMore), con consultas
+paginadas por clave (keyset) que corren en el ejecutor de tareas. El orden
+y los filtros se resuelven en SQL. En memoria se guarda un número fijo de
+páginas (las usadas más recientemente) y, por cada página recorrida, solo
+la clave donde empieza: si se vuelve a mostrar una página descartada, se
+pide de nuevo a partir de esa clave. Nunca se carga la tabla entera.
+
+    tabla = TablaDatos(FuenteTransacciones())
+    tabla.modelo.filtrar(tipo=TIPO_TRANSACCION_VENTA)
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QLabel, QTableView, QVBoxLayout, QWidget
+from sqlalchemy.orm import Session
+from app.gui.tareas import Tarea, ejecutor_tareas
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.utils.formatters import formatear_fecha_hora, formatear_moneda
+import config
+
+# Clave de paginación: (valor de la columna de orden, id)
+Clave = Tuple[Any, int]
+
+
+class Columna(NamedTuple):
+    """Columna de una tabla paginada"""
+    titulo: str
+    indice: int                                      # Posición del valor en la fila
+    formato: Optional[Callable[[Any], str]] = None   # Texto a mostrar (por defecto, str)
+    orden: Optional[str] = None                      # Nombre con que se ordena en SQL (None: no ordenable)
+    ancho: int = 120
+    alinear_derecha: bool = False
+
+
+class FuenteDatos:
+    """
+    Origen de las filas de un ModeloTablaPaginada
+
+    Cada fila es una tupla cuyo primer elemento es el ID del registro. Las
+    subclases definen las columnas y cómo leer una página en SQL.
+    """
+
+    columnas: List[Columna] = []
+    orden_inicial: str = 'fecha'
+
+    def cargar_pagina(self, session: Session, limite: int, despues_de: Optional[Clave],
+                      orden: str, descendente: bool, filtros: Dict[str, Any]) -> List[tuple]:
+        """
+        Lee una página (se ejecuta en un hilo del ejecutor de tareas)
+
+        Args:
+            session: Sesión de la tarea
+            limite: Tamaño de la página
+            despues_de: Clave de la última fila de la página anterior (None para la primera)
+            orden: Nombre de la columna de orden
+            descendente: Dirección del orden
+            filtros: Filtros a aplicar en la consulta
+
+        Returns:
+            Filas de la página
+        """
+        raise NotImplementedError
+
+    def clave(self, fila: tuple, orden: str) -> Clave:
+        """Clave de paginación de una fila para el orden dado"""
+        indice = next(c.indice for c in self.columnas if c.orden == orden)
+        return fila[indice], fila[0]
+
+
+class FuenteTransacciones(FuenteDatos):
+    """Transacciones, con su cuenta y su usuario; filtros de TransaccionRepository.get_pagina"""
+
+    columnas = [
+        Columna("Fecha", 1, formatear_fecha_hora, orden='fecha', ancho=140),
+        Columna("Tipo", 2, ancho=80),
+        Columna("Concepto", 3, ancho=320),
+        Columna("Cuenta", 4, ancho=180),
+        Columna("Monto", 5, formatear_moneda, orden='monto', ancho=110, alinear_derecha=True),
+        Columna("Usuario", 6, ancho=100),
+    ]
+    orden_inicial = 'fecha'
+
+    def cargar_pagina(self, session, limite, despues_de, orden, descendente, filtros):
+        pagina = TransaccionRepository(session).get_pagina(
+            limite, despues_de, descendente, orden=orden, con_relaciones=True, **filtros
+        )
+        return [(t.id, t.fecha, t.tipo, t.concepto, t.cuenta.nombre, t.monto, t.usuario.username)
+                for t in pagina]
+
+
+class FuenteActividades(FuenteDatos):
+    """Actividades de auditoría con su usuario; filtros de AuditoriaRepository.get_pagina"""
+
+    columnas = [
+        Columna("Fecha/Hora", 1, formatear_fecha_hora, orden='fecha_hora', ancho=140),
+        Columna("Usuario", 2, ancho=100),
+        Columna("Tipo", 3, ancho=140),
+        Columna("Descripción", 4, ancho=480),
+    ]
+    orden_inicial = 'fecha_hora'
+
+    def cargar_pagina(self, session, limite, despues_de, orden, descendente, filtros):
+        pagina = AuditoriaRepository(session).get_pagina(
+            limite, despues_de, descendente, con_usuario=True, **filtros
+        )
+        return [(a.id, a.fecha_hora, a.usuario.username, a.tipo_actividad, a.descripcion)
+                for a in pagina]
+
+
+class ModeloTablaPaginada(QAbstractTableModel):
+    """Modelo de tabla que carga páginas a pedido y conserva pocas en memoria"""
+
+    # Texto de las celdas cuya página se está cargando
+    CARGANDO = "…"
+
+    # (filas recorridas, True si ya se llegó al final)
+    filas_cambiadas = pyqtSignal(int, bool)
+    # Error al leer una página
+    fallo = pyqtSignal(object)
+
+    def __init__(self, fuente: FuenteDatos, tamano_pagina: Optional[int] = None,
+                 paginas_en_cache: Optional[int] = None, parent=None):
+        """
+        Args:
+            fuente: Origen de las filas
+            tamano_pagina: Filas por consulta (por defecto config.TABLA_TAMANO_PAGINA)
+            paginas_en_cache: Páginas en memoria (por defecto config.TABLA_PAGINAS_EN_CACHE)
+        """
+        super().__init__(parent)
+        self.fuente = fuente
+        self.tamano_pagina = tamano_pagina or config.TABLA_TAMANO_PAGINA
+        # Al menos dos: las filas visibles pueden abarcar dos páginas
+        self.paginas_en_cache = max(2, paginas_en_cache or config.TABLA_PAGINAS_EN_CACHE)
+        self.orden = fuente.orden_inicial
+        self.descendente = True
+        self.filtros: Dict[str, Any] = {}
+        # Cambia con cada recarga; los resultados de tareas anteriores se descartan
+        self._generacion = 0
+        self._limpiar()
+
+    def _limpiar(self):
+        self._filas = 0
+        self._completo = False
+        # Clave donde empieza cada página recorrida (la última es la de la página siguiente)
+        self._inicios: List[Optional[Clave]] = [None]
+        self._paginas: "OrderedDict[int, List[tuple]]" = OrderedDict()
+        self._pendientes: Dict[int, Tarea] = {}
+
+    @property
+    def completo(self) -> bool:
+        """Indica si ya se recorrieron todas las filas"""
+        return self._completo
+
+    def filas_en_memoria(self) -> int:
+        """Filas de las páginas que hay en la caché en este momento"""
+        return sum(len(filas) for filas in self._paginas.values())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._filas
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.fuente.columnas)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.fuente.columnas[section].titulo
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        columna = self.fuente.columnas[index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole and columna.alinear_derecha:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+
+        pagina, posicion = divmod(index.row(), self.tamano_pagina)
+        filas = self._paginas.get(pagina)
+        if filas is None:
+            # Página descartada de la caché: se vuelve a pedir
+            self._cargar(pagina)
+            return self.CARGANDO
+        self._paginas.move_to_end(pagina)
+        if posicion >= len(filas):
+            return None  # La página es más corta que al recorrerla (se borraron filas)
+
+        valor = filas[posicion][columna.indice]
+        if columna.formato is not None and valor is not None:
+            return columna.formato(valor)
+        return "" if valor is None else str(valor)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid() or self._completo:
+            return False
+        return len(self._inicios) - 1 not in self._pendientes
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if self.canFetchMore(parent):
+            self._cargar(len(self._inicios) - 1)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """Ordena en SQL por la columna, si es ordenable (si no, no hace nada)"""
+        orden = self.fuente.columnas[column].orden
+        if orden is None:
+            return
+        self.orden = orden
+        self.descendente = order == Qt.SortOrder.DescendingOrder
+        self.recargar()
+
+    def columna_ordenable(self, column: int) -> bool:
+        return self.fuente.columnas[column].orden is not None
+
+    def filtrar(self, **filtros):
+        """Reemplaza los filtros (los valores None o vacíos se ignoran) y recarga"""
+        self.filtros = {nombre: valor for nombre, valor in filtros.items() if valor not in (None, "")}
+        self.recargar()
+
+    def recargar(self):
+        """Descarta todo lo cargado y vuelve a leer desde la primera página"""
+        self.beginResetModel()
+        self._generacion += 1
+        for tarea in self._pendientes.values():
+            tarea.cancelar()
+        self._limpiar()
+        self.endResetModel()
+        self.filas_cambiadas.emit(0, False)
+        self.fetchMore()
+
+    def _cargar(self, pagina: int):
+        """Pide una página al ejecutor de tareas (si no está pedida ya)"""
+        if pagina in self._pendientes:
+            return
+        generacion = self._generacion
+        self._pendientes[pagina] = ejecutor_tareas().ejecutar(
+            self._leer_pagina, self.fuente, self.tamano_pagina, self._inicios[pagina],
+            self.orden, self.descendente, dict(self.filtros),
+            al_terminar=lambda filas: self._pagina_cargada(generacion, pagina, filas),
+            al_fallar=lambda error: self._pagina_fallida(generacion, error),
+            al_finalizar=lambda: self._pagina_finalizada(generacion, pagina)
+        )
+
+    @staticmethod
+    def _leer_pagina(contexto, fuente: FuenteDatos, limite: int, despues_de: Optional[Clave],
+                     orden: str, descendente: bool, filtros: Dict[str, Any]) -> List[tuple]:
+        return fuente.cargar_pagina(contexto.session, limite, despues_de, orden, descendente, filtros)
+
+    def _pagina_cargada(self, generacion: int, pagina: int, filas: List[tuple]):
+        if generacion != self._generacion:
+            return
+
+        if pagina == len(self._inicios) - 1:
+            # Página nueva al final: se agregan sus filas
+            if len(filas) < self.tamano_pagina:
+                self._completo = True
+            if filas:
+                self.beginInsertRows(QModelIndex(), self._filas, self._filas + len(filas) - 1)
+                self._guardar(pagina, filas)
+                self._inicios.append(self.fuente.clave(filas[-1], self.orden))
+                self._filas += len(filas)
+                self.endInsertRows()
+            self.filas_cambiadas.emit(self._filas, self._completo)
+        else:
+            # Página que se había descartado de la caché
+            self._guardar(pagina, filas)
+            primera = pagina * self.tamano_pagina
+            ultima = min(primera + self.tamano_pagina, self._filas) - 1
+            self.dataChanged.emit(self.index(primera, 0), self.index(ultima, self.columnCount() - 1))
+
+    def _guardar(self, pagina: int, filas: List[tuple]):
+        """Guarda una página en la caché, descartando las usadas hace más tiempo"""
+        self._paginas[pagina] = filas
+        self._paginas.move_to_end(pagina)
+        while len(self._paginas) > self.paginas_en_cache:
+            self._paginas.popitem(last=False)
+
+    def _pagina_fallida(self, generacion: int, error: Exception):
+        if generacion != self._generacion:
+            return
+        # No se siguen pidiendo páginas hasta la próxima recarga
+        self._completo = True
+        self.filas_cambiadas.emit(self._filas, self._completo)
+        self.fallo.emit(error)
+
+    def _pagina_finalizada(self, generacion: int, pagina: int):
+        if generacion == self._generacion:
+            self._pendientes.pop(pagina, None)
+
+
+class TablaDatos(QWidget):
+    """Tabla de solo lectura sobre un ModeloTablaPaginada, con el total de filas recorridas"""
+
+    # Alto fijo de las filas: la vista no necesita medir cada una al desplazarse
+    ALTO_FILA = 22
+
+    def __init__(self, fuente: FuenteDatos, parent=None):
+        super().__init__(parent)
+        self.modelo = ModeloTablaPaginada(fuente, parent=self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.setWordWrap(False)
+        vertical = self.tabla.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical.setDefaultSectionSize(self.ALTO_FILA)
+        encabezado = self.tabla.horizontalHeader()
+        encabezado.setStretchLastSection(True)
+        for numero, columna in enumerate(fuente.columnas):
+            self.tabla.setColumnWidth(numero, columna.ancho)
+        layout.addWidget(self.tabla)
+
+        self.estado_label = QLabel("")
+        layout.addWidget(self.estado_label)
+
+        self.modelo.filas_cambiadas.connect(self._mostrar_filas)
+        self.modelo.fallo.connect(lambda e: self.estado_label.setText(f"Error al cargar datos: {e}"))
+
+        # Activar el ordenamiento hace la primera carga (orden inicial, descendente)
+        inicial = next(i for i, c in enumerate(fuente.columnas) if c.orden == fuente.orden_inicial)
+        self._orden_actual = (inicial, Qt.SortOrder.DescendingOrder)
+        encabezado.setSortIndicator(*self._orden_actual)
+        encabezado.sortIndicatorChanged.connect(self._orden_cambiado)
+        self.tabla.setSortingEnabled(True)
+
+    def _orden_cambiado(self, columna: int, orden: Qt.SortOrder):
+        """Las columnas que no se pueden ordenar en SQL conservan el indicador anterior"""
+        if self.modelo.columna_ordenable(columna):
+            self._orden_actual = (columna, orden)
+            return
+        encabezado = self.tabla.horizontalHeader()
+        encabezado.blockSignals(True)
+        encabezado.setSortIndicator(*self._orden_actual)
+        encabezado.blockSignals(False)
+
+    def _mostrar_filas(self, filas: int, completo: bool):
+        self.estado_label.setText(f"{filas:,} filas" if completo else f"{filas:,} filas cargadas (hay más)")
@@ -8,6 +8,9 @@ from app.models.transaccion import Transaccion
 from app.models.asiento import Asiento
 from app.models.periodo import Periodo
 from app.models.auditoria import Auditoria
+from app.models.importacion import Importacion
+from app.models.saldo_historico import SaldoHistorico
+from app.models.resumen import ResumenDiario, ResumenMensual
 
 __all__ = [
     'BaseModel',
@@ -16,5 +19,9 @@ __all__ = [
     'Transaccion',
     'Asiento',
     'Periodo',
-    'Auditoria'
+    'Auditoria',
+    'Importacion',
+    'SaldoHistorico',
+    'ResumenDiario',
+    'ResumenMensual'
 ]
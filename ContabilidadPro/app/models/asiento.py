@@ -1,7 +1,8 @@
 """
 Modelo de Asiento Contable
 """
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from typing import Tuple
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import BaseModel
@@ -10,6 +11,9 @@ from app.models.base import BaseModel
 class Asiento(BaseModel):
     """Modelo de asiento contable (partida doble)"""
     __tablename__ = 'asientos'
+    __table_args__ = (
+        Index('ix_asientos_periodo_fecha', 'periodo_id', 'fecha'),
+    )
     
     fecha = Column(DateTime, default=datetime.now, nullable=False)
     descripcion = Column(String(500), nullable=False)
@@ -20,24 +24,45 @@ class Asiento(BaseModel):
     usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     
     # Relaciones
-    transacciones = relationship("Transaccion", back_populates="asiento", cascade="all, delete-orphan")
+    # selectin: al cargar varios asientos, sus transacciones llegan en una sola consulta
+    transacciones = relationship("Transaccion", back_populates="asiento", cascade="all, delete-orphan",
+                                 lazy="selectin")
     periodo = relationship("Periodo", back_populates="asientos")
     usuario = relationship("Usuario")
     
     @property
     def total_debe(self):
         """Calcula el total del debe"""
-        return sum(t.monto for t in self.transacciones if t.cuenta.es_deudora)
+        return self.totales()[0]
     
     @property
     def total_haber(self):
         """Calcula el total del haber"""
-        return sum(t.monto for t in self.transacciones if t.cuenta.es_acreedora)
+        return self.totales()[1]
     
     @property
     def esta_balanceado(self):
         """Verifica si el asiento está balanceado (debe = haber)"""
-        return abs(self.total_debe - self.total_haber) < 0.01
+        debe, haber = self.totales()
+        return abs(debe - haber) < 0.01
+    
+    def totales(self) -> Tuple[float, float]:
+        """
+        Calcula el total del debe y del haber
+        
+        Necesita la cuenta de cada línea: para no cargarlas de a una, obtenga
+        el asiento con AsientoRepository.get_con_cuentas o get_by_periodo.
+        
+        Returns:
+            Tupla (debe, haber)
+        """
+        debe = haber = 0.0
+        for t in self.transacciones:
+            if t.cuenta.es_deudora:
+                debe += t.monto
+            if t.cuenta.es_acreedora:
+                haber += t.monto
+        return debe, haber
     
     def __repr__(self):
         return f"<Asiento(numero={self.numero}, fecha='{self.fecha}', descripcion='{self.descripcion}')>"
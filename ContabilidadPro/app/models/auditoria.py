@@ -1,7 +1,7 @@
 """
 Modelo de Auditoría (Log de Actividades)
 """
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import BaseModel
@@ -10,6 +10,12 @@ from app.models.base import BaseModel
 class Auditoria(BaseModel):
     """Modelo de auditoría para registrar actividades del sistema"""
     __tablename__ = 'auditoria'
+    __table_args__ = (
+        # Índices para paginación por (fecha_hora, id), con y sin filtro
+        Index('ix_auditoria_fecha_hora_id', 'fecha_hora', 'id'),
+        Index('ix_auditoria_tipo_fecha_hora_id', 'tipo_actividad', 'fecha_hora', 'id'),
+        Index('ix_auditoria_usuario_fecha_hora_id', 'usuario_id', 'fecha_hora', 'id'),
+    )
     
     tipo_actividad = Column(String(50), nullable=False)  # Login, Logout, Crear, etc.
     descripcion = Column(String(500), nullable=False)
@@ -0,0 +1,32 @@
+"""
+Modelo de Importación (punto de control de importaciones masivas)
+"""
+from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+
+class Importacion(BaseModel):
+    """Estado de la importación de un archivo, para poder reanudarla"""
+    __tablename__ = 'importaciones'
+    
+    archivo = Column(String(500), nullable=False)
+    huella = Column(String(100), nullable=False, index=True)  # nombre + tamaño + fecha de modificación
+    ultima_fila = Column(Integer, default=0, nullable=False)  # Última fila del archivo ya procesada
+    filas_importadas = Column(Integer, default=0, nullable=False)
+    filas_con_error = Column(Integer, default=0, nullable=False)
+    completada = Column(Integer, default=0)  # 0 = en curso, 1 = completada
+    
+    # Foreign Keys
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
+    
+    # Relaciones
+    usuario = relationship("Usuario")
+    
+    @property
+    def esta_completada(self):
+        """Verifica si la importación terminó"""
+        return self.completada == 1
+    
+    def __repr__(self):
+        return f"<Importacion(archivo='{self.archivo}', ultima_fila={self.ultima_fila})>"
@@ -0,0 +1,38 @@
+"""
+Modelos de resúmenes de transacciones por día y por mes
+
+Cada fila acumula la cantidad y el total de las transacciones de un tipo y
+una cuenta en un día (o un mes). Los triggers de app.core.resumenes los
+mantienen al día con cada INSERT/UPDATE/DELETE sobre transacciones, así que
+no tienen id ni fechas de auditoría: su clave es (fecha, tipo, cuenta).
+"""
+from sqlalchemy import Column, String, Float, Integer, Date, ForeignKey
+from app.core.database import Base
+
+
+class ResumenDiario(Base):
+    """Cantidad y total de transacciones por (día, tipo, cuenta)"""
+    __tablename__ = 'resumen_diario'
+
+    dia = Column(Date, primary_key=True)
+    tipo = Column(String(50), primary_key=True)
+    cuenta_id = Column(Integer, ForeignKey('cuentas.id'), primary_key=True)
+    cantidad = Column(Integer, default=0, nullable=False)
+    total = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f"<ResumenDiario(dia='{self.dia}', tipo='{self.tipo}', cuenta_id={self.cuenta_id}, total={self.total})>"
+
+
+class ResumenMensual(Base):
+    """Cantidad y total de transacciones por (mes, tipo, cuenta); mes es el primer día del mes"""
+    __tablename__ = 'resumen_mensual'
+
+    mes = Column(Date, primary_key=True)
+    tipo = Column(String(50), primary_key=True)
+    cuenta_id = Column(Integer, ForeignKey('cuentas.id'), primary_key=True)
+    cantidad = Column(Integer, default=0, nullable=False)
+    total = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f"<ResumenMensual(mes='{self.mes}', tipo='{self.tipo}', cuenta_id={self.cuenta_id}, total={self.total})>"
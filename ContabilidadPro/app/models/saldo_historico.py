@@ -0,0 +1,32 @@
+"""
+Modelo de Saldo Histórico (instantánea del saldo de una cuenta a una fecha de corte)
+"""
+from sqlalchemy import Column, Float, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+
+class SaldoHistorico(BaseModel):
+    """
+    Saldo de una cuenta considerando todas sus transacciones con fecha
+    anterior a fecha_corte (el corte es exclusivo)
+    """
+    __tablename__ = 'saldos_historicos'
+    __table_args__ = (
+        # Una instantánea por (corte, cuenta); también sirve para leer un corte completo
+        Index('ix_saldos_historicos_corte_cuenta', 'fecha_corte', 'cuenta_id', unique=True),
+    )
+    
+    fecha_corte = Column(DateTime, nullable=False)
+    saldo = Column(Float, default=0.0, nullable=False)
+    
+    # Foreign Keys
+    cuenta_id = Column(Integer, ForeignKey('cuentas.id'), nullable=False)
+    periodo_id = Column(Integer, ForeignKey('periodos.id'), nullable=True)  # Null en cortes mensuales
+    
+    # Relaciones
+    cuenta = relationship("Cuenta")
+    periodo = relationship("Periodo")
+    
+    def __repr__(self):
+        return f"<SaldoHistorico(cuenta_id={self.cuenta_id}, corte='{self.fecha_corte}', saldo={self.saldo})>"
@@ -1,7 +1,7 @@
 """
 Modelo de Transacción Contable
 """
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import BaseModel
@@ -10,6 +10,18 @@ from app.models.base import BaseModel
 class Transaccion(BaseModel):
     """Modelo de transacción contable"""
     __tablename__ = 'transacciones'
+    __table_args__ = (
+        # Índices para paginación por (fecha, id), con y sin filtro
+        Index('ix_transacciones_fecha_id', 'fecha', 'id'),
+        Index('ix_transacciones_tipo_fecha_id', 'tipo', 'fecha', 'id'),
+        Index('ix_transacciones_usuario_fecha_id', 'usuario_id', 'fecha', 'id'),
+        Index('ix_transacciones_cuenta_fecha_id', 'cuenta_id', 'fecha', 'id'),
+        # Para recorrer el libro ordenado por monto (tabla de transacciones)
+        Index('ix_transacciones_monto_id', 'monto', 'id'),
+        # Consultas de un período sin recorrer los demás (listados y totales por tipo)
+        Index('ix_transacciones_periodo_fecha_id', 'periodo_id', 'fecha', 'id'),
+        Index('ix_transacciones_periodo_tipo_monto', 'periodo_id', 'tipo', 'monto'),
+    )
     
     fecha = Column(DateTime, default=datetime.now, nullable=False)
     concepto = Column(String(500), nullable=False)
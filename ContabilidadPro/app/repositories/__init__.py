@@ -6,11 +6,19 @@ from app.repositories.usuario_repository import UsuarioRepository
 from app.repositories.cuenta_repository import CuentaRepository
 from app.repositories.transaccion_repository import TransaccionRepository
 from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.asiento_repository import AsientoRepository
 
 __all__ = [
     'BaseRepository',
     'UsuarioRepository',
     'CuentaRepository',
     'TransaccionRepository',
-    'AuditoriaRepository'
+    'AuditoriaRepository',
+    'PeriodoRepository',
+    'SaldoHistoricoRepository',
+    'ResumenRepository',
+    'AsientoRepository'
 ]
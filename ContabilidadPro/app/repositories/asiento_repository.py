@@ -0,0 +1,78 @@
+"""
+Repositorio para el modelo Asiento
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, selectinload
+from app.models.asiento import Asiento
+from app.models.transaccion import Transaccion
+from app.repositories.base_repository import BaseRepository
+
+# Carga las líneas de los asientos y sus cuentas (dos consultas en total),
+# lo que necesita Asiento.totales para no consultar cada cuenta por separado
+_CON_CUENTAS = selectinload(Asiento.transacciones).selectinload(Transaccion.cuenta)
+
+
+class AsientoRepository(BaseRepository[Asiento]):
+    """Repositorio para operaciones con asientos contables"""
+    
+    def __init__(self, session: Session):
+        super().__init__(Asiento, session)
+    
+    def siguiente_numero(self) -> int:
+        """
+        Obtiene el número consecutivo para un asiento nuevo
+        
+        Returns:
+            Último número de asiento más uno (1 si no hay asientos)
+        """
+        return (self.session.query(func.max(Asiento.numero)).scalar() or 0) + 1
+    
+    def get_con_cuentas(self, asiento_id: int) -> Optional[Asiento]:
+        """
+        Obtiene un asiento con sus líneas y las cuentas de cada línea
+        
+        Args:
+            asiento_id: ID del asiento
+            
+        Returns:
+            Asiento o None, listo para calcular sus totales
+        """
+        return self.session.query(Asiento).options(_CON_CUENTAS).filter(Asiento.id == asiento_id).first()
+    
+    def get_by_periodo(self, periodo_id: int) -> List[Asiento]:
+        """
+        Obtiene los asientos de un período, en orden cronológico, con sus
+        líneas y las cuentas de cada línea
+        
+        Args:
+            periodo_id: ID del período
+            
+        Returns:
+            Lista de asientos
+        """
+        return self.session.query(Asiento).options(_CON_CUENTAS).filter(
+            Asiento.periodo_id == periodo_id
+        ).order_by(Asiento.fecha, Asiento.id).all()
+    
+    def asignar_periodo(self, periodo_id: int, desde: datetime, hasta: Optional[datetime]) -> int:
+        """
+        Asigna un período a los asientos sin período dentro de un rango de fechas
+        
+        Args:
+            periodo_id: ID del período a asignar
+            desde: Fecha inicial inclusive
+            hasta: Fecha final exclusiva (None para sin límite)
+            
+        Returns:
+            Cantidad de asientos actualizados
+        """
+        condiciones = [Asiento.periodo_id.is_(None), Asiento.fecha >= desde]
+        if hasta is not None:
+            condiciones.append(Asiento.fecha < hasta)
+        resultado = self.session.execute(
+            update(Asiento).where(*condiciones).values(periodo_id=periodo_id)
+            .execution_options(synchronize_session=False)
+        )
+        return resultado.rowcount
@@ -1,12 +1,14 @@
 """
 Repositorio para el modelo Auditoría
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple, Dict, Iterator
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from app.models.auditoria import Auditoria
+from app.models.usuario import Usuario
 from app.repositories.base_repository import BaseRepository
+from app.repositories.escritor_auditoria import escritor_auditoria
 
 
 class AuditoriaRepository(BaseRepository[Auditoria]):
@@ -75,27 +77,113 @@ class AuditoriaRepository(BaseRepository[Auditoria]):
             Auditoria.fecha_hora.desc()
         ).limit(limite).all()
     
+    def get_pagina(self, limite: int = 100,
+                   despues_de: Optional[Tuple[datetime, int]] = None,
+                   descendente: bool = True,
+                   tipo_actividad: Optional[str] = None,
+                   usuario_id: Optional[int] = None,
+                   fecha_inicio: Optional[datetime] = None,
+                   fecha_fin: Optional[datetime] = None,
+                   con_usuario: bool = False) -> List[Auditoria]:
+        """
+        Obtiene una página de actividades ordenadas por (fecha_hora, id)
+        
+        Para pedir la página siguiente, pasar en despues_de la clave
+        (fecha_hora, id) de la última actividad recibida.
+        
+        Args:
+            limite: Tamaño de la página
+            despues_de: Clave (fecha_hora, id) del último registro visto (opcional)
+            descendente: True para ordenar de la más reciente a la más antigua
+            tipo_actividad: Filtrar por tipo de actividad (opcional)
+            usuario_id: Filtrar por usuario (opcional)
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            con_usuario: Cargar el usuario en la misma consulta
+                         (evita una consulta por actividad al mostrarlo)
+            
+        Returns:
+            Lista de actividades de la página
+        """
+        query = self.session.query(Auditoria)
+        if con_usuario:
+            query = query.options(joinedload(Auditoria.usuario))
+        
+        if tipo_actividad:
+            query = query.filter(Auditoria.tipo_actividad == tipo_actividad)
+        if usuario_id:
+            query = query.filter(Auditoria.usuario_id == usuario_id)
+        if fecha_inicio:
+            query = query.filter(Auditoria.fecha_hora >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(Auditoria.fecha_hora <= fecha_fin)
+        
+        return self._paginar_por_clave(query, Auditoria.fecha_hora, limite, despues_de, descendente)
+    
+    def iterar_filas(self, usuario_id: Optional[int] = None,
+                     fecha_inicio: Optional[datetime] = None,
+                     fecha_fin: Optional[datetime] = None,
+                     tamano_lote: int = 1000) -> Iterator[Tuple]:
+        """
+        Recorre las actividades como filas planas, en orden cronológico
+        
+        Lee con un cursor que trae tamano_lote filas por vez y no crea
+        objetos del ORM, por lo que la memoria no depende del total.
+        
+        Args:
+            usuario_id: Filtrar por usuario (opcional)
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            tamano_lote: Filas leídas de la base por vez
+            
+        Yields:
+            Tuplas (fecha_hora, usuario, tipo_actividad, descripcion)
+        """
+        query = self.session.query(
+            Auditoria.fecha_hora, Usuario.username, Auditoria.tipo_actividad, Auditoria.descripcion
+        ).outerjoin(Usuario, Auditoria.usuario_id == Usuario.id)
+        
+        if usuario_id:
+            query = query.filter(Auditoria.usuario_id == usuario_id)
+        if fecha_inicio:
+            query = query.filter(Auditoria.fecha_hora >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(Auditoria.fecha_hora <= fecha_fin)
+        
+        yield from query.order_by(Auditoria.fecha_hora, Auditoria.id).yield_per(tamano_lote)
+    
     def registrar_actividad(self, usuario_id: int, tipo_actividad: str, 
-                           descripcion: str, ip_address: Optional[str] = None) -> Auditoria:
+                           descripcion: str, ip_address: Optional[str] = None):
         """
         Registra una nueva actividad
         
+        La escritura la realiza el escritor de auditoría según config.AUDITORIA_MODO:
+        en los modos por lotes la fila se inserta al confirmar la sesión
+        (durable) o en segundo plano (relajado).
+        
         Args:
             usuario_id: ID del usuario
             tipo_actividad: Tipo de actividad
             descripcion: Descripción de la actividad
             ip_address: Dirección IP (opcional)
-            
-        Returns:
-            Registro de auditoría creado
-        """
-        return self.create(
-            usuario_id=usuario_id,
-            tipo_actividad=tipo_actividad,
-            descripcion=descripcion,
-            ip_address=ip_address,
-            fecha_hora=datetime.now()
-        )
+        """
+        escritor_auditoria.registrar(self.session, {
+            'usuario_id': usuario_id,
+            'tipo_actividad': tipo_actividad,
+            'descripcion': descripcion,
+            'ip_address': ip_address,
+            'fecha_hora': datetime.now()
+        })
+    
+    def registrar_actividades(self, registros: List[Dict]):
+        """
+        Registra varias actividades de una vez, con inserción por lotes
+        
+        Args:
+            registros: Lista de diccionarios con usuario_id, tipo_actividad,
+                       descripcion, ip_address y fecha_hora
+        """
+        escritor_auditoria.registrar_lote(self.session, registros)
     
     def buscar(self, termino: str) -> List[Auditoria]:
         """
@@ -110,3 +198,20 @@ class AuditoriaRepository(BaseRepository[Auditoria]):
         return self.session.query(Auditoria).filter(
             Auditoria.descripcion.like(f'%{termino}%')
         ).order_by(Auditoria.fecha_hora.desc()).all()
+    
+    def buscar_texto(self, termino: str, limite: int = 50, pagina: int = 0) -> List[Auditoria]:
+        """
+        Busca actividades por palabras usando el índice de texto completo
+        
+        Cada palabra se busca como prefijo, sin distinguir mayúsculas ni
+        acentos, y los resultados se ordenan por relevancia.
+        
+        Args:
+            termino: Palabras a buscar
+            limite: Tamaño de la página
+            pagina: Número de página (desde 0)
+            
+        Returns:
+            Lista de actividades que coinciden
+        """
+        return self._buscar_texto_completo('auditoria_fts', Auditoria.descripcion, termino, limite, pagina)
@@ -1,9 +1,12 @@
 """
 Repositorio base con operaciones CRUD genéricas
 """
-from typing import TypeVar, Generic, Type, Optional, List
-from sqlalchemy.orm import Session
+from typing import TypeVar, Generic, Type, Optional, List, Tuple, Any
+from sqlalchemy import tuple_, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, Query
 from app.models.base import BaseModel
+from app.core.busqueda import construir_consulta_fts, indice_no_disponible
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -103,6 +106,21 @@ class BaseRepository(Generic[T]):
         """
         return self.session.query(self.model).count()
     
+    def count_hasta(self, limite: Optional[int] = None) -> int:
+        """
+        Cuenta los registros, deteniéndose al llegar a un límite
+        
+        Args:
+            limite: Máximo a contar (None para contar todos)
+            
+        Returns:
+            min(total de registros, limite)
+        """
+        if limite is None:
+            return self.count()
+        subconsulta = self.session.query(self.model.id).limit(limite).subquery()
+        return self.session.query(func.count()).select_from(subconsulta).scalar()
+    
     def exists(self, id: int) -> bool:
         """
         Verifica si existe un registro con el ID dado
@@ -114,3 +132,79 @@ class BaseRepository(Generic[T]):
             True si existe, False en caso contrario
         """
         return self.session.query(self.model).filter(self.model.id == id).count() > 0
+    
+    def _paginar_por_clave(self, query: Query, columna_orden, limite: int,
+                           despues_de: Optional[Tuple[Any, int]] = None,
+                           descendente: bool = True) -> List[T]:
+        """
+        Pagina una consulta por clave (keyset) sobre (columna_orden, id)
+        
+        En lugar de OFFSET, cada página continúa a partir de la clave del
+        último registro de la página anterior, por lo que el costo no depende
+        de cuántas páginas se hayan recorrido.
+        
+        Args:
+            query: Consulta ya filtrada
+            columna_orden: Columna principal de ordenamiento (p. ej. fecha)
+            limite: Tamaño de la página
+            despues_de: Clave (valor_orden, id) del último registro visto, o None
+            descendente: True para recorrer del más reciente al más antiguo
+            
+        Returns:
+            Lista de registros de la página
+        """
+        clave = tuple_(columna_orden, self.model.id)
+        if despues_de is not None:
+            cursor = tuple_(*despues_de)
+            query = query.filter(clave < cursor if descendente else clave > cursor)
+        
+        if descendente:
+            query = query.order_by(columna_orden.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(columna_orden.asc(), self.model.id.asc())
+        
+        return query.limit(limite).all()
+    
+    def _buscar_texto_completo(self, tabla_fts: str, columna_texto, termino: str,
+                               limite: int, pagina: int) -> List[T]:
+        """
+        Busca registros usando un índice FTS5, ordenados por relevancia
+        
+        Si el índice no existe (SQLite sin FTS5), recurre a LIKE sobre la
+        columna de texto, ordenando por ID descendente. Cualquier otro error
+        (base bloqueada, búsqueda cancelada) se propaga.
+        
+        Args:
+            tabla_fts: Nombre de la tabla FTS5 (rowid = id del modelo)
+            columna_texto: Columna del modelo para el LIKE de respaldo
+            termino: Palabras a buscar (cada una como prefijo)
+            limite: Tamaño de la página
+            pagina: Número de página (desde 0)
+            
+        Returns:
+            Lista de registros de la página
+        """
+        consulta = construir_consulta_fts(termino)
+        if not consulta:
+            return []
+        
+        try:
+            ids = self.session.execute(
+                text(f"SELECT rowid FROM {tabla_fts} WHERE {tabla_fts} MATCH :consulta "
+                     f"ORDER BY rank LIMIT :limite OFFSET :desplazamiento"),
+                {"consulta": consulta, "limite": limite, "desplazamiento": pagina * limite}
+            ).scalars().all()
+        except OperationalError as e:
+            if not indice_no_disponible(e, tabla_fts):
+                raise
+            query = self.session.query(self.model)
+            for palabra in termino.split():
+                query = query.filter(columna_texto.like(f'%{palabra}%'))
+            return query.order_by(self.model.id.desc()).limit(limite).offset(pagina * limite).all()
+        
+        if not ids:
+            return []
+        
+        # Recuperar los registros y respetar el orden de relevancia
+        por_id = {r.id: r for r in self.session.query(self.model).filter(self.model.id.in_(ids))}
+        return [por_id[id_] for id_ in ids if id_ in por_id]
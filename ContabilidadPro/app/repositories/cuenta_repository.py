@@ -1,10 +1,23 @@
 """
 Repositorio para el modelo Cuenta
 """
-from typing import Optional, List
+from typing import Optional, List, Iterable, Dict
+from sqlalchemy import update, bindparam, event, select, func
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 from app.models.cuenta import Cuenta
+from app.models.transaccion import Transaccion
+from app.core.cache import marcar_libro_modificado
+from app.core.estado_sesion import estado_de_transaccion
 from app.repositories.base_repository import BaseRepository
+from app.repositories.indice_cuentas import indice_cuentas, CuentaIndexada
+
+# Campos de la cuenta que guarda el índice del plan de cuentas
+CAMPOS_INDEXADOS = {'codigo', 'nombre', 'tipo', 'naturaleza'}
+
+# Clave en session.info con los deltas de saldo pendientes {cuenta_id: delta}
+# (si la transacción termina sin confirmar se descartan, ver app.core.estado_sesion)
+CLAVE_SALDOS_PENDIENTES = 'saldos_pendientes'
 
 
 class CuentaRepository(BaseRepository[Cuenta]):
@@ -13,6 +26,63 @@ class CuentaRepository(BaseRepository[Cuenta]):
     def __init__(self, session: Session):
         super().__init__(Cuenta, session)
     
+    def create(self, **kwargs) -> Cuenta:
+        """
+        Crea una cuenta y la registra en el índice del plan de cuentas
+        
+        Args:
+            **kwargs: Campos de la cuenta
+            
+        Returns:
+            Cuenta creada
+        """
+        cuenta = super().create(**kwargs)
+        indice_cuentas.registrar_nueva(self.session, cuenta)
+        return cuenta
+    
+    def update(self, id: int, **kwargs) -> Optional[Cuenta]:
+        """
+        Actualiza una cuenta; si cambian sus datos de plan, invalida el índice al confirmar
+        
+        Args:
+            id: ID de la cuenta
+            **kwargs: Campos a actualizar
+            
+        Returns:
+            Cuenta actualizada o None
+        """
+        if CAMPOS_INDEXADOS.intersection(kwargs):
+            indice_cuentas.marcar_modificado(self.session)
+        return super().update(id, **kwargs)
+    
+    def delete(self, id: int) -> bool:
+        """
+        Elimina una cuenta e invalida el índice del plan al confirmar
+        
+        Args:
+            id: ID de la cuenta
+            
+        Returns:
+            True si se eliminó, False si no existía
+        """
+        indice_cuentas.marcar_modificado(self.session)
+        return super().delete(id)
+    
+    def resolver_codigo(self, codigo: str) -> Optional[CuentaIndexada]:
+        """
+        Obtiene id, tipo y naturaleza de una cuenta por código desde el índice en memoria
+        
+        Solo consulta la base la primera vez (para cargar el índice) o si el
+        código no está en el índice.
+        
+        Args:
+            codigo: Código de la cuenta
+            
+        Returns:
+            CuentaIndexada o None si no existe
+        """
+        return indice_cuentas.resolver(self.session, codigo)
+    
     def get_by_codigo(self, codigo: str) -> Optional[Cuenta]:
         """
         Obtiene una cuenta por su código
@@ -41,6 +111,42 @@ class CuentaRepository(BaseRepository[Cuenta]):
             Cuenta.tipo == tipo
         ).all()
     
+    def get_saldos_por_tipos(self, tipos: Iterable[str]) -> List:
+        """
+        Obtiene tipo, nombre y saldo de las cuentas de varios tipos en una sola consulta
+
+        A diferencia de get_by_tipo, no hidrata objetos Cuenta: retorna filas
+        livianas, pensadas para armar estados financieros.
+        
+        Args:
+            tipos: Tipos de cuenta a incluir
+            
+        Returns:
+            Lista de filas (tipo, nombre, saldo) ordenadas por ID de cuenta
+        """
+        self.aplicar_saldos_pendientes()
+        return self.session.query(
+            Cuenta.tipo, Cuenta.nombre, Cuenta.saldo
+        ).filter(
+            Cuenta.tipo.in_(list(tipos))
+        ).order_by(Cuenta.id).all()
+    
+    def get_tipos_por_id(self, tipos: Iterable[str]) -> List:
+        """
+        Obtiene id, tipo y nombre de las cuentas de varios tipos, sin sus saldos
+        
+        Args:
+            tipos: Tipos de cuenta a incluir
+            
+        Returns:
+            Lista de filas (id, tipo, nombre) ordenadas por ID de cuenta
+        """
+        return self.session.query(
+            Cuenta.id, Cuenta.tipo, Cuenta.nombre
+        ).filter(
+            Cuenta.tipo.in_(list(tipos))
+        ).order_by(Cuenta.id).all()
+    
     def get_activas(self) -> List[Cuenta]:
         """
         Obtiene todas las cuentas activas
@@ -97,6 +203,12 @@ class CuentaRepository(BaseRepository[Cuenta]):
         """
         Suma un monto al saldo actual de la cuenta
         
+        Se resuelve con un único UPDATE ... SET saldo = saldo + ? en la base,
+        sin leer la cuenta antes, por lo que es atómico aun con varias
+        instancias de la aplicación escribiendo sobre la misma cuenta. La
+        cuenta que se retorna es la de la sesión (solo se consulta si no
+        estaba cargada) y su saldo se vuelve a leer al accederlo.
+        
         Args:
             cuenta_id: ID de la cuenta
             monto: Monto a sumar (puede ser negativo)
@@ -104,8 +216,122 @@ class CuentaRepository(BaseRepository[Cuenta]):
         Returns:
             Cuenta actualizada o None
         """
-        cuenta = self.get_by_id(cuenta_id)
-        if cuenta:
-            cuenta.saldo += monto
-            self.session.flush()
-        return cuenta
+        resultado = self.session.execute(
+            update(Cuenta)
+            .where(Cuenta.id == cuenta_id)
+            .values(saldo=Cuenta.saldo + monto)
+            .execution_options(synchronize_session=False)
+        )
+        self._expirar_saldos([cuenta_id])
+        marcar_libro_modificado(self.session)
+        return self.session.get(Cuenta, cuenta_id) if resultado.rowcount else None
+    
+    def get_saldos(self) -> Dict[int, float]:
+        """
+        Obtiene el saldo guardado de todas las cuentas
+        
+        Returns:
+            Diccionario {cuenta_id: saldo}
+        """
+        self.aplicar_saldos_pendientes()
+        return dict(self.session.query(Cuenta.id, Cuenta.saldo).all())
+    
+    def recalcular_saldos(self, cuenta_ids: Iterable[int]) -> int:
+        """
+        Reemplaza el saldo de varias cuentas por la suma de sus transacciones
+        
+        Se resuelve con un único UPDATE con subconsulta, de modo que el saldo
+        se calcula en la misma sentencia que lo escribe.
+        
+        Args:
+            cuenta_ids: IDs de las cuentas a recalcular
+            
+        Returns:
+            Número de cuentas actualizadas
+        """
+        ids = list(cuenta_ids)
+        if not ids:
+            return 0
+        self.aplicar_saldos_pendientes()
+        suma = select(func.coalesce(func.sum(Transaccion.monto), 0.0)).where(
+            Transaccion.cuenta_id == Cuenta.id
+        ).scalar_subquery()
+        resultado = self.session.execute(
+            update(Cuenta)
+            .where(Cuenta.id.in_(ids))
+            .values(saldo=suma)
+            .execution_options(synchronize_session=False)
+        )
+        self._expirar_saldos(ids)
+        marcar_libro_modificado(self.session)
+        return resultado.rowcount
+    
+    def acumular_saldo(self, cuenta_id: int, monto: float):
+        """
+        Acumula un monto para sumar al saldo más adelante, en lote
+        
+        Los montos de una misma cuenta se agregan en un solo delta, que se
+        aplica con aplicar_saldos_pendientes o, a más tardar, al confirmar la
+        sesión. Pensado para registrar muchas transacciones en una sola unidad
+        de trabajo.
+        
+        Args:
+            cuenta_id: ID de la cuenta
+            monto: Monto a sumar (puede ser negativo)
+        """
+        pendientes = estado_de_transaccion(self.session, CLAVE_SALDOS_PENDIENTES, dict)
+        pendientes[cuenta_id] = pendientes.get(cuenta_id, 0.0) + monto
+        marcar_libro_modificado(self.session)
+    
+    def aplicar_saldos_pendientes(self):
+        """
+        Aplica los deltas acumulados con acumular_saldo en un único UPDATE por lotes
+        """
+        aplicar_saldos_pendientes(self.session)
+    
+    def _expirar_saldos(self, ids: Iterable[int]):
+        """Marca como vencido el saldo en memoria de las cuentas ya cargadas en la sesión"""
+        expirar_saldos(self.session, ids)
+
+
+def expirar_saldos(session: Session, ids: Iterable[int]):
+    """
+    Vence el atributo saldo de las cuentas cargadas en la sesión
+
+    Se usa después de actualizar saldos con SQL directo, para que el próximo
+    acceso a cuenta.saldo lo vuelva a leer de la base.
+
+    Args:
+        session: Sesión de base de datos
+        ids: IDs de las cuentas actualizadas
+    """
+    for cuenta_id in ids:
+        cuenta = session.identity_map.get(identity_key(Cuenta, cuenta_id))
+        if cuenta is not None:
+            session.expire(cuenta, ['saldo'])
+
+
+def aplicar_saldos_pendientes(session: Session):
+    """
+    Aplica en lote los deltas de saldo acumulados en la sesión
+
+    Args:
+        session: Sesión con deltas pendientes
+    """
+    pendientes = session.info.pop(CLAVE_SALDOS_PENDIENTES, None)
+    if not pendientes:
+        return
+    
+    tabla = Cuenta.__table__
+    session.execute(
+        update(tabla)
+        .where(tabla.c.id == bindparam('b_id'))
+        .values(saldo=tabla.c.saldo + bindparam('b_delta')),
+        [{'b_id': cuenta_id, 'b_delta': delta} for cuenta_id, delta in pendientes.items()]
+    )
+    expirar_saldos(session, pendientes.keys())
+
+
+@event.listens_for(Session, "before_commit")
+def _aplicar_saldos_antes_de_confirmar(session):
+    aplicar_saldos_pendientes(session)
@@ -0,0 +1,153 @@
+"""
+Escritor de auditoría con escritura diferida por lotes
+
+Modos (config.AUDITORIA_MODO):
+    inmediato: cada actividad se inserta y se hace flush al registrarla
+               (comportamiento original, una ida a la base por actividad)
+    durable:   las actividades se acumulan en la sesión y se insertan en un
+               solo INSERT por lotes justo antes del commit, dentro de la
+               misma transacción que el cambio contable (atómico con él)
+    relajado:  las actividades se encolan y un hilo en segundo plano las
+               inserta por lotes cada pocos milisegundos, fuera de la
+               transacción del negocio. Máximo rendimiento, pero si el
+               proceso termina abruptamente se pueden perder las últimas
+"""
+import atexit
+import queue
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.estado_sesion import estado_de_transaccion
+from app.models.auditoria import Auditoria
+from app.utils.logger import app_logger
+import config
+
+MODO_INMEDIATO = 'inmediato'
+MODO_DURABLE = 'durable'
+MODO_RELAJADO = 'relajado'
+MODOS_AUDITORIA = (MODO_INMEDIATO, MODO_DURABLE, MODO_RELAJADO)
+
+# Clave en session.info con las actividades pendientes de la transacción
+# (si la transacción termina sin confirmar se descartan, ver app.core.estado_sesion)
+CLAVE_PENDIENTES = 'auditoria_pendiente'
+
+
+class EscritorAuditoria:
+    """Buffer de escritura para registros de auditoría"""
+
+    def __init__(self, modo: Optional[str] = None, intervalo_ms: Optional[int] = None,
+                 lote_max: Optional[int] = None):
+        """
+        Inicializa el escritor
+
+        Args:
+            modo: inmediato, durable o relajado (None para config.AUDITORIA_MODO)
+            intervalo_ms: Cada cuánto vacía la cola el modo relajado
+            lote_max: Tamaño de cola que fuerza un vaciado anticipado (modo relajado)
+        """
+        self.modo = modo or config.AUDITORIA_MODO
+        if self.modo not in MODOS_AUDITORIA:
+            raise ValueError(f"Modo de auditoría desconocido: {self.modo}")
+        self.intervalo = (intervalo_ms or config.AUDITORIA_INTERVALO_MS) / 1000
+        self.lote_max = lote_max or config.AUDITORIA_LOTE_MAX
+
+        self._cola: "queue.Queue" = queue.Queue()
+        self._despertar = threading.Event()
+        self._lock_vaciado = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+
+    def registrar(self, session: Session, registro: Dict):
+        """
+        Registra una actividad según el modo configurado
+
+        Args:
+            session: Sesión de la operación de negocio
+            registro: Columnas de la fila de auditoría
+        """
+        if self.modo == MODO_INMEDIATO:
+            session.add(Auditoria(**registro))
+            session.flush()
+        elif self.modo == MODO_DURABLE:
+            estado_de_transaccion(session, CLAVE_PENDIENTES, list).append(registro)
+        else:
+            self._iniciar_hilo()
+            self._cola.put((session.get_bind(), registro))
+            if self._cola.qsize() >= self.lote_max:
+                self._despertar.set()
+
+    def registrar_lote(self, session: Session, registros: List[Dict]):
+        """
+        Registra varias actividades; en modo inmediato las inserta con un solo executemany
+
+        Args:
+            session: Sesión de la operación de negocio
+            registros: Columnas de cada fila de auditoría
+        """
+        if not registros:
+            return
+        if self.modo == MODO_INMEDIATO:
+            session.execute(Auditoria.__table__.insert(), registros)
+        elif self.modo == MODO_DURABLE:
+            estado_de_transaccion(session, CLAVE_PENDIENTES, list).extend(registros)
+        else:
+            self._iniciar_hilo()
+            engine = session.get_bind()
+            for registro in registros:
+                self._cola.put((engine, registro))
+            self._despertar.set()
+
+    def escribir_pendientes(self, session: Session):
+        """
+        Inserta en un solo lote las actividades acumuladas en la sesión (modo durable)
+
+        Args:
+            session: Sesión con actividades pendientes
+        """
+        pendientes = session.info.pop(CLAVE_PENDIENTES, None)
+        if pendientes:
+            session.execute(Auditoria.__table__.insert(), pendientes)
+
+    def vaciar(self):
+        """Escribe ya todas las actividades encoladas en modo relajado"""
+        with self._lock_vaciado:
+            por_engine: Dict[Engine, List[Dict]] = {}
+            while True:
+                try:
+                    engine, registro = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                por_engine.setdefault(engine, []).append(registro)
+
+            for engine, registros in por_engine.items():
+                try:
+                    with engine.begin() as conexion:
+                        conexion.execute(Auditoria.__table__.insert(), registros)
+                except Exception as e:
+                    app_logger.error(f"No se pudieron escribir {len(registros)} registros de auditoría: {e}")
+
+    def _iniciar_hilo(self):
+        """Inicia el hilo de vaciado del modo relajado (una sola vez)"""
+        if self._hilo is not None:
+            return
+        with self._lock_vaciado:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="EscritorAuditoria", daemon=True)
+                self._hilo.start()
+                atexit.register(self.vaciar)
+
+    def _bucle(self):
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            self.vaciar()
+
+
+# Escritor global del proceso
+escritor_auditoria = EscritorAuditoria()
+
+
+@event.listens_for(Session, "before_commit")
+def _escribir_auditoria_antes_de_confirmar(session):
+    escritor_auditoria.escribir_pendientes(session)
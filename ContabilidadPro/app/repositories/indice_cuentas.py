@@ -0,0 +1,148 @@
+"""
+Índice en memoria del plan de cuentas (código -> id, tipo, naturaleza)
+
+Evita consultar la tabla cuentas cada vez que se registra una transacción.
+El índice es del proceso (uno por engine) y se carga la primera vez que se
+usa. Para que nunca contenga datos sin confirmar:
+    - las cuentas creadas en una sesión se publican recién en su commit
+      (y se descartan si la transacción termina sin confirmarse);
+    - si una sesión modifica o elimina cuentas, el índice se invalida
+      completo al confirmar y se recarga en el próximo uso;
+    - mientras una sesión tenga cambios del plan sin confirmar, sus
+      búsquedas van a la base.
+Un código que no esté en el índice (p. ej. creado por otra instancia de la
+aplicación) se busca en la base y se agrega.
+"""
+import threading
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.estado_sesion import estado_de_transaccion, marcar_en_transaccion
+from app.models.cuenta import Cuenta
+
+# Claves en session.info
+CLAVE_CUENTAS_NUEVAS = 'plan_cuentas_nuevas'
+CLAVE_PLAN_MODIFICADO = 'plan_cuentas_modificado'
+
+
+class CuentaIndexada(NamedTuple):
+    """Datos de una cuenta necesarios para registrar transacciones"""
+    id: int
+    codigo: str
+    nombre: str
+    tipo: str
+    naturaleza: str
+
+
+def _indexada(cuenta) -> CuentaIndexada:
+    return CuentaIndexada(cuenta.id, cuenta.codigo, cuenta.nombre, cuenta.tipo, cuenta.naturaleza)
+
+
+class IndiceCuentas:
+    """Índice código -> CuentaIndexada, uno por engine"""
+
+    def __init__(self):
+        self._por_engine: Dict[Engine, Dict[str, CuentaIndexada]] = {}
+        self._lock = threading.Lock()
+
+    def resolver(self, session: Session, codigo: str) -> Optional[CuentaIndexada]:
+        """
+        Busca una cuenta por código
+
+        Args:
+            session: Sesión en curso
+            codigo: Código de la cuenta
+
+        Returns:
+            CuentaIndexada o None si la cuenta no existe
+        """
+        nuevas = session.info.get(CLAVE_CUENTAS_NUEVAS)
+        if nuevas and codigo in nuevas:
+            return nuevas[codigo]
+        if session.info.get(CLAVE_PLAN_MODIFICADO):
+            return self._buscar_en_base(session, codigo)
+
+        engine = session.get_bind()
+        indice = self._por_engine.get(engine)
+        if indice is None:
+            indice = self._cargar(session, engine)
+
+        cuenta = indice.get(codigo)
+        if cuenta is None:
+            cuenta = self._buscar_en_base(session, codigo)
+            if cuenta is not None:
+                with self._lock:
+                    indice[codigo] = cuenta
+        return cuenta
+
+    def registrar_nueva(self, session: Session, cuenta: Cuenta):
+        """
+        Registra una cuenta recién creada; se publica al confirmar la sesión
+
+        Args:
+            session: Sesión que creó la cuenta
+            cuenta: Cuenta creada (con ID asignado)
+        """
+        estado_de_transaccion(session, CLAVE_CUENTAS_NUEVAS, dict)[cuenta.codigo] = _indexada(cuenta)
+
+    def marcar_modificado(self, session: Session):
+        """
+        Indica que la sesión modificó o eliminó cuentas; el índice se invalida al confirmar
+
+        Args:
+            session: Sesión que modificó el plan de cuentas
+        """
+        marcar_en_transaccion(session, CLAVE_PLAN_MODIFICADO)
+
+    def invalidar(self, engine: Optional[Engine] = None):
+        """
+        Descarta el índice de un engine (o de todos) para que se recargue
+
+        Args:
+            engine: Engine a invalidar (None para todos)
+        """
+        with self._lock:
+            if engine is None:
+                self._por_engine.clear()
+            else:
+                self._por_engine.pop(engine, None)
+
+    def _cargar(self, session: Session, engine: Engine) -> Dict[str, CuentaIndexada]:
+        filas = session.query(
+            Cuenta.id, Cuenta.codigo, Cuenta.nombre, Cuenta.tipo, Cuenta.naturaleza
+        ).all()
+        indice = {fila.codigo: _indexada(fila) for fila in filas}
+        with self._lock:
+            return self._por_engine.setdefault(engine, indice)
+
+    def _buscar_en_base(self, session: Session, codigo: str) -> Optional[CuentaIndexada]:
+        fila = session.query(
+            Cuenta.id, Cuenta.codigo, Cuenta.nombre, Cuenta.tipo, Cuenta.naturaleza
+        ).filter(Cuenta.codigo == codigo).first()
+        return _indexada(fila) if fila else None
+
+    def _publicar(self, session: Session):
+        """Aplica al índice los cambios del plan confirmados por la sesión"""
+        nuevas = session.info.pop(CLAVE_CUENTAS_NUEVAS, None)
+        modificado = session.info.pop(CLAVE_PLAN_MODIFICADO, False)
+        if not nuevas and not modificado:
+            return
+
+        engine = session.get_bind()
+        if modificado:
+            self.invalidar(engine)
+            return
+        with self._lock:
+            indice = self._por_engine.get(engine)
+            if indice is not None:
+                indice.update(nuevas)
+
+
+# Índice global del proceso
+indice_cuentas = IndiceCuentas()
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_plan_al_confirmar(session):
+    indice_cuentas._publicar(session)
@@ -0,0 +1,178 @@
+"""
+Índice en memoria de los períodos contables (fecha -> período)
+
+Permite asignar el período a cada transacción que se registra sin consultar
+la tabla periodos. Igual que el índice del plan de cuentas, es del proceso
+(uno por engine) y se carga la primera vez que se usa:
+    - si una sesión crea, modifica o elimina períodos, el índice se
+      invalida al confirmar y se recarga en el próximo uso;
+    - mientras una sesión tenga esos cambios sin confirmar, sus búsquedas
+      van a la base;
+    - si una fecha no cae en ningún período del índice y la base cambió
+      desde la última vez que se verificó (PRAGMA data_version, ver
+      app.core.version_base), se busca en la base: el período puede haberlo
+      creado otro proceso (u otra instancia de la aplicación sobre el mismo
+      archivo). Si aparece, el índice se recarga; si no, la fecha no tiene
+      período hasta el próximo cambio de la base, sin volver a consultar.
+Cerrar un período no cambia su rango, así que no invalida el índice.
+"""
+import threading
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.estado_sesion import marcar_en_transaccion
+from app.core.version_base import version_base
+from app.models.periodo import Periodo
+
+# Clave en session.info
+CLAVE_PERIODOS_MODIFICADOS = 'periodos_modificados'
+
+
+def fin_exclusivo(fecha_fin: Optional[datetime]) -> Optional[datetime]:
+    """Primer instante posterior a un período: el inicio del día siguiente a su fecha de fin"""
+    if fecha_fin is None:
+        return None
+    return datetime.combine(fecha_fin.date() + timedelta(days=1), time.min)
+
+
+class RangoPeriodo(NamedTuple):
+    """Fechas que abarca un período: [inicio, fin) (fin None si no tiene fecha de fin)"""
+    inicio: datetime
+    fin: Optional[datetime]
+    id: int
+
+
+class _Rangos(NamedTuple):
+    inicios: List[datetime]
+    rangos: List[RangoPeriodo]
+
+
+class IndicePeriodos:
+    """Índice de rangos de períodos ordenados por fecha de inicio, uno por engine"""
+
+    def __init__(self):
+        self._por_engine: Dict[Engine, _Rangos] = {}
+        # Versión de la base en la que se comprobó que el índice no le falta ningún período
+        self._verificado_en: Dict[Engine, int] = {}
+        self._lock = threading.Lock()
+
+    def resolver(self, session: Session, fecha: datetime) -> Optional[int]:
+        """
+        Busca el período que contiene una fecha
+
+        Args:
+            session: Sesión en curso
+            fecha: Fecha de la transacción
+
+        Returns:
+            ID del período o None si la fecha no cae en ningún período
+        """
+        if session.info.get(CLAVE_PERIODOS_MODIFICADOS):
+            return self._buscar_en_base(session, fecha)
+
+        engine = session.get_bind()
+        indice = self._por_engine.get(engine)
+        if indice is None:
+            indice = self._cargar(session, engine)
+
+        # El último período que empieza antes de la fecha (no se superponen)
+        posicion = bisect_right(indice.inicios, fecha) - 1
+        if posicion >= 0:
+            rango = indice.rangos[posicion]
+            if rango.fin is None or fecha < rango.fin:
+                return rango.id
+
+        # Sin período en el índice: puede haberse creado fuera de este proceso
+        version = version_base(engine)
+        if self._verificado_en.get(engine) == version:
+            return None
+        periodo_id = self._buscar_en_base(session, fecha)
+        if periodo_id is not None:
+            self.invalidar(engine)
+        else:
+            self._verificado_en[engine] = version
+        return periodo_id
+
+    def rangos(self, session: Session) -> List[RangoPeriodo]:
+        """
+        Obtiene los rangos de todos los períodos, del más antiguo al más reciente
+
+        Args:
+            session: Sesión en curso
+
+        Returns:
+            Lista de RangoPeriodo
+        """
+        if session.info.get(CLAVE_PERIODOS_MODIFICADOS):
+            return self._leer_rangos(session)
+        engine = session.get_bind()
+        indice = self._por_engine.get(engine) or self._cargar(session, engine)
+        return list(indice.rangos)
+
+    def marcar_modificado(self, session: Session):
+        """
+        Indica que la sesión creó, modificó o eliminó períodos; el índice se invalida al confirmar
+
+        Args:
+            session: Sesión que modificó los períodos
+        """
+        marcar_en_transaccion(session, CLAVE_PERIODOS_MODIFICADOS)
+
+    def invalidar(self, engine: Optional[Engine] = None):
+        """
+        Descarta el índice de un engine (o de todos) para que se recargue
+
+        Args:
+            engine: Engine a invalidar (None para todos)
+        """
+        with self._lock:
+            if engine is None:
+                self._por_engine.clear()
+                self._verificado_en.clear()
+            else:
+                self._por_engine.pop(engine, None)
+                self._verificado_en.pop(engine, None)
+
+    def _cargar(self, session: Session, engine: Engine) -> _Rangos:
+        # La versión se lee antes que los períodos: un cambio posterior obliga a verificar
+        version = version_base(engine)
+        rangos = self._leer_rangos(session)
+        indice = _Rangos([rango.inicio for rango in rangos], rangos)
+        with self._lock:
+            if engine not in self._por_engine:
+                self._verificado_en[engine] = version
+            return self._por_engine.setdefault(engine, indice)
+
+    @staticmethod
+    def _leer_rangos(session: Session) -> List[RangoPeriodo]:
+        filas = session.query(Periodo.fecha_inicio, Periodo.fecha_fin, Periodo.id).order_by(
+            Periodo.fecha_inicio
+        ).all()
+        return [RangoPeriodo(inicio, fin_exclusivo(fin), id) for inicio, fin, id in filas]
+
+    @staticmethod
+    def _buscar_en_base(session: Session, fecha: datetime) -> Optional[int]:
+        fila = session.query(Periodo.fecha_fin, Periodo.id).filter(
+            Periodo.fecha_inicio <= fecha
+        ).order_by(Periodo.fecha_inicio.desc()).first()
+        if fila is None:
+            return None
+        fin = fin_exclusivo(fila.fecha_fin)
+        return fila.id if fin is None or fecha < fin else None
+
+    def _publicar(self, session: Session):
+        """Invalida el índice si la sesión confirmó cambios de períodos"""
+        if session.info.pop(CLAVE_PERIODOS_MODIFICADOS, False):
+            self.invalidar(session.get_bind())
+
+
+# Índice global del proceso
+indice_periodos = IndicePeriodos()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_periodos_al_confirmar(session):
+    indice_periodos._publicar(session)
@@ -0,0 +1,135 @@
+"""
+Repositorio para el modelo Período
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models.periodo import Periodo
+from app.repositories.base_repository import BaseRepository
+from app.repositories.indice_periodos import RangoPeriodo, fin_exclusivo, indice_periodos
+
+
+class PeriodoRepository(BaseRepository[Periodo]):
+    """Repositorio para operaciones con períodos contables"""
+    
+    def __init__(self, session: Session):
+        super().__init__(Periodo, session)
+    
+    def create(self, **kwargs) -> Periodo:
+        """
+        Crea un período; el índice de períodos se invalida al confirmar
+        
+        Args:
+            **kwargs: Campos del período
+            
+        Returns:
+            Período creado
+        """
+        indice_periodos.marcar_modificado(self.session)
+        return super().create(**kwargs)
+    
+    def update(self, id: int, **kwargs) -> Optional[Periodo]:
+        """
+        Actualiza un período; si cambian sus fechas, invalida el índice al confirmar
+        
+        Args:
+            id: ID del período
+            **kwargs: Campos a actualizar
+            
+        Returns:
+            Período actualizado o None
+        """
+        if {'fecha_inicio', 'fecha_fin'}.intersection(kwargs):
+            indice_periodos.marcar_modificado(self.session)
+        return super().update(id, **kwargs)
+    
+    def delete(self, id: int) -> bool:
+        """
+        Elimina un período e invalida el índice al confirmar
+        
+        Args:
+            id: ID del período
+            
+        Returns:
+            True si se eliminó, False si no existía
+        """
+        indice_periodos.marcar_modificado(self.session)
+        return super().delete(id)
+    
+    def resolver_fecha(self, fecha: datetime) -> Optional[int]:
+        """
+        Obtiene el período que contiene una fecha desde el índice en memoria
+        
+        Args:
+            fecha: Fecha de la transacción
+            
+        Returns:
+            ID del período o None si la fecha no cae en ningún período
+        """
+        return indice_periodos.resolver(self.session, fecha)
+    
+    def get_actual(self) -> Optional[Periodo]:
+        """
+        Obtiene el período que contiene la fecha actual
+        
+        Returns:
+            Período actual o None si hoy no cae en ningún período
+        """
+        periodo_id = self.resolver_fecha(datetime.now())
+        return self.get_by_id(periodo_id) if periodo_id else None
+    
+    def get_rangos(self) -> List[RangoPeriodo]:
+        """
+        Obtiene las fechas que abarca cada período, del más antiguo al más reciente
+        
+        Returns:
+            Lista de RangoPeriodo (inicio inclusive, fin exclusivo)
+        """
+        return indice_periodos.rangos(self.session)
+    
+    def get_superpuestos(self, fecha_inicio: datetime, fecha_fin: Optional[datetime]) -> List[Periodo]:
+        """
+        Obtiene los períodos que comparten algún día con un rango
+        
+        Args:
+            fecha_inicio: Inicio del rango
+            fecha_fin: Último día del rango (None si no tiene fin)
+            
+        Returns:
+            Lista de períodos superpuestos
+        """
+        query = self.session.query(Periodo).filter(
+            or_(Periodo.fecha_fin.is_(None), Periodo.fecha_fin >= fecha_inicio.replace(
+                hour=0, minute=0, second=0, microsecond=0))
+        )
+        if fecha_fin is not None:
+            query = query.filter(Periodo.fecha_inicio < fin_exclusivo(fecha_fin))
+        return query.order_by(Periodo.fecha_inicio).all()
+    
+    def get_cerrados(self) -> List[Periodo]:
+        """
+        Obtiene los períodos cerrados, del más antiguo al más reciente
+        
+        Returns:
+            Lista de períodos cerrados
+        """
+        return self.session.query(Periodo).filter(
+            Periodo.cerrado == 1,
+            Periodo.fecha_fin.isnot(None)
+        ).order_by(Periodo.fecha_fin).all()
+    
+    def get_abierto_anterior(self, periodo: Periodo) -> Optional[Periodo]:
+        """
+        Obtiene el período abierto más antiguo que empieza antes que otro
+        
+        Args:
+            periodo: Período de referencia
+            
+        Returns:
+            Período abierto anterior o None si todos los anteriores están cerrados
+        """
+        return self.session.query(Periodo).filter(
+            Periodo.cerrado == 0,
+            Periodo.fecha_inicio < periodo.fecha_inicio
+        ).order_by(Periodo.fecha_inicio).first()
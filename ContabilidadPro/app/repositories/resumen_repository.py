@@ -0,0 +1,167 @@
+"""
+Repositorio para los resúmenes de transacciones por día y por mes
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, union_all
+from app.models.resumen import ResumenDiario, ResumenMensual
+
+
+def _a_fecha(valor: Optional[date]) -> Optional[date]:
+    """Normaliza un datetime a su fecha (los resúmenes no tienen hora)"""
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+def _mes_siguiente(fecha: date) -> date:
+    """Primer día del mes siguiente al de la fecha"""
+    if fecha.month == 12:
+        return date(fecha.year + 1, 1, 1)
+    return date(fecha.year, fecha.month + 1, 1)
+
+
+def dividir_rango(desde: Optional[date], hasta: Optional[date]) -> List[Tuple[type, Optional[date], Optional[date]]]:
+    """
+    Divide un rango de días en meses completos más los días sueltos de los extremos
+
+    Args:
+        desde: Día inicial inclusive (None para desde el comienzo)
+        hasta: Día final exclusivo (None para hasta el final)
+
+    Returns:
+        Lista de tramos (modelo de resumen, desde, hasta) que cubren el rango
+    """
+    inicio_meses = desde if desde is None or desde.day == 1 else _mes_siguiente(desde)
+    fin_meses = None if hasta is None else hasta.replace(day=1)
+    if inicio_meses is not None and fin_meses is not None and inicio_meses >= fin_meses:
+        return [(ResumenDiario, desde, hasta)]
+
+    tramos = [(ResumenMensual, inicio_meses, fin_meses)]
+    if desde is not None and desde < inicio_meses:
+        tramos.append((ResumenDiario, desde, inicio_meses))
+    if hasta is not None and fin_meses < hasta:
+        tramos.append((ResumenDiario, fin_meses, hasta))
+    return tramos
+
+
+class ResumenRepository:
+    """
+    Repositorio de consultas sobre los resúmenes diarios y mensuales
+
+    Leen una fila por (día o mes, tipo, cuenta) en lugar de una por
+    transacción. Los rangos son de días completos: desde inclusive, hasta
+    exclusivo; si reciben datetime se toma solo la fecha.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def totales_por_dia(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                        tipo: Optional[str] = None,
+                        cuenta_id: Optional[int] = None) -> List[Tuple[date, str, int, float]]:
+        """
+        Obtiene la cantidad y el total de transacciones de cada día y tipo
+
+        Args:
+            desde: Día inicial inclusive (opcional)
+            hasta: Día final exclusivo (opcional)
+            tipo: Filtrar por tipo de transacción (opcional)
+            cuenta_id: Filtrar por cuenta (opcional)
+
+        Returns:
+            Lista de tuplas (día, tipo, cantidad, total) ordenada por día y tipo
+        """
+        return self._totales(ResumenDiario, ResumenDiario.dia, desde, hasta, tipo, cuenta_id)
+
+    def totales_por_mes(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                        tipo: Optional[str] = None,
+                        cuenta_id: Optional[int] = None) -> List[Tuple[date, str, int, float]]:
+        """
+        Obtiene la cantidad y el total de transacciones de cada mes y tipo
+
+        Args:
+            desde: Mes inicial inclusive (cualquier día del mes; opcional)
+            hasta: Día final exclusivo; un mes parcial se incluye completo (opcional)
+            tipo: Filtrar por tipo de transacción (opcional)
+            cuenta_id: Filtrar por cuenta (opcional)
+
+        Returns:
+            Lista de tuplas (primer día del mes, tipo, cantidad, total) ordenada por mes y tipo
+        """
+        desde = _a_fecha(desde)
+        return self._totales(ResumenMensual, ResumenMensual.mes, desde and desde.replace(day=1),
+                             hasta, tipo, cuenta_id)
+
+    def get_total(self, tipo: Optional[str] = None, desde: Optional[date] = None,
+                  hasta: Optional[date] = None, cuenta_id: Optional[int] = None) -> float:
+        """
+        Calcula el total de las transacciones en un rango de días
+
+        Los meses completos del rango se leen del resumen mensual y solo los
+        días sueltos de los extremos del diario.
+
+        Args:
+            tipo: Tipo de transacción (None para todos)
+            desde: Día inicial inclusive (opcional)
+            hasta: Día final exclusivo (opcional)
+            cuenta_id: Filtrar por cuenta (opcional)
+
+        Returns:
+            Total de montos
+        """
+        tramos = self._seleccionar_tramos(desde, hasta, tipo, cuenta_id)
+        result = self.session.execute(select(func.sum(tramos.c.total))).scalar()
+        return result if result else 0.0
+
+    def sumar_por_cuenta(self, desde: Optional[date] = None,
+                         hasta: Optional[date] = None) -> Dict[int, float]:
+        """
+        Suma los montos de cada cuenta en un rango de días
+
+        Equivale a TransaccionRepository.sumar_por_cuenta con fechas al
+        inicio del día, pero lee los resúmenes.
+
+        Args:
+            desde: Día inicial inclusive (None para desde el comienzo)
+            hasta: Día final exclusivo (None para hasta el final)
+
+        Returns:
+            Diccionario {cuenta_id: suma de montos}
+        """
+        tramos = self._seleccionar_tramos(desde, hasta)
+        return dict(self.session.execute(
+            select(tramos.c.cuenta_id, func.sum(tramos.c.total)).group_by(tramos.c.cuenta_id)
+        ).all())
+
+    def _totales(self, modelo, columna, desde: Optional[date], hasta: Optional[date],
+                 tipo: Optional[str], cuenta_id: Optional[int]) -> List[Tuple[date, str, int, float]]:
+        """Totales de un resumen agrupados por fecha y tipo"""
+        query = self.session.query(columna, modelo.tipo, func.sum(modelo.cantidad),
+                                   func.sum(modelo.total))
+        query = self._filtrar(query, modelo, columna, _a_fecha(desde), _a_fecha(hasta), tipo, cuenta_id)
+        return [tuple(fila) for fila in
+                query.group_by(columna, modelo.tipo).order_by(columna, modelo.tipo).all()]
+
+    def _seleccionar_tramos(self, desde: Optional[date], hasta: Optional[date],
+                            tipo: Optional[str] = None, cuenta_id: Optional[int] = None):
+        """Subconsulta (cuenta_id, total) con las filas de resumen que cubren el rango"""
+        selects = []
+        for modelo, tramo_desde, tramo_hasta in dividir_rango(_a_fecha(desde), _a_fecha(hasta)):
+            columna = modelo.dia if modelo is ResumenDiario else modelo.mes
+            selects.append(self._filtrar(select(modelo.cuenta_id, modelo.total), modelo, columna,
+                                         tramo_desde, tramo_hasta, tipo, cuenta_id))
+        return union_all(*selects).subquery() if len(selects) > 1 else selects[0].subquery()
+
+    @staticmethod
+    def _filtrar(query, modelo, columna, desde: Optional[date], hasta: Optional[date],
+                 tipo: Optional[str], cuenta_id: Optional[int]):
+        """Aplica los filtros de rango, tipo y cuenta a una consulta sobre un resumen"""
+        if desde is not None:
+            query = query.filter(columna >= desde)
+        if hasta is not None:
+            query = query.filter(columna < hasta)
+        if tipo:
+            query = query.filter(modelo.tipo == tipo)
+        if cuenta_id is not None:
+            query = query.filter(modelo.cuenta_id == cuenta_id)
+        return query
@@ -0,0 +1,98 @@
+"""
+Repositorio para el modelo Saldo Histórico
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models.saldo_historico import SaldoHistorico
+from app.repositories.base_repository import BaseRepository
+
+
+class SaldoHistoricoRepository(BaseRepository[SaldoHistorico]):
+    """Repositorio para operaciones con saldos históricos"""
+    
+    def __init__(self, session: Session):
+        super().__init__(SaldoHistorico, session)
+    
+    def get_cortes(self) -> List[datetime]:
+        """
+        Obtiene las fechas de corte con instantánea, de la más antigua a la más reciente
+        
+        Returns:
+            Lista de fechas de corte
+        """
+        filas = self.session.query(SaldoHistorico.fecha_corte).distinct().order_by(
+            SaldoHistorico.fecha_corte
+        ).all()
+        return [fila.fecha_corte for fila in filas]
+    
+    def get_ultimo_corte(self, hasta: Optional[datetime] = None,
+                         incluir_hasta: bool = True) -> Optional[datetime]:
+        """
+        Obtiene el corte más reciente que no supere una fecha
+        
+        Args:
+            hasta: Fecha límite (None para el último corte)
+            incluir_hasta: False para excluir un corte igual a hasta
+            
+        Returns:
+            Fecha de corte o None si no hay instantáneas
+        """
+        query = self.session.query(func.max(SaldoHistorico.fecha_corte))
+        if hasta:
+            if incluir_hasta:
+                query = query.filter(SaldoHistorico.fecha_corte <= hasta)
+            else:
+                query = query.filter(SaldoHistorico.fecha_corte < hasta)
+        return query.scalar()
+    
+    def get_saldos(self, fecha_corte: datetime) -> Dict[int, float]:
+        """
+        Obtiene los saldos de todas las cuentas en un corte
+        
+        Args:
+            fecha_corte: Fecha de corte exacta
+            
+        Returns:
+            Diccionario {cuenta_id: saldo}
+        """
+        return dict(self.session.query(SaldoHistorico.cuenta_id, SaldoHistorico.saldo).filter(
+            SaldoHistorico.fecha_corte == fecha_corte
+        ).all())
+    
+    def reemplazar_corte(self, fecha_corte: datetime, saldos: Dict[int, float],
+                         periodo_id: Optional[int] = None):
+        """
+        Guarda los saldos de un corte, reemplazando los que hubiera
+        
+        Args:
+            fecha_corte: Fecha de corte
+            saldos: Diccionario {cuenta_id: saldo}
+            periodo_id: Período al que corresponde el corte (opcional)
+        """
+        self.session.query(SaldoHistorico).filter(
+            SaldoHistorico.fecha_corte == fecha_corte
+        ).delete(synchronize_session=False)
+        
+        if saldos:
+            self.session.execute(SaldoHistorico.__table__.insert(), [
+                {'fecha_corte': fecha_corte, 'cuenta_id': cuenta_id, 'saldo': saldo,
+                 'periodo_id': periodo_id}
+                for cuenta_id, saldo in saldos.items()
+            ])
+    
+    def invalidar_desde(self, fecha: datetime) -> int:
+        """
+        Elimina los cortes posteriores a una fecha (quedan desactualizados
+        cuando se registran transacciones con esa fecha)
+        
+        Args:
+            fecha: Fecha de la transacción más antigua registrada
+            
+        Returns:
+            Número de filas eliminadas
+        """
+        return self.session.query(SaldoHistorico).filter(
+            SaldoHistorico.fecha_corte > fecha
+        ).delete(synchronize_session=False)
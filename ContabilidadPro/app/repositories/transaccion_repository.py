@@ -1,12 +1,21 @@
 """
 Repositorio para el modelo Transacción
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple, Dict, Iterator
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, select, update
 from app.models.transaccion import Transaccion
+from app.models.cuenta import Cuenta
+from app.models.usuario import Usuario
 from app.repositories.base_repository import BaseRepository
+from app.repositories.resumen_repository import ResumenRepository
+
+# Columnas por las que get_pagina puede ordenar (cada una con su índice (columna, id))
+COLUMNAS_ORDEN = {
+    'fecha': Transaccion.fecha,
+    'monto': Transaccion.monto
+}
 
 
 class TransaccionRepository(BaseRepository[Transaccion]):
@@ -15,6 +24,18 @@ class TransaccionRepository(BaseRepository[Transaccion]):
     def __init__(self, session: Session):
         super().__init__(Transaccion, session)
     
+    def crear_lote(self, filas: List[Dict]):
+        """
+        Inserta varias transacciones con un único INSERT por lotes (executemany)
+        
+        No crea objetos Transaccion en la sesión; pensado para registros masivos.
+        
+        Args:
+            filas: Lista de diccionarios con las columnas de cada transacción
+        """
+        if filas:
+            self.session.execute(Transaccion.__table__.insert(), filas)
+    
     def get_by_cuenta(self, cuenta_id: int) -> List[Transaccion]:
         """
         Obtiene todas las transacciones de una cuenta
@@ -43,6 +64,64 @@ class TransaccionRepository(BaseRepository[Transaccion]):
             Transaccion.periodo_id == periodo_id
         ).order_by(Transaccion.fecha.desc()).all()
     
+    def asignar_periodo(self, periodo_id: int, desde: datetime, hasta: Optional[datetime],
+                        limite: int) -> int:
+        """
+        Asigna un período a transacciones sin período dentro de un rango de fechas
+        
+        Actualiza como máximo limite filas por llamada; las filas sin período
+        se ubican por el índice (periodo_id, fecha, id), así que cada llamada
+        lee solo las que modifica.
+        
+        Args:
+            periodo_id: ID del período a asignar
+            desde: Fecha inicial inclusive
+            hasta: Fecha final exclusiva (None para sin límite)
+            limite: Máximo de filas a actualizar
+            
+        Returns:
+            Cantidad de transacciones actualizadas
+        """
+        pendientes = select(Transaccion.id).where(
+            Transaccion.periodo_id.is_(None),
+            Transaccion.fecha >= desde
+        )
+        if hasta is not None:
+            pendientes = pendientes.where(Transaccion.fecha < hasta)
+        
+        resultado = self.session.execute(
+            update(Transaccion).where(Transaccion.id.in_(pendientes.limit(limite)))
+            .values(periodo_id=periodo_id).execution_options(synchronize_session=False)
+        )
+        return resultado.rowcount
+    
+    def contar_por_periodo(self, periodo_id: int, limite: Optional[int] = None) -> int:
+        """
+        Cuenta las transacciones de un período, deteniéndose al llegar a un límite
+        
+        Args:
+            periodo_id: ID del período
+            limite: Máximo a contar (None para contar todas)
+            
+        Returns:
+            min(transacciones del período, limite)
+        """
+        query = self.session.query(Transaccion.id).filter(Transaccion.periodo_id == periodo_id)
+        if limite is not None:
+            query = query.limit(limite)
+        return self.session.query(func.count()).select_from(query.subquery()).scalar()
+    
+    def contar_sin_periodo(self) -> int:
+        """
+        Cuenta las transacciones que todavía no tienen período asignado
+        
+        Returns:
+            Cantidad de transacciones sin período
+        """
+        return self.session.query(func.count(Transaccion.id)).filter(
+            Transaccion.periodo_id.is_(None)
+        ).scalar()
+    
     def get_by_tipo(self, tipo: str) -> List[Transaccion]:
         """
         Obtiene transacciones por tipo
@@ -93,6 +172,9 @@ class TransaccionRepository(BaseRepository[Transaccion]):
         """
         Calcula el total de transacciones por tipo
         
+        Sin período se lee del resumen mensual (una fila por mes y cuenta)
+        en lugar de recorrer las transacciones.
+        
         Args:
             tipo: Tipo de transacción
             periodo_id: ID del período (opcional)
@@ -100,15 +182,153 @@ class TransaccionRepository(BaseRepository[Transaccion]):
         Returns:
             Total de montos
         """
+        if not periodo_id:
+            return ResumenRepository(self.session).get_total(tipo)
+        
         query = self.session.query(func.sum(Transaccion.monto)).filter(
-            Transaccion.tipo == tipo
+            Transaccion.tipo == tipo,
+            Transaccion.periodo_id == periodo_id
         )
         
+        result = query.scalar()
+        return result if result else 0.0
+    
+    def get_pagina(self, limite: int = 50,
+                   despues_de: Optional[Tuple[datetime, int]] = None,
+                   descendente: bool = True,
+                   tipo: Optional[str] = None,
+                   usuario_id: Optional[int] = None,
+                   cuenta_id: Optional[int] = None,
+                   periodo_id: Optional[int] = None,
+                   fecha_inicio: Optional[datetime] = None,
+                   fecha_fin: Optional[datetime] = None,
+                   con_relaciones: bool = False,
+                   orden: str = 'fecha') -> List[Transaccion]:
+        """
+        Obtiene una página de transacciones ordenadas por (orden, id)
+        
+        Para pedir la página siguiente, pasar en despues_de la clave
+        (valor de la columna de orden, id) de la última transacción recibida.
+        
+        Args:
+            limite: Tamaño de la página
+            despues_de: Clave (valor de orden, id) del último registro visto (opcional)
+            descendente: True para ordenar de mayor a menor (la más reciente primero)
+            tipo: Filtrar por tipo de transacción (opcional)
+            usuario_id: Filtrar por usuario (opcional)
+            cuenta_id: Filtrar por cuenta (opcional)
+            periodo_id: Filtrar por período (opcional)
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            con_relaciones: Cargar la cuenta y el usuario en la misma consulta
+                            (evita una consulta por transacción al mostrarlos)
+            orden: Columna de ordenamiento, una de COLUMNAS_ORDEN ('fecha' o 'monto')
+            
+        Returns:
+            Lista de transacciones de la página
+        """
+        if orden not in COLUMNAS_ORDEN:
+            raise ValueError(f"No se puede ordenar transacciones por {orden}")
+        
+        query = self.session.query(Transaccion)
+        if con_relaciones:
+            query = query.options(joinedload(Transaccion.cuenta), joinedload(Transaccion.usuario))
+        
+        if tipo:
+            query = query.filter(Transaccion.tipo == tipo)
+        if usuario_id:
+            query = query.filter(Transaccion.usuario_id == usuario_id)
+        if cuenta_id:
+            query = query.filter(Transaccion.cuenta_id == cuenta_id)
         if periodo_id:
             query = query.filter(Transaccion.periodo_id == periodo_id)
+        if fecha_inicio:
+            query = query.filter(Transaccion.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(Transaccion.fecha <= fecha_fin)
         
-        result = query.scalar()
-        return result if result else 0.0
+        return self._paginar_por_clave(query, COLUMNAS_ORDEN[orden], limite, despues_de, descendente)
+    
+    def get_primera_fecha(self) -> Optional[datetime]:
+        """
+        Obtiene la fecha de la transacción más antigua
+        
+        Returns:
+            Fecha o None si no hay transacciones
+        """
+        return self.session.query(func.min(Transaccion.fecha)).scalar()
+    
+    def get_rango_ids(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Obtiene el menor y el mayor ID de transacción
+        
+        Returns:
+            Tupla (mínimo, máximo), o (None, None) si no hay transacciones
+        """
+        return tuple(self.session.query(func.min(Transaccion.id), func.max(Transaccion.id)).one())
+    
+    def sumar_por_cuenta(self, desde: Optional[datetime] = None,
+                         hasta: Optional[datetime] = None,
+                         id_desde: Optional[int] = None,
+                         id_hasta: Optional[int] = None) -> Dict[int, float]:
+        """
+        Suma los montos de cada cuenta en un rango de fechas y/o de IDs de transacción
+        
+        Args:
+            desde: Fecha inicial inclusive (None para desde el comienzo)
+            hasta: Fecha final exclusiva (None para hasta el final)
+            id_desde: ID de transacción inicial inclusive (opcional)
+            id_hasta: ID de transacción final exclusivo (opcional)
+            
+        Returns:
+            Diccionario {cuenta_id: suma de montos}
+        """
+        query = self.session.query(Transaccion.cuenta_id, func.sum(Transaccion.monto))
+        
+        if desde:
+            query = query.filter(Transaccion.fecha >= desde)
+        if hasta:
+            query = query.filter(Transaccion.fecha < hasta)
+        if id_desde is not None:
+            query = query.filter(Transaccion.id >= id_desde)
+        if id_hasta is not None:
+            query = query.filter(Transaccion.id < id_hasta)
+        
+        return dict(query.group_by(Transaccion.cuenta_id).all())
+    
+    def iterar_filas(self, fecha_inicio: Optional[datetime] = None,
+                     fecha_fin: Optional[datetime] = None,
+                     tamano_lote: int = 1000,
+                     periodo_id: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Recorre las transacciones como filas planas, en orden cronológico
+        
+        Lee con un cursor que trae tamano_lote filas por vez y no crea
+        objetos del ORM, por lo que la memoria no depende del total.
+        
+        Args:
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            tamano_lote: Filas leídas de la base por vez
+            periodo_id: Solo las transacciones de un período (opcional)
+            
+        Yields:
+            Tuplas (fecha, tipo, concepto, monto, cuenta, usuario)
+        """
+        query = self.session.query(
+            Transaccion.fecha, Transaccion.tipo, Transaccion.concepto, Transaccion.monto,
+            Cuenta.nombre, Usuario.username
+        ).outerjoin(Cuenta, Transaccion.cuenta_id == Cuenta.id
+        ).outerjoin(Usuario, Transaccion.usuario_id == Usuario.id)
+        
+        if fecha_inicio:
+            query = query.filter(Transaccion.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(Transaccion.fecha <= fecha_fin)
+        if periodo_id:
+            query = query.filter(Transaccion.periodo_id == periodo_id)
+        
+        yield from query.order_by(Transaccion.fecha, Transaccion.id).yield_per(tamano_lote)
     
     def buscar(self, termino: str) -> List[Transaccion]:
         """
@@ -123,3 +343,20 @@ class TransaccionRepository(BaseRepository[Transaccion]):
         return self.session.query(Transaccion).filter(
             Transaccion.concepto.like(f'%{termino}%')
         ).order_by(Transaccion.fecha.desc()).all()
+    
+    def buscar_texto(self, termino: str, limite: int = 50, pagina: int = 0) -> List[Transaccion]:
+        """
+        Busca transacciones por palabras usando el índice de texto completo
+        
+        Cada palabra se busca como prefijo, sin distinguir mayúsculas ni
+        acentos, y los resultados se ordenan por relevancia.
+        
+        Args:
+            termino: Palabras a buscar
+            limite: Tamaño de la página
+            pagina: Número de página (desde 0)
+            
+        Returns:
+            Lista de transacciones que coinciden
+        """
+        return self._buscar_texto_completo('transacciones_fts', Transaccion.concepto, termino, limite, pagina)
@@ -0,0 +1,145 @@
+"""
+Servicio de Cierre de Períodos
+
+Cerrar un período lleva a cero las cuentas de resultado (ingresos y gastos)
+con un asiento de cierre fechado en el último instante del período, y pasa
+el resultado a la cuenta de resultados no asignados del patrimonio. Así el
+estado de resultados vuelve a empezar y el balance sigue cuadrando. Después
+el período queda congelado (ver app.core.periodos_cerrados).
+
+Los saldos al fin del período salen de la última instantánea más los
+resúmenes diarios y mensuales (SaldosHistoricosService.saldos_a_fecha), y
+el asiento se inserta con un único INSERT por lotes: el costo depende de la
+cantidad de cuentas y de días desde la última instantánea, no de la de
+transacciones del período. Todo el cierre va en la unidad de trabajo de la
+sesión; si algo falla, el rollback lo deshace completo.
+"""
+from datetime import datetime, timedelta
+from typing import Tuple
+from sqlalchemy.orm import Session
+from app.core.cache import marcar_libro_modificado
+from app.core.constants import *
+from app.models.usuario import Usuario
+from app.repositories.asiento_repository import AsientoRepository
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.cuenta_repository import CuentaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.services.saldos_historicos_service import SaldosHistoricosService, corte_de_periodo
+from app.utils.logger import app_logger
+
+# Saldos menores a esto se consideran cero y no generan línea de cierre
+TOLERANCIA_CIERRE = 0.005
+
+# Cuenta de patrimonio que recibe el resultado de cada cierre
+CODIGO_CUENTA_RESULTADOS = "RES-RESULTADOS"
+
+
+class CierrePeriodoService:
+    """Servicio para cerrar períodos contables"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.periodo_repo = PeriodoRepository(session)
+        self.cuenta_repo = CuentaRepository(session)
+        self.transaccion_repo = TransaccionRepository(session)
+        self.asiento_repo = AsientoRepository(session)
+        self.auditoria_repo = AuditoriaRepository(session)
+        self.saldo_repo = SaldoHistoricoRepository(session)
+        self.saldos_service = SaldosHistoricosService(session)
+
+    def cerrar_periodo(self, periodo_id: int, usuario: Usuario) -> Tuple[bool, str]:
+        """
+        Cierra un período: asiento de cierre, resultado y bloqueo
+
+        Los períodos se cierran en orden y solo después de terminados.
+
+        Args:
+            periodo_id: ID del período a cerrar
+            usuario: Usuario que realiza el cierre
+
+        Returns:
+            Tupla (exito, mensaje)
+        """
+        periodo = self.periodo_repo.get_by_id(periodo_id)
+        if periodo is None:
+            return False, "Período no encontrado"
+        if periodo.esta_cerrado:
+            return False, f"El período {periodo.nombre} ya está cerrado"
+        if periodo.fecha_fin is None:
+            return False, f"El período {periodo.nombre} no tiene fecha de fin"
+        corte = corte_de_periodo(periodo)
+        if corte > datetime.now():
+            return False, f"El período {periodo.nombre} termina el {periodo.fecha_fin:%d/%m/%Y}"
+        anterior = self.periodo_repo.get_abierto_anterior(periodo)
+        if anterior is not None:
+            return False, f"Primero debe cerrarse el período {anterior.nombre}"
+
+        # Último instante del período: el asiento queda dentro de él y antes del corte
+        fecha_cierre = corte - timedelta(microseconds=1)
+        saldos = self.saldos_service.saldos_a_fecha(corte)
+        lineas = []
+        resultado = 0.0
+        for cuenta_id, tipo, _nombre in self.cuenta_repo.get_tipos_por_id([TIPO_INGRESO, TIPO_GASTO]):
+            saldo = saldos.get(cuenta_id, 0.0)
+            if abs(saldo) > TOLERANCIA_CIERRE:
+                lineas.append((cuenta_id, -saldo))
+                resultado += saldo if tipo == TIPO_INGRESO else -saldo
+        if abs(resultado) > TOLERANCIA_CIERRE:
+            lineas.append((self._obtener_cuenta_resultados().id, resultado))
+
+        if lineas:
+            asiento = self.asiento_repo.create(
+                fecha=fecha_cierre,
+                descripcion=f"Asiento de cierre del período {periodo.nombre}",
+                numero=self.asiento_repo.siguiente_numero(),
+                periodo_id=periodo.id,
+                usuario_id=usuario.id
+            )
+            self.transaccion_repo.crear_lote([{
+                'fecha': fecha_cierre,
+                'concepto': f"Cierre del período {periodo.nombre}",
+                'monto': monto,
+                'tipo': TIPO_TRANSACCION_CIERRE,
+                'cuenta_id': cuenta_id,
+                'asiento_id': asiento.id,
+                'periodo_id': periodo.id,
+                'usuario_id': usuario.id
+            } for cuenta_id, monto in lineas])
+            for cuenta_id, monto in lineas:
+                self.cuenta_repo.acumular_saldo(cuenta_id, monto)
+            self.cuenta_repo.aplicar_saldos_pendientes()
+
+        # Desde aquí los triggers rechazan cualquier cambio en las transacciones del período
+        periodo.cerrado = 1
+        periodo.resultado = resultado
+        self.session.flush()
+
+        # Los cortes posteriores no incluyen el asiento de cierre
+        self.saldo_repo.invalidar_desde(fecha_cierre)
+        self.saldos_service.generar_instantanea_periodo(periodo)
+
+        self.auditoria_repo.registrar_actividad(
+            usuario_id=usuario.id,
+            tipo_actividad=ACTIVIDAD_CERRAR_PERIODO,
+            descripcion=f"Período {periodo.nombre} cerrado con un resultado de ${resultado:,.2f}"
+        )
+        marcar_libro_modificado(self.session)
+        app_logger.info(f"Período {periodo.nombre} cerrado: resultado ${resultado:,.2f}, "
+                        f"{len(lineas)} líneas de cierre")
+        return True, f"Período {periodo.nombre} cerrado con un resultado de ${resultado:,.2f}"
+
+    def _obtener_cuenta_resultados(self):
+        """Obtiene (o crea) la cuenta de patrimonio que acumula los resultados de los cierres"""
+        cuenta = self.cuenta_repo.resolver_codigo(CODIGO_CUENTA_RESULTADOS)
+        if not cuenta:
+            cuenta = self.cuenta_repo.create(
+                codigo=CODIGO_CUENTA_RESULTADOS,
+                nombre="Resultados No Asignados",
+                tipo=TIPO_RESERVAS,
+                naturaleza=NATURALEZA_ACREEDORA,
+                saldo=0.0,
+                activa=1
+            )
+        return cuenta
@@ -1,14 +1,38 @@
 """
 Servicio de Contabilidad - Lógica de negocio principal
 """
-from typing import Tuple, Dict, List, Optional
+from typing import Tuple, Dict, List, Iterable
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.repositories.cuenta_repository import CuentaRepository
 from app.repositories.transaccion_repository import TransaccionRepository
 from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
 from app.models.usuario import Usuario
+from app.core.cache import cache_estados, marcar_libro_modificado
 from app.core.constants import *
+from app.utils.decorators import cachear_por_version
+from app.services.saldos_historicos_service import SaldosHistoricosService
+
+# Sección del balance general que corresponde a cada tipo de cuenta (en orden de presentación)
+SECCIONES_BALANCE = {
+    TIPO_ACTIVO_CORRIENTE: 'activo_corriente',
+    TIPO_ACTIVO_NO_CORRIENTE: 'activo_no_corriente',
+    TIPO_PASIVO_CORRIENTE: 'pasivo_corriente',
+    TIPO_PASIVO_NO_CORRIENTE: 'pasivo_no_corriente',
+    TIPO_CAPITAL: 'patrimonio',
+    TIPO_RESERVAS: 'patrimonio'
+}
+
+# Filas por cada INSERT por lotes de registrar_lote
+TAMANO_LOTE_INSERCION = 1000
+
+# Sección del estado de resultados que corresponde a cada tipo de cuenta
+SECCIONES_RESULTADOS = {
+    TIPO_INGRESO: 'ingresos',
+    TIPO_GASTO: 'gastos'
+}
 
 
 class ContabilidadService:
@@ -19,6 +43,7 @@ class ContabilidadService:
         self.cuenta_repo = CuentaRepository(session)
         self.transaccion_repo = TransaccionRepository(session)
         self.auditoria_repo = AuditoriaRepository(session)
+        self.periodo_repo = PeriodoRepository(session)
     
     def registrar_venta(self, concepto: str, monto: float, usuario: Usuario) -> Tuple[bool, str]:
         """
@@ -28,24 +53,17 @@ class ContabilidadService:
             return False, "El monto debe ser mayor a cero"
         
         # Buscar o crear cuenta de ingresos por ventas
-        cuenta_ingreso = self.cuenta_repo.get_by_codigo("ING-VENTAS")
-        if not cuenta_ingreso:
-            cuenta_ingreso = self.cuenta_repo.create(
-                codigo="ING-VENTAS",
-                nombre="Ingresos por Ventas",
-                tipo=TIPO_INGRESO,
-                naturaleza=NATURALEZA_ACREEDORA,
-                saldo=0.0,
-                activa=1
-            )
+        cuenta_ingreso = self._obtener_cuenta_ventas()
         
-        # Crear transacción
+        # Crear transacción, en el período que contiene su fecha
+        fecha = datetime.now()
         self.transaccion_repo.create(
-            fecha=datetime.now(),
+            fecha=fecha,
             concepto=f"Venta: {concepto}",
             monto=monto,
             tipo=TIPO_TRANSACCION_VENTA,
             cuenta_id=cuenta_ingreso.id,
+            periodo_id=self.periodo_repo.resolver_fecha(fecha),
             usuario_id=usuario.id
         )
         
@@ -59,6 +77,9 @@ class ContabilidadService:
             descripcion=f"Venta registrada: {concepto} - ${monto:,.2f}"
         )
         
+        # Invalida los estados financieros cacheados al confirmar
+        marcar_libro_modificado(self.session)
+        
         # self.session.commit() # <--- ELIMINADO
         return True, "Venta registrada exitosamente"
     
@@ -70,24 +91,17 @@ class ContabilidadService:
             return False, "El monto debe ser mayor a cero"
         
         # Buscar o crear cuenta de gastos por compras
-        cuenta_gasto = self.cuenta_repo.get_by_codigo("GAS-COMPRAS")
-        if not cuenta_gasto:
-            cuenta_gasto = self.cuenta_repo.create(
-                codigo="GAS-COMPRAS",
-                nombre="Gastos por Compras",
-                tipo=TIPO_GASTO,
-                naturaleza=NATURALEZA_DEUDORA,
-                saldo=0.0,
-                activa=1
-            )
+        cuenta_gasto = self._obtener_cuenta_compras()
         
-        # Crear transacción
+        # Crear transacción, en el período que contiene su fecha
+        fecha = datetime.now()
         self.transaccion_repo.create(
-            fecha=datetime.now(),
+            fecha=fecha,
             concepto=f"Compra: {concepto}",
             monto=monto,
             tipo=TIPO_TRANSACCION_COMPRA,
             cuenta_id=cuenta_gasto.id,
+            periodo_id=self.periodo_repo.resolver_fecha(fecha),
             usuario_id=usuario.id
         )
         
@@ -101,9 +115,91 @@ class ContabilidadService:
             descripcion=f"Compra registrada: {concepto} - ${monto:,.2f}"
         )
         
+        # Invalida los estados financieros cacheados al confirmar
+        marcar_libro_modificado(self.session)
+        
         # self.session.commit() # <--- ELIMINADO
         return True, "Compra registrada exitosamente"
     
+    def registrar_lote(self, registros: Iterable[Tuple[str, str, float, Usuario]]) -> List[Tuple[bool, str]]:
+        """
+        Registra en bloque un lote de ventas y compras
+        
+        Todo el lote va en la unidad de trabajo de la sesión: las transacciones
+        se insertan con executemany, el saldo de cada cuenta se actualiza una
+        sola vez con el total del lote y la auditoría se escribe por lotes.
+        El período de cada transacción sale del índice en memoria de períodos.
+        Los registros inválidos se informan y no impiden registrar el resto.
+        
+        Args:
+            registros: Iterable de tuplas (tipo, concepto, monto, usuario), donde
+                       tipo es TIPO_TRANSACCION_VENTA o TIPO_TRANSACCION_COMPRA.
+                       Puede agregarse un quinto elemento con la fecha de la
+                       transacción (por defecto, la fecha actual)
+            
+        Returns:
+            Lista de (exito, mensaje), una por registro y en el mismo orden
+        """
+        resultados = []
+        transacciones = []
+        actividades = []
+        cuentas = {}
+        fecha_mas_antigua = None
+        
+        for tipo, concepto, monto, usuario, *opcionales in registros:
+            if tipo not in OPERACIONES_LOTE:
+                resultados.append((False, f"Tipo de transacción inválido: {tipo}"))
+                continue
+            if monto <= 0:
+                resultados.append((False, "El monto debe ser mayor a cero"))
+                continue
+            
+            prefijo, actividad, obtener_cuenta = OPERACIONES_LOTE[tipo]
+            if tipo not in cuentas:
+                cuentas[tipo] = obtener_cuenta(self)
+            cuenta = cuentas[tipo]
+            ahora = datetime.now()
+            fecha = opcionales[0] if opcionales else ahora
+            if opcionales and (fecha_mas_antigua is None or fecha < fecha_mas_antigua):
+                fecha_mas_antigua = fecha
+            
+            transacciones.append({
+                'fecha': fecha,
+                'concepto': f"{prefijo}: {concepto}",
+                'monto': monto,
+                'tipo': tipo,
+                'cuenta_id': cuenta.id,
+                'periodo_id': self.periodo_repo.resolver_fecha(fecha),
+                'usuario_id': usuario.id
+            })
+            actividades.append({
+                'usuario_id': usuario.id,
+                'tipo_actividad': actividad,
+                'descripcion': f"{prefijo} registrada: {concepto} - ${monto:,.2f}",
+                'ip_address': None,
+                'fecha_hora': ahora
+            })
+            self.cuenta_repo.acumular_saldo(cuenta.id, monto)
+            resultados.append((True, f"{prefijo} registrada exitosamente"))
+            
+            if len(transacciones) >= TAMANO_LOTE_INSERCION:
+                self.transaccion_repo.crear_lote(transacciones)
+                transacciones = []
+        
+        if transacciones:
+            self.transaccion_repo.crear_lote(transacciones)
+        self.cuenta_repo.aplicar_saldos_pendientes()
+        self.auditoria_repo.registrar_actividades(actividades)
+        
+        # Las instantáneas posteriores a una transacción con fecha pasada quedan desactualizadas
+        if fecha_mas_antigua is not None:
+            SaldoHistoricoRepository(self.session).invalidar_desde(fecha_mas_antigua)
+        
+        if actividades:
+            marcar_libro_modificado(self.session)
+        
+        return resultados
+    
     def registrar_transaccion_cuenta(self, tipo_cuenta: str, concepto: str, 
                                      monto: float, usuario: Usuario) -> Tuple[bool, str]:
         """
@@ -117,7 +213,7 @@ class ContabilidadService:
         
         # Buscar o crear cuenta
         codigo = self._generar_codigo_cuenta(tipo_cuenta, concepto)
-        cuenta = self.cuenta_repo.get_by_codigo(codigo)
+        cuenta = self.cuenta_repo.resolver_codigo(codigo)
         
         if not cuenta:
             naturaleza = self._determinar_naturaleza(tipo_cuenta)
@@ -130,13 +226,15 @@ class ContabilidadService:
                 activa=1
             )
         
-        # Crear transacción
+        # Crear transacción, en el período que contiene su fecha
+        fecha = datetime.now()
         self.transaccion_repo.create(
-            fecha=datetime.now(),
+            fecha=fecha,
             concepto=concepto,
             monto=monto,
             tipo=TIPO_TRANSACCION_GENERAL,
             cuenta_id=cuenta.id,
+            periodo_id=self.periodo_repo.resolver_fecha(fecha),
             usuario_id=usuario.id
         )
         
@@ -150,11 +248,95 @@ class ContabilidadService:
             descripcion=f"Transacción: {tipo_cuenta} - {concepto} - ${monto:,.2f}"
         )
         
+        # Invalida los estados financieros cacheados al confirmar
+        marcar_libro_modificado(self.session)
+        
         # self.session.commit() # <--- ELIMINADO
         return True, "Transacción registrada exitosamente"
     
+    def _obtener_cuenta_ventas(self):
+        """Obtiene (o crea) la cuenta de ingresos por ventas"""
+        cuenta = self.cuenta_repo.resolver_codigo("ING-VENTAS")
+        if not cuenta:
+            cuenta = self.cuenta_repo.create(
+                codigo="ING-VENTAS",
+                nombre="Ingresos por Ventas",
+                tipo=TIPO_INGRESO,
+                naturaleza=NATURALEZA_ACREEDORA,
+                saldo=0.0,
+                activa=1
+            )
+        return cuenta
+    
+    def _obtener_cuenta_compras(self):
+        """Obtiene (o crea) la cuenta de gastos por compras"""
+        cuenta = self.cuenta_repo.resolver_codigo("GAS-COMPRAS")
+        if not cuenta:
+            cuenta = self.cuenta_repo.create(
+                codigo="GAS-COMPRAS",
+                nombre="Gastos por Compras",
+                tipo=TIPO_GASTO,
+                naturaleza=NATURALEZA_DEUDORA,
+                saldo=0.0,
+                activa=1
+            )
+        return cuenta
+    
+    @cachear_por_version(cache_estados)
+    def obtener_estados_financieros(self) -> Tuple[Dict, Dict]:
+        """
+        Genera el balance general y el estado de resultados con una sola consulta
+
+        Returns:
+            Tupla (balance, estado_resultados) con la misma estructura que
+            obtener_balance_general y obtener_estado_resultados
+        """
+        por_tipo = self._saldos_por_tipo(TIPOS_CUENTA)
+        return self._armar_balance(por_tipo), self._armar_estado_resultados(por_tipo)
+    
+    def obtener_estados_financieros_al(self, fecha: datetime) -> Tuple[Dict, Dict]:
+        """
+        Genera el balance general y el estado de resultados a una fecha pasada
+        
+        Los saldos salen de la instantánea más reciente anterior a la fecha
+        más los movimientos posteriores a ella, sin recorrer todo el libro.
+        
+        Args:
+            fecha: Fecha límite (se consideran las transacciones anteriores)
+        
+        Returns:
+            Tupla (balance, estado_resultados) con la misma estructura que
+            obtener_estados_financieros
+        """
+        saldos = SaldosHistoricosService(self.session).saldos_a_fecha(fecha)
+        por_tipo = {tipo: {} for tipo in TIPOS_CUENTA}
+        for cuenta_id, tipo, nombre in self.cuenta_repo.get_tipos_por_id(TIPOS_CUENTA):
+            por_tipo[tipo][nombre] = saldos.get(cuenta_id, 0.0)
+        return self._armar_balance(por_tipo), self._armar_estado_resultados(por_tipo)
+    
+    @cachear_por_version(cache_estados)
     def obtener_balance_general(self) -> Dict:
-        # ... (el resto del archivo no cambia) ...
+        """
+        Genera el balance general
+        """
+        return self._armar_balance(self._saldos_por_tipo(SECCIONES_BALANCE))
+    
+    @cachear_por_version(cache_estados)
+    def obtener_estado_resultados(self) -> Dict:
+        """
+        Genera el estado de resultados
+        """
+        return self._armar_estado_resultados(self._saldos_por_tipo(SECCIONES_RESULTADOS))
+    
+    def _saldos_por_tipo(self, tipos) -> Dict[str, Dict[str, float]]:
+        """Obtiene {tipo: {nombre: saldo}} para los tipos dados en una sola consulta"""
+        por_tipo = {tipo: {} for tipo in tipos}
+        for tipo, nombre, saldo in self.cuenta_repo.get_saldos_por_tipos(tipos):
+            por_tipo[tipo][nombre] = saldo
+        return por_tipo
+    
+    def _armar_balance(self, por_tipo: Dict[str, Dict[str, float]]) -> Dict:
+        """Arma el balance general a partir de los saldos agrupados por tipo"""
         balance = {
             'activo_corriente': {},
             'activo_no_corriente': {},
@@ -163,26 +345,8 @@ class ContabilidadService:
             'patrimonio': {}
         }
         
-        # Activos
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_ACTIVO_CORRIENTE):
-            balance['activo_corriente'][cuenta.nombre] = cuenta.saldo
-        
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_ACTIVO_NO_CORRIENTE):
-            balance['activo_no_corriente'][cuenta.nombre] = cuenta.saldo
-        
-        # Pasivos
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_PASIVO_CORRIENTE):
-            balance['pasivo_corriente'][cuenta.nombre] = cuenta.saldo
-        
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_PASIVO_NO_CORRIENTE):
-            balance['pasivo_no_corriente'][cuenta.nombre] = cuenta.saldo
-        
-        # Patrimonio
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_CAPITAL):
-            balance['patrimonio'][cuenta.nombre] = cuenta.saldo
-        
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_RESERVAS):
-            balance['patrimonio'][cuenta.nombre] = cuenta.saldo
+        for tipo, seccion in SECCIONES_BALANCE.items():
+            balance[seccion].update(por_tipo[tipo])
         
         # Calcular totales
         balance['total_activo_corriente'] = sum(balance['activo_corriente'].values())
@@ -197,22 +361,15 @@ class ContabilidadService:
         
         return balance
     
-    def obtener_estado_resultados(self) -> Dict:
-        """
-        Genera el estado de resultados
-        """
+    def _armar_estado_resultados(self, por_tipo: Dict[str, Dict[str, float]]) -> Dict:
+        """Arma el estado de resultados a partir de los saldos agrupados por tipo"""
         resultado = {
             'ingresos': {},
             'gastos': {}
         }
         
-        # Ingresos
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_INGRESO):
-            resultado['ingresos'][cuenta.nombre] = cuenta.saldo
-        
-        # Gastos
-        for cuenta in self.cuenta_repo.get_by_tipo(TIPO_GASTO):
-            resultado['gastos'][cuenta.nombre] = cuenta.saldo
+        for tipo, seccion in SECCIONES_RESULTADOS.items():
+            resultado[seccion].update(por_tipo[tipo])
         
         # Calcular totales
         resultado['total_ingresos'] = sum(resultado['ingresos'].values())
@@ -241,4 +398,11 @@ class ContabilidadService:
     def _determinar_naturaleza(self, tipo: str) -> str:
         """Determina la naturaleza de una cuenta según su tipo"""
         cuentas_deudoras = [TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE, TIPO_GASTO]
-        return NATURALEZA_DEUDORA if tipo in cuentas_deudoras else NATURALEZA_ACREEDORA
\ No newline at end of file
+        return NATURALEZA_DEUDORA if tipo in cuentas_deudoras else NATURALEZA_ACREEDORA
+
+
+# Operaciones admitidas por registrar_lote: tipo -> (prefijo del concepto, actividad, cuenta)
+OPERACIONES_LOTE = {
+    TIPO_TRANSACCION_VENTA: ("Venta", ACTIVIDAD_VENTA, ContabilidadService._obtener_cuenta_ventas),
+    TIPO_TRANSACCION_COMPRA: ("Compra", ACTIVIDAD_COMPRA, ContabilidadService._obtener_cuenta_compras)
+}
@@ -0,0 +1,359 @@
+"""
+Servicio de Exportación a Excel, CSV y PDF
+
+Las filas se leen de la base con un cursor por lotes (yield_per) y se
+escriben en el archivo a medida que llegan, sin armar listas intermedias:
+    excel: libro openpyxl en modo solo escritura (cada fila va directo al disco)
+    csv:   csv.writer sobre el archivo abierto
+    pdf:   canvas de reportlab, una página por vez; reportlab guarda el
+           contenido de cada página (unos 30 KB) hasta cerrar el archivo, así
+           que en PDF la memoria sí crece con el número de páginas
+"""
+import csv
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.services.contabilidad_service import ContabilidadService
+from app.services.reportes_service import ReportesService
+from app.utils.formatters import formatear_fecha_hora, formatear_moneda
+from app.utils.logger import app_logger
+import config
+
+FORMATO_EXCEL = 'excel'
+FORMATO_CSV = 'csv'
+FORMATO_PDF = 'pdf'
+FORMATOS_EXPORTACION = (FORMATO_EXCEL, FORMATO_CSV, FORMATO_PDF)
+
+EXTENSIONES = {
+    FORMATO_EXCEL: '.xlsx',
+    FORMATO_CSV: '.csv',
+    FORMATO_PDF: '.pdf'
+}
+
+# Columnas de cada exportación: (título, ancho en caracteres)
+COLUMNAS_TRANSACCIONES = (('Fecha', 17), ('Tipo', 10), ('Concepto', 50), ('Monto', 15),
+                          ('Cuenta', 30), ('Usuario', 15))
+COLUMNAS_ACTIVIDADES = (('Fecha/Hora', 19), ('Usuario', 15), ('Tipo', 20), ('Descripción', 90))
+COLUMNAS_ESTADOS = (('Estado', 22), ('Sección', 25), ('Cuenta', 40), ('Monto', 15))
+COLUMNAS_VENTAS_COMPRAS = (('Mes', 10), ('Ventas', 15), ('Cantidad de ventas', 18),
+                           ('Compras', 15), ('Cantidad de compras', 19))
+
+Columnas = Sequence[Tuple[str, int]]
+
+
+def _texto(valor) -> str:
+    """Representación de un valor para CSV y PDF"""
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return formatear_fecha_hora(valor, "%d/%m/%Y %H:%M")
+    return str(valor)
+
+
+def _contar(filas: Iterable[tuple], progreso: Optional[Callable[[int], None]]) -> Iterator[tuple]:
+    """Recorre las filas avisando a progreso cada config.EXPORTACION_TAMANO_LOTE filas"""
+    cantidad = 0
+    for cantidad, fila in enumerate(filas, start=1):
+        yield fila
+        if progreso and cantidad % config.EXPORTACION_TAMANO_LOTE == 0:
+            progreso(cantidad)
+    if progreso:
+        progreso(cantidad)
+
+
+def escribir_excel(ruta: Path, titulo: str, columnas: Columnas, filas: Iterable[tuple]) -> int:
+    """
+    Escribe las filas en un libro .xlsx en modo solo escritura
+
+    Args:
+        ruta: Archivo de destino
+        titulo: Título de la hoja
+        columnas: Títulos y anchos de las columnas
+        filas: Filas a escribir
+
+    Returns:
+        Número de filas escritas
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(titulo[:31])
+    for i, (_, ancho) in enumerate(columnas, start=1):
+        hoja.column_dimensions[get_column_letter(i)].width = ancho
+
+    negrita = Font(bold=True)
+    encabezado = []
+    for nombre, _ in columnas:
+        celda = WriteOnlyCell(hoja, value=nombre)
+        celda.font = negrita
+        encabezado.append(celda)
+    hoja.append(encabezado)
+
+    total = 0
+    for fila in filas:
+        hoja.append(tuple(fila))
+        total += 1
+    libro.save(ruta)
+    return total
+
+
+def escribir_csv(ruta: Path, titulo: str, columnas: Columnas, filas: Iterable[tuple]) -> int:
+    """
+    Escribe las filas en un archivo CSV (UTF-8 con BOM, para que Excel respete los acentos)
+
+    Args:
+        ruta: Archivo de destino
+        titulo: No se usa; se recibe para tener la misma firma que los demás formatos
+        columnas: Títulos de las columnas
+        filas: Filas a escribir
+
+    Returns:
+        Número de filas escritas
+    """
+    total = 0
+    with open(ruta, 'w', newline='', encoding='utf-8-sig') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow([nombre for nombre, _ in columnas])
+        for fila in filas:
+            escritor.writerow([f"{v:.2f}" if isinstance(v, float) else _texto(v) for v in fila])
+            total += 1
+    return total
+
+
+def escribir_pdf(ruta: Path, titulo: str, columnas: Columnas, filas: Iterable[tuple]) -> int:
+    """
+    Escribe las filas en un PDF apaisado, repitiendo el encabezado en cada página
+
+    Args:
+        ruta: Archivo de destino
+        titulo: Título impreso en cada página
+        columnas: Títulos y anchos de las columnas
+        filas: Filas a escribir
+
+    Returns:
+        Número de filas escritas
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    ancho_pagina, alto_pagina = landscape(A4)
+    margen = 36
+    alto_linea = 11
+    tamano_fuente = 8
+    # Ancho en puntos de cada columna, escalado para ocupar el ancho útil
+    escala = (ancho_pagina - 2 * margen) / sum(ancho for _, ancho in columnas)
+    posiciones = []
+    x = margen
+    for _, ancho in columnas:
+        posiciones.append((x, int(ancho * escala / (tamano_fuente * 0.5))))
+        x += ancho * escala
+
+    lienzo = canvas.Canvas(str(ruta), pagesize=(ancho_pagina, alto_pagina), pageCompression=1)
+    lienzo.setTitle(titulo)
+    pagina = 0
+
+    def nueva_pagina() -> float:
+        nonlocal pagina
+        if pagina:
+            lienzo.showPage()
+        pagina += 1
+        y = alto_pagina - margen
+        lienzo.setFont("Helvetica-Bold", 11)
+        lienzo.drawString(margen, y, titulo)
+        lienzo.setFont("Helvetica", tamano_fuente)
+        lienzo.drawRightString(ancho_pagina - margen, y, f"Página {pagina}")
+        y -= 2 * alto_linea
+        lienzo.setFont("Helvetica-Bold", tamano_fuente)
+        for (nombre, _), (x, _) in zip(columnas, posiciones):
+            lienzo.drawString(x, y, nombre)
+        lienzo.line(margen, y - 3, ancho_pagina - margen, y - 3)
+        lienzo.setFont("Helvetica", tamano_fuente)
+        return y - alto_linea - 3
+
+    y = nueva_pagina()
+    total = 0
+    for fila in filas:
+        if y < margen:
+            y = nueva_pagina()
+        for valor, (x, max_caracteres) in zip(fila, posiciones):
+            texto = formatear_moneda(valor) if isinstance(valor, float) else _texto(valor)
+            lienzo.drawString(x, y, texto[:max_caracteres])
+        y -= alto_linea
+        total += 1
+    lienzo.save()
+    return total
+
+
+ESCRITORES = {
+    FORMATO_EXCEL: escribir_excel,
+    FORMATO_CSV: escribir_csv,
+    FORMATO_PDF: escribir_pdf
+}
+
+
+class ExportService:
+    """Servicio para exportar transacciones, actividades, estados financieros y resúmenes mensuales"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.transaccion_repo = TransaccionRepository(session)
+        self.auditoria_repo = AuditoriaRepository(session)
+        self.contabilidad_service = ContabilidadService(session)
+        self.reportes_service = ReportesService(session)
+
+    def exportar_transacciones(self, formato: str, ruta: Optional[Path] = None,
+                               fecha_inicio: Optional[datetime] = None,
+                               fecha_fin: Optional[datetime] = None,
+                               progreso: Optional[Callable[[int], None]] = None,
+                               periodo_id: Optional[int] = None) -> Tuple[Path, int]:
+        """
+        Exporta las transacciones en orden cronológico
+
+        Args:
+            formato: excel, csv o pdf
+            ruta: Archivo de destino (None para uno nuevo en exports/<formato>)
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            periodo_id: Solo las transacciones de un período (opcional)
+            progreso: Función opcional llamada con el número de filas escritas
+                      cada config.EXPORTACION_TAMANO_LOTE filas
+
+        Returns:
+            Tupla (ruta del archivo, filas exportadas)
+        """
+        filas = self.transaccion_repo.iterar_filas(fecha_inicio, fecha_fin,
+                                                   config.EXPORTACION_TAMANO_LOTE, periodo_id)
+        return self._exportar(formato, ruta, "Transacciones", COLUMNAS_TRANSACCIONES, filas, progreso)
+
+    def exportar_transacciones_periodo_actual(self, formato: str, ruta: Optional[Path] = None,
+                                              progreso: Optional[Callable[[int], None]] = None
+                                              ) -> Tuple[Path, int]:
+        """
+        Exporta las transacciones del período que contiene la fecha actual
+
+        Args:
+            formato: excel, csv o pdf
+            ruta: Archivo de destino (None para uno nuevo en exports/<formato>)
+            progreso: Función opcional llamada con el número de filas escritas
+
+        Returns:
+            Tupla (ruta del archivo, filas exportadas); ValueError si la fecha
+            actual no cae en ningún período
+        """
+        periodo = PeriodoRepository(self.session).get_actual()
+        if periodo is None:
+            raise ValueError("No hay un período que contenga la fecha actual")
+        return self.exportar_transacciones(formato, ruta, progreso=progreso, periodo_id=periodo.id)
+
+    def exportar_actividades(self, formato: str, ruta: Optional[Path] = None,
+                             usuario_id: Optional[int] = None,
+                             fecha_inicio: Optional[datetime] = None,
+                             fecha_fin: Optional[datetime] = None,
+                             progreso: Optional[Callable[[int], None]] = None) -> Tuple[Path, int]:
+        """
+        Exporta el registro de auditoría en orden cronológico
+
+        Args:
+            formato: excel, csv o pdf
+            ruta: Archivo de destino (None para uno nuevo en exports/<formato>)
+            usuario_id: Filtrar por usuario (opcional)
+            fecha_inicio: Fecha inicial inclusive (opcional)
+            fecha_fin: Fecha final inclusive (opcional)
+            progreso: Función opcional llamada con el número de filas escritas
+
+        Returns:
+            Tupla (ruta del archivo, filas exportadas)
+        """
+        filas = self.auditoria_repo.iterar_filas(usuario_id, fecha_inicio, fecha_fin,
+                                                 config.EXPORTACION_TAMANO_LOTE)
+        return self._exportar(formato, ruta, "Actividades", COLUMNAS_ACTIVIDADES, filas, progreso)
+
+    def exportar_estados_financieros(self, formato: str,
+                                     ruta: Optional[Path] = None) -> Tuple[Path, int]:
+        """
+        Exporta el balance general y el estado de resultados
+
+        Args:
+            formato: excel, csv o pdf
+            ruta: Archivo de destino (None para uno nuevo en exports/<formato>)
+
+        Returns:
+            Tupla (ruta del archivo, filas exportadas)
+        """
+        return self._exportar(formato, ruta, "Estados Financieros", COLUMNAS_ESTADOS,
+                              self._filas_estados(), None)
+
+    def exportar_ventas_compras_por_mes(self, formato: str,
+                                        ruta: Optional[Path] = None) -> Tuple[Path, int]:
+        """
+        Exporta los totales de ventas y compras de cada mes
+
+        Args:
+            formato: excel, csv o pdf
+            ruta: Archivo de destino (None para uno nuevo en exports/<formato>)
+
+        Returns:
+            Tupla (ruta del archivo, filas exportadas)
+        """
+        filas = ((fila['mes'].strftime('%m/%Y'), fila['ventas'], fila['cantidad_ventas'],
+                  fila['compras'], fila['cantidad_compras'])
+                 for fila in self.reportes_service.obtener_ventas_compras_por_mes())
+        return self._exportar(formato, ruta, "Ventas y Compras por Mes", COLUMNAS_VENTAS_COMPRAS,
+                              filas, None)
+
+    def _filas_estados(self) -> Iterator[tuple]:
+        """Filas (estado, sección, cuenta, monto) de los estados financieros"""
+        balance, resultados = self.contabilidad_service.obtener_estados_financieros()
+
+        secciones_balance = (('Activo Corriente', 'activo_corriente', 'total_activo_corriente'),
+                             ('Activo No Corriente', 'activo_no_corriente', 'total_activo_no_corriente'),
+                             ('Pasivo Corriente', 'pasivo_corriente', 'total_pasivo_corriente'),
+                             ('Pasivo No Corriente', 'pasivo_no_corriente', 'total_pasivo_no_corriente'),
+                             ('Patrimonio Neto', 'patrimonio', 'total_patrimonio'))
+        for nombre, seccion, total in secciones_balance:
+            for cuenta, monto in balance[seccion].items():
+                yield "Balance General", nombre, cuenta, monto
+            yield "Balance General", nombre, "TOTAL", float(balance[total])
+        yield "Balance General", "Patrimonio Neto", "Resultado del Período", resultados['resultado_periodo']
+
+        for nombre, seccion, total in (('Ingresos', 'ingresos', 'total_ingresos'),
+                                       ('Gastos', 'gastos', 'total_gastos')):
+            for cuenta, monto in resultados[seccion].items():
+                yield "Estado de Resultados", nombre, cuenta, monto
+            yield "Estado de Resultados", nombre, "TOTAL", float(resultados[total])
+        yield "Estado de Resultados", "Resultado", "RESULTADO DEL PERÍODO", resultados['resultado_periodo']
+
+    def _exportar(self, formato: str, ruta: Optional[Path], titulo: str, columnas: Columnas,
+                  filas: Iterable[tuple], progreso: Optional[Callable[[int], None]]) -> Tuple[Path, int]:
+        """
+        Escribe las filas en el formato pedido
+
+        Se escribe primero a un archivo temporal junto al destino y se renombra
+        al terminar, para no dejar archivos a medio escribir si algo falla.
+        """
+        if formato not in ESCRITORES:
+            raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS_EXPORTACION)})")
+
+        if ruta is None:
+            nombre = f"{titulo.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            ruta = config.EXPORTS_DIR / formato / f"{nombre}{EXTENSIONES[formato]}"
+        ruta = Path(ruta)
+        temporal = ruta.with_name(ruta.name + ".parcial")
+
+        try:
+            total = ESCRITORES[formato](temporal, titulo, columnas, _contar(filas, progreso))
+            os.replace(temporal, ruta)
+        finally:
+            if temporal.exists():
+                temporal.unlink()
+
+        app_logger.info(f"Exportación {titulo} ({formato}): {total} filas en {ruta}")
+        return ruta, total
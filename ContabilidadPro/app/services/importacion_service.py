@@ -0,0 +1,276 @@
+"""
+Servicio de Importación de transacciones históricas desde Excel (.xlsx) o CSV
+"""
+import csv
+import unicodedata
+from datetime import datetime, date
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.periodos_cerrados import MENSAJE_PERIODO_CERRADO
+from app.models.importacion import Importacion
+from app.models.usuario import Usuario
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.services.contabilidad_service import ContabilidadService
+from app.services.saldos_historicos_service import corte_de_periodo
+from app.services.validacion_service import ValidacionService
+from app.utils.formatters import limpiar_monto
+from app.utils.logger import app_logger
+from app.core.constants import (TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA,
+                                ACTIVIDAD_IMPORTACION)
+import config
+
+# Columnas obligatorias del archivo (encabezados sin distinguir mayúsculas ni acentos)
+COLUMNAS_IMPORTACION = ('fecha', 'tipo', 'concepto', 'monto')
+
+FORMATOS_FECHA = ('%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+                  '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+
+TIPOS_IMPORTABLES = {
+    'venta': TIPO_TRANSACCION_VENTA,
+    'compra': TIPO_TRANSACCION_COMPRA
+}
+
+
+def _normalizar(texto: Any) -> str:
+    """Pasa a minúsculas y quita acentos y espacios sobrantes"""
+    texto = unicodedata.normalize('NFKD', str(texto or '').strip().lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def leer_filas(ruta: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lee un archivo .xlsx o .csv fila por fila, sin cargarlo completo
+    
+    Args:
+        ruta: Ruta del archivo (la primera fila debe tener los encabezados)
+    
+    Yields:
+        Tuplas (número de fila en el archivo, {columna: valor})
+    """
+    if ruta.suffix.lower() in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        libro = load_workbook(ruta, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            yield from _mapear_filas(filas)
+        finally:
+            libro.close()
+    elif ruta.suffix.lower() == '.csv':
+        with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+            muestra = archivo.read(4096)
+            archivo.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+            except csv.Error:
+                dialecto = csv.excel
+            yield from _mapear_filas(csv.reader(archivo, dialecto))
+    else:
+        raise ValueError(f"Formato no soportado: {ruta.suffix} (use .xlsx o .csv)")
+
+
+def _mapear_filas(filas: Iterator[tuple]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Convierte filas posicionales en diccionarios según la fila de encabezados"""
+    encabezados = [_normalizar(e) for e in next(filas, ())]
+    faltantes = [c for c in COLUMNAS_IMPORTACION if c not in encabezados]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+    
+    posiciones = {c: encabezados.index(c) for c in COLUMNAS_IMPORTACION}
+    for numero, fila in enumerate(filas, start=2):
+        if not fila or all(v in (None, '') for v in fila):
+            continue
+        yield numero, {c: (fila[i] if i < len(fila) else None) for c, i in posiciones.items()}
+
+
+def huella_archivo(ruta: Path) -> str:
+    """Identifica un archivo por nombre, tamaño y fecha de modificación"""
+    estado = ruta.stat()
+    return f"{ruta.name}|{estado.st_size}|{int(estado.st_mtime)}"
+
+
+class ImportacionService:
+    """
+    Servicio para importar transacciones históricas en lotes
+    
+    A diferencia de los demás servicios, confirma la sesión al final de cada
+    lote: así una importación larga no retiene la base bloqueada y, si se
+    interrumpe, puede reanudarse desde el último lote confirmado.
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+        self.contabilidad_service = ContabilidadService(session)
+        self.auditoria_repo = AuditoriaRepository(session)
+        self.validacion_service = ValidacionService()
+        # Rangos [inicio, corte) de los períodos cerrados, donde no se puede registrar
+        self._periodos_cerrados: List[Tuple[datetime, datetime]] = []
+    
+    def importar_transacciones(self, ruta, usuario: Usuario,
+                               progreso: Optional[Callable[[int, int, int], None]] = None,
+                               tamano_lote: Optional[int] = None) -> Dict:
+        """
+        Importa ventas y compras desde un archivo .xlsx o .csv
+        
+        El archivo debe tener las columnas fecha, tipo (Venta/Compra), concepto
+        y monto. Cada lote se valida, se registra con registrar_lote y se
+        confirma junto con el punto de control, por lo que volver a llamar con
+        el mismo archivo retoma donde quedó. Las filas inválidas se escriben en
+        un reporte CSV de errores.
+        
+        Args:
+            ruta: Ruta del archivo
+            usuario: Usuario que realiza la importación
+            progreso: Función opcional llamada tras cada lote con
+                      (filas leídas, filas importadas, filas con error)
+            tamano_lote: Filas por lote (None para config.IMPORTACION_TAMANO_LOTE)
+        
+        Returns:
+            Diccionario con importadas, errores, reanudada_desde, completada
+            y reporte_errores (ruta del CSV o None)
+        """
+        ruta = Path(ruta)
+        tamano_lote = tamano_lote or config.IMPORTACION_TAMANO_LOTE
+        importacion = self._obtener_punto_control(ruta, usuario)
+        reanudada_desde = importacion.ultima_fila
+        
+        if importacion.esta_completada:
+            return self._resumen(importacion, reanudada_desde)
+        
+        self._periodos_cerrados = [(periodo.fecha_inicio, corte_de_periodo(periodo))
+                                   for periodo in PeriodoRepository(self.session).get_cerrados()]
+        reporte = config.IMPORTACIONES_DIR / f"errores_importacion_{importacion.id}.csv"
+        filas = (f for f in leer_filas(ruta) if f[0] > importacion.ultima_fila)
+        
+        with open(reporte, 'a', newline='', encoding='utf-8') as archivo_errores:
+            errores = csv.writer(archivo_errores)
+            if archivo_errores.tell() == 0:
+                errores.writerow(['fila', 'error'] + list(COLUMNAS_IMPORTACION))
+            
+            while True:
+                lote = list(islice(filas, tamano_lote))
+                if not lote:
+                    break
+                self._procesar_lote(lote, usuario, importacion, errores)
+                self.session.commit()
+                archivo_errores.flush()
+                
+                if progreso:
+                    leidas = importacion.filas_importadas + importacion.filas_con_error
+                    progreso(leidas, importacion.filas_importadas, importacion.filas_con_error)
+        
+        importacion.completada = 1
+        self.auditoria_repo.registrar_actividad(
+            usuario_id=usuario.id,
+            tipo_actividad=ACTIVIDAD_IMPORTACION,
+            descripcion=(f"Importación de {ruta.name}: {importacion.filas_importadas} transacciones, "
+                         f"{importacion.filas_con_error} filas con error")
+        )
+        self.session.commit()
+        
+        if importacion.filas_con_error == 0:
+            reporte.unlink(missing_ok=True)
+        app_logger.info(f"Importación de {ruta.name} completada: {importacion.filas_importadas} "
+                        f"transacciones, {importacion.filas_con_error} errores")
+        return self._resumen(importacion, reanudada_desde, reporte)
+    
+    def _procesar_lote(self, lote: List[Tuple[int, Dict]], usuario: Usuario,
+                       importacion: Importacion, errores):
+        """Valida un lote, registra las filas válidas y actualiza el punto de control"""
+        registros = []
+        numeros = []
+        for numero, fila in lote:
+            registro, error = self._validar_fila(fila, usuario)
+            if error:
+                errores.writerow([numero, error] + [fila[c] for c in COLUMNAS_IMPORTACION])
+                importacion.filas_con_error += 1
+            else:
+                registros.append(registro)
+                numeros.append((numero, fila))
+        
+        resultados = self.contabilidad_service.registrar_lote(registros)
+        for (numero, fila), (exito, mensaje) in zip(numeros, resultados):
+            if exito:
+                importacion.filas_importadas += 1
+            else:
+                errores.writerow([numero, mensaje] + [fila[c] for c in COLUMNAS_IMPORTACION])
+                importacion.filas_con_error += 1
+        
+        importacion.ultima_fila = lote[-1][0]
+    
+    def _validar_fila(self, fila: Dict, usuario: Usuario) -> Tuple[Optional[tuple], Optional[str]]:
+        """
+        Valida y convierte una fila con las reglas de ValidacionService
+        
+        Returns:
+            Tupla (registro para registrar_lote, None) o (None, mensaje de error)
+        """
+        fecha = self._convertir_fecha(fila['fecha'])
+        if fecha is None:
+            return None, "Fecha inválida"
+        if any(inicio <= fecha < corte for inicio, corte in self._periodos_cerrados):
+            return None, MENSAJE_PERIODO_CERRADO
+        
+        tipo = TIPOS_IMPORTABLES.get(_normalizar(fila['tipo']))
+        if tipo is None:
+            return None, "Tipo inválido (use Venta o Compra)"
+        
+        concepto = str(fila['concepto'] or '').strip()
+        valido, mensaje = self.validacion_service.validar_concepto(concepto)
+        if not valido:
+            return None, mensaje
+        
+        monto = fila['monto']
+        if not isinstance(monto, (int, float)):
+            monto = limpiar_monto(str(monto or ''))
+            if monto is None:
+                return None, "Monto inválido"
+        valido, mensaje = self.validacion_service.validar_monto(monto)
+        if not valido:
+            return None, mensaje
+        
+        return (tipo, concepto, float(monto), usuario, fecha), None
+    
+    @staticmethod
+    def _convertir_fecha(valor: Any) -> Optional[datetime]:
+        """Convierte el valor de una celda en datetime"""
+        if isinstance(valor, datetime):
+            return valor
+        if isinstance(valor, date):
+            return datetime(valor.year, valor.month, valor.day)
+        texto = str(valor or '').strip()
+        for formato in FORMATOS_FECHA:
+            try:
+                return datetime.strptime(texto, formato)
+            except ValueError:
+                continue
+        return None
+    
+    def _obtener_punto_control(self, ruta: Path, usuario: Usuario) -> Importacion:
+        """Obtiene la importación en curso de este archivo o crea una nueva"""
+        huella = huella_archivo(ruta)
+        importacion = self.session.query(Importacion).filter(
+            Importacion.huella == huella
+        ).order_by(Importacion.id.desc()).first()
+        
+        if importacion is None:
+            importacion = Importacion(archivo=str(ruta), huella=huella, ultima_fila=0,
+                                      filas_importadas=0, filas_con_error=0, completada=0,
+                                      usuario_id=usuario.id)
+            self.session.add(importacion)
+            self.session.commit()
+        elif not importacion.esta_completada:
+            app_logger.info(f"Reanudando importación de {ruta.name} desde la fila {importacion.ultima_fila + 1}")
+        return importacion
+    
+    @staticmethod
+    def _resumen(importacion: Importacion, reanudada_desde: int, reporte: Optional[Path] = None) -> Dict:
+        return {
+            'importadas': importacion.filas_importadas,
+            'errores': importacion.filas_con_error,
+            'reanudada_desde': reanudada_desde,
+            'completada': importacion.esta_completada,
+            'reporte_errores': str(reporte) if reporte and importacion.filas_con_error else None
+        }
@@ -0,0 +1,115 @@
+"""
+Servicio de Períodos contables
+
+Cada transacción y cada asiento guardan el período que contiene su fecha
+(periodo_id): los listados, totales y exportaciones de un período se leen
+por los índices (periodo_id, ...) sin recorrer las filas de los demás.
+ContabilidadService lo asigna al registrar, desde el índice en memoria de
+períodos; este servicio crea períodos sin superposiciones (así cada fecha
+tiene a lo sumo un período) y completa el período de las filas existentes
+que no lo tienen, por lotes que se confirman de a uno: si se interrumpe,
+volver a ejecutarlo sigue desde donde quedó.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.constants import ACTIVIDAD_CREAR_PERIODO
+from app.models.usuario import Usuario
+from app.repositories.asiento_repository import AsientoRepository
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.utils.logger import app_logger
+import config
+
+
+class PeriodosService:
+    """Servicio para crear períodos y asignarlos a las transacciones"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.periodo_repo = PeriodoRepository(session)
+        self.transaccion_repo = TransaccionRepository(session)
+        self.asiento_repo = AsientoRepository(session)
+        self.auditoria_repo = AuditoriaRepository(session)
+
+    def crear_periodo(self, nombre: str, fecha_inicio: datetime, fecha_fin: Optional[datetime],
+                      usuario: Usuario) -> Tuple[bool, str]:
+        """
+        Crea un período contable
+
+        El período abarca desde fecha_inicio hasta el final del día de
+        fecha_fin, y no puede compartir días con otro período. Las
+        transacciones que ya existen en esas fechas quedan sin período hasta
+        ejecutar asignar_pendientes.
+
+        Args:
+            nombre: Nombre del período (p. ej. "Ejercicio 2025")
+            fecha_inicio: Primer día del período
+            fecha_fin: Último día del período (None si no tiene fin)
+            usuario: Usuario que crea el período
+
+        Returns:
+            Tupla (exito, mensaje)
+        """
+        nombre = nombre.strip()
+        if not nombre:
+            return False, "El nombre del período es obligatorio"
+        if fecha_fin is not None and fecha_fin.date() < fecha_inicio.date():
+            return False, "La fecha de fin es anterior a la de inicio"
+        superpuestos = self.periodo_repo.get_superpuestos(fecha_inicio, fecha_fin)
+        if superpuestos:
+            return False, f"Las fechas se superponen con el período {superpuestos[0].nombre}"
+
+        periodo = self.periodo_repo.create(
+            nombre=nombre,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            cerrado=0,
+            resultado=0.0
+        )
+        self.auditoria_repo.registrar_actividad(
+            usuario_id=usuario.id,
+            tipo_actividad=ACTIVIDAD_CREAR_PERIODO,
+            descripcion=f"Período {nombre} creado (ID {periodo.id})"
+        )
+        return True, f"Período {nombre} creado"
+
+    def asignar_pendientes(self, tamano_lote: Optional[int] = None,
+                           progreso: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """
+        Asigna su período a las transacciones y asientos que no lo tienen
+
+        Recorre los períodos en orden y, dentro de cada uno, actualiza las
+        transacciones sin período por lotes, confirmando cada lote. Las
+        filas cuya fecha no cae en ningún período siguen sin período.
+
+        Args:
+            tamano_lote: Transacciones por lote (None para config.PERIODOS_ASIGNACION_LOTE)
+            progreso: Función opcional llamada tras cada lote con el total
+                      de transacciones asignadas hasta el momento
+
+        Returns:
+            Diccionario con transacciones y asientos asignados, y sin_periodo
+            (transacciones que quedaron sin período)
+        """
+        tamano_lote = tamano_lote or config.PERIODOS_ASIGNACION_LOTE
+        transacciones = asientos = 0
+
+        for rango in self.periodo_repo.get_rangos():
+            asientos += self.asiento_repo.asignar_periodo(rango.id, rango.inicio, rango.fin)
+            self.session.commit()
+            while True:
+                asignadas = self.transaccion_repo.asignar_periodo(rango.id, rango.inicio, rango.fin,
+                                                                  tamano_lote)
+                self.session.commit()
+                transacciones += asignadas
+                if progreso and asignadas:
+                    progreso(transacciones)
+                if asignadas < tamano_lote:
+                    break
+
+        sin_periodo = self.transaccion_repo.contar_sin_periodo()
+        app_logger.info(f"Períodos asignados: {transacciones} transacciones, {asientos} asientos; "
+                        f"{sin_periodo} transacciones fuera de todo período")
+        return {'transacciones': transacciones, 'asientos': asientos, 'sin_periodo': sin_periodo}
@@ -1,13 +1,50 @@
 """
 Servicio de Reportes
 """
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Iterable, Iterator, Optional, Callable, Union, TextIO
+from datetime import date, datetime, timedelta
 from app.repositories.transaccion_repository import TransaccionRepository
 from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
 from app.services.contabilidad_service import ContabilidadService
 from sqlalchemy.orm import Session
 
+# Cantidad de registros que se leen de la base por cada página al generar reportes
+TAMANO_PAGINA_REPORTE = 500
+
+
+def escribir_reporte(lineas: Iterable[str], destino: Union[TextIO, Callable[[str], None]],
+                     lineas_por_bloque: int = 200) -> int:
+    """
+    Escribe un reporte en un destino a medida que se generan sus líneas
+    
+    Las líneas se agrupan en bloques para no llamar al destino por cada línea.
+    Solo se mantiene en memoria el bloque actual.
+    
+    Args:
+        lineas: Iterable de líneas (cada una terminada en salto de línea)
+        destino: Objeto con método write (archivo, socket.makefile, StringIO)
+                 o función que recibe cada bloque de texto
+        lineas_por_bloque: Líneas por bloque entregado al destino
+    
+    Returns:
+        Número de líneas escritas
+    """
+    escribir = destino.write if hasattr(destino, 'write') else destino
+    bloque = []
+    total = 0
+    for linea in lineas:
+        bloque.append(linea)
+        total += 1
+        if len(bloque) >= lineas_por_bloque:
+            escribir("".join(bloque))
+            bloque.clear()
+    if bloque:
+        escribir("".join(bloque))
+    return total
+
 
 class ReportesService:
     """Servicio para generación de reportes"""
@@ -17,112 +54,133 @@ class ReportesService:
         self.contabilidad_service = ContabilidadService(session)
         self.transaccion_repo = TransaccionRepository(session)
         self.auditoria_repo = AuditoriaRepository(session)
+        self.resumen_repo = ResumenRepository(session)
+        self.periodo_repo = PeriodoRepository(session)
     
     def generar_balance_general_texto(self) -> str:
         """
         Genera el balance general en formato texto
         
+        Los estados financieros salen de la caché; el texto se arma en cada
+        llamada para que la fecha del encabezado sea la actual.
+        
         Returns:
             String con el balance formateado
         """
-        balance = self.contabilidad_service.obtener_balance_general()
+        return "".join(self.iterar_balance_general())
+    
+    def iterar_balance_general(self) -> Iterator[str]:
+        """
+        Genera el balance general línea por línea
         
-        texto = "=" * 60 + "\n"
-        texto += "BALANCE GENERAL\n"
-        texto += f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
-        texto += "=" * 60 + "\n\n"
+        Yields:
+            Líneas del reporte
+        """
+        balance, estado_resultados = self.contabilidad_service.obtener_estados_financieros()
+        
+        yield "=" * 60 + "\n"
+        yield "BALANCE GENERAL\n"
+        yield f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+        yield "=" * 60 + "\n\n"
         
         # ACTIVO
-        texto += "ACTIVO\n" + "-" * 30 + "\n"
-        texto += "ACTIVO CORRIENTE:\n"
+        yield "ACTIVO\n" + "-" * 30 + "\n"
+        yield "ACTIVO CORRIENTE:\n"
         for cuenta, monto in balance['activo_corriente'].items():
-            texto += f"  {cuenta}: ${monto:,.2f}\n"
-        texto += f"  TOTAL ACTIVO CORRIENTE: ${balance['total_activo_corriente']:,.2f}\n\n"
+            yield f"  {cuenta}: ${monto:,.2f}\n"
+        yield f"  TOTAL ACTIVO CORRIENTE: ${balance['total_activo_corriente']:,.2f}\n\n"
         
-        texto += "ACTIVO NO CORRIENTE:\n"
+        yield "ACTIVO NO CORRIENTE:\n"
         for cuenta, monto in balance['activo_no_corriente'].items():
-            texto += f"  {cuenta}: ${monto:,.2f}\n"
-        texto += f"  TOTAL ACTIVO NO CORRIENTE: ${balance['total_activo_no_corriente']:,.2f}\n\n"
-        texto += f"TOTAL ACTIVO: ${balance['total_activo']:,.2f}\n\n"
+            yield f"  {cuenta}: ${monto:,.2f}\n"
+        yield f"  TOTAL ACTIVO NO CORRIENTE: ${balance['total_activo_no_corriente']:,.2f}\n\n"
+        yield f"TOTAL ACTIVO: ${balance['total_activo']:,.2f}\n\n"
         
         # PASIVO
-        texto += "PASIVO\n" + "-" * 30 + "\n"
-        texto += "PASIVO CORRIENTE:\n"
+        yield "PASIVO\n" + "-" * 30 + "\n"
+        yield "PASIVO CORRIENTE:\n"
         for cuenta, monto in balance['pasivo_corriente'].items():
-            texto += f"  {cuenta}: ${monto:,.2f}\n"
-        texto += f"  TOTAL PASIVO CORRIENTE: ${balance['total_pasivo_corriente']:,.2f}\n\n"
+            yield f"  {cuenta}: ${monto:,.2f}\n"
+        yield f"  TOTAL PASIVO CORRIENTE: ${balance['total_pasivo_corriente']:,.2f}\n\n"
         
-        texto += "PASIVO NO CORRIENTE:\n"
+        yield "PASIVO NO CORRIENTE:\n"
         for cuenta, monto in balance['pasivo_no_corriente'].items():
-            texto += f"  {cuenta}: ${monto:,.2f}\n"
-        texto += f"  TOTAL PASIVO NO CORRIENTE: ${balance['total_pasivo_no_corriente']:,.2f}\n\n"
-        texto += f"TOTAL PASIVO: ${balance['total_pasivo']:,.2f}\n\n"
+            yield f"  {cuenta}: ${monto:,.2f}\n"
+        yield f"  TOTAL PASIVO NO CORRIENTE: ${balance['total_pasivo_no_corriente']:,.2f}\n\n"
+        yield f"TOTAL PASIVO: ${balance['total_pasivo']:,.2f}\n\n"
         
         # PATRIMONIO
-        texto += "PATRIMONIO NETO\n" + "-" * 30 + "\n"
+        yield "PATRIMONIO NETO\n" + "-" * 30 + "\n"
         for cuenta, monto in balance['patrimonio'].items():
-            texto += f"  {cuenta}: ${monto:,.2f}\n"
+            yield f"  {cuenta}: ${monto:,.2f}\n"
         
         # Agregar resultado del período
-        estado_resultados = self.contabilidad_service.obtener_estado_resultados()
         resultado_periodo = estado_resultados['resultado_periodo']
-        texto += f"  Resultado del Período: ${resultado_periodo:,.2f}\n"
-        texto += f"TOTAL PATRIMONIO NETO: ${balance['total_patrimonio'] + resultado_periodo:,.2f}\n\n"
+        yield f"  Resultado del Período: ${resultado_periodo:,.2f}\n"
+        yield f"TOTAL PATRIMONIO NETO: ${balance['total_patrimonio'] + resultado_periodo:,.2f}\n\n"
         
         # VERIFICACIÓN
-        texto += "=" * 60 + "\n"
-        texto += "VERIFICACIÓN ECUACIÓN CONTABLE\n"
-        texto += "=" * 60 + "\n"
-        texto += f"ACTIVO: ${balance['total_activo']:,.2f}\n"
+        yield "=" * 60 + "\n"
+        yield "VERIFICACIÓN ECUACIÓN CONTABLE\n"
+        yield "=" * 60 + "\n"
+        yield f"ACTIVO: ${balance['total_activo']:,.2f}\n"
         total_pasivo_patrimonio = balance['total_pasivo'] + balance['total_patrimonio'] + resultado_periodo
-        texto += f"PASIVO + PATRIMONIO NETO: ${total_pasivo_patrimonio:,.2f}\n"
+        yield f"PASIVO + PATRIMONIO NETO: ${total_pasivo_patrimonio:,.2f}\n"
         
         diferencia = abs(balance['total_activo'] - total_pasivo_patrimonio)
         if diferencia < 0.01:
-            texto += "✓ La ecuación contable está balanceada\n"
+            yield "✓ La ecuación contable está balanceada\n"
         else:
-            texto += f"✗ ERROR: La ecuación contable NO está balanceada (diferencia: ${diferencia:,.2f})\n"
-        
-        return texto
+            yield f"✗ ERROR: La ecuación contable NO está balanceada (diferencia: ${diferencia:,.2f})\n"
     
     def generar_estado_resultados_texto(self) -> str:
         """
         Genera el estado de resultados en formato texto
         
+        Los importes salen de la caché; el texto se arma en cada llamada para
+        que la fecha del encabezado sea la actual.
+        
         Returns:
             String con el estado de resultados formateado
         """
+        return "".join(self.iterar_estado_resultados())
+    
+    def iterar_estado_resultados(self) -> Iterator[str]:
+        """
+        Genera el estado de resultados línea por línea
+        
+        Yields:
+            Líneas del reporte
+        """
         resultado = self.contabilidad_service.obtener_estado_resultados()
         
-        texto = "=" * 60 + "\n"
-        texto += "ESTADO DE RESULTADOS\n"
-        texto += f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
-        texto += "=" * 60 + "\n\n"
+        yield "=" * 60 + "\n"
+        yield "ESTADO DE RESULTADOS\n"
+        yield f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+        yield "=" * 60 + "\n\n"
         
         # INGRESOS
-        texto += "INGRESOS:\n"
+        yield "INGRESOS:\n"
         for concepto, monto in resultado['ingresos'].items():
-            texto += f"  {concepto}: ${monto:,.2f}\n"
-        texto += f"  TOTAL INGRESOS: ${resultado['total_ingresos']:,.2f}\n\n"
+            yield f"  {concepto}: ${monto:,.2f}\n"
+        yield f"  TOTAL INGRESOS: ${resultado['total_ingresos']:,.2f}\n\n"
         
         # GASTOS
-        texto += "GASTOS:\n"
+        yield "GASTOS:\n"
         for concepto, monto in resultado['gastos'].items():
-            texto += f"  {concepto}: ${monto:,.2f}\n"
-        texto += f"  TOTAL GASTOS: ${resultado['total_gastos']:,.2f}\n\n"
+            yield f"  {concepto}: ${monto:,.2f}\n"
+        yield f"  TOTAL GASTOS: ${resultado['total_gastos']:,.2f}\n\n"
         
         # RESULTADO
         resultado_periodo = resultado['resultado_periodo']
-        texto += f"RESULTADO DEL PERÍODO: ${resultado_periodo:,.2f}\n"
+        yield f"RESULTADO DEL PERÍODO: ${resultado_periodo:,.2f}\n"
         
         if resultado_periodo > 0:
-            texto += "(GANANCIA)\n"
+            yield "(GANANCIA)\n"
         elif resultado_periodo < 0:
-            texto += "(PÉRDIDA)\n"
+            yield "(PÉRDIDA)\n"
         else:
-            texto += "(PUNTO DE EQUILIBRIO)\n"
-        
-        return texto
+            yield "(PUNTO DE EQUILIBRIO)\n"
     
     def generar_reporte_transacciones(self, limite: int = 50) -> str:
         """
@@ -130,29 +188,69 @@ class ReportesService:
         
         Args:
             limite: Número de transacciones a mostrar
-            
+        
         Returns:
             String con el reporte
         """
-        transacciones = self.transaccion_repo.get_all()
-        transacciones = sorted(transacciones, key=lambda x: x.fecha, reverse=True)[:limite]
+        return "".join(self.iterar_reporte_transacciones(limite))
+    
+    def iterar_reporte_transacciones(self, limite: Optional[int] = 50,
+                                     periodo_id: Optional[int] = None) -> Iterator[str]:
+        """
+        Genera el reporte de transacciones línea por línea
         
-        texto = "=" * 80 + "\n"
-        texto += "REPORTE DE TRANSACCIONES\n"
-        texto += f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
-        texto += f"Últimas {len(transacciones)} transacciones\n"
-        texto += "=" * 80 + "\n\n"
+        Las transacciones se leen por páginas, de modo que la memoria usada
+        no depende del número de transacciones del reporte. Con un período,
+        se leen por el índice (periodo_id, fecha, id) sin tocar las de otros
+        períodos.
         
-        for t in transacciones:
-            texto += f"Fecha: {t.fecha.strftime('%d/%m/%Y %H:%M')}\n"
-            texto += f"Tipo: {t.tipo}\n"
-            texto += f"Concepto: {t.concepto}\n"
-            texto += f"Monto: ${t.monto:,.2f}\n"
-            texto += f"Cuenta: {t.cuenta.nombre if t.cuenta else 'N/A'}\n"
-            texto += f"Usuario: {t.usuario.nombre_completo if t.usuario else 'N/A'}\n"
-            texto += "-" * 80 + "\n"
+        Args:
+            limite: Número de transacciones a mostrar (None para todas)
+            periodo_id: Solo las transacciones de un período (opcional)
         
-        return texto
+        Yields:
+            Líneas del reporte
+        """
+        periodo = self.periodo_repo.get_by_id(periodo_id) if periodo_id else None
+        if periodo:
+            cantidad = self.transaccion_repo.contar_por_periodo(periodo.id, limite)
+        else:
+            cantidad = self.transaccion_repo.count_hasta(limite)
+        
+        yield "=" * 80 + "\n"
+        yield "REPORTE DE TRANSACCIONES\n"
+        yield f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+        if periodo:
+            fin = f"{periodo.fecha_fin:%d/%m/%Y}" if periodo.fecha_fin else "en curso"
+            yield f"Período: {periodo.nombre} ({periodo.fecha_inicio:%d/%m/%Y} - {fin})\n"
+        yield f"Últimas {cantidad} transacciones\n"
+        yield "=" * 80 + "\n\n"
+        
+        for t in self._iterar_paginas(self.transaccion_repo.get_pagina, lambda t: (t.fecha, t.id),
+                                      limite, con_relaciones=True, periodo_id=periodo_id):
+            yield f"Fecha: {t.fecha.strftime('%d/%m/%Y %H:%M')}\n"
+            yield f"Tipo: {t.tipo}\n"
+            yield f"Concepto: {t.concepto}\n"
+            yield f"Monto: ${t.monto:,.2f}\n"
+            yield f"Cuenta: {t.cuenta.nombre if t.cuenta else 'N/A'}\n"
+            yield f"Usuario: {t.usuario.nombre_completo if t.usuario else 'N/A'}\n"
+            yield "-" * 80 + "\n"
+    
+    def iterar_reporte_periodo_actual(self, limite: Optional[int] = None) -> Iterator[str]:
+        """
+        Genera el reporte de transacciones del período que contiene la fecha actual
+        
+        Args:
+            limite: Número de transacciones a mostrar (None para todas)
+        
+        Yields:
+            Líneas del reporte
+        """
+        periodo = self.periodo_repo.get_actual()
+        if periodo is None:
+            yield "No hay un período que contenga la fecha actual\n"
+            return
+        yield from self.iterar_reporte_transacciones(limite, periodo.id)
     
     def generar_reporte_actividades(self, usuario_id: int = None, limite: int = 100) -> str:
         """
@@ -161,27 +259,142 @@ class ReportesService:
         Args:
             usuario_id: ID del usuario (None para todas las actividades)
             limite: Número de actividades a mostrar
-            
+        
         Returns:
             String con el reporte
         """
+        return "".join(self.iterar_reporte_actividades(usuario_id, limite))
+    
+    def iterar_reporte_actividades(self, usuario_id: int = None,
+                                   limite: Optional[int] = 100) -> Iterator[str]:
+        """
+        Genera el reporte de actividades línea por línea
+        
+        Args:
+            usuario_id: ID del usuario (None para todas las actividades)
+            limite: Número de actividades a mostrar (None para todas)
+        
+        Yields:
+            Líneas del reporte
+        """
         if usuario_id:
-            actividades = self.auditoria_repo.get_by_usuario(usuario_id)[:limite]
             titulo = f"Actividades del usuario ID {usuario_id}"
         else:
-            actividades = self.auditoria_repo.get_recientes(limite)
             titulo = "Todas las actividades"
         
-        texto = "=" * 80 + "\n"
-        texto += f"REPORTE DE ACTIVIDADES - {titulo}\n"
-        texto += f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
-        texto += "=" * 80 + "\n\n"
+        yield "=" * 80 + "\n"
+        yield f"REPORTE DE ACTIVIDADES - {titulo}\n"
+        yield f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+        yield "=" * 80 + "\n\n"
+        
+        for act in self._iterar_paginas(self.auditoria_repo.get_pagina,
+                                        lambda a: (a.fecha_hora, a.id),
+                                        limite, usuario_id=usuario_id, con_usuario=True):
+            yield f"Usuario: {act.usuario.username} ({act.usuario.nombre_completo})\n"
+            yield f"Fecha/Hora: {act.fecha_hora.strftime('%d/%m/%Y %H:%M:%S')}\n"
+            yield f"Tipo: {act.tipo_actividad}\n"
+            yield f"Descripción: {act.descripcion}\n"
+            yield "-" * 80 + "\n"
+    
+    def obtener_ventas_compras_por_mes(self, desde: Optional[date] = None,
+                                       hasta: Optional[date] = None) -> List[Dict]:
+        """
+        Obtiene los totales de ventas y compras de cada mes
+        
+        Se leen del resumen mensual, una fila por mes y cuenta, sin importar
+        cuántas transacciones haya.
+        
+        Args:
+            desde: Mes inicial inclusive (opcional)
+            hasta: Día final exclusivo (opcional)
+        
+        Returns:
+            Lista de diccionarios con mes (primer día), ventas, cantidad_ventas,
+            compras y cantidad_compras, en orden cronológico
+        """
+        claves = {TIPO_TRANSACCION_VENTA: 'ventas', TIPO_TRANSACCION_COMPRA: 'compras'}
+        meses: Dict[date, Dict] = {}
+        for mes, tipo, cantidad, total in self.resumen_repo.totales_por_mes(desde, hasta):
+            if tipo not in claves:
+                continue
+            fila = meses.setdefault(mes, {'mes': mes, 'ventas': 0.0, 'cantidad_ventas': 0,
+                                          'compras': 0.0, 'cantidad_compras': 0})
+            fila[claves[tipo]] = total
+            fila[f"cantidad_{claves[tipo]}"] = cantidad
+        return list(meses.values())
+    
+    def obtener_ventas_compras_del_mes(self, fecha: Optional[date] = None) -> Dict[str, float]:
+        """
+        Obtiene el total de ventas y de compras del mes de una fecha
+        
+        Args:
+            fecha: Cualquier día del mes (None para el mes actual)
         
-        for act in actividades:
-            texto += f"Usuario: {act.usuario.username} ({act.usuario.nombre_completo})\n"
-            texto += f"Fecha/Hora: {act.fecha_hora.strftime('%d/%m/%Y %H:%M:%S')}\n"
-            texto += f"Tipo: {act.tipo_actividad}\n"
-            texto += f"Descripción: {act.descripcion}\n"
-            texto += "-" * 80 + "\n"
+        Returns:
+            Diccionario con ventas y compras
+        """
+        inicio = (fecha or date.today()).replace(day=1)
+        fin = (inicio + timedelta(days=32)).replace(day=1)
+        return {
+            'ventas': self.resumen_repo.get_total(TIPO_TRANSACCION_VENTA, inicio, fin),
+            'compras': self.resumen_repo.get_total(TIPO_TRANSACCION_COMPRA, inicio, fin)
+        }
+    
+    def iterar_ventas_compras_por_mes(self, desde: Optional[date] = None,
+                                      hasta: Optional[date] = None) -> Iterator[str]:
+        """
+        Genera el reporte de ventas y compras por mes línea por línea
+        
+        Args:
+            desde: Mes inicial inclusive (opcional)
+            hasta: Día final exclusivo (opcional)
+        
+        Yields:
+            Líneas del reporte
+        """
+        meses = self.obtener_ventas_compras_por_mes(desde, hasta)
         
-        return texto
+        yield "=" * 80 + "\n"
+        yield "VENTAS Y COMPRAS POR MES\n"
+        yield f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+        yield "=" * 80 + "\n\n"
+        
+        yield f"{'Mes':<10}{'Ventas':>20}{'Compras':>20}{'Diferencia':>20}\n"
+        yield "-" * 70 + "\n"
+        for fila in meses:
+            yield (f"{fila['mes'].strftime('%m/%Y'):<10}{fila['ventas']:>20,.2f}"
+                   f"{fila['compras']:>20,.2f}{fila['ventas'] - fila['compras']:>20,.2f}\n")
+        yield "-" * 70 + "\n"
+        
+        total_ventas = sum(fila['ventas'] for fila in meses)
+        total_compras = sum(fila['compras'] for fila in meses)
+        yield (f"{'TOTAL':<10}{total_ventas:>20,.2f}{total_compras:>20,.2f}"
+               f"{total_ventas - total_compras:>20,.2f}\n")
+    
+    def _iterar_paginas(self, get_pagina: Callable[..., List], clave: Callable,
+                        limite: Optional[int], **filtros) -> Iterator:
+        """
+        Recorre un listado paginado por clave hasta agotar el límite
+        
+        Args:
+            get_pagina: Método get_pagina de un repositorio
+            clave: Función que obtiene la clave de paginación de un registro
+            limite: Total máximo de registros (None para todos)
+            **filtros: Filtros adicionales para get_pagina
+        
+        Yields:
+            Registros en orden descendente de fecha
+        """
+        restantes = limite
+        despues_de = None
+        while restantes is None or restantes > 0:
+            tamano = TAMANO_PAGINA_REPORTE if restantes is None else min(restantes, TAMANO_PAGINA_REPORTE)
+            pagina = get_pagina(limite=tamano, despues_de=despues_de, **filtros)
+            if not pagina:
+                return
+            yield from pagina
+            if restantes is not None:
+                restantes -= len(pagina)
+            if len(pagina) < tamano:
+                return
+            despues_de = clave(pagina[-1])
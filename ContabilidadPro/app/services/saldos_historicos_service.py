@@ -0,0 +1,187 @@
+"""
+Servicio de Saldos Históricos (instantáneas de saldos por fecha de corte)
+
+Cada instantánea guarda el saldo de cada cuenta considerando las
+transacciones con fecha anterior al corte. Los cortes se generan en forma
+incremental: el saldo de un corte es el del corte anterior más los
+movimientos entre ambos. Un saldo a cualquier fecha se obtiene leyendo el
+último corte anterior y sumando solo los movimientos posteriores a él.
+"""
+from datetime import datetime, time
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.periodo import Periodo
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.indice_periodos import fin_exclusivo
+from app.repositories.resumen_repository import ResumenRepository
+from app.utils.logger import app_logger
+
+# Diferencia máxima admitida entre un saldo guardado y el recalculado
+TOLERANCIA_SALDO = 0.005
+
+
+def corte_de_periodo(periodo: Periodo) -> datetime:
+    """Fecha de corte de un período: el inicio del día siguiente a su fecha de fin"""
+    return fin_exclusivo(periodo.fecha_fin)
+
+
+def _mes_siguiente(fecha: datetime) -> datetime:
+    """Primer instante del mes siguiente al de la fecha"""
+    if fecha.month == 12:
+        return datetime(fecha.year + 1, 1, 1)
+    return datetime(fecha.year, fecha.month + 1, 1)
+
+
+def _es_inicio_de_dia(fecha: datetime) -> bool:
+    """Indica si la fecha es el primer instante de un día"""
+    return fecha.time() == time.min
+
+
+class SaldosHistoricosService:
+    """Servicio para generar, consultar y verificar saldos históricos"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.saldo_repo = SaldoHistoricoRepository(session)
+        self.transaccion_repo = TransaccionRepository(session)
+        self.periodo_repo = PeriodoRepository(session)
+        self.resumen_repo = ResumenRepository(session)
+
+    def generar_instantanea(self, fecha_corte: datetime, periodo_id: Optional[int] = None) -> int:
+        """
+        Genera (o regenera) la instantánea de saldos de un corte
+
+        Parte del corte anterior y le suma los movimientos hasta fecha_corte,
+        así que solo lee las transacciones entre ambos cortes.
+
+        Args:
+            fecha_corte: Fecha de corte (exclusiva); no puede ser futura
+            periodo_id: Período al que corresponde el corte (opcional)
+
+        Returns:
+            Número de cuentas de la instantánea
+        """
+        if fecha_corte > datetime.now():
+            raise ValueError("No se puede generar una instantánea con fecha de corte futura")
+
+        saldos = self.saldos_a_fecha(fecha_corte, incluir_corte_exacto=False)
+        self.saldo_repo.reemplazar_corte(fecha_corte, saldos, periodo_id)
+        return len(saldos)
+
+    def generar_instantanea_periodo(self, periodo: Periodo) -> int:
+        """
+        Genera la instantánea de cierre de un período
+
+        Args:
+            periodo: Período con fecha de fin
+
+        Returns:
+            Número de cuentas de la instantánea
+        """
+        if periodo.fecha_fin is None:
+            raise ValueError(f"El período {periodo.nombre} no tiene fecha de fin")
+        return self.generar_instantanea(corte_de_periodo(periodo), periodo.id)
+
+    def generar_pendientes(self, hasta: Optional[datetime] = None) -> List[datetime]:
+        """
+        Genera las instantáneas que falten: una por cada mes completo y una por
+        cada período cerrado
+
+        Los meses se generan a partir del último corte existente (o del mes de
+        la primera transacción), por lo que llamarlo seguido solo agrega los
+        meses nuevos.
+
+        Args:
+            hasta: Fecha límite de los cortes (None para la fecha actual)
+
+        Returns:
+            Fechas de corte generadas, en orden
+        """
+        hasta = hasta or datetime.now()
+        cortes_existentes = set(self.saldo_repo.get_cortes())
+
+        pendientes = {}
+        for periodo in self.periodo_repo.get_cerrados():
+            corte = corte_de_periodo(periodo)
+            if corte <= hasta and corte not in cortes_existentes:
+                pendientes[corte] = periodo.id
+
+        inicio = self.saldo_repo.get_ultimo_corte() or self.transaccion_repo.get_primera_fecha()
+        if inicio is not None:
+            corte = _mes_siguiente(inicio)
+            while corte <= hasta:
+                if corte not in cortes_existentes:
+                    pendientes.setdefault(corte, None)
+                corte = _mes_siguiente(corte)
+
+        # En orden cronológico, para que cada corte parta del anterior
+        for corte in sorted(pendientes):
+            self.generar_instantanea(corte, pendientes[corte])
+
+        if pendientes:
+            app_logger.info(f"Instantáneas de saldos generadas: {len(pendientes)}")
+        return sorted(pendientes)
+
+    def saldos_a_fecha(self, fecha: datetime, incluir_corte_exacto: bool = True) -> Dict[int, float]:
+        """
+        Calcula el saldo de cada cuenta considerando las transacciones anteriores a una fecha
+
+        Lee la instantánea más reciente que no supere la fecha y le suma los
+        movimientos posteriores a ella. Si ambas fechas caen al inicio de un
+        día (como los cortes mensuales y de período), los movimientos se
+        leen de los resúmenes diarios y mensuales.
+
+        Args:
+            fecha: Fecha límite (exclusiva)
+            incluir_corte_exacto: False para no usar una instantánea de esa misma fecha
+
+        Returns:
+            Diccionario {cuenta_id: saldo}
+        """
+        corte = self.saldo_repo.get_ultimo_corte(fecha, incluir_corte_exacto)
+        saldos = self.saldo_repo.get_saldos(corte) if corte else {}
+
+        if _es_inicio_de_dia(fecha) and (corte is None or _es_inicio_de_dia(corte)):
+            movimientos_por_cuenta = self.resumen_repo.sumar_por_cuenta(corte, fecha)
+        else:
+            movimientos_por_cuenta = self.transaccion_repo.sumar_por_cuenta(corte, fecha)
+
+        for cuenta_id, movimientos in movimientos_por_cuenta.items():
+            saldos[cuenta_id] = saldos.get(cuenta_id, 0.0) + movimientos
+        return saldos
+
+    def verificar(self) -> List[Dict]:
+        """
+        Verifica que cada instantánea coincida con la suma de las transacciones
+
+        Recorre los cortes en orden acumulando los movimientos entre uno y
+        otro, de modo que cada transacción se lee una sola vez.
+
+        Returns:
+            Lista de diferencias, cada una con fecha_corte, cuenta_id,
+            saldo_guardado y saldo_calculado (vacía si todo coincide)
+        """
+        diferencias = []
+        calculados: Dict[int, float] = {}
+        anterior = None
+
+        for corte in self.saldo_repo.get_cortes():
+            for cuenta_id, movimientos in self.transaccion_repo.sumar_por_cuenta(anterior, corte).items():
+                calculados[cuenta_id] = calculados.get(cuenta_id, 0.0) + movimientos
+            guardados = self.saldo_repo.get_saldos(corte)
+
+            for cuenta_id in calculados.keys() | guardados.keys():
+                guardado = guardados.get(cuenta_id, 0.0)
+                calculado = calculados.get(cuenta_id, 0.0)
+                if abs(guardado - calculado) > TOLERANCIA_SALDO:
+                    diferencias.append({
+                        'fecha_corte': corte,
+                        'cuenta_id': cuenta_id,
+                        'saldo_guardado': guardado,
+                        'saldo_calculado': calculado
+                    })
+            anterior = corte
+
+        return diferencias
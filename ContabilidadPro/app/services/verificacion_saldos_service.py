@@ -0,0 +1,129 @@
+"""
+Servicio de Verificación de saldos contra las transacciones
+
+Cuenta.saldo es un total acumulado que se mantiene al registrar cada
+transacción. Este servicio lo recalcula desde transacciones con una suma
+agrupada por cuenta, informa las diferencias y las corrige.
+
+Con libros muy grandes la suma se reparte entre varios procesos por tramos
+de ID de transacción (no por cuenta: unas pocas cuentas, como ventas y
+compras, concentran casi todos los movimientos, y repartir por cuenta
+dejaría a un proceso con casi todo el trabajo). Cada proceso suma su tramo
+agrupado por cuenta y los parciales se combinan al final.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.database import crear_engine
+from app.repositories.cuenta_repository import CuentaRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.utils.logger import app_logger
+import config
+
+# Diferencia máxima admitida entre el saldo guardado y el recalculado
+TOLERANCIA_SALDO = 0.005
+
+
+def _sumar_tramo(url: str, id_desde: int, id_hasta: int) -> Dict[int, float]:
+    """Suma por cuenta las transacciones de un tramo de IDs (se ejecuta en otro proceso)"""
+    engine = crear_engine(url)
+    try:
+        with sessionmaker(bind=engine)() as session:
+            return TransaccionRepository(session).sumar_por_cuenta(id_desde=id_desde, id_hasta=id_hasta)
+    finally:
+        engine.dispose()
+
+
+class VerificacionSaldosService:
+    """Servicio para verificar y reparar los saldos de las cuentas"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.cuenta_repo = CuentaRepository(session)
+        self.transaccion_repo = TransaccionRepository(session)
+
+    def calcular_saldos(self, procesos: Optional[int] = None) -> Dict[int, float]:
+        """
+        Calcula el saldo de cada cuenta sumando sus transacciones
+
+        Args:
+            procesos: Procesos a usar (None para elegir solo: uno si hay menos
+                      de config.VERIFICACION_UMBRAL_PARALELO transacciones,
+                      si no config.VERIFICACION_PROCESOS o uno por núcleo)
+
+        Returns:
+            Diccionario {cuenta_id: saldo}
+        """
+        minimo, maximo = self.transaccion_repo.get_rango_ids()
+        if minimo is None:
+            return {}
+
+        if procesos is None:
+            if maximo - minimo + 1 < config.VERIFICACION_UMBRAL_PARALELO:
+                procesos = 1
+            else:
+                procesos = config.VERIFICACION_PROCESOS or os.cpu_count() or 1
+        url = self.session.get_bind().url
+        if procesos <= 1 or url.database in (None, '', ':memory:'):
+            return self.transaccion_repo.sumar_por_cuenta()
+
+        # Tramos de IDs del mismo tamaño, uno por proceso
+        tamano = (maximo - minimo) // procesos + 1
+        limites = [minimo + i * tamano for i in range(procesos)] + [maximo + 1]
+        url_texto = url.render_as_string(hide_password=False)
+
+        saldos: Dict[int, float] = {}
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            parciales = pool.map(_sumar_tramo, [url_texto] * procesos, limites[:-1], limites[1:])
+            for parcial in parciales:
+                for cuenta_id, suma in parcial.items():
+                    saldos[cuenta_id] = saldos.get(cuenta_id, 0.0) + suma
+        return saldos
+
+    def verificar(self, procesos: Optional[int] = None) -> List[Dict]:
+        """
+        Compara el saldo guardado de cada cuenta con la suma de sus transacciones
+
+        Args:
+            procesos: Procesos a usar para la suma (ver calcular_saldos)
+
+        Returns:
+            Lista de diferencias, cada una con cuenta_id, saldo_guardado,
+            saldo_calculado y diferencia (vacía si los saldos son correctos)
+        """
+        guardados = self.cuenta_repo.get_saldos()
+        calculados = self.calcular_saldos(procesos)
+
+        diferencias = []
+        for cuenta_id in sorted(guardados.keys() | calculados.keys()):
+            guardado = guardados.get(cuenta_id, 0.0)
+            calculado = calculados.get(cuenta_id, 0.0)
+            if abs(guardado - calculado) > TOLERANCIA_SALDO:
+                diferencias.append({
+                    'cuenta_id': cuenta_id,
+                    'saldo_guardado': guardado,
+                    'saldo_calculado': calculado,
+                    'diferencia': guardado - calculado
+                })
+        return diferencias
+
+    def reparar(self, diferencias: List[Dict]) -> int:
+        """
+        Corrige el saldo de las cuentas con diferencias
+
+        El saldo se vuelve a calcular dentro del mismo UPDATE que lo escribe,
+        así que la corrección es válida aunque se hayan registrado
+        transacciones después de la verificación.
+
+        Args:
+            diferencias: Resultado de verificar
+
+        Returns:
+            Número de cuentas corregidas
+        """
+        ids = [d['cuenta_id'] for d in diferencias]
+        corregidas = self.cuenta_repo.recalcular_saldos(ids)
+        if corregidas:
+            app_logger.warning(f"Saldos corregidos en {corregidas} cuentas: {ids}")
+        return corregidas
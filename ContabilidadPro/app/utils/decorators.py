@@ -0,0 +1,45 @@
+"""
+Decoradores de la aplicación
+"""
+from functools import wraps
+from app.core.cache import CacheLRU, version_libro, libro_modificado_en
+from app.core.version_base import version_base
+
+
+def cachear_por_version(cache: CacheLRU):
+    """
+    Memoiza un método de servicio contra la versión actual del libro contable
+
+    La clave incluye el nombre del método, sus argumentos, el engine de la
+    sesión (los resultados de una base nunca se sirven a una sesión de otra),
+    la versión del libro de este proceso y la versión de datos de la base
+    (PRAGMA data_version, ver app.core.version_base), así que cualquier
+    escritura confirmada, aunque la haga otra instancia de la aplicación,
+    invalida las entradas anteriores. Si la sesión del servicio tiene escrituras sin confirmar, se
+    omite la caché para no mezclar datos pendientes con datos confirmados.
+    Los valores cacheados se comparten: quien los reciba no debe modificarlos.
+
+    Args:
+        cache: Caché donde guardar los resultados
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            session = getattr(self, 'session', None)
+            if session is not None and libro_modificado_en(session):
+                return metodo(self, *args, **kwargs)
+            
+            # Leer la versión antes de consultar: si llega una escritura
+            # mientras se calcula, el resultado queda bajo una versión vieja
+            engine = session.get_bind() if session is not None else None
+            clave = (metodo.__qualname__, engine, args, tuple(sorted(kwargs.items())),
+                     version_libro.actual, version_base(engine))
+            encontrado, valor = cache.obtener(clave)
+            if encontrado:
+                return valor
+            
+            valor = metodo(self, *args, **kwargs)
+            cache.guardar(clave, valor)
+            return valor
+        return envoltura
+    return decorador
@@ -47,3 +47,27 @@ def setup_logger(name: str = "ContabilidadPro") -> logging.Logger:
 
 # Logger global de la aplicación
 app_logger = setup_logger()
+
+
+def setup_logger_consultas_lentas() -> logging.Logger:
+    """
+    Configura y retorna el logger de consultas lentas
+    
+    Escribe solo en config.SLOW_QUERY_LOG_FILE (no se propaga al log de la
+    aplicación ni a la consola).
+    
+    Returns:
+        Logger configurado
+    """
+    logger = logging.getLogger("ContabilidadPro.consultas_lentas")
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    
+    if logger.handlers:
+        return logger
+    
+    file_handler = logging.FileHandler(config.SLOW_QUERY_LOG_FILE, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+    logger.addHandler(file_handler)
+    
+    return logger
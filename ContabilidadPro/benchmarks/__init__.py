@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento de ContabilidadPro
+
+Ejecutar desde la carpeta ContabilidadPro, por ejemplo:
+    python -m benchmarks.bench_perfiles_sqlite
+"""
@@ -0,0 +1,64 @@
+"""
+Benchmark del escritor de auditoría
+
+Mide ventas registradas por segundo (cada venta escribe su fila de auditoría)
+con cada modo del escritor: inmediato, durable y relajado. Se prueban dos
+escenarios: una venta por commit (como en la GUI) y varias ventas por commit.
+
+Uso:
+    python -m benchmarks.bench_auditoria [--ventas 3000] [--por-commit 1 50]
+"""
+import argparse
+import time
+from app.models.auditoria import Auditoria
+from app.repositories.escritor_auditoria import escritor_auditoria, MODOS_AUDITORIA
+from app.services.contabilidad_service import ContabilidadService
+from benchmarks.comun import base_temporal, imprimir_tabla
+
+
+def medir_modo(modo: str, ventas: int, por_commit: int) -> float:
+    """Retorna ventas por segundo para un modo y tamaño de transacción"""
+    escritor_auditoria.modo = modo
+    with base_temporal() as (engine, fabrica, usuario):
+        inicio = time.perf_counter()
+        for desde in range(0, ventas, por_commit):
+            with fabrica() as session:
+                servicio = ContabilidadService(session)
+                for i in range(desde, min(desde + por_commit, ventas)):
+                    servicio.registrar_venta(f"Ticket {i}", 10.0, usuario)
+                session.commit()
+        transcurrido = time.perf_counter() - inicio
+
+        # Verificar que no se perdió ninguna fila de auditoría
+        escritor_auditoria.vaciar()
+        with fabrica() as session:
+            filas = session.query(Auditoria).count()
+        if filas != ventas:
+            raise RuntimeError(f"Modo {modo}: se esperaban {ventas} filas de auditoría y hay {filas}")
+
+    return ventas / transcurrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ventas', type=int, default=3000)
+    parser.add_argument('--por-commit', type=int, nargs='+', default=[1, 50])
+    args = parser.parse_args()
+
+    modo_original = escritor_auditoria.modo
+    filas = []
+    try:
+        for modo in MODOS_AUDITORIA:
+            fila = [modo]
+            for por_commit in args.por_commit:
+                fila.append(f"{medir_modo(modo, args.ventas, por_commit):.0f}")
+            filas.append(fila)
+    finally:
+        escritor_auditoria.modo = modo_original
+
+    imprimir_tabla(["modo"] + [f"ventas/s ({n} por commit)" for n in args.por_commit], filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark de bloqueos de la interfaz: trabajo en el hilo de la interfaz vs. en segundo plano
+
+Carga N transacciones en una base temporal y ejecuta varias veces el mismo
+trabajo de una vista (autenticar con bcrypt y generar el reporte completo
+de transacciones) de dos formas:
+    - en el hilo de la interfaz, como hacían las vistas antes;
+    - con el ejecutor de tareas, como lo hacen ahora.
+Mientras tanto, el monitor de bloqueos mide cuánto tarda el bucle de eventos
+en atender un temporizador periódico. Se informa la cantidad de bloqueos
+mayores al umbral, el mayor y el tiempo total bloqueado.
+
+Corre sin pantalla (QT_QPA_PLATFORM=offscreen si no se indica otra).
+
+Uso:
+    python -m benchmarks.bench_bloqueos_gui [--transacciones 20000] [--repeticiones 5] [--umbral 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
+from app.core.database import configurar_perfil, get_session
+from app.gui.monitor_bloqueos import MonitorBloqueos
+from app.gui.tareas import EjecutorTareas
+from app.services.auth_service import AuthService
+from app.services.contabilidad_service import ContabilidadService
+from app.services.reportes_service import ReportesService
+from benchmarks.comun import base_temporal, imprimir_tabla
+import config
+
+PAUSA_MS = 100
+
+
+def trabajo(session) -> int:
+    """Lo que hace una vista: autenticar y generar un reporte completo"""
+    admin = config.DEFAULT_ADMIN
+    exito, mensaje, _ = AuthService(session).autenticar(admin['username'], admin['password'])
+    if not exito:
+        raise RuntimeError(mensaje)
+    return len("".join(ReportesService(session).iterar_reporte_transacciones(limite=None)))
+
+
+def en_hilo_interfaz():
+    with get_session() as session:
+        trabajo(session)
+
+
+def medir(monitor: MonitorBloqueos, repeticiones: int, ejecutar) -> tuple:
+    """Corre `ejecutar(loop)` con el bucle de eventos activo; retorna (segundos, estadísticas)"""
+    monitor.reiniciar()
+    monitor.iniciar()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        loop = QEventLoop()
+        QTimer.singleShot(0, lambda: ejecutar(loop))
+        loop.exec()
+        # Una pausa entre repeticiones para que el monitor registre cada bloqueo por separado
+        pausa = QEventLoop()
+        QTimer.singleShot(PAUSA_MS, pausa.quit)
+        pausa.exec()
+    transcurrido = time.perf_counter() - inicio
+    monitor.detener()
+    return transcurrido, monitor.estadisticas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transacciones', type=int, default=20000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--umbral', type=float, default=config.GUI_UMBRAL_BLOQUEO_MS,
+                        help="Milisegundos a partir de los cuales se cuenta un bloqueo")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with base_temporal() as (engine, fabrica, usuario):
+        # Las vistas usan la sesión global: se la apunta a la base temporal
+        configurar_perfil(config.DB_PERFIL, str(engine.url))
+        with get_session() as session:
+            AuthService(session).crear_admin_default()
+            ContabilidadService(session).registrar_lote([
+                (TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+                 f"Ticket {i}", float(i % 1000 + 1), usuario)
+                for i in range(args.transacciones)
+            ])
+
+        monitor = MonitorBloqueos(umbral_ms=args.umbral, registrar=False)
+        ejecutor = EjecutorTareas()
+
+        def sincrono(loop):
+            en_hilo_interfaz()
+            loop.quit()
+
+        def en_segundo_plano(loop):
+            ejecutor.ejecutar(lambda contexto: trabajo(contexto.session), al_finalizar=loop.quit)
+
+        t_sinc, sinc = medir(monitor, args.repeticiones, sincrono)
+        t_tareas, tareas = medir(monitor, args.repeticiones, en_segundo_plano)
+        ejecutor.esperar()
+    del app
+
+    imprimir_tabla(
+        ["modo", "segundos", f"bloqueos >= {args.umbral:.0f} ms", "máximo ms", "total bloqueado ms"],
+        [["hilo de la interfaz", f"{t_sinc:.2f}", sinc['bloqueos'],
+          f"{sinc['maximo_ms']:.0f}", f"{sinc['total_bloqueado_ms']:.0f}"],
+         ["ejecutor de tareas", f"{t_tareas:.2f}", tareas['bloqueos'],
+          f"{tareas['maximo_ms']:.0f}", f"{tareas['total_bloqueado_ms']:.0f}"]]
+    )
+    if tareas['bloqueos']:
+        print(f"ERROR: la interfaz se bloqueó {tareas['bloqueos']} veces con el ejecutor de tareas")
+        sys.exit(1)
+    print(f"\nOK: mayor bloqueo {sinc['maximo_ms']:.0f} ms en el hilo de la interfaz, "
+          f"{tareas['maximo_ms']:.0f} ms con el ejecutor de tareas")
+
+
+if __name__ == "__main__":
+    main()
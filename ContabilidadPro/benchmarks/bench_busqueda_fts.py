@@ -0,0 +1,89 @@
+"""
+Benchmark de búsqueda: LIKE '%término%' contra el índice FTS5
+
+Carga N transacciones sintéticas (por defecto 1.000.000) y compara
+TransaccionRepository.buscar (LIKE, recorre toda la tabla) con
+TransaccionRepository.buscar_texto (FTS5, primera página por relevancia).
+
+Uso:
+    python -m benchmarks.bench_busqueda_fts [--filas 1000000] [--repeticiones 5]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.repositories.transaccion_repository import TransaccionRepository
+from benchmarks.comun import base_temporal, imprimir_tabla
+
+PALABRAS = ["mercadería", "alquiler", "servicio", "luz", "agua", "sueldo", "honorarios",
+            "flete", "insumos", "papelería", "mantenimiento", "seguro", "impuesto",
+            "publicidad", "combustible", "repuestos", "crédito", "contado", "cliente",
+            "proveedor", "mayorista", "minorista", "factura", "remito", "ticket"]
+TERMINOS = ["alquiler", "crédito mayorista", "repu", "factura cliente contado", "inexistente"]
+
+
+def cargar_transacciones(engine, filas: int, usuario_id: int, lote: int = 50000):
+    """Inserta transacciones sintéticas con executemany (los triggers llenan el FTS)"""
+    azar = random.Random(42)
+    inicio = datetime(2020, 1, 1)
+    with engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO cuentas (codigo, nombre, tipo, naturaleza, saldo, activa, created_at, updated_at) "
+            "VALUES ('ING-VENTAS', 'Ingresos por Ventas', 'Ingreso', 'Acreedora', 0, 1, :f, :f)"
+        ), {"f": inicio})
+    sentencia = text(
+        "INSERT INTO transacciones (fecha, concepto, monto, tipo, cuenta_id, usuario_id, created_at, updated_at) "
+        "VALUES (:fecha, :concepto, :monto, 'Venta', 1, :usuario_id, :fecha, :fecha)"
+    )
+    for desde in range(0, filas, lote):
+        registros = []
+        for i in range(desde, min(desde + lote, filas)):
+            fecha = inicio + timedelta(minutes=i)
+            concepto = "Venta: " + " ".join(azar.sample(PALABRAS, 3)) + f" #{i}"
+            registros.append({"fecha": fecha, "concepto": concepto,
+                              "monto": round(azar.uniform(1, 5000), 2), "usuario_id": usuario_id})
+        with engine.begin() as conexion:
+            conexion.execute(sentencia, registros)
+
+
+def medir(funcion, repeticiones: int) -> tuple:
+    """Retorna (mejor tiempo en ms, cantidad de resultados)"""
+    mejor = float('inf')
+    resultados = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultados = len(funcion())
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor, resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    with base_temporal() as (engine, fabrica, usuario):
+        inicio = time.perf_counter()
+        cargar_transacciones(engine, args.filas, usuario.id)
+        print(f"Carga de {args.filas:,} transacciones (con triggers FTS): "
+              f"{time.perf_counter() - inicio:.1f} s\n")
+
+        filas = []
+        with fabrica() as session:
+            repo = TransaccionRepository(session)
+            for termino in TERMINOS:
+                # LIKE solo admite una subcadena: se usa la primera palabra
+                ms_like, n_like = medir(lambda: repo.buscar(termino.split()[0]), args.repeticiones)
+                ms_fts, n_fts = medir(lambda: repo.buscar_texto(termino, limite=50), args.repeticiones)
+                filas.append([termino, f"{ms_like:.1f}", n_like, f"{ms_fts:.1f}", n_fts,
+                              f"{ms_like / ms_fts:.0f}x" if ms_fts else "-"])
+
+        imprimir_tabla(["término", "LIKE ms", "LIKE filas", "FTS5 ms", "FTS5 filas (pág.)", "mejora"],
+                       filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark del cierre de períodos (CierrePeriodoService)
+
+Genera un libro sintético, reagrupa sus períodos mensuales en ejercicios
+anuales (con la escala 1m y un año, un millón de transacciones en un solo
+período) y los cierra en orden. Para cada cierre mide el tiempo total con
+el commit y las sentencias SQL, y lo compara con calcular el resultado
+recorriendo las transacciones del período. Después verifica que:
+    - el resultado de cada período coincida con el de las transacciones,
+    - las cuentas de resultado queden en cero al fin de cada período,
+    - Cuenta.saldo, las instantáneas y los resúmenes sigan coincidiendo con
+      las transacciones,
+    - no se pueda registrar ni modificar una transacción de un período cerrado.
+
+También mide cuánto agregan los triggers de bloqueo a un registro masivo
+fuera de los períodos cerrados.
+
+Uso:
+    python -m benchmarks.bench_cierre_periodo [--escala 1m] [--anios 1] [--lote 10000]
+                                              [--maximo-cierre 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Las sentencias de cada cierre se cuentan con contar_consultas()
+os.environ.setdefault("INSTRUMENTACION_CONSULTAS", "1")
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.core import database
+from app.core.constants import TIPO_INGRESO, TIPO_GASTO, TIPO_TRANSACCION_VENTA
+from app.core.database import configurar_perfil, get_session
+from app.core.instrumentacion import contar_consultas
+from app.core.periodos_cerrados import (MENSAJE_PERIODO_CERRADO, crear_bloqueo_periodos,
+                                        quitar_bloqueo_periodos)
+from app.core.resumenes import verificar_resumenes
+from app.models.periodo import Periodo
+from app.models.usuario import Usuario
+from app.repositories.cuenta_repository import CuentaRepository
+from app.services.cierre_periodo_service import CierrePeriodoService, TOLERANCIA_CIERRE
+from app.services.saldos_historicos_service import SaldosHistoricosService, corte_de_periodo
+from app.services.verificacion_saldos_service import VerificacionSaldosService
+from benchmarks.bench_resumenes import registrar
+from benchmarks.comun import imprimir_tabla
+from benchmarks.generador_datos import ESCALAS, crear_libro
+import config
+
+TOLERANCIA = 0.01
+
+
+def agrupar_en_ejercicios(engine):
+    """Reemplaza los períodos mensuales del generador por uno por año"""
+    with engine.begin() as conexion:
+        anios = conexion.execute(text(
+            "SELECT substr(fecha_inicio, 1, 4), min(fecha_inicio), max(fecha_fin) "
+            "FROM periodos GROUP BY 1 ORDER BY 1"
+        )).all()
+        for anio, inicio, fin in anios:
+            conexion.execute(Periodo.__table__.insert(), {
+                'nombre': f"Ejercicio {anio}", 'fecha_inicio': datetime.fromisoformat(inicio),
+                'fecha_fin': datetime.fromisoformat(fin), 'cerrado': 0, 'resultado': 0.0,
+                'created_at': datetime.now(), 'updated_at': datetime.now()
+            })
+        for tabla in ("transacciones", "asientos"):
+            conexion.execute(text(
+                f"UPDATE {tabla} SET periodo_id = (SELECT id FROM periodos "
+                f"WHERE nombre = 'Ejercicio ' || substr({tabla}.fecha, 1, 4))"
+            ))
+        conexion.execute(text("DELETE FROM periodos WHERE nombre NOT LIKE 'Ejercicio %'"))
+
+
+def resultado_recorriendo(session, periodo: Periodo) -> tuple:
+    """Retorna (ms, resultado, transacciones) sumando las transacciones del período"""
+    inicio = time.perf_counter()
+    resultado, cantidad = session.execute(text(
+        "SELECT sum(CASE WHEN c.tipo = :ingreso THEN t.monto ELSE -t.monto END), "
+        "(SELECT count(*) FROM transacciones WHERE fecha >= :desde AND fecha < :corte) "
+        "FROM transacciones t JOIN cuentas c ON c.id = t.cuenta_id "
+        "WHERE c.tipo IN (:ingreso, :gasto) AND t.fecha >= :desde AND t.fecha < :corte"
+    ), {'ingreso': TIPO_INGRESO, 'gasto': TIPO_GASTO, 'desde': periodo.fecha_inicio,
+        'corte': corte_de_periodo(periodo)}).one()
+    return (time.perf_counter() - inicio) * 1000, resultado or 0.0, cantidad
+
+
+def intentar_modificar(periodo: Periodo) -> list:
+    """Intenta registrar, modificar y borrar transacciones del período; retorna las que se permitieron"""
+    parametros = {'fecha': periodo.fecha_inicio.replace(hour=12), 'corte': corte_de_periodo(periodo),
+                  'tipo': TIPO_TRANSACCION_VENTA}
+    sentencias = {
+        "registrar": ("INSERT INTO transacciones (fecha, concepto, monto, tipo, cuenta_id, usuario_id, "
+                      "created_at, updated_at) SELECT :fecha, 'Fuera de término', 1.0, :tipo, id, 1, "
+                      ":fecha, :fecha FROM cuentas LIMIT 1"),
+        "modificar": "UPDATE transacciones SET monto = monto + 1 WHERE id = (SELECT min(id) FROM "
+                     "transacciones WHERE fecha >= :fecha AND fecha < :corte)",
+        "borrar": "DELETE FROM transacciones WHERE id = (SELECT min(id) FROM transacciones "
+                  "WHERE fecha >= :fecha AND fecha < :corte)",
+    }
+    permitidas = []
+    for nombre, sentencia in sentencias.items():
+        try:
+            with database.engine.begin() as conexion:
+                conexion.execute(text(sentencia), parametros)
+            permitidas.append(nombre)
+        except IntegrityError as e:
+            if MENSAJE_PERIODO_CERRADO not in str(e):
+                raise
+    return permitidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='1m')
+    parser.add_argument('--anios', type=int, default=1, help="Años del libro (un ejercicio por año)")
+    parser.add_argument('--lote', type=int, default=10_000, help="Transacciones del registro masivo")
+    parser.add_argument('--maximo-cierre', type=float, default=1000.0,
+                        help="Tiempo máximo admitido de un cierre, con el commit (ms)")
+    args = parser.parse_args()
+
+    filas, errores = [], []
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-cierre-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        inicio = time.perf_counter()
+        crear_libro(ruta, ESCALAS[args.escala], anios=args.anios)
+        print(f"Libro '{args.escala}' de {args.anios} año(s) generado en {time.perf_counter() - inicio:.1f} s\n")
+        configurar_perfil(config.DB_PERFIL, f"sqlite:///{ruta}")
+        agrupar_en_ejercicios(database.engine)
+
+        with get_session() as session:
+            periodos = session.query(Periodo).order_by(Periodo.fecha_inicio).all()
+            usuario_id = session.query(Usuario.id).order_by(Usuario.id).first()[0]
+            session.expunge_all()
+
+        for periodo in periodos:
+            with get_session() as session:
+                ms_recorriendo, esperado, cantidad = resultado_recorriendo(session, periodo)
+
+            inicio = time.perf_counter()
+            with get_session() as session, contar_consultas() as contador:
+                exito, mensaje = CierrePeriodoService(session).cerrar_periodo(
+                    periodo.id, session.get(Usuario, usuario_id))
+            ms_cierre = (time.perf_counter() - inicio) * 1000
+
+            with get_session() as session:
+                cerrado = session.get(Periodo, periodo.id)
+                saldos = SaldosHistoricosService(session).saldos_a_fecha(corte_de_periodo(cerrado))
+                temporales = [cuenta_id for cuenta_id, _, _ in
+                              CuentaRepository(session).get_tipos_por_id([TIPO_INGRESO, TIPO_GASTO])]
+                sin_cerrar = [c for c in temporales if abs(saldos.get(c, 0.0)) > TOLERANCIA_CIERRE]
+                if not exito:
+                    errores.append(f"{periodo.nombre}: {mensaje}")
+                elif abs(cerrado.resultado - esperado) > TOLERANCIA:
+                    errores.append(f"{periodo.nombre}: resultado ${cerrado.resultado:,.2f}, "
+                                   f"según las transacciones ${esperado:,.2f}")
+                if sin_cerrar:
+                    errores.append(f"{periodo.nombre}: {len(sin_cerrar)} cuentas de resultado quedaron con saldo")
+            if ms_cierre > args.maximo_cierre:
+                errores.append(f"{periodo.nombre}: el cierre tardó {ms_cierre:.0f} ms "
+                               f"(máximo {args.maximo_cierre:.0f} ms)")
+            permitidas = intentar_modificar(periodo)
+            if permitidas:
+                errores.append(f"{periodo.nombre}: cerrado, pero se pudo {', '.join(permitidas)}")
+
+            filas.append([periodo.nombre, f"{cantidad:,}", f"{ms_recorriendo:.0f}", f"{ms_cierre:.0f}",
+                          contador.consultas, f"{esperado:,.2f}"])
+
+        with get_session() as session:
+            if VerificacionSaldosService(session).verificar():
+                errores.append("Cuenta.saldo no coincide con las transacciones")
+            if SaldosHistoricosService(session).verificar():
+                errores.append("las instantáneas no coinciden con las transacciones")
+        if verificar_resumenes(database.engine):
+            errores.append("los resúmenes no coinciden con las transacciones")
+
+        # Costo de los triggers de bloqueo en un registro masivo (con la fecha actual)
+        fabrica = sessionmaker(bind=database.engine)
+        registrar(fabrica, args.lote)  # Calienta la caché de páginas para que ambas mediciones partan igual
+        con_bloqueo = registrar(fabrica, args.lote)
+        quitar_bloqueo_periodos(database.engine)
+        sin_bloqueo = registrar(fabrica, args.lote)
+        crear_bloqueo_periodos(database.engine)
+        database.engine.dispose()
+
+    imprimir_tabla(["período", "transacciones", "recorriendo ms", "cierre ms (con commit)",
+                    "sentencias", "resultado"], filas)
+    print()
+    imprimir_tabla(["registrar_lote", "sin bloqueo ms", "con bloqueo ms", "costo"],
+                   [[f"{args.lote:,}", f"{sin_bloqueo:.0f}", f"{con_bloqueo:.0f}",
+                     f"{(con_bloqueo / sin_bloqueo - 1) * 100:+.0f}%"]])
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print(f"\nOK: {len(filas)} períodos cerrados y bloqueados, resultados coincidentes con las transacciones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Prueba de concurrencia sobre el saldo de una misma cuenta
+
+Lanza varios procesos que registran ventas a la vez sobre ING-VENTAS (como
+varias instancias de la aplicación compartiendo la base) y verifica que el
+saldo final coincida exactamente con la suma de las transacciones, es decir,
+que no haya actualizaciones perdidas. Informa además el rendimiento total.
+
+Uso:
+    python -m benchmarks.bench_concurrencia_saldo [--procesos 4] [--ventas 500]
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from app.core.database import crear_engine
+from app.models.cuenta import Cuenta
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.services.contabilidad_service import ContabilidadService
+from benchmarks.comun import base_temporal
+
+MONTO = 1.25
+
+
+def trabajador(url: str, usuario_id: int, ventas: int) -> int:
+    """Registra `ventas` ventas, una por commit; retorna cuántos commits fallaron"""
+    engine = crear_engine(url)
+    fabrica = sessionmaker(bind=engine)
+    fallos = 0
+    for i in range(ventas):
+        try:
+            with fabrica() as session:
+                usuario = session.get(Usuario, usuario_id)
+                ContabilidadService(session).registrar_venta(f"Ticket {i}", MONTO, usuario)
+                session.commit()
+        except Exception:
+            fallos += 1
+    engine.dispose()
+    return fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--procesos', type=int, default=4)
+    parser.add_argument('--ventas', type=int, default=500, help="Ventas por proceso")
+    args = parser.parse_args()
+
+    with base_temporal() as (engine, fabrica, usuario):
+        # Crear la cuenta antes, para que los procesos no compitan por crearla
+        with fabrica() as session:
+            ContabilidadService(session).registrar_venta("Apertura", MONTO, usuario)
+            session.commit()
+
+        url = str(engine.url)
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(args.procesos) as pool:
+            fallos = sum(pool.starmap(trabajador, [(url, usuario.id, args.ventas)] * args.procesos))
+        transcurrido = time.perf_counter() - inicio
+
+        with fabrica() as session:
+            cuenta = session.query(Cuenta).filter(Cuenta.codigo == "ING-VENTAS").one()
+            suma = session.query(func.sum(Transaccion.monto)).filter(
+                Transaccion.cuenta_id == cuenta.id
+            ).scalar()
+            cantidad = session.query(Transaccion).filter(Transaccion.cuenta_id == cuenta.id).count()
+
+    confirmadas = args.procesos * args.ventas - fallos
+    print(f"Procesos: {args.procesos}, ventas confirmadas: {confirmadas}, fallidas: {fallos}")
+    print(f"Rendimiento: {confirmadas / transcurrido:.1f} ventas/s")
+    print(f"Saldo ING-VENTAS: {cuenta.saldo:.2f} | Suma de transacciones: {suma:.2f} "
+          f"| Esperado: {(confirmadas + 1) * MONTO:.2f} ({cantidad} transacciones)")
+
+    if abs(cuenta.saldo - suma) > 0.005 or cantidad != confirmadas + 1:
+        print("ERROR: el saldo no coincide con las transacciones (actualización perdida)")
+        sys.exit(1)
+    print("OK: sin actualizaciones perdidas")
+
+
+if __name__ == "__main__":
+    main()
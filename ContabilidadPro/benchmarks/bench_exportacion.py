@@ -0,0 +1,92 @@
+"""
+Benchmark de exportación: filas/s y memoria máxima por formato
+
+Carga N transacciones en una base temporal y exporta todas a Excel, CSV y
+PDF. Cada exportación corre en un proceso nuevo para medir su memoria
+máxima (RSS) sin arrastrar la de las anteriores. Con varios tamaños se
+puede comprobar que la memoria no crece con el número de filas.
+
+Uso:
+    python -m benchmarks.bench_exportacion [--registros 10000,100000] [--formatos excel,csv,pdf]
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy.orm import sessionmaker
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
+from app.core.database import crear_engine
+from app.models.usuario import Usuario
+from app.services.contabilidad_service import ContabilidadService
+from app.services.export_service import ExportService, FORMATOS_EXPORTACION, EXTENSIONES
+from benchmarks.comun import base_temporal, imprimir_tabla
+
+
+def rss_maximo_mb() -> float:
+    """Memoria máxima del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)"""
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+
+
+def cargar(url: str, usuario_id: int, cantidad: int):
+    """Registra `cantidad` transacciones alternando ventas y compras (en un proceso aparte)"""
+    engine = crear_engine(url)
+    fabrica = sessionmaker(bind=engine)
+    with fabrica() as session:
+        usuario = session.get(Usuario, usuario_id)
+        registros = [
+            (TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+             f"Ticket {i} - venta de mercadería varia", float(i % 1000 + 1), usuario)
+            for i in range(cantidad)
+        ]
+        ContabilidadService(session).registrar_lote(registros)
+        session.commit()
+    engine.dispose()
+
+
+def exportar(url: str, formato: str, carpeta: str) -> tuple:
+    """Exporta todas las transacciones (en un proceso aparte); retorna (filas, segundos, MB base, MB máx)"""
+    engine = crear_engine(url)
+    base = rss_maximo_mb()
+    with sessionmaker(bind=engine)() as session:
+        inicio = time.perf_counter()
+        ruta, filas = ExportService(session).exportar_transacciones(
+            formato, Path(carpeta) / f"transacciones{EXTENSIONES[formato]}")
+        transcurrido = time.perf_counter() - inicio
+    engine.dispose()
+    return filas, transcurrido, base, rss_maximo_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--registros', default="10000,100000",
+                        help="Tamaños a probar, separados por coma")
+    parser.add_argument('--formatos', default=",".join(FORMATOS_EXPORTACION))
+    args = parser.parse_args()
+
+    contexto = multiprocessing.get_context('spawn')
+    filas_tabla = []
+    for cantidad in (int(x) for x in args.registros.split(",")):
+        with base_temporal() as (engine, fabrica, usuario), \
+                tempfile.TemporaryDirectory(prefix="contabilidadpro-export-") as carpeta:
+            # La carga también va en otro proceso: ru_maxrss se hereda al crear
+            # procesos, y así este proceso no infla la medición de los demás
+            with contexto.Pool(1) as pool:
+                pool.apply(cargar, (str(engine.url), usuario.id, cantidad))
+            for formato in args.formatos.split(","):
+                with contexto.Pool(1) as pool:
+                    filas, segundos, base, maximo = pool.apply(exportar, (str(engine.url), formato, carpeta))
+                tamano = (Path(carpeta) / f"transacciones{EXTENSIONES[formato]}").stat().st_size
+                filas_tabla.append([formato, filas, f"{segundos:.2f}", f"{filas / segundos:.0f}",
+                                    f"{maximo:.1f}", f"{maximo - base:.1f}", f"{tamano / 1e6:.1f}"])
+
+    imprimir_tabla(["formato", "filas", "segundos", "filas/s", "RSS máx MB", "RSS export MB", "archivo MB"],
+                   filas_tabla)
+
+
+if __name__ == "__main__":
+    main()
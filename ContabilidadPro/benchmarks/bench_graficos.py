@@ -0,0 +1,177 @@
+"""
+Benchmark de los gráficos del dashboard (GraficoWidget)
+
+Sobre un libro sintético de varios años mide:
+    - la lectura de los datos desde los resúmenes diarios,
+    - la reducción LTTB de una serie larga al ancho en píxeles,
+    - el dibujo completo de cada gráfico (el que corre en segundo plano),
+    - la actualización por blitting (la que corre en el hilo de la interfaz),
+    - y, con el dashboard abierto, las pausas del hilo de la interfaz mientras
+      se registran ventas y los gráficos se actualizan en vivo.
+
+El costo de los gráficos depende de la cantidad de días, no de la de
+transacciones, así que la escala chica alcanza. Corre sin pantalla
+(QT_QPA_PLATFORM=offscreen si no se indica otra).
+
+Uso:
+    python -m benchmarks.bench_graficos [--escala 10k] [--puntos 1000000] [--actualizaciones 50]
+                                        [--umbral 100] [--maximo-blitting 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+from app.core.database import configurar_perfil, get_session
+from app.core.constants import TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE
+from app.gui.monitor_bloqueos import MonitorBloqueos
+from app.gui.tareas import ejecutor_tareas
+from app.gui.views.dashboard_view import DashboardView
+from app.gui.widgets.graficos import (FuenteComposicionCuentas, FuenteVentasCompras,
+                                      reducir_lttb, renderizar)
+from app.models.usuario import Usuario
+from app.services.contabilidad_service import ContabilidadService
+from benchmarks.bench_tabla_datos import esperar
+from benchmarks.comun import imprimir_tabla, percentil
+from benchmarks.generador_datos import ESCALAS, crear_libro
+import config
+
+ANCHO, ALTO = 1000, 400
+
+
+def medir(funcion, repeticiones: int = 5) -> float:
+    """Mejor tiempo de varias repeticiones, en ms"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor
+
+
+def medir_blitting(fuente, datos, actualizaciones: int) -> list:
+    """Dibuja la figura y mide cada actualización por blitting con datos apenas distintos"""
+    lienzo, _ = renderizar(fuente, datos, ANCHO, ALTO)
+    tiempos = []
+    for i in range(actualizaciones):
+        if isinstance(datos, dict):
+            nuevos = {tipo: (x, y.copy()) for tipo, (x, y) in datos.items()}
+            for _, y in nuevos.values():
+                if len(y):
+                    y[-1] += i  # Como una venta más en el último día
+        else:
+            nuevos = [(nombre, saldo + i) for nombre, saldo in datos]
+        inicio = time.perf_counter()
+        if not lienzo.actualizar(nuevos):
+            raise RuntimeError(f"{fuente.titulo}: los datos nuevos no entraron en la figura")
+        lienzo.componer()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def dashboard_en_vivo(usuario_id: int, ventas: int, umbral: float) -> dict:
+    """Abre el dashboard, registra ventas y mide cómo se actualizan los gráficos"""
+    with get_session() as session:
+        usuario = session.get(Usuario, usuario_id)
+        session.expunge(usuario)
+
+    vista = DashboardView(usuario)
+    vista.resize(1400, 900)
+    vista.show()
+    graficos = (vista.grafico_ventas, vista.grafico_activos)
+    esperar(lambda: all(g._imagen is not None for g in graficos))
+
+    modos = []
+    for grafico in graficos:
+        grafico.dibujado.connect(lambda modo, ms: modos.append((modo, ms)))
+    monitor = MonitorBloqueos(umbral_ms=umbral, registrar=False)
+    monitor.iniciar()
+    for i in range(ventas):
+        registradas = []
+        ejecutor_tareas().ejecutar(
+            lambda contexto, i=i: ContabilidadService(contexto.session).registrar_venta(
+                f"Venta en vivo {i}", 10.0 + i, contexto.session.merge(usuario)),
+            al_finalizar=lambda: registradas.append(True)
+        )
+        esperar(lambda: registradas)
+        anteriores = len(modos)
+        vista._revisar_cambios()  # Lo mismo que hace su temporizador
+        esperar(lambda: len(modos) >= anteriores + len(graficos))
+    monitor.detener()
+    vista.close()
+    ejecutor_tareas().esperar()
+    return {'modos': modos, 'bloqueo': monitor.estadisticas()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='10k')
+    parser.add_argument('--puntos', type=int, default=1_000_000, help="Largo de la serie para LTTB")
+    parser.add_argument('--actualizaciones', type=int, default=50)
+    parser.add_argument('--umbral', type=float, default=config.GUI_UMBRAL_BLOQUEO_MS,
+                        help="Milisegundos a partir de los cuales se cuenta un bloqueo")
+    parser.add_argument('--maximo-blitting', type=float, default=20.0,
+                        help="Mediana máxima admitida de una actualización por blitting (ms)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-graficos-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        crear_libro(ruta, ESCALAS[args.escala])
+        configurar_perfil(config.DB_PERFIL, f"sqlite:///{ruta}")
+
+        fuentes = [FuenteVentasCompras(),
+                   FuenteComposicionCuentas([TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE],
+                                            "Composición del activo")]
+        filas = []
+        for fuente in fuentes:
+            with get_session() as session:
+                lectura = medir(lambda: fuente.cargar(session))
+                datos = fuente.cargar(session)
+            puntos = sum(len(x) for x, _ in datos.values()) if isinstance(datos, dict) else len(datos)
+            completo = medir(lambda: renderizar(fuente, datos, ANCHO, ALTO))
+            blitting = medir_blitting(fuente, datos, args.actualizaciones)
+            filas.append([fuente.titulo, f"{puntos:,}", f"{lectura:.1f}", f"{completo:.0f}",
+                          f"{statistics.median(blitting):.1f}", f"{percentil(blitting, 95):.1f}"])
+
+        azar = np.random.default_rng(42)
+        x = np.arange(args.puntos, dtype=float)
+        y = np.cumsum(azar.normal(size=args.puntos))
+        lttb = medir(lambda: reducir_lttb(x, y, ANCHO))
+
+        with get_session() as session:
+            usuario_id = session.query(Usuario.id).order_by(Usuario.id).first()[0]
+        vivo = dashboard_en_vivo(usuario_id, 5, args.umbral)
+    del app
+
+    imprimir_tabla(["gráfico", "puntos", "lectura ms", "dibujo completo ms",
+                    "blitting ms (mediana)", "blitting ms (p95)"], filas)
+    print(f"\nLTTB: {args.puntos:,} puntos a {ANCHO} en {lttb:.0f} ms")
+    blits = [ms for modo, ms in vivo['modos'] if modo == 'blitting']
+    print(f"Dashboard en vivo: {len(blits)} de {len(vivo['modos'])} actualizaciones por blitting, "
+          f"{vivo['bloqueo']['bloqueos']} bloqueos >= {args.umbral:.0f} ms "
+          f"(máximo {vivo['bloqueo']['maximo_ms']:.0f} ms)")
+
+    errores = [f"{fila[0]}: blitting de {fila[4]} ms (máximo {args.maximo_blitting:.0f} ms)"
+               for fila in filas if float(fila[4]) > args.maximo_blitting]
+    if len(blits) < len(vivo['modos']):
+        errores.append("el dashboard redibujó gráficos completos en lugar de usar blitting")
+    if vivo['bloqueo']['bloqueos']:
+        errores.append(f"la interfaz se bloqueó {vivo['bloqueo']['bloqueos']} veces")
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print("\nOK: gráficos actualizados por blitting y sin bloqueos de la interfaz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark de perfiles de SQLite
+
+Compara, para cada perfil de config.DB_PERFILES, el rendimiento sostenido de
+ContabilidadService.registrar_venta (una venta por commit, como en la GUI) y
+la latencia de generar el balance general mientras otro hilo registra ventas.
+
+Uso:
+    python -m benchmarks.bench_perfiles_sqlite [--duracion 5] [--perfiles desktop bulk-load]
+"""
+import argparse
+import threading
+import time
+import config
+from app.services.contabilidad_service import ContabilidadService
+from app.services.reportes_service import ReportesService
+from benchmarks.comun import base_temporal, percentil, imprimir_tabla
+
+
+def medir_perfil(perfil: str, duracion: float) -> dict:
+    """
+    Mide un perfil durante `duracion` segundos
+
+    Returns:
+        Diccionario con ventas/s y latencias del reporte en ms
+    """
+    with base_temporal(perfil) as (engine, fabrica, usuario):
+        detener = threading.Event()
+        ventas = [0]
+        latencias = []
+        errores = []
+
+        def escritor():
+            while not detener.is_set():
+                try:
+                    with fabrica() as session:
+                        ContabilidadService(session).registrar_venta("Ticket", 10.0, usuario)
+                        session.commit()
+                    ventas[0] += 1
+                except Exception as e:
+                    errores.append(e)
+
+        def lector():
+            while not detener.is_set():
+                inicio = time.perf_counter()
+                try:
+                    with fabrica() as session:
+                        ReportesService(session).generar_balance_general_texto()
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                except Exception as e:
+                    errores.append(e)
+
+        hilos = [threading.Thread(target=escritor), threading.Thread(target=lector)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        time.sleep(duracion)
+        detener.set()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.perf_counter() - inicio
+
+        return {
+            'perfil': perfil,
+            'ventas_s': ventas[0] / transcurrido,
+            'reportes': len(latencias),
+            'p50_ms': percentil(latencias, 50),
+            'p95_ms': percentil(latencias, 95),
+            'max_ms': max(latencias) if latencias else 0.0,
+            'errores': len(errores),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duracion', type=float, default=5.0,
+                        help="Segundos de medición por perfil")
+    parser.add_argument('--perfiles', nargs='+', default=list(config.DB_PERFILES),
+                        help="Perfiles a comparar")
+    args = parser.parse_args()
+
+    filas = []
+    for perfil in args.perfiles:
+        r = medir_perfil(perfil, args.duracion)
+        filas.append([
+            r['perfil'], f"{r['ventas_s']:.1f}", r['reportes'],
+            f"{r['p50_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['max_ms']:.2f}", r['errores']
+        ])
+
+    imprimir_tabla(["perfil", "ventas/s", "reportes", "p50 ms", "p95 ms", "max ms", "errores"],
+                   filas)
+
+
+if __name__ == "__main__":
+    main()
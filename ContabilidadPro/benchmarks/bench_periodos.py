@@ -0,0 +1,233 @@
+"""
+Benchmark de la asignación de períodos y de las consultas por período
+
+Genera un libro sintético (un período por mes) y agrega el período en curso
+con PeriodosService. Después:
+    - registra un lote con ContabilidadService.registrar_lote y verifica que
+      cada transacción nueva quede en el período en curso;
+    - borra el período de todas las transacciones y asientos, lo vuelve a
+      completar con PeriodosService.asignar_pendientes y verifica que cada
+      fila recupere su período;
+    - compara las consultas de un período (total por tipo, primera página,
+      conteo y recorrido completo) filtrando por periodo_id y por rango de
+      fechas, verifica que den lo mismo y que las de periodo_id usen los
+      índices de período, y las mide también sin esos índices;
+    - mide cuánto agregan los índices de período a un registro masivo.
+
+Uso:
+    python -m benchmarks.bench_periodos [--escala 1m] [--repeticiones 5] [--lote 10000]
+                                        [--tamano-asignacion 50000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import sessionmaker
+from app.core import database
+from app.core.constants import TIPO_TRANSACCION_VENTA
+from app.core.database import configurar_perfil, get_session
+from app.models.periodo import Periodo
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.services.periodos_service import PeriodosService
+from benchmarks.bench_resumenes import iguales, medir, registrar
+from benchmarks.comun import imprimir_tabla
+from benchmarks.generador_datos import ESCALAS, crear_libro
+import config
+
+INDICES_PERIODO = [indice for indice in Transaccion.__table__.indexes if 'periodo' in indice.name]
+
+
+def crear_periodo_en_curso(usuario_id: int) -> Periodo:
+    """Crea el período del año actual (el libro sintético termina antes)"""
+    anio = datetime.now().year
+    with get_session() as session:
+        exito, mensaje = PeriodosService(session).crear_periodo(
+            f"Ejercicio {anio}", datetime(anio, 1, 1), datetime(anio, 12, 31), session.get(Usuario, usuario_id))
+        if not exito:
+            raise RuntimeError(mensaje)
+    with get_session() as session:
+        periodo = session.query(Periodo).filter(Periodo.nombre == f"Ejercicio {anio}").one()
+        session.expunge(periodo)
+        return periodo
+
+
+def planes(funcion) -> list:
+    """Ejecuta funcion y retorna el plan (EXPLAIN QUERY PLAN) de cada SELECT que emitió"""
+    sentencias = []
+
+    def capturar(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            sentencias.append((sentencia, parametros))
+
+    event.listen(database.engine, "before_cursor_execute", capturar)
+    try:
+        funcion()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", capturar)
+    with database.engine.connect() as conexion:
+        return [" / ".join(fila[-1] for fila in conexion.exec_driver_sql(f"EXPLAIN QUERY PLAN {sentencia}",
+                                                                         parametros))
+                for sentencia, parametros in sentencias]
+
+
+def consultas(session, periodo: Periodo) -> list:
+    """Tríos (consulta, por rango de fechas, por periodo_id) sobre las transacciones de un período"""
+    repo = TransaccionRepository(session)
+    desde = periodo.fecha_inicio
+    hasta = datetime.combine(periodo.fecha_fin.date() + timedelta(days=1), datetime.min.time())
+    ultimo_instante = hasta - timedelta(microseconds=1)
+
+    def total_por_fechas():
+        return session.query(func.sum(Transaccion.monto)).filter(
+            Transaccion.tipo == TIPO_TRANSACCION_VENTA, Transaccion.fecha >= desde, Transaccion.fecha < hasta
+        ).scalar() or 0.0
+
+    def conteo_por_fechas():
+        return session.query(func.count(Transaccion.id)).filter(
+            Transaccion.fecha >= desde, Transaccion.fecha < hasta).scalar()
+
+    def ids(pagina):
+        return [t.id for t in pagina]
+
+    def recorrido(filas):
+        return round(sum(fila[3] for fila in filas), 2)
+
+    return [
+        ("total de ventas", total_por_fechas,
+         lambda: repo.get_total_por_tipo(TIPO_TRANSACCION_VENTA, periodo.id)),
+        ("primera página", lambda: ids(repo.get_pagina(fecha_inicio=desde, fecha_fin=ultimo_instante)),
+         lambda: ids(repo.get_pagina(periodo_id=periodo.id))),
+        ("cantidad", conteo_por_fechas, lambda: repo.contar_por_periodo(periodo.id)),
+        ("recorrido (exportación)", lambda: recorrido(repo.iterar_filas(desde, ultimo_instante)),
+         lambda: recorrido(repo.iterar_filas(periodo_id=periodo.id))),
+    ]
+
+
+def comparar(periodos: list, repeticiones: int, errores: list) -> dict:
+    """Mide cada consulta por fechas y por período; retorna {(período, consulta): (ms fechas, ms período)}"""
+    tiempos = {}
+    with get_session() as session:
+        for periodo in periodos:
+            for nombre, por_fechas, por_periodo in consultas(session, periodo):
+                ms_fechas, esperado = medir(por_fechas, repeticiones)
+                ms_periodo, obtenido = medir(por_periodo, repeticiones)
+                if isinstance(esperado, list) and esperado != obtenido or \
+                        not isinstance(esperado, list) and not iguales(esperado, obtenido):
+                    errores.append(f"{periodo.nombre}, {nombre}: por período {obtenido}, por fechas {esperado}")
+                tiempos[(periodo.nombre, nombre)] = (ms_fechas, ms_periodo)
+    return tiempos
+
+
+def verificar_planes(periodos: list, errores: list):
+    """Verifica que las consultas por periodo_id usen un índice de período"""
+    with get_session() as session:
+        for periodo in periodos:
+            for nombre, _, por_periodo in consultas(session, periodo):
+                for plan in planes(por_periodo):
+                    if 'ix_transacciones_periodo' not in plan:
+                        errores.append(f"{periodo.nombre}, {nombre}: no usa un índice de período ({plan})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='1m')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--lote', type=int, default=10_000, help="Transacciones del registro masivo")
+    parser.add_argument('--tamano-asignacion', type=int, default=config.PERIODOS_ASIGNACION_LOTE,
+                        help="Transacciones por lote de asignar_pendientes")
+    args = parser.parse_args()
+
+    errores = []
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-periodos-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        inicio = time.perf_counter()
+        crear_libro(ruta, ESCALAS[args.escala])
+        print(f"Libro '{args.escala}' generado en {time.perf_counter() - inicio:.1f} s\n")
+        configurar_perfil(config.DB_PERFIL, f"sqlite:///{ruta}")
+        fabrica = sessionmaker(bind=database.engine)
+
+        with get_session() as session:
+            usuario_id = session.query(Usuario.id).order_by(Usuario.id).first()[0]
+            ultimo_mes = session.query(Periodo).order_by(Periodo.fecha_inicio.desc()).first()
+            session.expunge(ultimo_mes)
+        en_curso = crear_periodo_en_curso(usuario_id)
+
+        # Registro: cada transacción nueva queda en el período en curso
+        registrar(fabrica, args.lote)  # Calienta la caché de páginas para que ambas mediciones partan igual
+        con_indices = registrar(fabrica, args.lote)
+        with database.engine.connect() as conexion:
+            fuera = conexion.execute(text(
+                "SELECT count(*) FROM transacciones WHERE fecha >= :desde AND periodo_id IS NOT :periodo"
+            ), {'desde': en_curso.fecha_inicio, 'periodo': en_curso.id}).scalar()
+        if fuera:
+            errores.append(f"{fuera} transacciones registradas no quedaron en el período {en_curso.nombre}")
+
+        # Asignación de los períodos a un libro que no los tiene
+        with database.engine.begin() as conexion:
+            for tabla in ("transacciones", "asientos"):
+                conexion.execute(text(f"CREATE TABLE esperado_{tabla} AS SELECT id, periodo_id FROM {tabla}"))
+                conexion.execute(text(f"UPDATE {tabla} SET periodo_id = NULL"))
+        inicio = time.perf_counter()
+        with get_session() as session:
+            totales = PeriodosService(session).asignar_pendientes(args.tamano_asignacion)
+        ms_asignacion = (time.perf_counter() - inicio) * 1000
+        with database.engine.begin() as conexion:
+            for tabla in ("transacciones", "asientos"):
+                distintas = conexion.execute(text(
+                    f"SELECT count(*) FROM {tabla} t JOIN esperado_{tabla} e ON e.id = t.id "
+                    f"WHERE t.periodo_id IS NOT e.periodo_id"
+                )).scalar()
+                if distintas:
+                    errores.append(f"{distintas} {tabla} quedaron con un período distinto al de su fecha")
+                conexion.execute(text(f"DROP TABLE esperado_{tabla}"))
+        if totales['sin_periodo']:
+            errores.append(f"{totales['sin_periodo']} transacciones quedaron sin período")
+
+        # Consultas de un período: por fechas y por periodo_id, con y sin los índices de período
+        periodos = [ultimo_mes, en_curso]
+        verificar_planes(periodos, errores)
+        con_indice = comparar(periodos, args.repeticiones, errores)
+        for indice in INDICES_PERIODO:
+            indice.drop(database.engine)
+        sin_indice = comparar(periodos, args.repeticiones, errores)
+        sin_indices = registrar(fabrica, args.lote)
+        for indice in INDICES_PERIODO:
+            indice.create(database.engine)
+
+        with get_session() as session:
+            cantidades = {p.nombre: TransaccionRepository(session).contar_por_periodo(p.id) for p in periodos}
+            resuelto = PeriodoRepository(session).resolver_fecha(datetime.now())
+        if resuelto != en_curso.id:
+            errores.append(f"resolver_fecha(ahora) retornó {resuelto}, se esperaba {en_curso.id}")
+        database.engine.dispose()
+
+    imprimir_tabla(["asignar_pendientes", "transacciones", "asientos", "lote", "ms", "filas/s"],
+                   [["", f"{totales['transacciones']:,}", f"{totales['asientos']:,}",
+                     f"{args.tamano_asignacion:,}", f"{ms_asignacion:.0f}",
+                     f"{totales['transacciones'] / ms_asignacion * 1000:,.0f}"]])
+    print()
+    imprimir_tabla(["período", "consulta", "por fechas ms", "por período ms", "por período sin índice ms"],
+                   [[f"{periodo} ({cantidades[periodo]:,})", nombre, f"{ms_fechas:.2f}", f"{ms_periodo:.2f}",
+                     f"{sin_indice[(periodo, nombre)][1]:.2f}"]
+                    for (periodo, nombre), (ms_fechas, ms_periodo) in con_indice.items()])
+    print()
+    imprimir_tabla(["registrar_lote", "sin índices de período ms", "con índices de período ms", "costo"],
+                   [[f"{args.lote:,}", f"{sin_indices:.0f}", f"{con_indices:.0f}",
+                     f"{(con_indices / sin_indices - 1) * 100:+.0f}%"]])
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print(f"\nOK: {totales['transacciones']:,} transacciones asignadas a su período; "
+          f"las consultas por período usan sus índices y coinciden con las de fechas")
+
+
+if __name__ == "__main__":
+    main()
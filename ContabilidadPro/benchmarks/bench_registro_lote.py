@@ -0,0 +1,86 @@
+"""
+Benchmark de registro masivo: registrar_lote contra llamadas individuales
+
+Compara el cierre diario de N tickets (por defecto 10.000, mitad ventas y
+mitad compras) registrados:
+    - uno por uno con registrar_venta/registrar_compra, un commit por ticket
+      (como hoy desde el punto de venta);
+    - con ContabilidadService.registrar_lote en una sola unidad de trabajo.
+En ambos casos se verifica que los saldos finales coincidan.
+
+Uso:
+    python -m benchmarks.bench_registro_lote [--registros 10000]
+"""
+import argparse
+import time
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
+from app.repositories.cuenta_repository import CuentaRepository
+from app.services.contabilidad_service import ContabilidadService
+from benchmarks.comun import base_temporal, imprimir_tabla
+
+
+def generar_registros(cantidad: int, usuario) -> list:
+    """Genera tickets alternando ventas y compras"""
+    return [
+        (TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+         f"Ticket {i}", float(i % 100 + 1), usuario)
+        for i in range(cantidad)
+    ]
+
+
+def saldos(fabrica) -> tuple:
+    with fabrica() as session:
+        repo = CuentaRepository(session)
+        return (repo.get_by_codigo("ING-VENTAS").saldo, repo.get_by_codigo("GAS-COMPRAS").saldo)
+
+
+def por_llamada(cantidad: int) -> tuple:
+    with base_temporal() as (engine, fabrica, usuario):
+        registros = generar_registros(cantidad, usuario)
+        inicio = time.perf_counter()
+        for tipo, concepto, monto, usuario_registro in registros:
+            with fabrica() as session:
+                servicio = ContabilidadService(session)
+                if tipo == TIPO_TRANSACCION_VENTA:
+                    servicio.registrar_venta(concepto, monto, usuario_registro)
+                else:
+                    servicio.registrar_compra(concepto, monto, usuario_registro)
+                session.commit()
+        return time.perf_counter() - inicio, saldos(fabrica)
+
+
+def en_lote(cantidad: int) -> tuple:
+    with base_temporal() as (engine, fabrica, usuario):
+        registros = generar_registros(cantidad, usuario)
+        inicio = time.perf_counter()
+        with fabrica() as session:
+            resultados = ContabilidadService(session).registrar_lote(registros)
+            session.commit()
+        transcurrido = time.perf_counter() - inicio
+        if not all(exito for exito, _ in resultados):
+            raise RuntimeError("registrar_lote rechazó registros válidos")
+        return transcurrido, saldos(fabrica)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--registros', type=int, default=10000)
+    args = parser.parse_args()
+
+    t_llamada, saldos_llamada = por_llamada(args.registros)
+    t_lote, saldos_lote = en_lote(args.registros)
+
+    if any(abs(a - b) > 0.005 for a, b in zip(saldos_llamada, saldos_lote)):
+        raise RuntimeError(f"Saldos distintos: {saldos_llamada} vs {saldos_lote}")
+
+    imprimir_tabla(
+        ["método", "segundos", "registros/s"],
+        [["registrar_venta/compra (1 commit c/u)", f"{t_llamada:.2f}", f"{args.registros / t_llamada:.0f}"],
+         ["registrar_lote (1 commit)", f"{t_lote:.2f}", f"{args.registros / t_lote:.0f}"]]
+    )
+    print(f"\nMejora: {t_llamada / t_lote:.1f}x  |  Saldos finales (ventas, compras): {saldos_lote}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark de los resúmenes diarios y mensuales contra recorrer las transacciones
+
+Genera un libro sintético y compara cada consulta por rango de fechas
+leyendo las transacciones (una fila por transacción) y leyendo los
+resúmenes (una fila por día o mes, tipo y cuenta). Verifica que ambas den
+el mismo resultado.
+
+También mide cuánto agregan los triggers de los resúmenes a un registro
+masivo: registra un lote con los triggers y otro igual sin ellos.
+
+Uso:
+    python -m benchmarks.bench_resumenes [--escala 1m] [--repeticiones 5] [--lote 10000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from sqlalchemy import func, text
+from sqlalchemy.orm import sessionmaker
+from app.core.constants import TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA
+from app.core.database import crear_engine
+from app.core.resumenes import RESUMENES
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.services.contabilidad_service import ContabilidadService
+from benchmarks.comun import imprimir_tabla
+from benchmarks.generador_datos import ESCALAS, FECHA_FIN, crear_libro
+
+TOLERANCIA = 0.01
+
+
+def medir(funcion, repeticiones: int) -> tuple:
+    """Retorna (mejor tiempo en ms, resultado)"""
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor, resultado
+
+
+def iguales(a, b) -> bool:
+    """Compara dos resultados numéricos, por clave si son diccionarios"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(abs(a[k] - b[k]) <= TOLERANCIA for k in a)
+    return abs((a or 0.0) - (b or 0.0)) <= TOLERANCIA
+
+
+def consultas(session) -> list:
+    """Pares (consulta, leyendo transacciones, leyendo resúmenes)"""
+    transacciones = TransaccionRepository(session)
+    resumenes = ResumenRepository(session)
+    anio = (date(FECHA_FIN.year, 1, 1), date(FECHA_FIN.year + 1, 1, 1))
+    mitad_de_mes = date(FECHA_FIN.year, 6, 15)
+
+    def total(tipo, desde=None, hasta=None):
+        query = session.query(func.sum(Transaccion.monto)).filter(Transaccion.tipo == tipo)
+        if desde:
+            query = query.filter(Transaccion.fecha >= datetime.combine(desde, datetime.min.time()))
+        if hasta:
+            query = query.filter(Transaccion.fecha < datetime.combine(hasta, datetime.min.time()))
+        return query.scalar()
+
+    def por_mes_transacciones():
+        mes = func.substr(Transaccion.fecha, 1, 7)
+        return {f"{m}/{t}": v for m, t, v in session.query(mes, Transaccion.tipo, func.sum(Transaccion.monto))
+                .filter(Transaccion.tipo.in_([TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA]))
+                .group_by(mes, Transaccion.tipo).all()}
+
+    def por_mes_resumenes():
+        return {f"{m:%Y-%m}/{t}": v for m, t, _, v in resumenes.totales_por_mes()
+                if t in (TIPO_TRANSACCION_VENTA, TIPO_TRANSACCION_COMPRA)}
+
+    return [
+        ("total de ventas", lambda: total(TIPO_TRANSACCION_VENTA),
+         lambda: resumenes.get_total(TIPO_TRANSACCION_VENTA)),
+        (f"ventas de {anio[0].year}", lambda: total(TIPO_TRANSACCION_VENTA, *anio),
+         lambda: resumenes.get_total(TIPO_TRANSACCION_VENTA, *anio)),
+        ("ventas y compras por mes", por_mes_transacciones, por_mes_resumenes),
+        (f"saldos al {mitad_de_mes:%d/%m/%Y}",
+         lambda: transacciones.sumar_por_cuenta(hasta=datetime.combine(mitad_de_mes, datetime.min.time())),
+         lambda: resumenes.sumar_por_cuenta(hasta=mitad_de_mes)),
+    ]
+
+
+def registrar(fabrica: sessionmaker, tamano: int) -> float:
+    """Registra un lote de ventas y compras y retorna los milisegundos (con commit)"""
+    with fabrica() as session:
+        usuario = session.query(Usuario).first()
+        lote = [(TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+                 f"Ticket {i}", float(i % 1000 + 1), usuario) for i in range(tamano)]
+        inicio = time.perf_counter()
+        ContabilidadService(session).registrar_lote(lote)
+        session.commit()
+        return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='1m')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--lote', type=int, default=10_000, help="Transacciones del registro masivo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-resumenes-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        inicio = time.perf_counter()
+        crear_libro(ruta, ESCALAS[args.escala])
+        print(f"Libro '{args.escala}' generado en {time.perf_counter() - inicio:.1f} s\n")
+        engine = crear_engine(f"sqlite:///{ruta}")
+        fabrica = sessionmaker(bind=engine)
+
+        filas, errores = [], []
+        with fabrica() as session:
+            for nombre, con_transacciones, con_resumenes in consultas(session):
+                ms_transacciones, esperado = medir(con_transacciones, args.repeticiones)
+                ms_resumenes, obtenido = medir(con_resumenes, args.repeticiones)
+                if not iguales(esperado, obtenido):
+                    errores.append(f"{nombre}: los resúmenes no coinciden con las transacciones")
+                filas.append([nombre, f"{ms_transacciones:.1f}", f"{ms_resumenes:.2f}",
+                              f"{ms_transacciones / ms_resumenes:.0f}x" if ms_resumenes else "-"])
+
+        registrar(fabrica, args.lote)  # Calienta la caché de páginas para que ambas mediciones partan igual
+        con_triggers = registrar(fabrica, args.lote)
+        with engine.begin() as conexion:
+            for tabla in RESUMENES:
+                for sufijo in ("ai", "ad", "au"):
+                    conexion.execute(text(f"DROP TRIGGER {tabla}_{sufijo}"))
+        sin_triggers = registrar(fabrica, args.lote)
+        engine.dispose()
+
+    imprimir_tabla(["consulta", "transacciones ms", "resúmenes ms", "mejora"], filas)
+    print()
+    imprimir_tabla(["registrar_lote", "sin triggers ms", "con triggers ms", "costo"],
+                   [[f"{args.lote:,}", f"{sin_triggers:.0f}", f"{con_triggers:.0f}",
+                     f"{(con_triggers / sin_triggers - 1) * 100:+.0f}%"]])
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print("\nOK: los resúmenes coinciden con las transacciones")
+
+
+if __name__ == "__main__":
+    main()
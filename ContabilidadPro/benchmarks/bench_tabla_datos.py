@@ -0,0 +1,130 @@
+"""
+Benchmark de la tabla de transacciones paginada (TablaDatos)
+
+Genera un libro sintético y recorre la tabla de transacciones con la
+vista: baja página por página hasta recorrer N filas, vuelve al principio
+(las primeras páginas ya se descartaron de la caché y se vuelven a pedir)
+y repite ordenando por monto. Mientras tanto, el monitor de bloqueos mide
+las pausas del hilo de la interfaz. Se informa el tiempo por página, el
+mayor bloqueo y cuántas filas quedan en memoria, que no debe superar
+TABLA_PAGINAS_EN_CACHE páginas sin importar cuántas se recorran.
+
+Corre sin pantalla (QT_QPA_PLATFORM=offscreen si no se indica otra).
+
+Uso:
+    python -m benchmarks.bench_tabla_datos [--escala 1m] [--filas 50000] [--umbral 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer, Qt
+from PyQt6.QtWidgets import QApplication
+from app.core.database import configurar_perfil
+from app.gui.monitor_bloqueos import MonitorBloqueos
+from app.gui.tareas import ejecutor_tareas
+from app.gui.widgets.tabla_datos import TablaDatos, FuenteTransacciones
+from benchmarks.comun import imprimir_tabla
+from benchmarks.generador_datos import ESCALAS, crear_libro
+import config
+
+
+def esperar(condicion, limite_s: float = 30.0):
+    """Atiende el bucle de eventos hasta que se cumpla la condición"""
+    fin = time.perf_counter() + limite_s
+    while not condicion():
+        if time.perf_counter() > fin:
+            raise TimeoutError("La tabla no terminó de cargar")
+        loop = QEventLoop()
+        QTimer.singleShot(1, loop.quit)
+        loop.exec()
+
+
+def recorrer(tabla: TablaDatos, filas: int, monitor: MonitorBloqueos) -> dict:
+    """Baja hasta recorrer `filas` filas y vuelve al principio; retorna las mediciones"""
+    modelo = tabla.modelo
+    barra = tabla.tabla.verticalScrollBar()
+    monitor.reiniciar()
+    monitor.iniciar()
+    inicio = time.perf_counter()
+    while modelo.rowCount() < filas and not modelo.completo:
+        actuales = modelo.rowCount()
+        barra.setValue(barra.maximum())
+        esperar(lambda: modelo.rowCount() > actuales or modelo.completo)
+    bajada = time.perf_counter() - inicio
+
+    # Volver al principio: las páginas descartadas se piden de nuevo
+    inicio = time.perf_counter()
+    barra.setValue(0)
+    esperar(lambda: modelo.data(modelo.index(0, 0)) != modelo.CARGANDO)
+    subida = time.perf_counter() - inicio
+    monitor.detener()
+
+    paginas = max(1, modelo.rowCount() // modelo.tamano_pagina)
+    return {
+        'filas': modelo.rowCount(),
+        'ms_pagina': bajada * 1000 / paginas,
+        'ms_volver': subida * 1000,
+        'en_memoria': modelo.filas_en_memoria(),
+        'bloqueo': monitor.estadisticas(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='1m')
+    parser.add_argument('--filas', type=int, default=50_000, help="Filas a recorrer en cada pasada")
+    parser.add_argument('--umbral', type=float, default=config.GUI_UMBRAL_BLOQUEO_MS,
+                        help="Milisegundos a partir de los cuales se cuenta un bloqueo")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-tabla-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        inicio = time.perf_counter()
+        crear_libro(ruta, ESCALAS[args.escala])
+        print(f"Libro '{args.escala}' generado en {time.perf_counter() - inicio:.1f} s\n")
+        configurar_perfil(config.DB_PERFIL, f"sqlite:///{ruta}")
+
+        monitor = MonitorBloqueos(umbral_ms=args.umbral, registrar=False)
+        tabla = TablaDatos(FuenteTransacciones())
+        tabla.resize(1000, 700)
+        tabla.show()
+        esperar(lambda: tabla.modelo.rowCount() > 0)
+
+        filas = [("por fecha", recorrer(tabla, args.filas, monitor))]
+        monto = next(i for i, c in enumerate(tabla.modelo.fuente.columnas) if c.orden == 'monto')
+        tabla.tabla.sortByColumn(monto, Qt.SortOrder.DescendingOrder)
+        esperar(lambda: tabla.modelo.rowCount() > 0)
+        filas.append(("por monto", recorrer(tabla, args.filas, monitor)))
+        limite = tabla.modelo.paginas_en_cache * tabla.modelo.tamano_pagina
+
+        tabla.close()
+        ejecutor_tareas().esperar()
+    del app
+
+    imprimir_tabla(
+        ["orden", "filas recorridas", "ms por página", "ms al volver", "filas en memoria",
+         f"bloqueos >= {args.umbral:.0f} ms", "máximo ms"],
+        [[orden, f"{r['filas']:,}", f"{r['ms_pagina']:.1f}", f"{r['ms_volver']:.0f}", f"{r['en_memoria']:,}",
+          r['bloqueo']['bloqueos'], f"{r['bloqueo']['maximo_ms']:.0f}"] for orden, r in filas]
+    )
+    errores = [f"{orden}: {r['en_memoria']:,} filas en memoria (máximo {limite:,})"
+               for orden, r in filas if r['en_memoria'] > limite]
+    errores += [f"{orden}: la interfaz se bloqueó {r['bloqueo']['bloqueos']} veces"
+                for orden, r in filas if r['bloqueo']['bloqueos']]
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print(f"\nOK: memoria acotada a {limite:,} filas y sin bloqueos de la interfaz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark del verificador de saldos sobre un libro grande
+
+Carga N transacciones (por defecto 10 millones) repartidas en varias cuentas,
+con la mitad concentrada en dos de ellas (como ventas y compras en un libro
+real), desajusta a propósito el saldo de algunas cuentas y mide:
+    - la verificación con un solo proceso (una suma agrupada);
+    - la verificación repartida en varios procesos por tramos de ID;
+    - la reparación (un único UPDATE) y una verificación final sin diferencias.
+Informa si la verificación paralela termina dentro del tiempo objetivo.
+La carga inicial de 10 millones de filas tarda varios minutos (incluye
+mantener el índice de texto completo de los conceptos).
+
+Uso:
+    python -m benchmarks.bench_verificacion_saldos [--transacciones 10000000]
+        [--cuentas 1000] [--procesos 4] [--objetivo 60]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.core.constants import TIPO_TRANSACCION_GENERAL, TIPO_GASTO, NATURALEZA_DEUDORA
+from app.models.cuenta import Cuenta
+from app.models.transaccion import Transaccion
+from app.repositories.cuenta_repository import CuentaRepository
+from app.services.verificacion_saldos_service import VerificacionSaldosService
+from benchmarks.comun import base_temporal, imprimir_tabla
+
+CUENTAS_DESAJUSTADAS = 5
+
+
+def cargar(fabrica, usuario, transacciones: int, cuentas: int):
+    """Inserta cuentas y transacciones con INSERT por lotes y deja los saldos correctos"""
+    ahora = datetime.now()
+    with fabrica() as session:
+        session.execute(Cuenta.__table__.insert(), [
+            {'codigo': f"BENCH-{i}", 'nombre': f"Cuenta {i}", 'tipo': TIPO_GASTO,
+             'naturaleza': NATURALEZA_DEUDORA, 'saldo': 0.0, 'activa': 1,
+             'created_at': ahora, 'updated_at': ahora}
+            for i in range(cuentas)
+        ])
+        ids = [fila.id for fila in session.query(Cuenta.id).order_by(Cuenta.id)]
+
+        inicio = ahora - timedelta(days=365)
+        lote = 100000
+        for desde in range(0, transacciones, lote):
+            filas = []
+            for i in range(desde, min(desde + lote, transacciones)):
+                # La mitad de los movimientos va a las dos primeras cuentas
+                cuenta_id = ids[i % 2] if i % 2 == 0 or cuentas <= 2 else ids[i % cuentas]
+                filas.append({
+                    'fecha': inicio + timedelta(seconds=i % 31536000), 'concepto': f"Mov {i}",
+                    'monto': float(i % 997 + 1) / 4, 'tipo': TIPO_TRANSACCION_GENERAL,
+                    'cuenta_id': cuenta_id, 'usuario_id': usuario.id,
+                    'created_at': ahora, 'updated_at': ahora
+                })
+            session.execute(Transaccion.__table__.insert(), filas)
+        CuentaRepository(session).recalcular_saldos(ids)
+        session.commit()
+    return ids
+
+
+def medir(fabrica, procesos: int) -> tuple:
+    with fabrica() as session:
+        inicio = time.perf_counter()
+        diferencias = VerificacionSaldosService(session).verificar(procesos)
+        return time.perf_counter() - inicio, diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transacciones', type=int, default=10000000)
+    parser.add_argument('--cuentas', type=int, default=1000)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--objetivo', type=float, default=60.0,
+                        help="Segundos máximos para la verificación paralela")
+    args = parser.parse_args()
+
+    with base_temporal('bulk-load') as (engine, fabrica, usuario):
+        inicio = time.perf_counter()
+        ids = cargar(fabrica, usuario, args.transacciones, args.cuentas)
+        print(f"Carga de {args.transacciones:,} transacciones: {time.perf_counter() - inicio:.1f} s")
+
+        desajustadas = ids[:CUENTAS_DESAJUSTADAS]
+        with fabrica() as session:
+            session.execute(update(Cuenta).where(Cuenta.id.in_(desajustadas)).values(saldo=Cuenta.saldo + 10))
+            session.commit()
+
+        t_serial, dif_serial = medir(fabrica, 1)
+        t_paralelo, dif_paralelo = medir(fabrica, args.procesos)
+
+        with fabrica() as session:
+            inicio = time.perf_counter()
+            corregidas = VerificacionSaldosService(session).reparar(dif_paralelo)
+            session.commit()
+            t_reparar = time.perf_counter() - inicio
+        t_final, dif_final = medir(fabrica, args.procesos)
+
+    imprimir_tabla(
+        ["paso", "segundos", "transacciones/s", "diferencias"],
+        [["verificar (1 proceso)", f"{t_serial:.2f}", f"{args.transacciones / t_serial:,.0f}", len(dif_serial)],
+         [f"verificar ({args.procesos} procesos)", f"{t_paralelo:.2f}",
+          f"{args.transacciones / t_paralelo:,.0f}", len(dif_paralelo)],
+         ["reparar", f"{t_reparar:.2f}", "-", corregidas],
+         ["verificar después de reparar", f"{t_final:.2f}", "-", len(dif_final)]]
+    )
+
+    errores = []
+    if {d['cuenta_id'] for d in dif_serial} != set(desajustadas) or len(dif_paralelo) != len(dif_serial):
+        errores.append("no se detectaron exactamente las cuentas desajustadas")
+    if dif_final:
+        errores.append("quedaron diferencias después de reparar")
+    if t_paralelo > args.objetivo:
+        errores.append(f"la verificación tardó más que el objetivo de {args.objetivo:.0f} s")
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print(f"\nOK: drift detectado y reparado; verificación en {t_paralelo:.1f} s "
+          f"(objetivo {args.objetivo:.0f} s, mejora {t_serial / t_paralelo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
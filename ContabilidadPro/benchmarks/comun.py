@@ -0,0 +1,69 @@
+"""
+Utilidades compartidas por los benchmarks
+"""
+import statistics
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import crear_engine, init_db
+from app.core.constants import NIVEL_ADMINISTRADOR
+import app.models  # noqa: F401  (registra todos los modelos en Base.metadata)
+from app.models.usuario import Usuario
+
+
+@contextmanager
+def base_temporal(perfil: str = None) -> Iterator[Tuple[Engine, sessionmaker, Usuario]]:
+    """
+    Crea una base de datos SQLite temporal con el esquema completo y un usuario
+
+    Args:
+        perfil: Perfil de rendimiento a usar (None para config.DB_PERFIL)
+
+    Yields:
+        Tupla (engine, fábrica de sesiones, usuario desvinculado de la sesión)
+    """
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-bench-") as carpeta:
+        ruta = Path(carpeta) / "bench.db"
+        engine = crear_engine(f"sqlite:///{ruta}", perfil)
+        init_db(engine)
+        fabrica = sessionmaker(bind=engine, expire_on_commit=False)
+
+        with fabrica() as session:
+            usuario = Usuario(
+                username="bench",
+                password_hash="-",  # No se usa para autenticar
+                nombre="Bench",
+                apellido="Mark",
+                documento="00000000",
+                nivel=NIVEL_ADMINISTRADOR,
+                activo=1
+            )
+            session.add(usuario)
+            session.commit()
+            session.expunge(usuario)
+
+        try:
+            yield engine, fabrica, usuario
+        finally:
+            engine.dispose()
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Calcula el percentil p (0-100) de una lista de valores"""
+    if not valores:
+        return 0.0
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[int(p) - 1]
+
+
+def imprimir_tabla(titulos: List[str], filas: List[List]):
+    """Imprime una tabla de resultados alineada"""
+    anchos = [max(len(str(x)) for x in columna) for columna in zip(titulos, *filas)]
+    print("  ".join(str(t).ljust(a) for t, a in zip(titulos, anchos)))
+    print("  ".join("-" * a for a in anchos))
+    for fila in filas:
+        print("  ".join(str(v).ljust(a) for v, a in zip(fila, anchos)))
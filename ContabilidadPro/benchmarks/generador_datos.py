@@ -0,0 +1,372 @@
+"""
+Generador determinista de libros contables sintéticos
+
+Llena una base con usuarios, plan de cuentas, períodos mensuales,
+transacciones (ventas, compras y asientos balanceados), actividades de
+auditoría y saldos coherentes con las transacciones, repartidos a lo largo
+de varios años. Con la misma semilla y escala se obtienen siempre las
+mismas filas, de modo que los resultados de distintas versiones son
+comparables.
+
+Las filas se insertan con executemany por lotes, sin pasar por los
+servicios. En una base nueva (crear_libro) los índices de búsqueda FTS5 se
+crean y cargan al final, de una vez, en lugar de fila por fila con los
+triggers.
+
+Uso:
+    python -m benchmarks.generador_datos --escala 1m --destino data/libro_1m.db [--semilla 42] [--anios 5]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from app.core.constants import *
+from app.core.busqueda import crear_indices_busqueda
+from app.core.database import Base, crear_engine, init_db
+from app.core.security import hash_password
+import app.models  # noqa: F401  (registra todos los modelos en Base.metadata)
+from app.models.asiento import Asiento
+from app.models.auditoria import Auditoria
+from app.models.cuenta import Cuenta
+from app.models.periodo import Periodo
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.cuenta_repository import CuentaRepository
+
+# Cantidad de transacciones de cada escala
+ESCALAS = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+SEMILLA = 42
+ANIOS = 5
+# Último día del libro: fijo, para que la misma semilla genere las mismas fechas
+FECHA_FIN = datetime(2025, 12, 31)
+# Contraseña de todos los usuarios generados
+PASSWORD = "bench1234"
+# Filas por cada INSERT por lotes
+TAMANO_LOTE = 50_000
+
+# Proporción de transacciones de cada clase; el resto son líneas de asientos
+PROPORCION_VENTAS = 0.45
+PROPORCION_COMPRAS = 0.40
+
+# Plan de cuentas: (código, nombre, tipo). ING-VENTAS y GAS-COMPRAS son las
+# que usa ContabilidadService para ventas y compras
+PLAN_CUENTAS = [
+    ("AC-CAJA", "Caja", TIPO_ACTIVO_CORRIENTE),
+    ("AC-BANCO", "Banco Cuenta Corriente", TIPO_ACTIVO_CORRIENTE),
+    ("AC-CLIENTES", "Deudores por Ventas", TIPO_ACTIVO_CORRIENTE),
+    ("AC-MERCADERIAS", "Mercaderías", TIPO_ACTIVO_CORRIENTE),
+    ("ANC-RODADOS", "Rodados", TIPO_ACTIVO_NO_CORRIENTE),
+    ("ANC-MUEBLES", "Muebles y Útiles", TIPO_ACTIVO_NO_CORRIENTE),
+    ("ANC-INMUEBLES", "Inmuebles", TIPO_ACTIVO_NO_CORRIENTE),
+    ("PC-PROVEEDORES", "Proveedores", TIPO_PASIVO_CORRIENTE),
+    ("PC-SUELDOS", "Sueldos a Pagar", TIPO_PASIVO_CORRIENTE),
+    ("PC-IMPUESTOS", "Impuestos a Pagar", TIPO_PASIVO_CORRIENTE),
+    ("PNC-PRESTAMOS", "Préstamos Bancarios", TIPO_PASIVO_NO_CORRIENTE),
+    ("CAP-SOCIAL", "Capital Social", TIPO_CAPITAL),
+    ("RES-LEGAL", "Reserva Legal", TIPO_RESERVAS),
+    ("ING-VENTAS", "Ingresos por Ventas", TIPO_INGRESO),
+    ("ING-INTERESES", "Intereses Ganados", TIPO_INGRESO),
+    ("GAS-COMPRAS", "Gastos por Compras", TIPO_GASTO),
+    ("GAS-SUELDOS", "Sueldos y Jornales", TIPO_GASTO),
+    ("GAS-ALQUILERES", "Alquileres", TIPO_GASTO),
+    ("GAS-SERVICIOS", "Servicios Públicos", TIPO_GASTO),
+]
+
+PALABRAS = ["mercadería", "alquiler", "servicio", "luz", "agua", "sueldo", "honorarios",
+            "flete", "insumos", "papelería", "mantenimiento", "seguro", "impuesto",
+            "publicidad", "combustible", "repuestos", "crédito", "contado", "cliente",
+            "proveedor", "mayorista", "minorista", "factura", "remito", "ticket"]
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto",
+         "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+
+def _naturaleza(tipo: str) -> str:
+    """Naturaleza de una cuenta según su tipo (como ContabilidadService)"""
+    deudoras = (TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE, TIPO_GASTO)
+    return NATURALEZA_DEUDORA if tipo in deudoras else NATURALEZA_ACREEDORA
+
+
+def _meses(desde: datetime, hasta: datetime) -> Iterator[Tuple[datetime, datetime]]:
+    """Primer y último día de cada mes entre dos fechas"""
+    inicio = datetime(desde.year, desde.month, 1)
+    while inicio <= hasta:
+        siguiente = datetime(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+        yield inicio, siguiente - timedelta(days=1)
+        inicio = siguiente
+
+
+class GeneradorLibro:
+    """Genera un libro sintético con una cantidad fija de transacciones"""
+
+    def __init__(self, transacciones: int, semilla: int = SEMILLA, anios: int = ANIOS,
+                 fecha_fin: datetime = FECHA_FIN):
+        """
+        Args:
+            transacciones: Cantidad total de transacciones (incluye las líneas de asientos)
+            semilla: Semilla del generador de números aleatorios
+            anios: Años que abarca el libro, hasta fecha_fin
+            fecha_fin: Último día del libro
+        """
+        self.transacciones = transacciones
+        self.semilla = semilla
+        self.fecha_fin = fecha_fin + timedelta(days=1)
+        self.fecha_inicio = datetime(fecha_fin.year - anios + 1, 1, 1)
+        # Unos pocos usuarios en libros chicos, hasta 200 en los grandes
+        self.usuarios = min(200, max(3, transacciones // 50_000))
+
+    def generar(self, engine: Engine) -> Dict[str, int]:
+        """
+        Agrega el libro a la base (puede tener datos previos) y recalcula los saldos
+
+        Args:
+            engine: Engine de una base ya inicializada con init_db
+
+        Returns:
+            Cantidad de filas generadas por tabla
+        """
+        azar = random.Random(self.semilla)
+        usuarios = self._crear_usuarios(engine)
+        cuentas = self._crear_cuentas(engine)
+        periodos = self._crear_periodos(engine)
+
+        with engine.connect() as conexion:
+            asiento_id = conexion.execute(select(func.coalesce(func.max(Asiento.id), 0))).scalar()
+            numero = conexion.execute(select(func.coalesce(func.max(Asiento.numero), 0))).scalar()
+
+        totales = {'transacciones': 0, 'asientos': 0, 'actividades': 0}
+        for transacciones, asientos, actividades in self._lotes(azar, usuarios, cuentas, periodos,
+                                                                asiento_id, numero):
+            with engine.begin() as conexion:
+                if asientos:
+                    conexion.execute(Asiento.__table__.insert(), asientos)
+                conexion.execute(Transaccion.__table__.insert(), transacciones)
+                conexion.execute(Auditoria.__table__.insert(), actividades)
+            totales['transacciones'] += len(transacciones)
+            totales['asientos'] += len(asientos)
+            totales['actividades'] += len(actividades)
+
+        totales['actividades'] += self._registrar_ingresos(engine, azar, usuarios)
+
+        # Los saldos quedan coherentes con las transacciones, como en un libro real
+        with sessionmaker(bind=engine)() as session:
+            CuentaRepository(session).recalcular_saldos(cuentas.values())
+            session.commit()
+
+        return {'usuarios': len(usuarios), 'cuentas': len(cuentas), 'periodos': len(periodos), **totales}
+
+    def _crear_usuarios(self, engine: Engine) -> List[int]:
+        """Crea los usuarios (el primero, administrador) y retorna sus IDs"""
+        password_hash = hash_password(PASSWORD)
+        filas = [{
+            'username': f"usuario{i:03d}",
+            'password_hash': password_hash,
+            'nombre': f"Nombre{i:03d}",
+            'apellido': "Sintético",
+            'documento': f"7{self.semilla % 1000:03d}{i:04d}",
+            'nivel': NIVEL_ADMINISTRADOR if i == 0 else NIVEL_TRABAJADOR,
+            'activo': 1,
+            'created_at': self.fecha_inicio,
+            'updated_at': self.fecha_inicio
+        } for i in range(self.usuarios)]
+        with engine.begin() as conexion:
+            conexion.execute(Usuario.__table__.insert(), filas)
+            return list(conexion.execute(
+                select(Usuario.id).where(Usuario.username.in_([f['username'] for f in filas]))
+                .order_by(Usuario.id)
+            ).scalars())
+
+    def _crear_cuentas(self, engine: Engine) -> Dict[str, int]:
+        """Crea las cuentas del plan que falten; retorna {código: id}"""
+        with engine.begin() as conexion:
+            existentes = set(conexion.execute(select(Cuenta.codigo)).scalars())
+            filas = [{
+                'codigo': codigo, 'nombre': nombre, 'tipo': tipo, 'naturaleza': _naturaleza(tipo),
+                'saldo': 0.0, 'activa': 1, 'created_at': self.fecha_inicio, 'updated_at': self.fecha_inicio
+            } for codigo, nombre, tipo in PLAN_CUENTAS if codigo not in existentes]
+            if filas:
+                conexion.execute(Cuenta.__table__.insert(), filas)
+            return dict(conexion.execute(
+                select(Cuenta.codigo, Cuenta.id).where(Cuenta.codigo.in_([c for c, _, _ in PLAN_CUENTAS]))
+            ).all())
+
+    def _crear_periodos(self, engine: Engine) -> Dict[Tuple[int, int], int]:
+        """Crea un período abierto por mes; retorna {(año, mes): id}"""
+        filas = [{
+            'nombre': f"{MESES[inicio.month - 1]} {inicio.year}",
+            'fecha_inicio': inicio,
+            'fecha_fin': fin,
+            'cerrado': 0,
+            'resultado': 0.0,
+            'created_at': inicio,
+            'updated_at': inicio
+        } for inicio, fin in _meses(self.fecha_inicio, self.fecha_fin - timedelta(days=1))]
+        with engine.begin() as conexion:
+            return {(f['fecha_inicio'].year, f['fecha_inicio'].month):
+                    conexion.execute(Periodo.__table__.insert(), f).inserted_primary_key[0]
+                    for f in filas}
+
+    def _lotes(self, azar: random.Random, usuarios: List[int], cuentas: Dict[str, int],
+               periodos: Dict[Tuple[int, int], int], asiento_id: int,
+               numero: int) -> Iterator[Tuple[List[Dict], List[Dict], List[Dict]]]:
+        """
+        Genera las filas en orden cronológico, por lotes de TAMANO_LOTE transacciones
+
+        Yields:
+            Tuplas (transacciones, asientos, actividades) de cada lote
+        """
+        deudoras = [cuentas[c] for c, _, t in PLAN_CUENTAS
+                    if _naturaleza(t) == NATURALEZA_DEUDORA and c != "GAS-COMPRAS"]
+        acreedoras = [cuentas[c] for c, _, t in PLAN_CUENTAS
+                      if _naturaleza(t) == NATURALEZA_ACREEDORA and c != "ING-VENTAS"]
+        paso = (self.fecha_fin - self.fecha_inicio) / max(self.transacciones, 1)
+
+        transacciones, asientos, actividades = [], [], []
+        i = 0
+        while i < self.transacciones:
+            fecha = self.fecha_inicio + paso * (i + azar.random())
+            fecha = fecha.replace(microsecond=0)
+            usuario_id = azar.choice(usuarios)
+            periodo_id = periodos[(fecha.year, fecha.month)]
+            palabras = " ".join(azar.sample(PALABRAS, 3))
+            clase = azar.random()
+            restantes = self.transacciones - i
+
+            if clase < PROPORCION_VENTAS + PROPORCION_COMPRAS or restantes < 2:
+                if clase < PROPORCION_VENTAS or restantes < 2:
+                    prefijo, tipo, actividad, cuenta_id = ("Venta", TIPO_TRANSACCION_VENTA,
+                                                           ACTIVIDAD_VENTA, cuentas["ING-VENTAS"])
+                else:
+                    prefijo, tipo, actividad, cuenta_id = ("Compra", TIPO_TRANSACCION_COMPRA,
+                                                           ACTIVIDAD_COMPRA, cuentas["GAS-COMPRAS"])
+                concepto = f"{palabras} #{i}"
+                monto = round(max(azar.lognormvariate(4.5, 1.2), 0.01), 2)
+                transacciones.append({
+                    'fecha': fecha, 'concepto': f"{prefijo}: {concepto}", 'monto': monto, 'tipo': tipo,
+                    'cuenta_id': cuenta_id, 'asiento_id': None, 'periodo_id': periodo_id,
+                    'usuario_id': usuario_id, 'created_at': fecha, 'updated_at': fecha
+                })
+                actividades.append({
+                    'usuario_id': usuario_id, 'tipo_actividad': actividad,
+                    'descripcion': f"{prefijo} registrada: {concepto} - ${monto:,.2f}",
+                    'ip_address': None, 'fecha_hora': fecha, 'created_at': fecha, 'updated_at': fecha
+                })
+                i += 1
+            else:
+                # Asiento balanceado: pares de líneas deudora/acreedora por el mismo monto
+                asiento_id += 1
+                numero += 1
+                pares = min(azar.randint(1, 3), restantes // 2)
+                asientos.append({
+                    'id': asiento_id, 'numero': numero, 'fecha': fecha,
+                    'descripcion': f"Asiento {numero}: {palabras}", 'periodo_id': periodo_id,
+                    'usuario_id': usuario_id, 'created_at': fecha, 'updated_at': fecha
+                })
+                for _ in range(pares):
+                    monto = round(max(azar.lognormvariate(6, 1.5), 0.01), 2)
+                    for cuenta_id in (azar.choice(deudoras), azar.choice(acreedoras)):
+                        transacciones.append({
+                            'fecha': fecha, 'concepto': f"Asiento {numero}: {palabras}", 'monto': monto,
+                            'tipo': TIPO_TRANSACCION_GENERAL, 'cuenta_id': cuenta_id,
+                            'asiento_id': asiento_id, 'periodo_id': periodo_id,
+                            'usuario_id': usuario_id, 'created_at': fecha, 'updated_at': fecha
+                        })
+                actividades.append({
+                    'usuario_id': usuario_id, 'tipo_actividad': ACTIVIDAD_CREAR_TRANSACCION,
+                    'descripcion': f"Asiento {numero} registrado: {palabras} ({pares * 2} líneas)",
+                    'ip_address': None, 'fecha_hora': fecha, 'created_at': fecha, 'updated_at': fecha
+                })
+                i += pares * 2
+
+            if len(transacciones) >= TAMANO_LOTE:
+                yield transacciones, asientos, actividades
+                transacciones, asientos, actividades = [], [], []
+
+        if transacciones:
+            yield transacciones, asientos, actividades
+
+    def _registrar_ingresos(self, engine: Engine, azar: random.Random, usuarios: List[int]) -> int:
+        """Agrega los inicios y cierres de sesión: uno por usuario en algunos días hábiles"""
+        filas = []
+        dia = self.fecha_inicio
+        # Con muchas transacciones por día, cada usuario entra casi todos los días
+        probabilidad = min(1.0, self.transacciones / (len(usuarios) * 365 * 5))
+        while dia < self.fecha_fin:
+            if dia.weekday() < 5:
+                for n, usuario_id in enumerate(usuarios):
+                    if azar.random() < probabilidad:
+                        entrada = dia + timedelta(hours=8, minutes=azar.randint(0, 59))
+                        salida = entrada + timedelta(hours=azar.randint(4, 9))
+                        for tipo, fecha in ((ACTIVIDAD_LOGIN, entrada), (ACTIVIDAD_LOGOUT, salida)):
+                            filas.append({
+                                'usuario_id': usuario_id, 'tipo_actividad': tipo,
+                                'descripcion': f"{tipo} de usuario{n:03d}",
+                                'ip_address': None, 'fecha_hora': fecha,
+                                'created_at': fecha, 'updated_at': fecha
+                            })
+            dia += timedelta(days=1)
+        for desde in range(0, len(filas), TAMANO_LOTE):
+            with engine.begin() as conexion:
+                conexion.execute(Auditoria.__table__.insert(), filas[desde:desde + TAMANO_LOTE])
+        return len(filas)
+
+
+def crear_libro(ruta: Path, transacciones: int, semilla: int = SEMILLA, anios: int = ANIOS) -> Dict[str, int]:
+    """
+    Crea una base nueva con el esquema completo y un libro sintético
+
+    Args:
+        ruta: Archivo SQLite a crear (no debe existir)
+        transacciones: Cantidad total de transacciones
+        semilla: Semilla del generador
+        anios: Años que abarca el libro
+
+    Returns:
+        Cantidad de filas generadas por tabla
+    """
+    engine = crear_engine(f"sqlite:///{ruta}", 'bulk-load')
+    try:
+        Base.metadata.create_all(engine)
+        totales = GeneradorLibro(transacciones, semilla, anios).generar(engine)
+        # Crea los índices FTS5 (cargándolos con todas las filas) y el resto del esquema
+        crear_indices_busqueda(engine)
+        init_db(engine)
+        return totales
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='10k')
+    parser.add_argument('--destino', type=Path, required=True, help="Archivo SQLite a crear")
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--anios', type=int, default=ANIOS)
+    args = parser.parse_args()
+
+    if args.destino.exists():
+        print(f"ERROR: {args.destino} ya existe")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    totales = crear_libro(args.destino, ESCALAS[args.escala], args.semilla, args.anios)
+
+    print(", ".join(f"{cantidad:,} {tabla}" for tabla, cantidad in totales.items()))
+    print(f"OK: libro '{args.escala}' (semilla {args.semilla}) generado en "
+          f"{time.perf_counter() - inicio:.1f} s en {args.destino}")
+
+
+if __name__ == "__main__":
+    main()
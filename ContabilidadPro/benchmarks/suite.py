@@ -0,0 +1,439 @@
+"""
+Suite de rendimiento de repositorios y servicios sobre un libro sintético
+
+Mide cada consulta de los repositorios, cada método de ContabilidadService
+y ReportesService y el registro masivo (registrar_lote) sobre un libro
+generado con benchmarks.generador_datos. De cada caso se guarda la cantidad
+de sentencias SQL y de filas, y el tiempo mínimo, la mediana, el p95 y el
+máximo en milisegundos.
+
+Los resultados se escriben en JSON (con los datos del entorno: versión,
+commit, Python, SQLite) y en CSV, para comparar corridas entre versiones:
+
+    python -m benchmarks.suite --escala 1m
+    python -m benchmarks.suite --base data/libro_1m.db --comparar benchmarks/resultados/suite-1m-....json
+
+Con --base se mide una copia de esa base (las escrituras no la modifican);
+si no, se genera un libro de la escala indicada en una base temporal.
+
+Uso:
+    python -m benchmarks.suite [--escala 10k|1m|10m | --base ruta.db] [--semilla 42]
+                               [--repeticiones 5] [--tiempo-maximo 10] [--salida benchmarks/resultados]
+                               [--comparar resultado_anterior.json] [--tolerancia 20]
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Las sentencias de cada caso se cuentan con contar_consultas()
+os.environ.setdefault("INSTRUMENTACION_CONSULTAS", "1")
+
+import sqlalchemy
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import cache_estados
+from app.core.constants import *
+from app.core.database import crear_engine
+from app.core.instrumentacion import contar_consultas
+import app.models  # noqa: F401  (registra todos los modelos en Base.metadata)
+from app.models.auditoria import Auditoria
+from app.models.cuenta import Cuenta
+from app.models.periodo import Periodo
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.cuenta_repository import CuentaRepository
+from app.repositories.periodo_repository import PeriodoRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
+from app.repositories.transaccion_repository import TransaccionRepository
+from app.repositories.usuario_repository import UsuarioRepository
+from app.services.contabilidad_service import ContabilidadService
+from app.services.reportes_service import ReportesService
+from benchmarks.comun import imprimir_tabla, percentil
+from benchmarks.generador_datos import ESCALAS, SEMILLA, crear_libro
+import config
+
+SALIDA = Path(__file__).parent / "resultados"
+# Tamaños de lote del registro masivo
+LOTES_REGISTRO = (1_000, 10_000)
+TERMINO_BUSQUEDA = "alquiler"
+
+
+class Caso(NamedTuple):
+    """Un caso de la suite: la función recibe una sesión nueva en cada repetición"""
+    grupo: str
+    nombre: str
+    funcion: Callable[[Session], Any]
+
+
+def contar(iterable) -> int:
+    """Consume un iterador y retorna la cantidad de elementos"""
+    return sum(1 for _ in iterable)
+
+
+def sin_cache(funcion: Callable[[Session], Any]) -> Callable[[Session], Any]:
+    """Ejecuta la función con la caché de estados financieros vacía"""
+    def envoltura(session: Session):
+        cache_estados.limpiar()
+        return funcion(session)
+    return envoltura
+
+
+def confirmando(funcion: Callable[[Session], Any]) -> Callable[[Session], Any]:
+    """Ejecuta una escritura y confirma la sesión (el commit es parte de la medición)"""
+    def envoltura(session: Session):
+        resultado = funcion(session)
+        session.commit()
+        return resultado
+    return envoltura
+
+
+def parametros(fabrica: sessionmaker) -> Dict[str, Any]:
+    """Valores del libro que usan los casos: IDs, fechas y un mes en el medio del rango"""
+    with fabrica() as session:
+        usuario = session.query(Usuario).order_by(Usuario.id.desc()).first()
+        periodo = session.query(Periodo).order_by(Periodo.fecha_inicio).all()
+        periodo = periodo[len(periodo) // 2] if periodo else None
+        primera = session.query(func.min(Transaccion.fecha)).scalar() or datetime.now()
+        ultima = session.query(func.max(Transaccion.fecha)).scalar() or datetime.now()
+        medio = primera + (ultima - primera) / 2
+        return {
+            'usuario': usuario,
+            'periodo_id': periodo.id if periodo else None,
+            'cuenta_id': session.query(Cuenta.id).filter(Cuenta.codigo == "ING-VENTAS").scalar(),
+            'transaccion_id': session.query(func.max(Transaccion.id)).scalar(),
+            'mes': (datetime(medio.year, medio.month, 1),
+                    datetime(medio.year + medio.month // 12, medio.month % 12 + 1, 1)),
+            'medio': medio,
+        }
+
+
+def casos(p: Dict[str, Any]) -> List[Caso]:
+    """Arma la lista de casos con los parámetros del libro"""
+    usuario = p['usuario']
+    desde, hasta = p['mes']
+    tipos_balance = [TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE, TIPO_PASIVO_CORRIENTE,
+                     TIPO_PASIVO_NO_CORRIENTE, TIPO_CAPITAL, TIPO_RESERVAS]
+    lista = [
+        # Cuentas
+        Caso("CuentaRepository", "get_all", lambda s: CuentaRepository(s).get_all()),
+        Caso("CuentaRepository", "get_by_id", lambda s: CuentaRepository(s).get_by_id(p['cuenta_id'])),
+        Caso("CuentaRepository", "resolver_codigo", lambda s: CuentaRepository(s).resolver_codigo("ING-VENTAS")),
+        Caso("CuentaRepository", "get_by_codigo", lambda s: CuentaRepository(s).get_by_codigo("ING-VENTAS")),
+        Caso("CuentaRepository", "get_by_tipo", lambda s: CuentaRepository(s).get_by_tipo(TIPO_GASTO)),
+        Caso("CuentaRepository", "get_saldos_por_tipos",
+             lambda s: CuentaRepository(s).get_saldos_por_tipos(tipos_balance)),
+        Caso("CuentaRepository", "get_tipos_por_id", lambda s: CuentaRepository(s).get_tipos_por_id(tipos_balance)),
+        Caso("CuentaRepository", "get_activas", lambda s: CuentaRepository(s).get_activas()),
+        Caso("CuentaRepository", "get_by_naturaleza",
+             lambda s: CuentaRepository(s).get_by_naturaleza(NATURALEZA_DEUDORA)),
+        Caso("CuentaRepository", "codigo_exists", lambda s: CuentaRepository(s).codigo_exists("ING-VENTAS")),
+        Caso("CuentaRepository", "get_saldos", lambda s: CuentaRepository(s).get_saldos()),
+        # Transacciones
+        Caso("TransaccionRepository", "count", lambda s: TransaccionRepository(s).count()),
+        Caso("TransaccionRepository", "get_by_id",
+             lambda s: TransaccionRepository(s).get_by_id(p['transaccion_id'])),
+        Caso("TransaccionRepository", "get_by_cuenta",
+             lambda s: TransaccionRepository(s).get_by_cuenta(p['cuenta_id'])),
+        Caso("TransaccionRepository", "get_by_periodo",
+             lambda s: TransaccionRepository(s).get_by_periodo(p['periodo_id'])),
+        Caso("TransaccionRepository", "get_by_tipo",
+             lambda s: TransaccionRepository(s).get_by_tipo(TIPO_TRANSACCION_GENERAL)),
+        Caso("TransaccionRepository", "get_by_fecha_rango (un mes)",
+             lambda s: TransaccionRepository(s).get_by_fecha_rango(desde, hasta)),
+        Caso("TransaccionRepository", "get_by_usuario",
+             lambda s: TransaccionRepository(s).get_by_usuario(usuario.id)),
+        Caso("TransaccionRepository", "get_total_por_tipo",
+             lambda s: TransaccionRepository(s).get_total_por_tipo(TIPO_TRANSACCION_VENTA)),
+        Caso("TransaccionRepository", "get_pagina (primera)", lambda s: TransaccionRepository(s).get_pagina()),
+        Caso("TransaccionRepository", "get_pagina (un mes)",
+             lambda s: TransaccionRepository(s).get_pagina(fecha_inicio=desde, fecha_fin=hasta)),
+        Caso("TransaccionRepository", "get_pagina (un período)",
+             lambda s: TransaccionRepository(s).get_pagina(periodo_id=p['periodo_id'])),
+        Caso("TransaccionRepository", "get_total_por_tipo (un período)",
+             lambda s: TransaccionRepository(s).get_total_por_tipo(TIPO_TRANSACCION_VENTA, p['periodo_id'])),
+        Caso("TransaccionRepository", "get_primera_fecha", lambda s: TransaccionRepository(s).get_primera_fecha()),
+        Caso("TransaccionRepository", "get_rango_ids", lambda s: TransaccionRepository(s).get_rango_ids()),
+        Caso("TransaccionRepository", "sumar_por_cuenta", lambda s: TransaccionRepository(s).sumar_por_cuenta()),
+        Caso("TransaccionRepository", "sumar_por_cuenta (un mes)",
+             lambda s: TransaccionRepository(s).sumar_por_cuenta(desde, hasta)),
+        Caso("TransaccionRepository", "iterar_filas (un mes)",
+             lambda s: contar(TransaccionRepository(s).iterar_filas(desde, hasta))),
+        Caso("TransaccionRepository", "iterar_filas (un período)",
+             lambda s: contar(TransaccionRepository(s).iterar_filas(periodo_id=p['periodo_id']))),
+        Caso("TransaccionRepository", "buscar (LIKE)", lambda s: TransaccionRepository(s).buscar(TERMINO_BUSQUEDA)),
+        Caso("TransaccionRepository", "buscar_texto (FTS5)",
+             lambda s: TransaccionRepository(s).buscar_texto(TERMINO_BUSQUEDA)),
+        # Resúmenes por día y por mes
+        Caso("ResumenRepository", "totales_por_mes", lambda s: ResumenRepository(s).totales_por_mes()),
+        Caso("ResumenRepository", "totales_por_dia (un mes)",
+             lambda s: ResumenRepository(s).totales_por_dia(desde, hasta)),
+        Caso("ResumenRepository", "get_total (un mes)",
+             lambda s: ResumenRepository(s).get_total(TIPO_TRANSACCION_VENTA, desde, hasta)),
+        Caso("ResumenRepository", "sumar_por_cuenta", lambda s: ResumenRepository(s).sumar_por_cuenta()),
+        Caso("ResumenRepository", "sumar_por_cuenta (un mes)",
+             lambda s: ResumenRepository(s).sumar_por_cuenta(desde, hasta)),
+        # Auditoría
+        Caso("AuditoriaRepository", "count", lambda s: AuditoriaRepository(s).count()),
+        Caso("AuditoriaRepository", "get_by_usuario", lambda s: AuditoriaRepository(s).get_by_usuario(usuario.id)),
+        Caso("AuditoriaRepository", "get_by_tipo", lambda s: AuditoriaRepository(s).get_by_tipo(ACTIVIDAD_LOGIN)),
+        Caso("AuditoriaRepository", "get_by_fecha_rango (un mes)",
+             lambda s: AuditoriaRepository(s).get_by_fecha_rango(desde, hasta)),
+        Caso("AuditoriaRepository", "get_recientes", lambda s: AuditoriaRepository(s).get_recientes()),
+        Caso("AuditoriaRepository", "get_pagina (primera)", lambda s: AuditoriaRepository(s).get_pagina()),
+        Caso("AuditoriaRepository", "get_pagina (un usuario)",
+             lambda s: AuditoriaRepository(s).get_pagina(usuario_id=usuario.id)),
+        Caso("AuditoriaRepository", "iterar_filas (un mes)",
+             lambda s: contar(AuditoriaRepository(s).iterar_filas(fecha_inicio=desde, fecha_fin=hasta))),
+        Caso("AuditoriaRepository", "buscar (LIKE)", lambda s: AuditoriaRepository(s).buscar(TERMINO_BUSQUEDA)),
+        Caso("AuditoriaRepository", "buscar_texto (FTS5)",
+             lambda s: AuditoriaRepository(s).buscar_texto(TERMINO_BUSQUEDA)),
+        # Usuarios, períodos e instantáneas
+        Caso("UsuarioRepository", "get_all", lambda s: UsuarioRepository(s).get_all()),
+        Caso("UsuarioRepository", "get_by_username",
+             lambda s: UsuarioRepository(s).get_by_username(usuario.username)),
+        Caso("UsuarioRepository", "get_by_documento",
+             lambda s: UsuarioRepository(s).get_by_documento(usuario.documento)),
+        Caso("UsuarioRepository", "username_exists",
+             lambda s: UsuarioRepository(s).username_exists(usuario.username)),
+        Caso("UsuarioRepository", "documento_exists",
+             lambda s: UsuarioRepository(s).documento_exists(usuario.documento)),
+        Caso("UsuarioRepository", "get_activos", lambda s: UsuarioRepository(s).get_activos()),
+        Caso("UsuarioRepository", "get_by_nivel", lambda s: UsuarioRepository(s).get_by_nivel(NIVEL_TRABAJADOR)),
+        Caso("PeriodoRepository", "get_all", lambda s: PeriodoRepository(s).get_all()),
+        Caso("PeriodoRepository", "get_cerrados", lambda s: PeriodoRepository(s).get_cerrados()),
+        Caso("PeriodoRepository", "resolver_fecha",
+             lambda s: PeriodoRepository(s).resolver_fecha(p['medio'])),
+        Caso("SaldoHistoricoRepository", "get_cortes", lambda s: SaldoHistoricoRepository(s).get_cortes()),
+        Caso("SaldoHistoricoRepository", "get_ultimo_corte",
+             lambda s: SaldoHistoricoRepository(s).get_ultimo_corte(p['medio'])),
+        # Servicios
+        Caso("ContabilidadService", "obtener_estados_financieros (sin caché)",
+             sin_cache(lambda s: ContabilidadService(s).obtener_estados_financieros())),
+        Caso("ContabilidadService", "obtener_estados_financieros (con caché)",
+             lambda s: ContabilidadService(s).obtener_estados_financieros()),
+        Caso("ContabilidadService", "obtener_estados_financieros_al",
+             sin_cache(lambda s: ContabilidadService(s).obtener_estados_financieros_al(p['medio']))),
+        Caso("ContabilidadService", "obtener_balance_general",
+             sin_cache(lambda s: ContabilidadService(s).obtener_balance_general())),
+        Caso("ContabilidadService", "obtener_estado_resultados",
+             sin_cache(lambda s: ContabilidadService(s).obtener_estado_resultados())),
+        Caso("ReportesService", "generar_balance_general_texto",
+             sin_cache(lambda s: ReportesService(s).generar_balance_general_texto())),
+        Caso("ReportesService", "generar_estado_resultados_texto",
+             sin_cache(lambda s: ReportesService(s).generar_estado_resultados_texto())),
+        Caso("ReportesService", "generar_reporte_transacciones",
+             lambda s: ReportesService(s).generar_reporte_transacciones()),
+        Caso("ReportesService", "generar_reporte_transacciones (todas)",
+             lambda s: ReportesService(s).generar_reporte_transacciones(limite=None)),
+        Caso("ReportesService", "generar_reporte_actividades",
+             lambda s: ReportesService(s).generar_reporte_actividades()),
+        Caso("ReportesService", "generar_reporte_actividades (un usuario)",
+             lambda s: ReportesService(s).generar_reporte_actividades(usuario_id=usuario.id, limite=None)),
+        Caso("ReportesService", "obtener_ventas_compras_por_mes",
+             lambda s: ReportesService(s).obtener_ventas_compras_por_mes()),
+        Caso("ReportesService", "obtener_ventas_compras_del_mes",
+             lambda s: ReportesService(s).obtener_ventas_compras_del_mes(desde)),
+        # Escrituras (cada una confirma su transacción)
+        Caso("ContabilidadService", "registrar_venta",
+             confirmando(lambda s: ContabilidadService(s).registrar_venta("Venta de prueba", 100.0, usuario))),
+        Caso("ContabilidadService", "registrar_compra",
+             confirmando(lambda s: ContabilidadService(s).registrar_compra("Compra de prueba", 100.0, usuario))),
+        Caso("ContabilidadService", "registrar_transaccion_cuenta",
+             confirmando(lambda s: ContabilidadService(s).registrar_transaccion_cuenta(
+                 TIPO_ACTIVO_CORRIENTE, "Caja", 100.0, usuario))),
+    ]
+    for tamano in LOTES_REGISTRO:
+        lote = [(TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+                 f"Ticket {i}", float(i % 1000 + 1), usuario) for i in range(tamano)]
+        lista.append(Caso("ContabilidadService", f"registrar_lote ({tamano:,})",
+                          confirmando(lambda s, lote=lote: ContabilidadService(s).registrar_lote(lote))))
+    return lista
+
+
+def filas_de(resultado) -> Optional[int]:
+    """Cantidad de filas de un resultado (listas, diccionarios, conteos o texto)"""
+    if isinstance(resultado, bool) or resultado is None:
+        return None
+    if isinstance(resultado, int):
+        return resultado
+    if isinstance(resultado, str):
+        return resultado.count("\n")
+    if isinstance(resultado, (list, dict)):
+        return len(resultado)
+    return None
+
+
+def medir(fabrica: sessionmaker, caso: Caso, repeticiones: int, tiempo_maximo: float) -> Dict[str, Any]:
+    """
+    Ejecuta un caso una vez sin medir (contando sentencias y filas) y luego
+    hasta `repeticiones` veces, o hasta superar `tiempo_maximo` segundos
+    """
+    with fabrica() as session, contar_consultas() as contador:
+        filas = filas_de(caso.funcion(session))
+
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones and (not tiempos or time.perf_counter() - inicio < tiempo_maximo):
+        with fabrica() as session:
+            t0 = time.perf_counter()
+            caso.funcion(session)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        'grupo': caso.grupo,
+        'nombre': caso.nombre,
+        'repeticiones': len(tiempos),
+        'consultas': contador.consultas,
+        'filas': filas,
+        'min_ms': round(min(tiempos), 3),
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'p95_ms': round(percentil(tiempos, 95), 3),
+        'max_ms': round(max(tiempos), 3),
+    }
+
+
+def contar_datos(fabrica: sessionmaker) -> Dict[str, int]:
+    """Filas de cada tabla del libro"""
+    with fabrica() as session:
+        return {tabla: session.execute(select(func.count()).select_from(modelo)).scalar()
+                for tabla, modelo in (('usuarios', Usuario), ('cuentas', Cuenta), ('periodos', Periodo),
+                                      ('transacciones', Transaccion), ('auditoria', Auditoria))}
+
+
+def commit_actual() -> Optional[str]:
+    """Commit de git del código medido (None si no está en un repositorio)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def guardar(resultado: Dict[str, Any], salida: Path) -> Path:
+    """Escribe el resultado en JSON y los casos en CSV; retorna la ruta del JSON"""
+    salida.mkdir(parents=True, exist_ok=True)
+    nombre = f"suite-{resultado['escala']}-{datetime.now():%Y%m%d-%H%M%S}"
+    ruta = salida / f"{nombre}.json"
+    ruta.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+    with open(salida / f"{nombre}.csv", 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(resultado['casos'][0]))
+        escritor.writeheader()
+        escritor.writerows(resultado['casos'])
+    return ruta
+
+
+def comparar(actual: Dict[str, Any], ruta_anterior: Path, tolerancia: float) -> List[str]:
+    """
+    Imprime la mediana de cada caso contra la de una corrida anterior
+
+    Returns:
+        Nombres de los casos más lentos que la tolerancia (en %)
+    """
+    anterior = json.loads(ruta_anterior.read_text(encoding='utf-8'))
+    previos = {(c['grupo'], c['nombre']): c for c in anterior['casos']}
+    filas, regresiones = [], []
+    for caso in actual['casos']:
+        previo = previos.get((caso['grupo'], caso['nombre']))
+        if previo is None or not previo['mediana_ms']:
+            continue
+        cambio = (caso['mediana_ms'] / previo['mediana_ms'] - 1) * 100
+        nombre = f"{caso['grupo']}.{caso['nombre']}"
+        if cambio > tolerancia:
+            regresiones.append(nombre)
+        filas.append([nombre, f"{previo['mediana_ms']:.2f}", f"{caso['mediana_ms']:.2f}", f"{cambio:+.0f}%",
+                      "más lento" if cambio > tolerancia else ""])
+    print(f"\nComparación con {ruta_anterior.name} "
+          f"(versión {anterior.get('version')}, commit {anterior.get('commit')}):")
+    imprimir_tabla(["caso", "anterior ms", "actual ms", "cambio", ""], filas)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=list(ESCALAS), default='10k')
+    parser.add_argument('--base', type=Path, help="Libro ya generado con benchmarks.generador_datos")
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--perfil', default=config.DB_PERFIL, choices=list(config.DB_PERFILES))
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--tiempo-maximo', type=float, default=10.0,
+                        help="Segundos de medición por caso a partir de los cuales no se repite más")
+    parser.add_argument('--salida', type=Path, default=SALIDA)
+    parser.add_argument('--comparar', type=Path, help="Resultado JSON de una corrida anterior")
+    parser.add_argument('--tolerancia', type=float, default=20.0,
+                        help="Porcentaje de aumento de la mediana que se informa como regresión")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="contabilidadpro-suite-") as carpeta:
+        ruta = Path(carpeta) / "libro.db"
+        inicio = time.perf_counter()
+        if args.base:
+            shutil.copyfile(args.base, ruta)
+            escala = args.base.stem
+        else:
+            crear_libro(ruta, ESCALAS[args.escala], args.semilla)
+            escala = args.escala
+        preparacion = time.perf_counter() - inicio
+
+        engine = crear_engine(f"sqlite:///{ruta}", args.perfil)
+        fabrica = sessionmaker(bind=engine, expire_on_commit=False)
+        datos = contar_datos(fabrica)
+        print(f"Libro '{escala}': " + ", ".join(f"{n:,} {t}" for t, n in datos.items())
+              + f" (preparado en {preparacion:.1f} s)\n")
+
+        resultados = []
+        for caso in casos(parametros(fabrica)):
+            resultados.append(medir(fabrica, caso, args.repeticiones, args.tiempo_maximo))
+            r = resultados[-1]
+            print(f"{r['grupo']}.{r['nombre']}: {r['mediana_ms']:.2f} ms "
+                  f"({r['repeticiones']} rep., {r['consultas']} consultas)", flush=True)
+        engine.dispose()
+
+    resultado = {
+        'version': config.APP_VERSION,
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'sqlalchemy': sqlalchemy.__version__,
+        'plataforma': platform.platform(),
+        'perfil': args.perfil,
+        'escala': escala,
+        'semilla': None if args.base else args.semilla,
+        'datos': datos,
+        'preparacion_s': round(preparacion, 1),
+        'casos': resultados,
+    }
+    ruta_json = guardar(resultado, args.salida)
+
+    print()
+    imprimir_tabla(["caso", "consultas", "filas", "mín ms", "mediana ms", "p95 ms", "máx ms"],
+                   [[f"{r['grupo']}.{r['nombre']}", r['consultas'], "-" if r['filas'] is None else r['filas'],
+                     f"{r['min_ms']:.2f}", f"{r['mediana_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['max_ms']:.2f}"]
+                    for r in resultados])
+    print(f"\nResultados en {ruta_json} y {ruta_json.with_suffix('.csv')}")
+
+    if args.comparar:
+        regresiones = comparar(resultado, args.comparar, args.tolerancia)
+        if regresiones:
+            print(f"\nERROR: {len(regresiones)} casos más de {args.tolerancia:g}% más lentos que la corrida anterior")
+            sys.exit(1)
+        print(f"\nOK: ningún caso es más de {args.tolerancia:g}% más lento que la corrida anterior")
+
+
+if __name__ == "__main__":
+    main()
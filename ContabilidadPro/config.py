@@ -10,14 +10,115 @@ DATA_DIR = BASE_DIR / "data"
 EXPORTS_DIR = BASE_DIR / "exports"
 LOGS_DIR = BASE_DIR / "logs"
 RESOURCES_DIR = BASE_DIR / "resources"
+IMPORTACIONES_DIR = DATA_DIR / "importaciones"
 
 # Crear directorios si no existen
-for directory in [DATA_DIR, EXPORTS_DIR, LOGS_DIR, EXPORTS_DIR / "pdf", EXPORTS_DIR / "excel", DATA_DIR / "backups"]:
+for directory in [DATA_DIR, EXPORTS_DIR, LOGS_DIR, EXPORTS_DIR / "pdf", EXPORTS_DIR / "excel", EXPORTS_DIR / "csv",
+                  DATA_DIR / "backups", IMPORTACIONES_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 # Base de datos
 DATABASE_URL = f"sqlite:///{DATA_DIR / 'database.db'}"
 
+# Perfiles de rendimiento de SQLite (PRAGMAs aplicados a cada conexión)
+#   desktop:      uso normal en un solo equipo (WAL, lectores no bloquean escrituras)
+#   shared-drive: base en una carpeta de red, donde WAL y mmap no son seguros
+#   bulk-load:    cargas masivas e importaciones, prioriza velocidad sobre durabilidad
+DB_PERFILES = {
+    'desktop': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,        # ms
+        'cache_size': -20000,        # negativo = KiB (~20 MB)
+        'mmap_size': 268435456,      # 256 MB
+        'temp_store': 'MEMORY',
+    },
+    'shared-drive': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 30000,
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+    },
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'busy_timeout': 60000,
+        'cache_size': -200000,
+        'mmap_size': 1073741824,     # 1 GB
+        'temp_store': 'MEMORY',
+    },
+}
+DB_PERFIL = os.environ.get('DB_PERFIL', 'desktop')
+
+# Caché de estados financieros (entradas LRU; se invalida con cada escritura del libro)
+CACHE_ESTADOS_CAPACIDAD = 32
+
+# Auditoría: 'inmediato', 'durable' (por lotes, en la misma transacción) o
+# 'relajado' (por lotes en segundo plano, puede perder lo último ante un corte)
+AUDITORIA_MODO = os.environ.get('AUDITORIA_MODO', 'durable')
+AUDITORIA_INTERVALO_MS = 200
+AUDITORIA_LOTE_MAX = 500
+
+# Importación masiva: filas por lote (cada lote se confirma junto con su punto de control)
+IMPORTACION_TAMANO_LOTE = 5000
+
+# Asignación de períodos a transacciones existentes: filas por lote (cada lote se confirma)
+PERIODOS_ASIGNACION_LOTE = 50000
+
+# Exportación: filas leídas de la base por vez (la memoria no depende del total exportado)
+EXPORTACION_TAMANO_LOTE = 2000
+
+# Verificación de saldos: a partir de cuántas transacciones se reparte la suma
+# entre varios procesos, y cuántos (None = uno por núcleo)
+VERIFICACION_UMBRAL_PARALELO = 1000000
+VERIFICACION_PROCESOS = None
+
+# Interfaz: hilos para el trabajo de base de datos de las vistas, y monitor de
+# bloqueos del hilo de la interfaz (registra cada pausa mayor al umbral)
+TAREAS_HILOS = 4
+GUI_MONITOR_BLOQUEOS = os.environ.get('GUI_MONITOR_BLOQUEOS', '0') == '1'
+GUI_UMBRAL_BLOQUEO_MS = 100
+
+# Tablas de datos paginadas: filas por consulta y páginas que se conservan en
+# memoria (las demás se vuelven a pedir al volver a mostrarse)
+TABLA_TAMANO_PAGINA = 200
+TABLA_PAGINAS_EN_CACHE = 25
+
+# Gráficos (ver app/gui/widgets/graficos.py): resolución de la figura, espera
+# tras un cambio de tamaño antes de redibujarla, y cada cuánto el dashboard
+# revisa si el libro cambió para actualizarlos
+GRAFICOS_DPI = 100
+GRAFICOS_RETARDO_REDIMENSION_MS = 150
+DASHBOARD_INTERVALO_ACTUALIZACION_MS = 2000
+
+# Consultas cancelables: cada cuántas instrucciones de SQLite se revisa si hay
+# que interrumpir, tiempo límite (segundos) para generar cada tipo de reporte
+# y para exportarlo (None = sin límite; una exportación siempre puede
+# cancelarse a mano)
+CONSULTAS_INSTRUCCIONES_POR_VERIFICACION = 10000
+REPORTES_TIEMPO_LIMITE = {
+    'Balance General': 30,
+    'Estado de Resultados': 30,
+    'Transacciones': 300,
+    'Transacciones del Período': 60,
+    'Actividades': 300,
+    'Ventas y Compras por Mes': 30
+}
+EXPORTACION_TIEMPO_LIMITE = None
+
+# Instrumentación de consultas: desactivada por defecto porque cuesta cerca
+# de un 15% del rendimiento (las pruebas y los benchmarks que cuentan
+# sentencias la activan con INSTRUMENTACION_CONSULTAS=1); a partir de cuántos
+# ms una sentencia va al log de consultas lentas, y cuántas sentencias
+# guardar por sesión (los totales cuentan todas)
+INSTRUMENTACION_CONSULTAS = os.environ.get('INSTRUMENTACION_CONSULTAS', '0') == '1'
+CONSULTAS_UMBRAL_LENTA_MS = 200
+INSTRUMENTACION_MAX_REGISTROS_SESION = 1000
+# Repeticiones de una misma sentencia desde un mismo método que se informan como N+1
+CONSULTAS_REPETICIONES_N_MAS_1 = 5
+
 # Seguridad
 SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 PASSWORD_MIN_LENGTH = 6
@@ -28,6 +129,7 @@ APP_VERSION = "1.0.0"
 
 # Logging
 LOG_FILE = LOGS_DIR / "app.log"
+SLOW_QUERY_LOG_FILE = LOGS_DIR / "consultas_lentas.log"
 LOG_LEVEL = "INFO"
 
 # Usuario Admin por defecto
@@ -2,6 +2,7 @@
 Punto de entrada principal de la aplicación ContabilidadPro
 """
 import sys
+import time
 # Importamos Path de pathlib
 from pathlib import Path 
 from PyQt6.QtWidgets import QApplication
@@ -9,6 +10,11 @@ from app.core.database import init_db, get_session
 from app.services.auth_service import AuthService
 from app.gui.views.login_view import LoginView
 from app.gui.main_window import MainWindow
+from app.gui.precarga import Precarga
+from app.gui.monitor_bloqueos import MonitorBloqueos
+from app.gui.tareas import ejecutor_tareas
+from app.core.cancelacion import metricas_cancelacion
+from app.core.instrumentacion import estadisticas_consultas
 from app.utils.logger import app_logger
 # Importamos config
 import config
@@ -48,6 +54,16 @@ def main():
             
         # --- FIN DEL CAMBIO ---
 
+        # Medir los bloqueos de la interfaz (GUI_MONITOR_BLOQUEOS=1)
+        monitor = None
+        if config.GUI_MONITOR_BLOQUEOS:
+            monitor = MonitorBloqueos()
+            monitor.iniciar()
+        
+        # Precargar los datos del dashboard mientras el usuario inicia sesión
+        precarga = Precarga()
+        precarga.iniciar()
+        
         # Mostrar login
         login_window = LoginView()
         
@@ -58,10 +74,27 @@ def main():
         usuario = login_window.usuario_autenticado
         app_logger.info(f"Usuario {usuario.username} autenticado exitosamente")
         
-        main_window = MainWindow(usuario)
+        # La ventana se abre sin esperar a la precarga: el dashboard carga sus
+        # datos en segundo plano y usa la caché si la precarga ya la llenó
+        inicio_login = time.perf_counter()
+        main_window = MainWindow(usuario, inicio_login=inicio_login)
         main_window.show()
         
-        sys.exit(app.exec())
+        codigo = app.exec()
+        ejecutor_tareas().esperar()
+        if monitor is not None:
+            stats = monitor.estadisticas()
+            app_logger.info(f"Bloqueos de la interfaz: {stats['bloqueos']} "
+                            f"(máximo {stats['maximo_ms']:.0f} ms, total {stats['total_bloqueado_ms']:.0f} ms)")
+        # Métodos con más tiempo en consultas durante la sesión de uso
+        for datos in estadisticas_consultas.resumen(limite=5):
+            app_logger.info(f"Consultas de {datos['metodo']}: {datos['consultas']} "
+                            f"({datos['tiempo_total_ms']:.0f} ms, {datos['filas']} filas, {datos['lentas']} lentas)")
+        cancelaciones = metricas_cancelacion.estadisticas()
+        app_logger.info(f"Operaciones cancelables: {cancelaciones['completadas']} completadas, "
+                        f"{cancelaciones['canceladas']} canceladas, "
+                        f"{cancelaciones['tiempo_agotado']} con tiempo agotado")
+        sys.exit(codigo)
             
     except Exception as e:
         app_logger.error(f"Error fatal al iniciar la aplicación: {e}", exc_info=True)
@@ -0,0 +1,183 @@
+"""
+Tareas de mantenimiento de la base de datos, desde la línea de comandos
+
+Uso:
+    python mantenimiento.py instantaneas generar     # genera las instantáneas de saldos pendientes
+    python mantenimiento.py instantaneas verificar   # compara las instantáneas con las transacciones
+    python mantenimiento.py saldos verificar [--procesos N] [--reparar]
+                                                     # compara Cuenta.saldo con las transacciones
+    python mantenimiento.py resumenes reconstruir    # recalcula los resúmenes diarios y mensuales
+    python mantenimiento.py resumenes verificar      # compara los resúmenes con las transacciones
+    python mantenimiento.py periodos listar          # muestra los períodos y su estado
+    python mantenimiento.py periodos crear NOMBRE DESDE [HASTA] --usuario NOMBRE
+                                                     # crea un período (fechas AAAA-MM-DD)
+    python mantenimiento.py periodos asignar [--lote N]
+                                                     # asigna su período a las transacciones que no lo tienen
+    python mantenimiento.py periodos cerrar ID --usuario NOMBRE
+                                                     # cierra un período (asiento de cierre y bloqueo)
+"""
+import argparse
+import sys
+from datetime import datetime
+from app.core import database
+from app.core.database import init_db, get_session
+from app.core.resumenes import reconstruir_resumenes, verificar_resumenes
+from app.models.periodo import Periodo
+from app.repositories.usuario_repository import UsuarioRepository
+from app.services.cierre_periodo_service import CierrePeriodoService
+from app.services.periodos_service import PeriodosService
+from app.services.saldos_historicos_service import SaldosHistoricosService
+from app.services.verificacion_saldos_service import VerificacionSaldosService
+
+
+def instantaneas_generar(args) -> int:
+    with get_session() as session:
+        cortes = SaldosHistoricosService(session).generar_pendientes()
+    for corte in cortes:
+        print(f"Instantánea generada: {corte:%d/%m/%Y}")
+    print(f"{len(cortes)} instantáneas generadas")
+    return 0
+
+
+def instantaneas_verificar(args) -> int:
+    with get_session() as session:
+        diferencias = SaldosHistoricosService(session).verificar()
+    for d in diferencias:
+        print(f"Corte {d['fecha_corte']:%d/%m/%Y}, cuenta {d['cuenta_id']}: "
+              f"guardado ${d['saldo_guardado']:,.2f}, según transacciones ${d['saldo_calculado']:,.2f}")
+    if diferencias:
+        print(f"ERROR: {len(diferencias)} saldos no coinciden con las transacciones")
+        return 1
+    print("OK: las instantáneas coinciden con las transacciones")
+    return 0
+
+
+def saldos_verificar(args) -> int:
+    with get_session() as session:
+        servicio = VerificacionSaldosService(session)
+        diferencias = servicio.verificar(args.procesos)
+        for d in diferencias:
+            print(f"Cuenta {d['cuenta_id']}: guardado ${d['saldo_guardado']:,.2f}, "
+                  f"según transacciones ${d['saldo_calculado']:,.2f} (diferencia ${d['diferencia']:,.2f})")
+        if not diferencias:
+            print("OK: todos los saldos coinciden con las transacciones")
+            return 0
+        if args.reparar:
+            print(f"{servicio.reparar(diferencias)} saldos corregidos")
+            return 0
+    print(f"ERROR: {len(diferencias)} saldos no coinciden (use --reparar para corregirlos)")
+    return 1
+
+
+def resumenes_reconstruir(args) -> int:
+    reconstruir_resumenes(database.engine)
+    print("Resúmenes diarios y mensuales reconstruidos")
+    return 0
+
+
+def resumenes_verificar(args) -> int:
+    diferencias = verificar_resumenes(database.engine)
+    for d in diferencias:
+        print(f"{d['tabla']} {d['fecha']}, {d['tipo']}, cuenta {d['cuenta_id']}: "
+              f"guardado {d['cantidad_guardada']} / ${d['total_guardado']:,.2f}, "
+              f"según transacciones {d['cantidad_calculada']} / ${d['total_calculado']:,.2f}")
+    if diferencias:
+        print(f"ERROR: {len(diferencias)} filas de resumen no coinciden (use 'resumenes reconstruir')")
+        return 1
+    print("OK: los resúmenes coinciden con las transacciones")
+    return 0
+
+
+def periodos_listar(args) -> int:
+    with get_session() as session:
+        for periodo in session.query(Periodo).order_by(Periodo.fecha_inicio):
+            fin = f"{periodo.fecha_fin:%d/%m/%Y}" if periodo.fecha_fin else "-"
+            estado = f"cerrado, resultado ${periodo.resultado:,.2f}" if periodo.esta_cerrado else "abierto"
+            print(f"{periodo.id:>5}  {periodo.nombre:<20} {periodo.fecha_inicio:%d/%m/%Y} - {fin:<10}  {estado}")
+    return 0
+
+
+def periodos_crear(args) -> int:
+    with get_session() as session:
+        usuario = UsuarioRepository(session).get_by_username(args.usuario)
+        if usuario is None:
+            print(f"ERROR: no existe el usuario {args.usuario}")
+            return 1
+        exito, mensaje = PeriodosService(session).crear_periodo(args.nombre, args.desde, args.hasta, usuario)
+    print(mensaje if exito else f"ERROR: {mensaje}")
+    if exito:
+        print("Para asignarlo a las transacciones existentes, use 'periodos asignar'")
+    return 0 if exito else 1
+
+
+def periodos_asignar(args) -> int:
+    with get_session() as session:
+        totales = PeriodosService(session).asignar_pendientes(
+            args.lote, progreso=lambda n: print(f"  {n:,} transacciones asignadas", end="\r"))
+    print(f"{totales['transacciones']:,} transacciones y {totales['asientos']:,} asientos asignados")
+    if totales['sin_periodo']:
+        print(f"{totales['sin_periodo']:,} transacciones quedaron fuera de todo período")
+    return 0
+
+
+def periodos_cerrar(args) -> int:
+    with get_session() as session:
+        usuario = UsuarioRepository(session).get_by_username(args.usuario)
+        if usuario is None:
+            print(f"ERROR: no existe el usuario {args.usuario}")
+            return 1
+        exito, mensaje = CierrePeriodoService(session).cerrar_periodo(args.id, usuario)
+    print(mensaje if exito else f"ERROR: {mensaje}")
+    return 0 if exito else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    grupos = parser.add_subparsers(dest="grupo", required=True)
+
+    instantaneas = grupos.add_parser("instantaneas", help="Instantáneas de saldos por período y mes")
+    acciones = instantaneas.add_subparsers(dest="accion", required=True)
+    acciones.add_parser("generar").set_defaults(funcion=instantaneas_generar)
+    acciones.add_parser("verificar").set_defaults(funcion=instantaneas_verificar)
+
+    saldos = grupos.add_parser("saldos", help="Saldos de las cuentas")
+    acciones = saldos.add_subparsers(dest="accion", required=True)
+    verificar = acciones.add_parser("verificar")
+    verificar.add_argument("--procesos", type=int, default=None,
+                           help="Procesos para sumar las transacciones (por defecto, automático)")
+    verificar.add_argument("--reparar", action="store_true",
+                           help="Corregir los saldos que no coincidan")
+    verificar.set_defaults(funcion=saldos_verificar)
+
+    resumenes = grupos.add_parser("resumenes", help="Resúmenes de transacciones por día y por mes")
+    acciones = resumenes.add_subparsers(dest="accion", required=True)
+    acciones.add_parser("reconstruir").set_defaults(funcion=resumenes_reconstruir)
+    acciones.add_parser("verificar").set_defaults(funcion=resumenes_verificar)
+
+    periodos = grupos.add_parser("periodos", help="Períodos contables")
+    acciones = periodos.add_subparsers(dest="accion", required=True)
+    acciones.add_parser("listar").set_defaults(funcion=periodos_listar)
+    crear = acciones.add_parser("crear")
+    crear.add_argument("nombre", help="Nombre del período")
+    crear.add_argument("desde", type=datetime.fromisoformat, help="Primer día (AAAA-MM-DD)")
+    crear.add_argument("hasta", type=datetime.fromisoformat, nargs="?", default=None,
+                       help="Último día (AAAA-MM-DD); sin él, el período no tiene fin")
+    crear.add_argument("--usuario", required=True, help="Usuario que crea el período (auditoría)")
+    crear.set_defaults(funcion=periodos_crear)
+    asignar = acciones.add_parser("asignar")
+    asignar.add_argument("--lote", type=int, default=None,
+                         help="Transacciones por lote (por defecto, config.PERIODOS_ASIGNACION_LOTE)")
+    asignar.set_defaults(funcion=periodos_asignar)
+    cerrar = acciones.add_parser("cerrar")
+    cerrar.add_argument("id", type=int, help="ID del período (ver 'periodos listar')")
+    cerrar.add_argument("--usuario", required=True, help="Usuario que realiza el cierre (auditoría)")
+    cerrar.set_defaults(funcion=periodos_cerrar)
+
+    args = parser.parse_args()
+    init_db()
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Fixtures compartidas por las pruebas
+
+Cada prueba que usa `libro` trabaja sobre una base SQLite temporal con el
+esquema completo: el engine global (el de get_session) se apunta a ella y
+al terminar vuelve a la configuración por defecto, sin tocar
+data/database.db.
+
+La instrumentación de consultas se activa para todas las pruebas: los
+presupuestos de sentencias usan contar_consultas().
+"""
+import os
+
+os.environ.setdefault("INSTRUMENTACION_CONSULTAS", "1")
+
+import pytest
+from app.core import database
+from app.core.constants import NIVEL_ADMINISTRADOR
+from app.core.database import configurar_perfil, get_session, init_db
+from app.models.usuario import Usuario
+import config
+
+
+@pytest.fixture
+def libro(tmp_path):
+    """Base temporal con un usuario; retorna el ID del usuario"""
+    configurar_perfil(config.DB_PERFIL, f"sqlite:///{tmp_path / 'libro.db'}")
+    init_db()
+    with get_session() as session:
+        usuario = Usuario(username="prueba", password_hash="-", nombre="Prueba", apellido="Test",
+                          documento="00000000", nivel=NIVEL_ADMINISTRADOR, activo=1)
+        session.add(usuario)
+        session.flush()
+        usuario_id = usuario.id
+    yield usuario_id
+    database.engine.dispose()
+    configurar_perfil(config.DB_PERFIL)
@@ -0,0 +1,155 @@
+"""
+Presupuesto de consultas SQL por operación (detección de N+1)
+
+Sobre un libro con varias páginas de transacciones, cada prueba ejecuta lo
+que hace una vista al actualizarse (o un método de servicio) y cuenta sus
+sentencias con contar_consultas(). El máximo no depende de la cantidad de
+registros (salvo las páginas de los listados): una carga perezosa por fila
+supera el presupuesto enseguida, y el error muestra las sentencias repetidas.
+"""
+import math
+from types import SimpleNamespace
+import pytest
+from app.core import database
+from app.core.cache import cache_estados
+from app.core.constants import (NIVEL_TRABAJADOR, TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE,
+                                TIPO_TRANSACCION_COMPRA, TIPO_TRANSACCION_GENERAL, TIPO_TRANSACCION_VENTA)
+from app.core.database import configurar_perfil, get_session, init_db
+from app.core.instrumentacion import contar_consultas
+from app.gui.views.dashboard_view import DashboardView
+from app.gui.views.usuarios_view import UsuariosView
+from app.gui.widgets.graficos import FuenteComposicionCuentas, FuenteVentasCompras
+from app.gui.widgets.tabla_datos import FuenteActividades, FuenteTransacciones
+from app.models.asiento import Asiento
+from app.models.cuenta import Cuenta
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.asiento_repository import AsientoRepository
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.services.contabilidad_service import ContabilidadService
+from app.services.export_service import ExportService, FORMATO_CSV
+from app.services.reportes_service import ReportesService, TAMANO_PAGINA_REPORTE
+import config
+
+TRANSACCIONES = 1200
+USUARIOS = 5
+TRANSACCIONES_POR_ASIENTO = 40
+
+
+def paginas(registros: int, tamano: int = TAMANO_PAGINA_REPORTE) -> int:
+    """Consultas de un listado paginado: una por página, más la que encuentra el final"""
+    return math.ceil(registros / tamano) + (1 if registros % tamano == 0 else 0)
+
+
+def verificar(funcion, maximo: int, operacion: str):
+    """Ejecuta funcion(session) en una unidad de trabajo y verifica su presupuesto de sentencias"""
+    with get_session() as session, contar_consultas() as contador:
+        funcion(session)
+    contador.verificar(maximo, operacion)
+
+
+@pytest.fixture(scope="module")
+def libro_cargado(tmp_path_factory):
+    """Libro con transacciones de varios usuarios y un asiento con muchas líneas"""
+    configurar_perfil(config.DB_PERFIL, f"sqlite:///{tmp_path_factory.mktemp('presupuesto') / 'libro.db'}")
+    init_db()
+    with get_session() as session:
+        usuarios = [
+            Usuario(username=f"usuario{i}", password_hash="-", nombre=f"Nombre{i}", apellido="Prueba",
+                    documento=f"9000{i:04d}", nivel=NIVEL_TRABAJADOR, activo=1)
+            for i in range(USUARIOS)
+        ]
+        session.add_all(usuarios)
+        session.flush()
+        ContabilidadService(session).registrar_lote([
+            (TIPO_TRANSACCION_VENTA if i % 2 == 0 else TIPO_TRANSACCION_COMPRA,
+             f"Ticket {i}", float(i % 1000 + 1), usuarios[i % USUARIOS])
+            for i in range(TRANSACCIONES)
+        ])
+    with get_session() as session:
+        cuentas = session.query(Cuenta).all()
+        usuario_id = session.query(Usuario.id).order_by(Usuario.id).first()[0]
+        asiento = Asiento(descripcion="Asiento de prueba", numero=1, usuario_id=usuario_id)
+        asiento.transacciones = [
+            Transaccion(concepto=f"Línea {i}", monto=100.0, tipo=TIPO_TRANSACCION_GENERAL,
+                        cuenta_id=cuentas[i % len(cuentas)].id, usuario_id=usuario_id)
+            for i in range(TRANSACCIONES_POR_ASIENTO)
+        ]
+        session.add(asiento)
+        session.flush()
+        datos = SimpleNamespace(asiento_id=asiento.id, usuario_id=usuario_id,
+                                transacciones=TRANSACCIONES + TRANSACCIONES_POR_ASIENTO)
+    with get_session() as session:
+        datos.actividades = AuditoriaRepository(session).count()
+    yield datos
+    database.engine.dispose()
+    configurar_perfil(config.DB_PERFIL)
+
+
+class TestPresupuestoVistas:
+    """Lo que ejecuta cada vista al actualizarse, sin caché (como la primera vez)"""
+
+    def test_dashboard(self, libro_cargado):
+        def actualizar(session):
+            cache_estados.limpiar()
+            DashboardView._cargar_datos(SimpleNamespace(session=session))
+            FuenteVentasCompras().cargar(session)
+            FuenteComposicionCuentas([TIPO_ACTIVO_CORRIENTE, TIPO_ACTIVO_NO_CORRIENTE], "Activo").cargar(session)
+
+        verificar(actualizar, 5, "Actualizar DashboardView")
+
+    def test_balance(self, libro_cargado):
+        def actualizar(session):
+            cache_estados.limpiar()
+            ReportesService(session).generar_balance_general_texto()
+
+        verificar(actualizar, 2, "Actualizar BalanceView")
+
+    def test_usuarios(self, libro_cargado):
+        verificar(lambda s: UsuariosView._generar_lista(SimpleNamespace(session=s)), 1,
+                  "Actualizar UsuariosView")
+
+    @pytest.mark.parametrize("fuente, orden", [(FuenteTransacciones, 'fecha'),
+                                               (FuenteActividades, 'fecha_hora')])
+    def test_pagina_del_libro(self, libro_cargado, fuente, orden):
+        verificar(lambda s: fuente().cargar_pagina(s, config.TABLA_TAMANO_PAGINA, None, orden, True, {}),
+                  1, f"Página de LibroView ({fuente.__name__})")
+
+
+class TestPresupuestoServicios:
+    """Métodos de servicio y de modelo usados por las vistas y los reportes"""
+
+    def test_reporte_transacciones(self, libro_cargado):
+        verificar(lambda s: ReportesService(s).generar_reporte_transacciones(limite=None),
+                  1 + paginas(libro_cargado.transacciones), "generar_reporte_transacciones")
+
+    def test_reporte_actividades(self, libro_cargado):
+        verificar(lambda s: ReportesService(s).generar_reporte_actividades(limite=None),
+                  paginas(libro_cargado.actividades), "generar_reporte_actividades")
+
+    def test_ventas_compras_del_mes(self, libro_cargado):
+        verificar(lambda s: ReportesService(s).obtener_ventas_compras_del_mes(), 2,
+                  "obtener_ventas_compras_del_mes")
+
+    def test_ventas_compras_por_mes(self, libro_cargado):
+        verificar(lambda s: "".join(ReportesService(s).iterar_ventas_compras_por_mes()), 1,
+                  "iterar_ventas_compras_por_mes")
+
+    def test_asiento_balanceado(self, libro_cargado):
+        verificar(lambda s: AsientoRepository(s).get_con_cuentas(libro_cargado.asiento_id).esta_balanceado, 3,
+                  "Asiento.esta_balanceado")
+
+    def test_registrar_venta(self, libro_cargado):
+        verificar(lambda s: ContabilidadService(s).registrar_venta(
+            "Venta de prueba", 10.0, s.get(Usuario, libro_cargado.usuario_id)), 8, "registrar_venta")
+
+    def test_exportar_transacciones(self, libro_cargado, tmp_path):
+        verificar(lambda s: ExportService(s).exportar_transacciones(FORMATO_CSV, tmp_path / "transacciones.csv"),
+                  1, "exportar_transacciones (csv)")
+
+
+def test_contar_consultas_sin_instrumentacion_falla(monkeypatch):
+    monkeypatch.setattr(config, "INSTRUMENTACION_CONSULTAS", False)
+    with pytest.raises(RuntimeError, match="INSTRUMENTACION_CONSULTAS"):
+        with contar_consultas():
+            pass
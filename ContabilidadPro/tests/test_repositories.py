@@ -0,0 +1,286 @@
+"""
+Pruebas de los repositorios
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.core import database
+from app.core.constants import (NATURALEZA_ACREEDORA, TIPO_INGRESO, TIPO_TRANSACCION_COMPRA,
+                                TIPO_TRANSACCION_VENTA)
+from app.core.database import crear_engine, get_session
+from app.core.instrumentacion import contar_consultas
+from app.core.resumenes import reconstruir_resumenes, verificar_resumenes
+from app.models.auditoria import Auditoria
+from app.models.cuenta import Cuenta
+from app.models.periodo import Periodo
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.repositories.cuenta_repository import CuentaRepository
+from app.repositories.indice_cuentas import indice_cuentas
+from app.repositories.indice_periodos import CLAVE_PERIODOS_MODIFICADOS
+from app.repositories.periodo_repository import PeriodoRepository
+from app.services.contabilidad_service import ContabilidadService
+
+
+class ErrorDePrueba(Exception):
+    """Error que interrumpe una unidad de trabajo dentro de una prueba"""
+
+
+def _crear_cuenta(codigo: str = "ING-PRUEBA") -> int:
+    with get_session() as session:
+        return CuentaRepository(session).create(codigo=codigo, nombre="Ingresos de prueba", tipo=TIPO_INGRESO,
+                                                naturaleza=NATURALEZA_ACREEDORA, saldo=0.0, activa=1).id
+
+
+def _saldo(cuenta_id: int) -> float:
+    with get_session() as session:
+        return session.get(Cuenta, cuenta_id).saldo
+
+
+def _descripciones_auditadas():
+    with get_session() as session:
+        return [a.descripcion for a in session.query(Auditoria).order_by(Auditoria.id)]
+
+
+class TestAuditoria:
+    """Actividades pendientes de la sesión (modo durable)"""
+
+    def test_actividad_de_una_sesion_revertida_no_se_escribe(self, libro):
+        # La excepción llega antes de la primera sentencia SQL: no hay after_rollback
+        with pytest.raises(ErrorDePrueba):
+            with get_session() as session:
+                AuditoriaRepository(session).registrar_actividad(libro, "Prueba", "fantasma")
+                raise ErrorDePrueba()
+
+        with get_session() as session:
+            AuditoriaRepository(session).registrar_actividad(libro, "Prueba", "real")
+
+        assert _descripciones_auditadas() == ["real"]
+
+    def test_actividad_de_una_sesion_cerrada_sin_confirmar_no_se_escribe(self, libro):
+        with get_session() as session:
+            AuditoriaRepository(session).registrar_actividad(libro, "Prueba", "fantasma")
+            session.close()
+            AuditoriaRepository(session).registrar_actividad(libro, "Prueba", "real")
+
+        assert _descripciones_auditadas() == ["real"]
+
+
+class TestSaldos:
+    """Actualización de Cuenta.saldo"""
+
+    def test_sumar_al_saldo_concurrente_no_pierde_actualizaciones(self, libro):
+        cuenta_id = _crear_cuenta()
+        hilos, sumas_por_hilo = 8, 50
+
+        def sumar(_):
+            for _ in range(sumas_por_hilo):
+                with get_session() as session:
+                    assert CuentaRepository(session).sumar_al_saldo(cuenta_id, 1.25)
+
+        with ThreadPoolExecutor(hilos) as ejecutor:
+            list(ejecutor.map(sumar, range(hilos)))
+
+        assert _saldo(cuenta_id) == pytest.approx(hilos * sumas_por_hilo * 1.25)
+
+    def test_sumar_al_saldo_retorna_la_cuenta_actualizada(self, libro):
+        cuenta_id = _crear_cuenta()
+        with get_session() as session:
+            repo = CuentaRepository(session)
+            cuenta = repo.sumar_al_saldo(cuenta_id, 80.0)
+            assert cuenta is session.get(Cuenta, cuenta_id)
+            assert cuenta.saldo == pytest.approx(80.0)
+            assert repo.sumar_al_saldo(cuenta_id, -30.0).saldo == pytest.approx(50.0)
+            assert repo.sumar_al_saldo(cuenta_id + 1000, 10.0) is None
+
+    def test_saldos_acumulados_de_una_sesion_revertida_no_se_aplican(self, libro):
+        cuenta_id = _crear_cuenta()
+
+        # La excepción llega antes de la primera sentencia SQL: no hay after_rollback
+        with pytest.raises(ErrorDePrueba):
+            with get_session() as session:
+                CuentaRepository(session).acumular_saldo(cuenta_id, 500.0)
+                raise ErrorDePrueba()
+
+        with get_session() as session:
+            session.get(Cuenta, cuenta_id)
+
+        assert _saldo(cuenta_id) == 0.0
+
+    def test_saldos_acumulados_se_aplican_al_confirmar(self, libro):
+        cuenta_id = _crear_cuenta()
+        with get_session() as session:
+            repo = CuentaRepository(session)
+            repo.acumular_saldo(cuenta_id, 100.0)
+            repo.acumular_saldo(cuenta_id, 25.5)
+
+        assert _saldo(cuenta_id) == pytest.approx(125.5)
+
+
+class TestIndiceCuentas:
+    """Cuentas nuevas en el índice en memoria del plan de cuentas"""
+
+    def test_cuenta_de_una_sesion_cerrada_sin_confirmar_no_se_publica(self, libro):
+        _crear_cuenta("ING-EXISTENTE")
+        with get_session() as session:
+            CuentaRepository(session).resolver_codigo("ING-EXISTENTE")  # Carga el índice
+
+        with get_session() as session:
+            CuentaRepository(session).create(codigo="ING-FANTASMA", nombre="Fantasma", tipo=TIPO_INGRESO,
+                                             naturaleza=NATURALEZA_ACREEDORA, saldo=0.0, activa=1)
+            session.close()
+            CuentaRepository(session).resolver_codigo("ING-EXISTENTE")
+
+        with get_session() as session:
+            assert indice_cuentas.resolver(session, "ING-FANTASMA") is None
+            assert CuentaRepository(session).resolver_codigo("ING-FANTASMA") is None
+
+    def test_cuenta_confirmada_se_publica(self, libro):
+        _crear_cuenta("ING-EXISTENTE")
+        with get_session() as session:
+            CuentaRepository(session).resolver_codigo("ING-EXISTENTE")
+
+        cuenta_id = _crear_cuenta("ING-NUEVA")
+        with get_session() as session:
+            assert CuentaRepository(session).resolver_codigo("ING-NUEVA").id == cuenta_id
+
+
+class TestBusquedaTexto:
+    """Búsqueda por el índice FTS5 y su alternativa con LIKE"""
+
+    def test_sin_indice_fts_busca_con_like(self, libro):
+        with database.engine.begin() as conexion:
+            for trigger in ("ai", "ad", "au"):
+                conexion.execute(text(f"DROP TRIGGER auditoria_fts_{trigger}"))
+            conexion.execute(text("DROP TABLE auditoria_fts"))
+        with get_session() as session:
+            AuditoriaRepository(session).registrar_actividad(libro, "prueba", "Cierre de caja")
+        with get_session() as session:
+            encontradas = AuditoriaRepository(session).buscar_texto("caja")
+            assert [a.descripcion for a in encontradas] == ["Cierre de caja"]
+
+    def test_otros_errores_de_la_busqueda_se_propagan(self, libro, monkeypatch):
+        with get_session() as session:
+            execute = session.execute
+
+            def base_bloqueada(sentencia, *args, **kwargs):
+                if "MATCH" in str(sentencia):
+                    raise OperationalError(str(sentencia), {}, Exception("database is locked"))
+                return execute(sentencia, *args, **kwargs)
+
+            monkeypatch.setattr(session, "execute", base_bloqueada)
+            with pytest.raises(OperationalError, match="database is locked"):
+                AuditoriaRepository(session).buscar_texto("caja")
+
+
+class TestIndicePeriodos:
+    """Índice en memoria de los períodos"""
+
+    def test_periodo_creado_por_otra_instancia_se_resuelve(self, libro):
+        fecha = datetime(2025, 6, 15)
+        with get_session() as session:
+            assert PeriodoRepository(session).resolver_fecha(fecha) is None
+
+        # Otra instancia de la aplicación sobre el mismo archivo: su commit no invalida este índice
+        otro_engine = crear_engine(str(database.engine.url))
+        try:
+            with sessionmaker(bind=otro_engine)() as session:
+                periodo = Periodo(nombre="Ejercicio 2025", fecha_inicio=datetime(2025, 1, 1),
+                                  fecha_fin=datetime(2025, 12, 31), cerrado=0, resultado=0.0)
+                session.add(periodo)
+                session.commit()
+                periodo_id = periodo.id
+        finally:
+            otro_engine.dispose()
+
+        with get_session() as session:
+            assert PeriodoRepository(session).resolver_fecha(fecha) == periodo_id
+            assert [r.id for r in PeriodoRepository(session).get_rangos()] == [periodo_id]
+
+    def test_fechas_sin_periodo_no_consultan_la_base_en_cada_registro(self, libro):
+        with get_session() as session:
+            usuario = session.get(Usuario, libro)
+            with contar_consultas() as contador:
+                ContabilidadService(session).registrar_lote(
+                    [(TIPO_TRANSACCION_VENTA, f"Ticket {i}", 10.0, usuario) for i in range(50)])
+                ContabilidadService(session).registrar_venta("Venta", 10.0, usuario)
+        consultas_periodos = [r for r in contador.registros if "FROM periodos" in r.sentencia]
+        assert len(consultas_periodos) == 1  # La carga del índice; los desaciertos no se repiten
+
+    def test_periodo_de_una_sesion_cerrada_sin_confirmar_no_deja_la_sesion_marcada(self, libro):
+        with get_session() as session:
+            PeriodoRepository(session).create(nombre="Ejercicio 2025", fecha_inicio=datetime(2025, 1, 1),
+                                              fecha_fin=datetime(2025, 12, 31), cerrado=0, resultado=0.0)
+            session.close()
+            assert CLAVE_PERIODOS_MODIFICADOS not in session.info
+
+
+def _meses_resumidos() -> list:
+    with database.engine.connect() as conexion:
+        return [tuple(fila) for fila in conexion.execute(text(
+            "SELECT mes, tipo, cantidad, total FROM resumen_mensual ORDER BY mes, tipo"))]
+
+
+class TestResumenes:
+    """Triggers de resumen_diario y resumen_mensual"""
+
+    @pytest.fixture
+    def transacciones(self, libro):
+        """Dos ventas y una compra de enero de 2025; retorna sus IDs por concepto"""
+        with get_session() as session:
+            usuario = session.get(Usuario, libro)
+            ContabilidadService(session).registrar_lote([
+                (TIPO_TRANSACCION_VENTA, "Uno", 100.0, usuario, datetime(2025, 1, 10, 9, 0)),
+                (TIPO_TRANSACCION_VENTA, "Dos", 40.0, usuario, datetime(2025, 1, 10, 17, 0)),
+                (TIPO_TRANSACCION_COMPRA, "Tres", 25.0, usuario, datetime(2025, 1, 31, 23, 59)),
+            ])
+        with get_session() as session:
+            return {concepto.split(": ")[1]: id_ for id_, concepto in
+                    session.query(Transaccion.id, Transaccion.concepto)}
+
+    def _modificar(self, transaccion_id: int, **valores):
+        with get_session() as session:
+            transaccion = session.get(Transaccion, transaccion_id)
+            for campo, valor in valores.items():
+                setattr(transaccion, campo, valor)
+        assert verificar_resumenes(database.engine) == []
+
+    def test_mover_de_dia_y_de_mes(self, transacciones):
+        self._modificar(transacciones["Dos"], fecha=datetime(2025, 1, 11, 8, 0))
+        self._modificar(transacciones["Tres"], fecha=datetime(2025, 2, 1, 0, 0))
+        self._modificar(transacciones["Uno"], fecha=datetime(2025, 2, 3, 12, 0), monto=70.0)
+
+        assert _meses_resumidos() == [("2025-01-01", TIPO_TRANSACCION_VENTA, 1, 40.0),
+                                      ("2025-02-01", TIPO_TRANSACCION_COMPRA, 1, 25.0),
+                                      ("2025-02-01", TIPO_TRANSACCION_VENTA, 1, 70.0)]
+
+    def test_cambiar_el_tipo(self, transacciones):
+        with get_session() as session:
+            cuenta_compras = session.query(Cuenta.id).filter(Cuenta.codigo == "GAS-COMPRAS").scalar()
+        self._modificar(transacciones["Dos"], tipo=TIPO_TRANSACCION_COMPRA, cuenta_id=cuenta_compras)
+
+        assert _meses_resumidos() == [("2025-01-01", TIPO_TRANSACCION_COMPRA, 2, 65.0),
+                                      ("2025-01-01", TIPO_TRANSACCION_VENTA, 1, 100.0)]
+
+    def test_eliminar(self, transacciones):
+        for transaccion_id in transacciones.values():
+            with get_session() as session:
+                session.delete(session.get(Transaccion, transaccion_id))
+            assert verificar_resumenes(database.engine) == []
+
+        assert _meses_resumidos() == []
+
+    def test_reconstruir_corrige_un_resumen_alterado(self, transacciones):
+        with database.engine.begin() as conexion:
+            conexion.execute(text("UPDATE resumen_diario SET total = total + 1"))
+            conexion.execute(text("DELETE FROM resumen_mensual WHERE tipo = :tipo"),
+                             {"tipo": TIPO_TRANSACCION_COMPRA})
+        assert {d['tabla'] for d in verificar_resumenes(database.engine)} == {"resumen_diario", "resumen_mensual"}
+
+        reconstruir_resumenes(database.engine)
+
+        assert verificar_resumenes(database.engine) == []
@@ -0,0 +1,424 @@
+"""
+Pruebas de los servicios
+"""
+import csv
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.core.constants import (NIVEL_ADMINISTRADOR, TIPO_TRANSACCION_CIERRE, TIPO_TRANSACCION_COMPRA,
+                                TIPO_TRANSACCION_VENTA)
+from app.core import database
+from app.core.database import crear_engine, get_session, init_db
+from app.core.instrumentacion import contar_consultas
+from app.core.periodos_cerrados import MENSAJE_PERIODO_CERRADO
+from app.models.cuenta import Cuenta
+from app.models.periodo import Periodo
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.repositories.saldo_historico_repository import SaldoHistoricoRepository
+from app.services.cierre_periodo_service import CODIGO_CUENTA_RESULTADOS, CierrePeriodoService
+from app.services.contabilidad_service import ContabilidadService
+from app.services.importacion_service import ImportacionService
+from app.services.periodos_service import PeriodosService
+from app.services.saldos_historicos_service import SaldosHistoricosService
+from app.services import verificacion_saldos_service
+from app.services.verificacion_saldos_service import VerificacionSaldosService
+from app.services import reportes_service
+from app.services.reportes_service import ReportesService
+import config
+
+
+def _crear_periodo(usuario_id: int, nombre: str, inicio: datetime, fin: datetime) -> int:
+    with get_session() as session:
+        exito, mensaje = PeriodosService(session).crear_periodo(nombre, inicio, fin, session.get(Usuario, usuario_id))
+        assert exito, mensaje
+    with get_session() as session:
+        return session.query(Periodo.id).filter(Periodo.nombre == nombre).scalar()
+
+
+def _registrar(usuario_id: int, registros: list) -> list:
+    """Registra con registrar_lote tuplas (tipo, concepto, monto[, fecha]) del usuario"""
+    with get_session() as session:
+        usuario = session.get(Usuario, usuario_id)
+        return ContabilidadService(session).registrar_lote(
+            [(tipo, concepto, monto, usuario, *fecha) for tipo, concepto, monto, *fecha in registros])
+
+
+def _saldos() -> dict:
+    with get_session() as session:
+        return dict(session.query(Cuenta.codigo, Cuenta.saldo))
+
+
+def _cerrar(usuario_id: int, periodo_id: int):
+    with get_session() as session:
+        return CierrePeriodoService(session).cerrar_periodo(periodo_id, session.get(Usuario, usuario_id))
+
+
+class TestRegistrarLote:
+    """Registro en bloque de ventas y compras"""
+
+    def test_informa_cada_registro_y_sigue_con_el_resto(self, libro):
+        resultados = _registrar(libro, [
+            (TIPO_TRANSACCION_VENTA, "Válida", 100.0),
+            ("X-INVALIDO", "Tipo desconocido", 10.0),
+            (TIPO_TRANSACCION_COMPRA, "Monto negativo", -5.0),
+            (TIPO_TRANSACCION_COMPRA, "Monto cero", 0.0),
+            (TIPO_TRANSACCION_COMPRA, "Válida", 40.0),
+        ])
+
+        assert [exito for exito, _ in resultados] == [True, False, False, False, True]
+        assert resultados[1][1] == "Tipo de transacción inválido: X-INVALIDO"
+        assert resultados[2][1] == resultados[3][1] == "El monto debe ser mayor a cero"
+        with get_session() as session:
+            assert session.query(Transaccion).count() == 2
+
+    def test_acumula_el_saldo_de_cada_cuenta(self, libro):
+        _registrar(libro, [(TIPO_TRANSACCION_VENTA, f"Venta {i}", 10.0 * i) for i in range(1, 11)]
+                   + [(TIPO_TRANSACCION_COMPRA, f"Compra {i}", 2.5) for i in range(4)])
+        _registrar(libro, [(TIPO_TRANSACCION_VENTA, "Otra venta", 45.0)])
+
+        saldos = _saldos()
+        assert saldos["ING-VENTAS"] == pytest.approx(595.0)
+        assert saldos["GAS-COMPRAS"] == pytest.approx(10.0)
+
+    def test_fecha_pasada_invalida_las_instantaneas_posteriores(self, libro):
+        _registrar(libro, [(TIPO_TRANSACCION_VENTA, "Enero", 100.0, datetime(2025, 1, 15))])
+        with get_session() as session:
+            servicio = SaldosHistoricosService(session)
+            servicio.generar_instantanea(datetime(2025, 2, 1))
+            servicio.generar_instantanea(datetime(2025, 3, 1))
+
+        _registrar(libro, [(TIPO_TRANSACCION_VENTA, "Atrasada", 20.0, datetime(2025, 2, 10))])
+
+        with get_session() as session:
+            assert SaldoHistoricoRepository(session).get_cortes() == [datetime(2025, 2, 1)]
+            assert SaldosHistoricosService(session).verificar() == []
+
+
+def _saldos_recalculados(hasta: datetime) -> dict:
+    """Saldos por cuenta_id sumando una a una las transacciones anteriores a hasta"""
+    saldos = {}
+    with get_session() as session:
+        for cuenta_id, monto in session.query(Transaccion.cuenta_id, Transaccion.monto).filter(
+                Transaccion.fecha < hasta):
+            saldos[cuenta_id] = saldos.get(cuenta_id, 0.0) + monto
+    return saldos
+
+
+def _saldos_a_fecha(fecha: datetime) -> dict:
+    with get_session() as session:
+        return SaldosHistoricosService(session).saldos_a_fecha(fecha)
+
+
+class TestSaldosHistoricos:
+    """Saldos a una fecha a partir de las instantáneas"""
+
+    CORTES = [datetime(2025, 2, 1), datetime(2025, 3, 1), datetime(2025, 3, 15, 12, 30),
+              datetime(2025, 4, 1), datetime(2025, 5, 1)]
+
+    @pytest.fixture
+    def movimientos(self, libro):
+        """Ventas y compras de enero a abril de 2025 e instantáneas al 1/2 y al 1/4"""
+        _registrar(libro, [
+            (TIPO_TRANSACCION_VENTA, "Enero", 100.0, datetime(2025, 1, 10, 9, 0)),
+            (TIPO_TRANSACCION_COMPRA, "Enero", 30.0, datetime(2025, 1, 31, 23, 59)),
+            (TIPO_TRANSACCION_VENTA, "Justo en el corte", 7.0, datetime(2025, 2, 1)),
+            (TIPO_TRANSACCION_VENTA, "Febrero", 50.0, datetime(2025, 2, 14, 18, 0)),
+            (TIPO_TRANSACCION_COMPRA, "Marzo", 20.0, datetime(2025, 3, 15, 12, 0)),
+            (TIPO_TRANSACCION_VENTA, "Marzo", 5.0, datetime(2025, 3, 15, 13, 0)),
+            (TIPO_TRANSACCION_VENTA, "Abril", 60.0, datetime(2025, 4, 2)),
+        ])
+        with get_session() as session:
+            servicio = SaldosHistoricosService(session)
+            servicio.generar_instantanea(datetime(2025, 2, 1))
+            servicio.generar_instantanea(datetime(2025, 4, 1))
+
+    @pytest.mark.parametrize("corte", CORTES)
+    def test_coincide_con_las_transacciones(self, movimientos, corte):
+        assert _saldos_a_fecha(corte) == pytest.approx(_saldos_recalculados(corte))
+
+    def test_fecha_pasada_invalida_la_instantanea_y_se_recalcula(self, libro, movimientos):
+        _registrar(libro, [(TIPO_TRANSACCION_COMPRA, "Atrasada", 15.0, datetime(2025, 2, 20))])
+        with get_session() as session:
+            assert SaldoHistoricoRepository(session).get_cortes() == [datetime(2025, 2, 1)]
+
+        for corte in self.CORTES:
+            assert _saldos_a_fecha(corte) == pytest.approx(_saldos_recalculados(corte))
+
+        with get_session() as session:
+            servicio = SaldosHistoricosService(session)
+            servicio.generar_pendientes(datetime(2025, 5, 1))
+            assert servicio.verificar() == []
+        for corte in self.CORTES:
+            assert _saldos_a_fecha(corte) == pytest.approx(_saldos_recalculados(corte))
+
+    def test_verificar_detecta_una_instantanea_desactualizada(self, movimientos):
+        corte = datetime(2025, 4, 1)
+        with get_session() as session:
+            cuenta_id = session.query(Cuenta.id).filter(Cuenta.codigo == "ING-VENTAS").scalar()
+            saldos = SaldoHistoricoRepository(session).get_saldos(corte)
+            saldos[cuenta_id] += 1.0
+            SaldoHistoricoRepository(session).reemplazar_corte(corte, saldos)
+
+        with get_session() as session:
+            diferencias = SaldosHistoricosService(session).verificar()
+        assert [(d['fecha_corte'], d['cuenta_id']) for d in diferencias] == [(corte, cuenta_id)]
+        assert diferencias[0]['saldo_guardado'] - diferencias[0]['saldo_calculado'] == pytest.approx(1.0)
+
+
+class ImportacionInterrumpida(Exception):
+    """Corta una importación después de confirmar un lote"""
+
+
+class TestImportacion:
+    """Importación por lotes con punto de control y reporte de errores"""
+
+    # Filas 2 a 9 del archivo: dos lotes de 4, con una fila inválida en cada uno
+    FILAS = [
+        ("10/01/2025", "Venta", "Venta 1", "100"),
+        ("11/01/2025", "Compra", "Compra 1", "40.50"),
+        ("no es fecha", "Venta", "Fecha rota", "10"),
+        ("12/01/2025", "Venta", "Venta 2", "20"),
+        ("13/01/2025", "Devolución", "Tipo raro", "5"),
+        ("14/01/2025", "Venta", "Venta 3", "30"),
+        ("15/01/2025", "Compra", "Compra 2", "9.5"),
+        ("16/01/2025", "Venta", "Venta 4", "1"),
+    ]
+
+    @pytest.fixture
+    def archivo(self, libro, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "IMPORTACIONES_DIR", tmp_path)
+        ruta = tmp_path / "historico.csv"
+        with open(ruta, "w", newline="", encoding="utf-8") as salida:
+            csv.writer(salida).writerows([("Fecha", "Tipo", "Concepto", "Monto"), *self.FILAS])
+        return ruta
+
+    def _importar(self, libro: int, ruta: Path, progreso=None) -> dict:
+        with get_session() as session:
+            return ImportacionService(session).importar_transacciones(
+                ruta, session.get(Usuario, libro), progreso=progreso, tamano_lote=4)
+
+    def test_reanuda_sin_duplicar_y_reporta_las_filas_invalidas(self, libro, archivo):
+        def interrumpir(*_):
+            raise ImportacionInterrumpida()
+
+        with pytest.raises(ImportacionInterrumpida):
+            self._importar(libro, archivo, progreso=interrumpir)
+        with get_session() as session:
+            assert session.query(Transaccion).count() == 3
+
+        resumen = self._importar(libro, archivo)
+        assert resumen['reanudada_desde'] == 5
+        assert resumen['completada']
+        assert (resumen['importadas'], resumen['errores']) == (6, 2)
+
+        with get_session() as session:
+            conceptos = sorted(c for c, in session.query(Transaccion.concepto))
+        assert len(conceptos) == len(set(conceptos)) == 6
+        assert _saldos()["ING-VENTAS"] == pytest.approx(151.0)
+        assert _saldos()["GAS-COMPRAS"] == pytest.approx(50.0)
+
+        with open(resumen['reporte_errores'], newline="", encoding="utf-8") as reporte:
+            filas = list(csv.reader(reporte))
+        assert filas[0] == ["fila", "error", "fecha", "tipo", "concepto", "monto"]
+        assert [(f[0], f[1], f[4]) for f in filas[1:]] == [
+            ("4", "Fecha inválida", "Fecha rota"),
+            ("6", "Tipo inválido (use Venta o Compra)", "Tipo raro"),
+        ]
+
+    def test_archivo_ya_importado_no_se_vuelve_a_registrar(self, libro, archivo):
+        self._importar(libro, archivo)
+        resumen = self._importar(libro, archivo)
+
+        assert resumen['reanudada_desde'] == 9
+        assert (resumen['importadas'], resumen['errores']) == (6, 2)
+        with get_session() as session:
+            assert session.query(Transaccion).count() == 6
+
+
+class TestVerificacionSaldos:
+    """Verificación y reparación de Cuenta.saldo contra las transacciones"""
+
+    @pytest.fixture(params=["un_proceso", "varios_procesos"])
+    def procesos_usados(self, request, libro, monkeypatch):
+        """Libro con 40 transacciones; retorna la lista de pools de procesos creados"""
+        pools = []
+
+        class PoolContado(verificacion_saldos_service.ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                pools.append(self)
+
+        monkeypatch.setattr(verificacion_saldos_service, "ProcessPoolExecutor", PoolContado)
+        if request.param == "varios_procesos":
+            monkeypatch.setattr(config, "VERIFICACION_UMBRAL_PARALELO", 10)
+            monkeypatch.setattr(config, "VERIFICACION_PROCESOS", 3)
+        _registrar(libro, [(TIPO_TRANSACCION_VENTA if i % 3 else TIPO_TRANSACCION_COMPRA, f"Ticket {i}", i + 0.25)
+                           for i in range(40)])
+        yield pools
+        assert bool(pools) == (request.param == "varios_procesos")
+
+    def test_informa_y_repara_un_saldo_alterado(self, procesos_usados):
+        esperados = _saldos()
+        with database.engine.begin() as conexion:
+            conexion.execute(text("UPDATE cuentas SET saldo = saldo + 12.5 WHERE codigo = 'ING-VENTAS'"))
+
+        with get_session() as session:
+            cuenta_id = session.query(Cuenta.id).filter(Cuenta.codigo == "ING-VENTAS").scalar()
+            diferencias = VerificacionSaldosService(session).verificar()
+        assert [(d['cuenta_id'], d['saldo_calculado']) for d in diferencias] == [
+            (cuenta_id, pytest.approx(esperados["ING-VENTAS"]))]
+        assert diferencias[0]['diferencia'] == pytest.approx(12.5)
+
+        with get_session() as session:
+            assert VerificacionSaldosService(session).reparar(diferencias) == 1
+        with get_session() as session:
+            assert VerificacionSaldosService(session).verificar() == []
+        assert _saldos() == pytest.approx(esperados)
+
+
+class TestCacheEstados:
+    """Caché de estados financieros (cachear_por_version)"""
+
+    def test_no_sirve_estados_de_otra_base(self, tmp_path):
+        engines = [crear_engine(f"sqlite:///{tmp_path / nombre}") for nombre in ("a.db", "b.db")]
+        try:
+            for engine in engines:
+                init_db(engine)
+            fabrica_a, fabrica_b = (sessionmaker(bind=engine) for engine in engines)
+
+            with fabrica_a() as session:
+                usuario = Usuario(username="prueba", password_hash="-", nombre="Prueba", apellido="Test",
+                                  documento="00000000", nivel=NIVEL_ADMINISTRADOR, activo=1)
+                session.add(usuario)
+                session.flush()
+                ContabilidadService(session).registrar_venta("Venta", 150.0, usuario)
+                session.commit()
+            with fabrica_a() as session:
+                assert ContabilidadService(session).obtener_estado_resultados()['total_ingresos'] == 150.0
+
+            with fabrica_b() as session:
+                assert ContabilidadService(session).obtener_estado_resultados()['total_ingresos'] == 0.0
+        finally:
+            for engine in engines:
+                engine.dispose()
+
+    def test_no_sirve_estados_que_otro_proceso_modifico(self, libro):
+        with get_session() as session:
+            ContabilidadService(session).registrar_venta("Venta", 100.0, session.get(Usuario, libro))
+        with get_session() as session:
+            assert ContabilidadService(session).obtener_estado_resultados()['total_ingresos'] == 100.0
+
+        # Otra instancia de la aplicación registra una venta en el mismo archivo
+        subprocess.run([sys.executable, "-c", (
+            "import config\n"
+            "from app.core.database import configurar_perfil, get_session\n"
+            "from app.models.usuario import Usuario\n"
+            "from app.services.contabilidad_service import ContabilidadService\n"
+            f"configurar_perfil(config.DB_PERFIL, {str(database.engine.url)!r})\n"
+            "with get_session() as session:\n"
+            f"    ContabilidadService(session).registrar_venta('Venta', 900.0, session.get(Usuario, {libro}))\n"
+        )], cwd=Path(__file__).resolve().parent.parent, check=True)
+
+        with get_session() as session:
+            assert ContabilidadService(session).obtener_estado_resultados()['total_ingresos'] == 1000.0
+
+    @pytest.mark.parametrize("generar", ["generar_balance_general_texto", "generar_estado_resultados_texto"])
+    def test_reporte_en_texto_muestra_la_fecha_actual(self, libro, monkeypatch, generar):
+        class Reloj(datetime):
+            ahora = datetime(2026, 3, 2, 10, 0)
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls.ahora
+
+        monkeypatch.setattr(reportes_service, "datetime", Reloj)
+        with get_session() as session:
+            assert "Fecha: 02/03/2026 10:00" in getattr(ReportesService(session), generar)()
+
+        Reloj.ahora = datetime(2026, 3, 2, 11, 30)
+        with get_session() as session, contar_consultas() as contador:
+            texto = getattr(ReportesService(session), generar)()
+        assert "Fecha: 02/03/2026 11:30" in texto
+        assert contador.consultas == 0
+
+
+class TestCierrePeriodo:
+    """Cierre de períodos y bloqueo de sus transacciones"""
+
+    @pytest.fixture
+    def periodos(self, libro):
+        """Enero y febrero de 2025 con ventas y compras; retorna (enero_id, febrero_id)"""
+        enero = _crear_periodo(libro, "Enero 2025", datetime(2025, 1, 1), datetime(2025, 1, 31))
+        febrero = _crear_periodo(libro, "Febrero 2025", datetime(2025, 2, 1), datetime(2025, 2, 28))
+        _registrar(libro, [
+            (TIPO_TRANSACCION_VENTA, "Venta enero", 1000.0, datetime(2025, 1, 10)),
+            (TIPO_TRANSACCION_COMPRA, "Compra enero", 300.0, datetime(2025, 1, 20)),
+            (TIPO_TRANSACCION_VENTA, "Venta febrero", 50.0, datetime(2025, 2, 5)),
+        ])
+        return enero, febrero
+
+    def test_cierre_salda_las_cuentas_de_resultado(self, libro, periodos):
+        enero, _ = periodos
+        exito, mensaje = _cerrar(libro, enero)
+        assert exito, mensaje
+
+        with get_session() as session:
+            lineas = {codigo: monto for codigo, monto in session.query(Cuenta.codigo, Transaccion.monto).join(
+                Transaccion.cuenta).filter(Transaccion.tipo == TIPO_TRANSACCION_CIERRE)}
+            periodo = session.get(Periodo, enero)
+            assert periodo.esta_cerrado
+            assert periodo.resultado == pytest.approx(700.0)
+        assert lineas == {"ING-VENTAS": pytest.approx(-1000.0), "GAS-COMPRAS": pytest.approx(-300.0),
+                          CODIGO_CUENTA_RESULTADOS: pytest.approx(700.0)}
+        # Febrero sigue abierto: solo su venta queda en las cuentas de resultado
+        saldos = _saldos()
+        assert saldos["ING-VENTAS"] == pytest.approx(50.0)
+        assert saldos["GAS-COMPRAS"] == pytest.approx(0.0)
+        assert saldos[CODIGO_CUENTA_RESULTADOS] == pytest.approx(700.0)
+
+    def test_triggers_rechazan_cambios_en_el_periodo_cerrado(self, libro, periodos):
+        enero, _ = periodos
+        assert _cerrar(libro, enero)[0]
+        with get_session() as session:
+            venta = session.query(Transaccion).filter(Transaccion.concepto == "Venta: Venta enero").one()
+            venta_id, cuenta_id = venta.id, venta.cuenta_id
+
+        def insertar(session):
+            session.add(Transaccion(fecha=datetime(2025, 1, 15), concepto="Tardía", monto=10.0,
+                                    tipo=TIPO_TRANSACCION_VENTA, cuenta_id=cuenta_id, usuario_id=libro))
+
+        def modificar(session):
+            session.get(Transaccion, venta_id).monto = 1.0
+
+        def eliminar(session):
+            session.delete(session.get(Transaccion, venta_id))
+
+        for operacion in (insertar, modificar, eliminar):
+            with pytest.raises(IntegrityError, match=MENSAJE_PERIODO_CERRADO):
+                with get_session() as session:
+                    operacion(session)
+        with get_session() as session:
+            assert session.get(Transaccion, venta_id).monto == 1000.0
+
+    def test_no_cierra_fuera_de_orden(self, libro, periodos):
+        enero, febrero = periodos
+        exito, mensaje = _cerrar(libro, febrero)
+        assert not exito
+        assert "Enero 2025" in mensaje
+        with get_session() as session:
+            assert not session.get(Periodo, febrero).esta_cerrado
+
+    def test_no_cierra_dos_veces(self, libro, periodos):
+        enero, _ = periodos
+        assert _cerrar(libro, enero)[0]
+        exito, mensaje = _cerrar(libro, enero)
+        assert not exito
+        assert "ya está cerrado" in mensaje
+        assert _saldos()[CODIGO_CUENTA_RESULTADOS] == pytest.approx(700.0)
+
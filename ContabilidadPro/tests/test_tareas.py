@@ -0,0 +1,51 @@
+"""
+Pruebas de las tareas en segundo plano de la interfaz
+"""
+from app.core.database import get_session
+from app.gui.tareas import EjecutorTareas, Tarea
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+from app.services.contabilidad_service import ContabilidadService
+
+
+def _ejecutar(ejecutor: EjecutorTareas, tarea: Tarea) -> list:
+    """Corre la tarea en este hilo, como tarea activa del ejecutor; retorna lo entregado a al_terminar"""
+    resultados = []
+    tarea.senales.terminada.connect(resultados.append)
+    ejecutor._activas.add(tarea)
+    tarea.run()
+    return resultados
+
+
+def _registrar_y_cancelar_todas(ejecutor: EjecutorTareas, usuario_id: int):
+    def registrar(contexto):
+        resultado = ContabilidadService(contexto.session).registrar_venta(
+            "Venta", 100.0, contexto.session.get(Usuario, usuario_id))
+        ejecutor.cancelar_todas()  # El usuario pulsa "Cancelar" o cierra la ventana
+        return resultado
+    return registrar
+
+
+def _ventas() -> int:
+    with get_session() as session:
+        return session.query(Transaccion).count()
+
+
+class TestCancelacion:
+    """cancelar_todas no revierte escrituras"""
+
+    def test_escritura_no_se_cancela(self, libro):
+        ejecutor = EjecutorTareas()
+        tarea = Tarea(_registrar_y_cancelar_todas(ejecutor, libro), (), {}, escritura=True)
+
+        resultados = _ejecutar(ejecutor, tarea)
+
+        assert resultados and resultados[0][0]
+        assert _ventas() > 0
+
+    def test_lectura_cancelada_se_revierte(self, libro):
+        ejecutor = EjecutorTareas()
+        tarea = Tarea(_registrar_y_cancelar_todas(ejecutor, libro), (), {})
+
+        assert _ejecutar(ejecutor, tarea) == []
+        assert _ventas() == 0